@@ -59,7 +59,8 @@ endpoint_descriptions = {
     "get_climate":                              "Get current temp and humidity from sensor",
     "set_gps_coords":                           "Set the latitude and longitude used to look up sunrise/sunset times",
     "clear_log":                                "Delete node's log file",
-    "set_log_level":                            "Set log level to argument ('DEBUG', 'INFO', 'WARNING', 'ERROR', or 'CRITICAL')"
+    "set_log_level":                            "Set log level to argument ('DEBUG', 'INFO', 'WARNING', 'ERROR', or 'CRITICAL')",
+    "set_log_format":                           "Set log format to argument ('text' or 'binary', binary uses less flash)"
 }
 
 
@@ -89,7 +90,8 @@ example_usage = {
     'ir_add_macro_action': {"Example usage": "./api_client.py ir_add_macro_action [name] [target] [key] <delay> <repeats>"},
     'ir_run_macro': {"Example usage": "./api_client.py ir_run_macro [name]"},
     'set_gps_coords': {"Example usage": "./api_client.py set_gps_coords [latitude] [longitude]"},
-    'set_log_level': {"Example usage": "./api_client.py set_log_level [LEVEL]"}
+    'set_log_level': {"Example usage": "./api_client.py set_log_level [LEVEL]"},
+    'set_log_format': {"Example usage": "./api_client.py set_log_format [text|binary]"}
 }
 # pylint: enable=line-too-long
 
@@ -605,6 +607,14 @@ def api_prompt():
             ).unsafe_ask()
             command_args.append(level)
 
+        elif endpoint == 'set_log_format':
+            # Prompt user to select log format
+            log_format = questionary.select(
+                'Select log format',
+                choices=('text', 'binary')
+            ).unsafe_ask()
+            command_args.append(log_format)
+
         # Send command, print response
         response = parse_command(node_ip, command_args)
         print(json.dumps(response, indent=4))
@@ -4,6 +4,12 @@
 cli_config.json and prints a table for each mem_info parameter with the value
 from each node and the average of all nodes.
 
+Also calls the /startup_profile endpoint on all nodes and prints the boot time
+of each node, the average duration and heap used by each boot phase and driver
+module import, and the slowest individual steps across all nodes (finds the
+driver or phase that makes a node slow to become reachable). Pass --mem-only
+to skip the startup profile.
+
 Example output:
 
 Total nodes: 7
@@ -37,8 +43,26 @@ max_free_sz:
   living-room:          1185
   thermostat:            819
 Average:                1229
+
+boot seconds:
+  bedroom:              9.48
+  downstairs-bathroom:  6.12
+  ...
+Average:                7.03
+
+phase (avg ms, avg heap used, nodes):
+  _api_calls                  4210.6   1152  7
+  _instantiate_peripherals    1893.2  14720  7
+  ...
+
+Slowest steps (ms, heap used):
+  thermostat    init    sensor1               1204.3   1216
+  bedroom-tv    import  IrBlaster              412.9   9856
+  ...
 '''
 
+import sys
+
 from concurrent.futures import ThreadPoolExecutor
 from api_client import parse_ip
 from cli_config_manager import CliConfigManager
@@ -46,24 +70,26 @@ from cli_config_manager import CliConfigManager
 cli_config = CliConfigManager(no_sync=True)
 
 
-def get_mem_info(node):
-    '''Takes name of node from cli_config.json, calls mem_info endpoint.
-    Returns dict with node name and API response.
+def get_mem_info(node, endpoint='mem_info'):
+    '''Takes name of node from cli_config.json, calls mem_info endpoint (or
+    endpoint arg). Returns dict with node name and API response.
     '''
     return {
         'node': node,
-        'response': parse_ip([node, 'mem_info'])
+        'response': parse_ip([node, endpoint])
     }
 
 
-def get_all_mem_info():
-    '''Calls the mem_info endpoint on all nodes in cli_config.json.
-    Returns a dict with node names as keys and responses as values.
+def get_all_mem_info(endpoint='mem_info'):
+    '''Calls the mem_info endpoint (or endpoint arg) on all nodes in
+    cli_config.json. Returns a dict with node names as keys and responses as
+    values.
     '''
     nodes = {}
 
     with ThreadPoolExecutor(max_workers=20) as executor:
-        for response in executor.map(get_mem_info, cli_config.get_existing_node_names()):
+        names = cli_config.get_existing_node_names()
+        for response in executor.map(get_mem_info, names, [endpoint] * len(names)):
             if not str(response['response']).startswith('Error'):
                 nodes[response['node']] = response['response']
 
@@ -105,9 +131,114 @@ def print_node_param(report, param):
     print('Average:'.ljust(max_name_length + 5) + str(average).rjust(max_num_length) + '\n')
 
 
+def print_boot_times(report):
+    '''Takes response from get_all_mem_info('startup_profile'). Prints table
+    with name of each node and seconds from reset until node was reachable.
+    '''
+    times = {name: response['boot_us'] / 1000000 for name, response in report.items()
+             if isinstance(response, dict) and response.get('boot_us') is not None}
+    if not times:
+        return
+    max_name_length = max(len(name) for name in times)
+
+    print('boot seconds:')
+    for name, seconds in times.items():
+        print(f"  {name}:".ljust(max_name_length + 5) + f"{seconds:.2f}".rjust(8))
+    average = sum(times.values()) / len(times)
+    print('Average:'.ljust(max_name_length + 5) + f"{average:.2f}".rjust(8) + '\n')
+
+
+def get_step_averages(report, category):
+    '''Takes response from get_all_mem_info('startup_profile') and step
+    category (phase, import, init). Returns dict with step names as keys and
+    3-tuples with average duration (ms), average heap used (bytes), and number
+    of nodes as values.
+    '''
+    totals = {}
+    for response in report.values():
+        try:
+            steps = response['steps'].get(category, {})
+        except (KeyError, TypeError, AttributeError):
+            continue
+        for name, (duration, free_before, free_after) in steps.items():
+            total = totals.setdefault(name, [0, 0, 0])
+            total[0] += duration
+            total[1] += free_before - free_after
+            total[2] += 1
+
+    return {
+        name: (duration / total_nodes / 1000, int(heap / total_nodes), total_nodes)
+        for name, (duration, heap, total_nodes) in totals.items()
+    }
+
+
+def print_step_averages(report, category):
+    '''Takes response from get_all_mem_info('startup_profile') and step
+    category. Prints table with average duration, heap used, and number of
+    nodes for each step (slowest first).
+    '''
+    averages = get_step_averages(report, category)
+    if not averages:
+        return
+    max_name_length = max(len(name) for name in averages)
+
+    print(f'{category} (avg ms, avg heap used, nodes):')
+    for name, (duration, heap, nodes) in sorted(averages.items(), key=lambda i: -i[1][0]):
+        print(
+            f"  {name}".ljust(max_name_length + 4) + f"{duration:.1f}".rjust(10) +
+            str(heap).rjust(8) + str(nodes).rjust(4)
+        )
+    print()
+
+
+def get_slowest_steps(report, count=10):
+    '''Takes response from get_all_mem_info('startup_profile'). Returns list of
+    (node, category, step name, duration ms, heap used) tuples for the slowest
+    steps on all nodes (slowest first).
+    '''
+    steps = []
+    for node, response in report.items():
+        try:
+            categories = response['steps'].items()
+        except (KeyError, TypeError, AttributeError):
+            continue
+        for category, category_steps in categories:
+            for name, (duration, free_before, free_after) in category_steps.items():
+                steps.append((node, category, name, duration / 1000, free_before - free_after))
+
+    return sorted(steps, key=lambda step: -step[3])[:count]
+
+
+def print_slowest_steps(report, count=10):
+    '''Takes response from get_all_mem_info('startup_profile'). Prints table
+    with the slowest steps on all nodes.
+    '''
+    steps = get_slowest_steps(report, count)
+    if not steps:
+        return
+    max_node_length = max(len(step[0]) for step in steps)
+    max_name_length = max(len(step[2]) for step in steps)
+
+    print('Slowest steps (ms, heap used):')
+    for node, category, name, duration, heap in steps:
+        print(
+            f"  {node}".ljust(max_node_length + 4) + category.ljust(8) +
+            name.ljust(max_name_length + 2) + f"{duration:.1f}".rjust(10) + str(heap).rjust(8)
+        )
+    print()
+
+
 if __name__ == '__main__':
     result = get_all_mem_info()
     print(f'\nTotal nodes: {len(result)}\n')
     print_node_param(result, 'free')
     print_node_param(result, 'max_new_split')
     print_node_param(result, 'max_free_sz')
+
+    # Skip startup profile if --mem-only flag passed
+    if '--mem-only' not in sys.argv:
+        profiles = get_all_mem_info('startup_profile')
+        print_boot_times(profiles)
+        print_step_averages(profiles, 'phase')
+        print_step_averages(profiles, 'import')
+        print_slowest_steps(profiles)
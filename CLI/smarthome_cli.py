@@ -9,6 +9,7 @@ import pydoc
 import questionary
 from questionary import Style
 from Webrepl import Webrepl
+from log_decoder import decode_log
 from helper_functions import valid_ip, valid_uri, valid_timestamp, get_config_filename
 from config_generator import GenerateConfigFile
 from config_generator import main as config_generator_main
@@ -275,14 +276,14 @@ def view_log_prompt():
     connection = Webrepl(ip, cli_config.config['webrepl_password'])
     print('Downloading log, this may take a few minutes...')
     try:
-        log = connection.get_file_mem('app.log')
+        log = decode_log(connection.get_log_mem())
         connection.close_connection()
     except OSError:
         # Exit on connection error (Webrepl instance prints error message)
         return
 
     # Display log in pager
-    pydoc.pager(log.decode())
+    pydoc.pager(log)
 
     # Save log prompt
     if questionary.confirm('Save log?').ask():
@@ -291,10 +292,21 @@ def view_log_prompt():
             default=f'{node}.log'
         ).unsafe_ask()
         with open(filename, 'w', encoding='utf-8') as file:
-            file.write(log.decode())
+            file.write(log)
         print(f'Log saved as {filename}')
 
 
+def decode_log_file(path):
+    '''Takes path to log file downloaded from node (text or binary format,
+    may contain multiple concatenated segments), prints in text format.
+    '''
+    try:
+        with open(path, 'rb') as file:
+            print(decode_log(file.read()), end='')
+    except FileNotFoundError:
+        print(f'Error: {path} not found')
+
+
 def manage_keywords_prompt():
     '''Prompt allows user to create, edit, and delete schedule keywords'''
     choice = None
@@ -444,7 +456,8 @@ def main_prompt():
 def main():
     '''Entrypoint, shows interactive prompt when smarthome_cli called without
     arguments. Forwards remaining arguments to requested script when first arg
-    is --api, --provision, or --config.
+    is --api, --provision, or --config. Prints decoded log file when first arg
+    is --decode-log.
     '''
 
     # Remove --no-sync flag if present (already processed)
@@ -475,11 +488,16 @@ def main():
             # Show config generator prompt
             config_generator_main()
 
+        elif sys.argv[0] == '--decode-log' and len(sys.argv) > 1:
+            # Print binary log file (eg downloaded with webrepl) in text format
+            decode_log_file(sys.argv[1])
+
         else:
             print('Invalid argument, example usage:')
             print('smarthome_cli --api <node> <command>')
             print('smarthome_cli --config')
             print('smarthome_cli --provision --config /path/to/config.json -ip <ip>')
+            print('smarthome_cli --decode-log /path/to/app.log')
 
 
 if __name__ == '__main__':  # pragma: no cover
@@ -5,12 +5,16 @@ import io
 import re
 import gc
 import json
+import time
 import asyncio
 import logging
 from math import isnan
 from asyncio import Lock
 from micropython import mem_info
 import app_context
+from Instance import Instance
+from json_stream import dump
+from startup_profile import get_profile
 from util import (
     is_device,
     is_sensor,
@@ -29,6 +33,45 @@ log = logging.getLogger("API")
 
 lock = Lock()
 
+# Endpoints that only read state, run without acquiring lock (respond even
+# while a mutating endpoint holds it). Their replies may be streamed while
+# other handlers run (lazy status is built during serialization), lock only
+# keeps mutating endpoints in order until their response is sent.
+READ_ONLY_ENDPOINTS = (
+    'status',
+    'status_since',
+    'get_schedule_rules',
+    'get_schedule_keywords',
+    'get_attributes',
+    'condition_met',
+    'get_temp',
+    'get_humid',
+    'get_climate_data',
+    'ir_get_existing_macros',
+    'load_cell_read',
+    'mem_info',
+    'poll_stats',
+    'sample_stats',
+    'time_sync',
+    'startup_profile'
+)
+
+# Endpoints with async handlers (coroutine awaited before reply is sent)
+ASYNC_ENDPOINTS = (
+    'batch',
+    'turn_on',
+    'turn_off'
+)
+
+# Maximum bytes in a single request line, longer requests are rejected
+MAX_REQUEST_SIZE = 4096
+
+# Maximum simultaneous subscribe connections (each holds a socket open)
+MAX_SUBSCRIBERS = 3
+
+# Seconds between subscribe events if nothing changes (detects dead clients)
+SUBSCRIBE_HEARTBEAT = 30
+
 # Matches HH:MM
 TIMESTAMP_REGEX = r'^([0-1][0-9]|2[0-3]):[0-5][0-9]$'
 
@@ -114,6 +157,44 @@ class MemInfoParser(io.IOBase):
         return None  # pragma: no cover
 
 
+class RequestReader:
+    '''Wraps stream reader and reads newline-terminated lines in fixed-size
+    chunks. Raises ValueError if a line exceeds max_size bytes (prevents a
+    malformed client from growing the buffer until the heap is exhausted).
+    '''
+
+    def __init__(self, sreader, max_size=MAX_REQUEST_SIZE, chunk_size=256):
+        self.sreader = sreader
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        # Bytes received after the end of the last line returned by readline
+        self._buffer = b''
+
+    async def readline(self):
+        '''Returns next line including trailing newline. Returns remaining
+        bytes (or empty bytes) if client closed write stream before newline.
+        '''
+        while True:
+            newline_index = self._buffer.find(b'\n')
+            if newline_index >= self.max_size:
+                raise ValueError('Request exceeded max size')
+            if newline_index != -1:
+                line = self._buffer[:newline_index + 1]
+                self._buffer = self._buffer[newline_index + 1:]
+                return line
+
+            if len(self._buffer) > self.max_size:
+                raise ValueError('Request exceeded max size')
+
+            chunk = await self.sreader.read(self.chunk_size)
+            # Client closed write stream, return partial line (if any)
+            if not chunk:
+                line = self._buffer
+                self._buffer = b''
+                return line
+            self._buffer += chunk
+
+
 class Api:
     '''API backend, listens for requests and calls correct handler function.
 
@@ -127,13 +208,24 @@ class Api:
 
     All class methods which are NOT endpoint handler functions must start with
     an underscore (this prevents them from being called with an API request).
+
+    Endpoints listed in READ_ONLY_ENDPOINTS run without acquiring the lock, all
+    other endpoints hold the lock until their response is sent and connection
+    closed (ensures reboot_task and run_macro_task run after the response).
+    Handlers are not atomic: endpoints in ASYNC_ENDPOINTS await network sends,
+    lazy status replies are built while streamed, and keep-alive and subscribe
+    connections stay open, so other clients are served in between.
     '''
 
-    def __init__(self, host='0.0.0.0', port=8123, backlog=5, timeout=20):
+    def __init__(self, host='0.0.0.0', port=8123, backlog=5, timeout=20, keepalive_timeout=60):
         self.host = host
         self.port = port
         self.backlog = backlog
         self.timeout = timeout
+        # Seconds a keep-alive connection can stay idle before it is closed
+        self.keepalive_timeout = keepalive_timeout
+        # Number of open subscribe connections
+        self.subscribers = 0
 
     async def _run(self):
         '''Starts asyncio server listening for API requests.'''
@@ -153,13 +245,21 @@ class Api:
                       passed to handler function as remaining items.
         HTTP request: Expects GET request to /endpoint with args passed to
                       handler in querystring.
+        Keep-alive:   Expects serialized dict with "id" key (returned with
+                      reply) and "cmd" key (same syntax as JSON request). The
+                      connection stays open for more requests, see
+                      _run_keepalive_client.
+        Subscribe:    Expects serialized list with "subscribe" followed by
+                      optional status_version. The connection stays open and
+                      receives status changes, see _run_subscriber.
 
         Looks up endpoint method using getattr(self), passes args to to method
         if found, returns error if endpoint does not exist.
         '''
+        reader = RequestReader(sreader)
         try:
             # Read client request
-            req = await asyncio.wait_for(sreader.readline(), self.timeout)
+            req = await asyncio.wait_for(reader.readline(), self.timeout)
             req = req.decode()
 
             # Received null (client closed write stream), skip to end and close read stream
@@ -174,60 +274,64 @@ class Api:
 
                 # Read until end of headers
                 while True:
-                    line = await asyncio.wait_for(sreader.readline(), self.timeout)
+                    line = await asyncio.wait_for(reader.readline(), self.timeout)
                     # Sequence indicates end of headers
                     if line == b"\r\n":
                         break
+                    # Client closed write stream before end of headers
+                    if not line:
+                        raise OSError
 
             # Raw JSON request (faster than HTTP, used by CLI, frontend, ApiTarget devices)
             else:
                 http = False
 
                 try:
-                    # Convert serialized json to list, get path and args
+                    # Convert serialized json to list
                     data = json.loads(req)
-                    path = data[0]
-                    args = data[1:]
-                    log.debug('received async request, endpoint: %s, args: %s', path, args)
+                    if not isinstance(data, (list, dict)) or not data:
+                        raise ValueError
                 except ValueError:
                     # Return error if request JSON is invalid
                     swriter.write(json.dumps({"ERROR": "Syntax error in received JSON"}).encode())
-                    await swriter.drain()
+                    await asyncio.wait_for(swriter.drain(), self.timeout)
                     raise OSError  # pylint: disable=W0707
 
+                # Keep-alive request, handle all requests received on
+                # connection until client closes it or goes idle
+                if isinstance(data, dict):
+                    await self._run_keepalive_client(reader, swriter, data)
+                    raise OSError
+
+                # Subscribe request, stream status changes to client
+                # until it closes connection
+                if data[0] == "subscribe":
+                    await self._run_subscriber(swriter, data[1:])
+                    raise OSError
+
+                # Get path and args
+                path = data[0]
+                args = data[1:]
+                log.debug('received async request, endpoint: %s, args: %s', path, args)
+
             # Prevent calling non-endpoint class methods
             if path.startswith('_'):
                 await self._invalid_endpoint_error(swriter, path, http)
-                await swriter.drain()
+                await asyncio.wait_for(swriter.drain(), self.timeout)
                 raise OSError
 
-            # Acquire lock, prevent multiple endpoints running simultaneously
-            # Ensures response sent + connection closed before reboot task runs
-            async with lock:
-                # Find endpoint matching path, call handler function and pass args
-                try:
-                    # Call handler, receive reply for client
-                    reply = getattr(self, path)(args)
+            # Read-only endpoints don't need lock (cannot conflict with other
+            # handlers), respond immediately even if another client is slow
+            if path in READ_ONLY_ENDPOINTS:
+                await self._handle_request(swriter, path, args, http)
 
-                # Return error if no match found
-                except AttributeError:
-                    await self._invalid_endpoint_error(swriter, path, http)
+            # Acquire lock, prevent multiple mutating endpoints running simultaneously
+            # Ensures response sent + connection closed before reboot task runs
+            else:
+                async with lock:
+                    await self._handle_request(swriter, path, args, http)
 
-                # Return endpoint reply to client
-                else:
-                    if http:
-                        # Send headers before reply
-                        swriter.write(
-                            "HTTP/1.0 200 NA\r\nContent-Type: application/json\r\n\r\n".encode()
-                        )
-                    swriter.write(json.dumps(reply).encode())
-
-                # Send response, close stream
-                await swriter.drain()
-                swriter.close()
-                await swriter.wait_closed()
-
-        except (OSError, asyncio.TimeoutError):
+        except (OSError, ValueError, asyncio.TimeoutError):
             # Close stream
             swriter.close()
             await swriter.wait_closed()
@@ -235,6 +339,170 @@ class Api:
         # Reduce memory fragmentation from repeated requests
         gc.collect()
 
+    async def _run_keepalive_client(self, reader, swriter, data):
+        '''Takes RequestReader, open stream writer, and first request parsed
+        from connection (dict with "id" and "cmd" keys). Replies to each request
+        with a newline-terminated dict containing the same "id" and a "reply"
+        key, then waits for the next request. Returns when the client closes
+        the connection or sends nothing for self.keepalive_timeout seconds.
+        '''
+        log.debug('starting keep-alive connection')
+        while True:
+            # Mutating endpoints hold lock until reply is sent (same as JSON
+            # requests), reboot_task runs after client receives response
+            if self._get_keepalive_path(data) in READ_ONLY_ENDPOINTS:
+                await self._handle_keepalive_request(swriter, data)
+            else:
+                async with lock:
+                    await self._handle_keepalive_request(swriter, data)
+
+            # Wait for next request
+            try:
+                req = await asyncio.wait_for(reader.readline(), self.keepalive_timeout)
+            except asyncio.TimeoutError:
+                log.debug('closing idle keep-alive connection')
+                return
+            if not req:
+                return
+
+            try:
+                data = json.loads(req)
+                if not isinstance(data, dict):
+                    raise ValueError
+            except (OSError, ValueError):
+                data = None
+
+    async def _run_subscriber(self, swriter, args):
+        '''Takes open stream writer and subscribe request args (optional
+        status_version from previous status reply). Writes newline-delimited
+        JSON events until the client closes the connection.
+
+        Each event is a dict with node_ms (node time in milliseconds, used to
+        measure latency between events) and status keys. The first status is
+        the full status object (or status_since reply if version was passed),
+        each following status contains changes since the previous event. An
+        unchanged event is sent after SUBSCRIBE_HEARTBEAT seconds with no
+        changes (lets both sides detect dead connections).
+        '''
+        if self.subscribers >= MAX_SUBSCRIBERS:
+            error = {"ERROR": "Too many subscribers"}
+        else:
+            error = None
+            try:
+                version = int(args[0]) if args else None
+            except (ValueError, TypeError):
+                error = {"ERROR": "Version argument must be int"}
+        if error:
+            swriter.write(json.dumps(error).encode())
+            await asyncio.wait_for(swriter.drain(), self.timeout)
+            return
+
+        log.debug('starting subscription')
+        config = app_context.config_instance
+
+        # Set event each time any instance status changes
+        changed = asyncio.Event()
+        listener = changed.set
+        Instance.status_listeners.append(listener)
+        self.subscribers += 1
+        try:
+            while True:
+                # Clear before building status (changes made while streaming
+                # set event again, sent in next event)
+                changed.clear()
+                if version is None:
+                    status = config.get_status(lazy=True)
+                else:
+                    status = config.get_status_since(version, lazy=True)
+                version = Instance.status_version
+
+                await dump(
+                    {"node_ms": time.time_ns() // 1000000, "status": status},
+                    swriter,
+                    timeout=self.timeout
+                )
+                swriter.write(b'\n')
+                await asyncio.wait_for(swriter.drain(), self.timeout)
+
+                # Wait for next change (send unchanged event if none)
+                try:
+                    await asyncio.wait_for(changed.wait(), SUBSCRIBE_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            Instance.status_listeners.remove(listener)
+            self.subscribers -= 1
+            log.debug('closing subscription')
+
+    def _get_keepalive_path(self, data):
+        '''Takes keep-alive request dict, returns endpoint name or None.'''
+        try:
+            return data["cmd"][0]
+        except (KeyError, IndexError, TypeError):
+            return None
+
+    async def _handle_keepalive_request(self, swriter, data):
+        '''Takes open stream writer and keep-alive request dict, calls endpoint
+        handler and writes reply (dict with request id and reply) followed by
+        newline. Does not close the connection.
+        '''
+        path = self._get_keepalive_path(data)
+        if data is None:
+            req_id = None
+            reply = {"ERROR": "Syntax error in received JSON"}
+        elif not isinstance(path, str):
+            req_id = data.get("id")
+            reply = INVALID_SYNTAX_ERROR
+        else:
+            req_id = data.get("id")
+            log.debug('received keep-alive request, endpoint: %s, args: %s', path, data["cmd"][1:])
+            # Prevent calling non-endpoint class methods
+            handler = None if path.startswith('_') else getattr(self, path, None)
+            if not callable(handler):
+                log.error('received invalid command (%s)', path)
+                reply = {"ERROR": "Invalid command"}
+            else:
+                reply = handler(data["cmd"][1:])
+                if path in ASYNC_ENDPOINTS:
+                    reply = await reply
+
+        await dump({"id": req_id, "reply": reply}, swriter, timeout=self.timeout)
+        swriter.write(b'\n')
+        await asyncio.wait_for(swriter.drain(), self.timeout)
+
+    async def _handle_request(self, swriter, path, args, http):
+        '''Takes open stream writer instance, endpoint name, list of args, and
+        http bool (adds headers if True). Calls endpoint handler, writes reply
+        to stream and closes connection. Drain is bounded by self.timeout so a
+        client that stops reading cannot hold the connection open.
+        '''
+
+        # Find endpoint matching path, call handler function and pass args
+        try:
+            # Call handler, receive reply for client
+            reply = getattr(self, path)(args)
+            if path in ASYNC_ENDPOINTS:
+                reply = await reply
+
+        # Return error if no match found
+        except AttributeError:
+            await self._invalid_endpoint_error(swriter, path, http)
+
+        # Return endpoint reply to client
+        else:
+            if http:
+                # Send headers before reply
+                swriter.write(
+                    "HTTP/1.0 200 NA\r\nContent-Type: application/json\r\n\r\n".encode()
+                )
+            # Write reply in chunks (avoids allocating full JSON string)
+            await dump(reply, swriter, timeout=self.timeout)
+
+        # Send response, close stream
+        await asyncio.wait_for(swriter.drain(), self.timeout)
+        swriter.close()
+        await swriter.wait_closed()
+
     async def _parse_http_request(self, req):
         '''Takes HTTP request (ex: "GET /status HTTP/1.1").
         Returns requested endpoint and list of args from querystring.
@@ -274,8 +542,56 @@ class Api:
         return "Rebooting"
 
     def status(self, args):
-        '''Returns status JSON with current state of all devices and sensors.'''
-        return app_context.config_instance.get_status()
+        '''Returns status JSON with current state of all devices and sensors.
+        Status of each instance is generated while reply is streamed.
+        '''
+        return app_context.config_instance.get_status(lazy=True)
+
+    def status_since(self, args):
+        '''Takes status_version from a previous status or status_since reply,
+        returns status of devices and sensors that changed since that version
+        (includes metadata if changed) or {"unchanged": True} if no changes.
+        Both replies include the current status_version.
+        '''
+        if len(args) < 1:
+            return INVALID_SYNTAX_ERROR
+
+        try:
+            version = int(args[0])
+        except (ValueError, TypeError):
+            return {"ERROR": "Version argument must be int"}
+
+        return app_context.config_instance.get_status_since(version, lazy=True)
+
+    async def batch(self, args):
+        '''Takes list of commands (each a list with endpoint followed by args),
+        calls each endpoint in order and returns list of replies (same order).
+        All commands run under a single lock acquisition.
+        '''
+        if len(args) < 1:
+            return INVALID_SYNTAX_ERROR
+
+        replies = []
+        for cmd in args:
+            if not isinstance(cmd, list) or not cmd or not isinstance(cmd[0], str):
+                replies.append(INVALID_SYNTAX_ERROR)
+                continue
+
+            # Prevent calling non-endpoint class methods and nested batches
+            path = cmd[0]
+            handler = None
+            if not path.startswith('_') and path != 'batch':
+                handler = getattr(self, path, None)
+            if not callable(handler):
+                log.error('received invalid command in batch (%s)', path)
+                replies.append({"ERROR": "Invalid command"})
+            else:
+                reply = handler(cmd[1:])
+                if path in ASYNC_ENDPOINTS:
+                    reply = await reply
+                replies.append(reply)
+
+        return replies
 
     def enable(self, args):
         '''Takes device or sensor ID, calls enable method.'''
@@ -470,12 +786,9 @@ class Api:
             return {"ERROR": f"Rule already exists at {timestamp}, add 'overwrite' arg to replace"}
 
         target.schedule[timestamp] = valid
-        # Schedule queue rebuild after connection closes (blocks for several seconds)
-        app_context.timer_instance.create(
-            1200,
-            app_context.config_instance._build_queue,
-            "rebuild_queue"
-        )
+        target.status_changed()
+        # Schedule target queue rebuild after connection closes (blocks)
+        app_context.config_instance.schedule_rebuild([target])
         return {"Rule added": valid, "time": timestamp}
 
     def remove_rule(self, args):
@@ -499,12 +812,9 @@ class Api:
 
         try:
             del target.schedule[timestamp]
-            # Schedule queue rebuild after connection closes (blocks for several seconds)
-            app_context.timer_instance.create(
-                1200,
-                app_context.config_instance._build_queue,
-                "rebuild_queue"
-            )
+            target.status_changed()
+            # Schedule target queue rebuild after connection closes (blocks)
+            app_context.config_instance.schedule_rebuild([target])
         except KeyError:
             return {"ERROR": "No rule exists at that time"}
 
@@ -541,12 +851,9 @@ class Api:
 
         if re.match(TIMESTAMP_REGEX, timestamp):
             app_context.config_instance.schedule_keywords[keyword] = timestamp
-            # Schedule queue rebuild after connection closes (blocks for several seconds)
-            app_context.timer_instance.create(
-                1200,
-                app_context.config_instance._build_queue,
-                "rebuild_queue"
-            )
+            app_context.config_instance.metadata_changed()
+            # Schedule queue rebuild for instances with rules using keyword
+            app_context.config_instance.schedule_keyword_rebuild(keyword)
             return {"Keyword added": keyword, "time": timestamp}
         return {"ERROR": "Timestamp format must be HH:MM (no AM/PM)"}
 
@@ -565,20 +872,22 @@ class Api:
             return {"ERROR": "Keyword does not exist"}
 
         # Remove all existing rules using keyword
+        affected = []
         for device in app_context.config_instance.devices:
             if keyword in device.schedule:  # pragma: no branch
                 del device.schedule[keyword]
+                device.status_changed()
+                affected.append(device)
         for sensor in app_context.config_instance.sensors:
             if keyword in sensor.schedule:
                 del sensor.schedule[keyword]
+                sensor.status_changed()
+                affected.append(sensor)
 
         del app_context.config_instance.schedule_keywords[keyword]
-        # Schedule queue rebuild after connection closes (blocks for several seconds)
-        app_context.timer_instance.create(
-            1200,
-            app_context.config_instance._build_queue,
-            "rebuild_queue"
-        )
+        app_context.config_instance.metadata_changed()
+        # Schedule queue rebuild for instances that had rules using keyword
+        app_context.config_instance.schedule_rebuild(affected)
         return {"Keyword removed": args[0]}
 
     def save_schedule_keywords(self, args):
@@ -632,7 +941,18 @@ class Api:
             return {"Triggered": target.name}
         return {"ERROR": f"Cannot trigger {target._type} sensor type"}
 
-    def turn_on(self, args):
+    async def _send(self, target, state):
+        '''Takes device instance and state, sends state to device. Returns
+        True if device acknowledged, False if request failed.
+        '''
+        # Network dimmers queue requests in outbox (send returns before
+        # request completes), wait for result. Force send even if device
+        # already acknowledged the same value (may have changed since).
+        if hasattr(target, 'outbox'):
+            return await target.send_async(state, force=True)
+        return target.send(state)
+
+    async def turn_on(self, args):
         '''Takes device ID, turns device on. Returns error if failed to turn on.'''
         if len(args) < 1:
             return INVALID_SYNTAX_ERROR
@@ -647,12 +967,12 @@ class Api:
         if not target.enabled:
             return {"ERROR": f"{target.name} is disabled, please enable before turning on"}
 
-        if target.send(1):
+        if await self._send(target, 1):
             target.state = True
             return {"On": target.name}
         return {"ERROR": f"Unable to turn on {target.name}"}
 
-    def turn_off(self, args):
+    async def turn_off(self, args):
         '''Takes device ID, turns device off. Returns error if failed to turn off.'''
         if len(args) < 1:
             return INVALID_SYNTAX_ERROR
@@ -664,7 +984,7 @@ class Api:
         if not is_device(target.name):
             return {"ERROR": "Can only turn on/off devices, use enable/disable for sensors"}
 
-        if target.send(0):
+        if await self._send(target, 0):
             target.state = False
             return {"Off": target.name}
         return {"ERROR": f"Unable to turn off {target.name}"}
@@ -725,6 +1045,24 @@ class Api:
         log.critical("Log level changed to %s", args[0])
         return {"Success": "Log level set (takes effect after reboot)"}
 
+    def set_log_format(self, args):
+        '''Takes log format (text or binary). Writes new log format to disk
+        (takes effect on next reboot). Binary logs use less flash and CPU but
+        must be decoded on the host (see util/log_decoder.py).
+        '''
+        if len(args) < 1:
+            return INVALID_SYNTAX_ERROR
+
+        if args[0] not in ("text", "binary"):
+            return {
+                "ERROR": "Unsupported log format",
+                "options": ["text", "binary"]
+            }
+        with open("log_format.py", "w", encoding="utf-8") as file:
+            file.write(f"LOG_FORMAT = '{args[0]}'")
+        log.critical("Log format changed to %s", args[0])
+        return {"Success": "Log format set (takes effect after reboot)"}
+
     def ir_key(self, args):
         '''Takes IR target device and key name, sends code with IR Blaster.
         Returns error if target/key invalid or no IR Blaster configured.
@@ -896,3 +1234,28 @@ class Api:
             'max_new_split': parser.max_new_split,
             'max_free_sz': parser.max_free_sz
         }
+
+    def poll_stats(self, args):
+        '''Returns dict with device names as keys, dicts with poll counters and
+        latency as values (devices polled by PollScheduler only).
+        '''
+        return app_context.poll_scheduler_instance.get_stats()
+
+    def sample_stats(self, args):
+        '''Returns dict with sensor names as keys, dicts with read counters,
+        duration, and lateness as values (sensors read by SensorSampler only).
+        '''
+        return app_context.sensor_sampler_instance.get_stats()
+
+    def time_sync(self, args):
+        '''Returns dict with NTP server, UTC offset, RTC drift rate, last clock
+        error and round trip delay, and sync counters.
+        '''
+        return app_context.config_instance.time_sync.get_status()
+
+    def startup_profile(self, args):
+        '''Returns dict with microseconds from reset until node was reachable,
+        free heap, and duration and free heap before/after each boot phase,
+        driver module import, and driver __init__.
+        '''
+        return get_profile()
@@ -1,22 +1,31 @@
-import re
 import gc
 import time
+import asyncio
 import logging
 import network
 from random import randrange
 from machine import Pin, Timer, RTC
+from array import array
+from bisect import bisect_right
 import requests
 import app_context
 from Group import Group
+from Instance import Instance
+from json_stream import LazyDict
 from api_keys import ipgeo_key
 from hardware_classes import hardware_classes
+from solar import get_sun_times, get_utc_offset, get_local_sun_times
+from sntp import TimeSync, DEFAULT_HOST
+from startup_profile import ProfileStep
 from util import (
     is_device,
     is_sensor,
     is_device_or_sensor,
     reboot,
     print_with_timestamp,
-    read_wifi_credentials_from_disk
+    read_wifi_credentials_from_disk,
+    read_astronomy_from_disk,
+    write_astronomy_to_disk
 )
 
 # Set name for module's log lines
@@ -25,10 +34,28 @@ log = logging.getLogger("Config")
 # Used to reboot if startup hangs for longer than 1 minute
 reboot_timer = Timer(2)
 
+# Max seconds since last API response that cached UTC offset is trusted to
+# skip the API call at boot (nightly reload refreshes it every day)
+ASTRONOMY_CACHE_MAX_AGE = 172800
+
 # Turn onboard LED on, indicates setup in progress
 led = Pin(2, Pin.OUT, value=1)
 
 
+def _minute_of_day(timestamp):
+    '''Takes HH:MM timestamp, returns number of minutes since midnight.
+    Returns None if timestamp is not a valid HH:MM string (eg keyword).
+    '''
+    try:
+        hour, minute = timestamp.split(":")
+        if len(hour) <= 2 and len(minute) == 2 and hour.isdigit() and minute.isdigit():
+            if int(hour) < 24 and int(minute) < 60:
+                return int(hour) * 60 + int(minute)
+    except (ValueError, AttributeError):
+        pass
+    return None
+
+
 def instantiate_hardware(name, **kwargs):
     '''Takes name (device1, sensor2, etc) and dict of config params,
     instantiates correct driver class and returns instance.
@@ -42,21 +69,32 @@ def instantiate_hardware(name, **kwargs):
             f'Invalid name "{name}", must start with "device" or "sensor"'
         )
 
-    # Import correct module, instantiate class
+    # Import correct module, instantiate class (records time and heap used by
+    # import and __init__ if node is booting)
     if is_device(name):
-        module = __import__(hardware_classes['devices'][kwargs['_type']])
+        module_name = hardware_classes['devices'][kwargs['_type']]
     else:
-        module = __import__(hardware_classes['sensors'][kwargs['_type']])
+        module_name = hardware_classes['sensors'][kwargs['_type']]
+    with ProfileStep('import', module_name):
+        module = __import__(module_name)
     cls = getattr(module, module.__name__)
-    return cls(name, **kwargs)
+    with ProfileStep('init', name):
+        return cls(name, **kwargs)
 
 
 class Config():
     '''Takes dict parsed from config.json, sets up node, peripherals, and
     scheduled rule changes based on config file settings.
 
-    Makes API calls to set system clock and get local sunrise/sunset times used
-    in schedule rules (uses GPS coordinates in config file if present).
+    Sets system clock with NTP (ntp_server in config metadata, or public pool)
+    and makes API calls to get local sunrise/sunset times used in schedule
+    rules (uses GPS coordinates in config file if present). The last API
+    response is cached on disk with the UTC offset used to convert NTP time to
+    local time. If the config file contains GPS coordinates sunrise/sunset are
+    computed locally and the API call is skipped at boot while the cached
+    response is recent. If the API call fails the cached response is used
+    instead of rebooting. The clock is resynced in the background at an
+    interval based on the measured RTC drift rate.
 
     Instantiates correct driver for all devices and sensors specified in config
     file, creates callback timers for each scheduled rule change.
@@ -65,12 +103,23 @@ class Config():
       devices:           List of device driver instances
       sensors:           List of device sensor instances
       schedule_keywords: Dict with keywords as keys, HH:MM timestamps as values
+      time_sync:         TimeSync instance (NTP sync status and drift rate)
 
     Public methods:
       find:              Takes device or sensor ID, returns matching instance
       get_status:        Generates status dict returned by status API endpoint
+      get_status_since:  Takes status version, returns only changed sections
+                         of status dict (returned by status_since endpoint)
+      metadata_changed:  Called when metadata or schedule keywords change
+      schedule_rebuild:  Takes list of instances with changed schedule rules,
+                         rebuilds their rule queues after a short delay
+      schedule_keyword_rebuild: Takes schedule keyword, rebuilds rule queues
+                         of all instances with rules that use the keyword
+      get_scheduled_rule: Takes device or sensor instance, returns schedule
+                         rule that applies now (or at optional time)
       reload_schedule_rules: Updates sunrise/sunset times from API and creates
                          scheduled rule change callback timers for next day
+      sync_time:         Syncs system clock with NTP server, schedules next sync
 
     Optional delay_setup argument used in unit tests to prevent automatically
     running all methods (allows checking state in between each method).
@@ -86,6 +135,9 @@ class Config():
         # Add key for timestamp of next schedule rule reload (between 3-4 am)
         self._metadata["_reload_time"] = ""
 
+        # Sets system clock from NTP server, tracks RTC drift between syncs
+        self.time_sync = TimeSync(self._metadata.get("ntp_server") or DEFAULT_HOST)
+
         # Device and sensor instances, populated by _instantiate_peripherals
         self.devices = []
         self.sensors = []
@@ -100,6 +152,22 @@ class Config():
         self.schedule_keywords = {'sunrise': '00:00', 'sunset': '00:00'}
         self.schedule_keywords.update(conf["schedule_keywords"])
 
+        # Keys are schedule keywords, values are lists of instances with rules
+        # using the keyword (populated by _build_instance_queue, used to only
+        # rebuild affected instances when a keyword changes)
+        self._keyword_index = {}
+
+        # Value of Instance.status_version when metadata last changed
+        self._metadata_version = Instance.status_version
+
+        # Instances waiting for schedule_rebuild timer to rebuild rule queue
+        self._pending_rebuild = []
+
+        # Keys are instance names, values are compiled schedules (2-tuple of
+        # sorted minute-of-day array and parallel rule list) populated by
+        # _build_instance_queue, removed by schedule_rebuild until rebuilt
+        self._compiled_schedules = {}
+
         # Parse all device and sensor sections into dict attributes, removed
         # after device and sensor lists populated by _instantiate_peripherals
         self._device_configs = {device: config for device, config in conf.items()
@@ -117,26 +185,32 @@ class Config():
         when class instantiated unless delay_setup arg passed (unit tests).
         '''
 
+        # Each phase is timed with free heap before/after (startup_profile)
+
         # Connect to wifi, hit APIs for current time, sunrise/sunset timestamps
-        self._api_calls()
+        with ProfileStep('phase', '_api_calls'):
+            self._api_calls()
         gc.collect()
 
         # Instantiate each config in self._device_configs and self._sensor_configs
         # as appropriate class, add to self.devices and self.sensors respectively
-        self._instantiate_peripherals()
+        with ProfileStep('phase', '_instantiate_peripherals'):
+            self._instantiate_peripherals()
         gc.collect()
 
         # Start timer to build schedule rule queue for next 24 hours around 3 am
         self._start_reload_schedule_rules_timer()
 
         # Create timers for all schedule rules expiring in next 24 hours
-        self._build_queue()
+        with ProfileStep('phase', '_build_queue'):
+            self._build_queue()
         gc.collect()
 
         # Map relationships between sensors ("triggers") and devices ("targets")
         # Must run after _build_queue to prevent sensors turning devices on/off
         # before correct scheduled rule applied
-        self._build_groups()
+        with ProfileStep('phase', '_build_groups'):
+            self._build_groups()
         gc.collect()
 
         log.info("Finished instantiating config")
@@ -165,7 +239,7 @@ class Config():
 
         # Get HH:MM timestamp of next reload, write to log
         reload_time = time.localtime(next_reload + adjust)
-        self._metadata["_reload_time"] = f"0{reload_time[3]}:{reload_time[4]}"
+        self._metadata["_reload_time"] = f"0{reload_time[3]}:{reload_time[4]:02d}"
         log.info(
             "Reload_schedule_rules callback scheduled for %s am",
             self._metadata["_reload_time"]
@@ -178,6 +252,9 @@ class Config():
             "reload_schedule_rules"
         )
 
+        # Reload time and sunrise/sunset (updated before this runs) changed
+        self.metadata_changed()
+
     def _instantiate_peripherals(self):
         '''Populates self.devices and self.sensors lists by instantiating
         config sections from self._device_configs and self._sensor_configs.
@@ -259,8 +336,22 @@ class Config():
                 # Replace targets list with list of instances
                 conf[sensor]['targets'] = targets
 
+                # Remove optional debounce window, sample interval, and max
+                # reading age (not driver arguments)
+                debounce_ms = conf[sensor].pop('debounce_ms', 0)
+                sample_interval = conf[sensor].pop('sample_interval', None)
+                max_age = conf[sensor].pop('max_age', None)
+
                 # Instantiate sensor with appropriate class
                 instance = instantiate_hardware(sensor, **conf[sensor])
+                instance.debounce_ms = int(debounce_ms)
+
+                # Override driver's default interval and max reading age
+                # (SensorWithLoop only)
+                if sample_interval is not None and hasattr(instance, 'sample_interval'):
+                    instance.sample_interval = int(sample_interval)
+                if max_age is not None and hasattr(instance, 'max_age'):
+                    instance.max_age = int(max_age)
 
                 # Add sensor instance to triggered_by list of each target
                 for t in targets:
@@ -336,42 +427,102 @@ class Config():
 
         log.debug("Finished building %s groups", len(self.groups))
 
-    def get_status(self):
+    def get_status(self, lazy=False):
         '''Returns dict with metadata and current status of all devices and
         sensors. Called by status API endpoint, frontend polls every 5 seconds
         and uses response to update react state.
+
+        If lazy arg is True returns LazyDict that gets status of each device
+        and sensor while it is being serialized (status endpoint streams reply
+        without building the full dict in memory).
         '''
 
-        # Populate template from class attributes
-        status_dict = {
-            "metadata": self._metadata,
-            "devices": {},
-            "sensors": {}
-        }
+        self._update_metadata()
+
+        # Get status of each device and sensor when section is serialized
+        status = LazyDict(lambda: iter((
+            ("metadata", self._metadata),
+            ("devices", LazyDict(lambda: self._iter_status(self.devices))),
+            ("sensors", LazyDict(lambda: self._iter_status(self.sensors))),
+            ("status_version", Instance.status_version),
+            ("boot_id", Instance.boot_id)
+        )))
+
+        if lazy:
+            return status
+        return status.to_dict()
+
+    def get_status_since(self, version, lazy=False):
+        '''Takes status_version from a previous get_status or get_status_since
+        call, returns dict with status of devices and sensors that changed
+        since version (metadata only included if changed) and current version.
+
+        Returns dict with unchanged key if nothing changed, returns full status
+        if version is newer than current version (node rebooted since). All
+        replies include boot_id, clients must request full status if it
+        changed (versions restart at 0 on reboot).
+        '''
+        current = Instance.status_version
+        if version > current:
+            return self.get_status(lazy)
+        if version == current:
+            return {"unchanged": True, "status_version": current, "boot_id": Instance.boot_id}
+
+        # Get status of each changed device and sensor when serialized
+        sections = [
+            ("devices", LazyDict(lambda: self._iter_status(self.devices, version))),
+            ("sensors", LazyDict(lambda: self._iter_status(self.sensors, version))),
+            ("status_version", current),
+            ("boot_id", Instance.boot_id)
+        ]
+        if self._metadata_version > version:
+            self._update_metadata()
+            sections.insert(0, ("metadata", self._metadata))
+        status = LazyDict(lambda: iter(sections))
+
+        if lazy:
+            return status
+        return status.to_dict()
+
+    def _update_metadata(self):
+        '''Adds schedule keywords and IR Blaster info to metadata dict.'''
 
         # Add schedule keywords to metadata
-        status_dict["metadata"]["schedule_keywords"] = self.schedule_keywords
+        self._metadata["schedule_keywords"] = self.schedule_keywords
 
         # Add bool that tells frontend if IR Blaster is configured
-        status_dict["metadata"]["ir_blaster"] = bool(self.ir_blaster)
+        self._metadata["ir_blaster"] = bool(self.ir_blaster)
 
         # Add IR targets if IR Blaster configured
         if self.ir_blaster:
-            status_dict["metadata"]["ir_targets"] = self.ir_blaster.target
-
-        # Iterate devices, add get_status return value, add schedule rules
-        for i in self.devices:
-            status_dict["devices"][i.name] = i.get_status()
-
-        # Iterate sensors, add get_status return value, add schedule rules
-        for i in self.sensors:
-            status_dict["sensors"][i.name] = i.get_status()
-
-        return status_dict
+            self._metadata["ir_targets"] = self.ir_blaster.target
 
-    def _api_calls(self):
-        '''Connects to wifi (if not connected), sets system clock and
-        sunrise/sunset times with values received from API.
+    def metadata_changed(self):
+        '''Increments Instance.status_version, saves as metadata version (next
+        get_status_since call includes metadata), notifies status listeners.
+        '''
+        Instance.status_version += 1
+        self._metadata_version = Instance.status_version
+        for listener in Instance.status_listeners:
+            listener()
+
+    def _iter_status(self, instances, since=None):
+        '''Takes list of device or sensor instances, yields 2-tuple with name
+        and get_status return value for each instance. If optional since arg
+        (status version) is passed skips instances that have not changed.
+        '''
+        for instance in instances:
+            if since is None or instance.changed_version > since:
+                yield instance.name, instance.get_status()
+
+    def _api_calls(self, use_cache=True):
+        '''Connects to wifi (if not connected), sets system clock with NTP
+        and sunrise/sunset times with values received from API.
+
+        If config contains GPS coordinates and use_cache is True (boot) the API
+        call is skipped when the NTP sync succeeded and the cached response is
+        recent enough to trust its UTC offset (sunrise/sunset computed locally).
+        If the API call fails the cached response is used as a fallback.
         '''
 
         # Auto-reboot if startup doesn't complete in 1 min (prevents API calls
@@ -395,14 +546,58 @@ class Config():
             print_with_timestamp(f"Successfully connected to {credentials['ssid']}")
             log.debug("Successfully connected to %s", credentials['ssid'])
 
+        cache = read_astronomy_from_disk()
+
+        # Set system clock with NTP if UTC offset known (cached API response)
+        synced = False
+        if cache.get('utc_offset') is not None:
+            synced = self.time_sync.sync(cache['utc_offset'])
+
+        # Skip API call if sunrise/sunset can be computed from GPS coordinates
+        # with trusted UTC offset (system clock was set by NTP)
+        age = time.time() - cache.get('time', 0)
+        if (
+            use_cache
+            and synced
+            and 0 <= age < ASTRONOMY_CACHE_MAX_AGE
+            and self._set_sun_times_from_gps(cache['utc_offset'])
+        ):
+            log.info("Computed sunrise/sunset from GPS coordinates, skipped API call")
+
+        # Get time and sunrise/sunset from API, fall back to cache if failed
+        elif not self._get_astronomy_from_api(bool(cache)):
+            self._use_cached_astronomy(cache)
+
+        # Resync system clock in background (corrects RTC drift)
+        self._start_time_sync_timer()
+
+        log.info(
+            "Finished API calls (timestamp may look weird due to system clock change)"
+        )
+
+        # Stop timer once API calls finish
+        reboot_timer.deinit()
+
+        # Turn off LED to confirm setup completed successfully
+        led.value(0)
+
+    def _get_astronomy_from_api(self, has_fallback):
+        '''Sets sunrise/sunset times with timestamps from ipgeolocation.io
+        API, syncs system clock with NTP (derives UTC offset from API local
+        time) or sets it from API response if NTP server unreachable. Writes
+        response to disk (fallback for failed API calls). Returns True if
+        successful.
+
+        If has_fallback is True returns False on first failure (caller uses
+        cached response). Otherwise retries up to 5 times if API call fails and
+        reboots after 5th failure.
+        '''
         failed_attempts = 0
 
         # Ensure enough free ram for API response
         gc.collect()
 
-        # Set system clock and sunrise/sunset times with timestamps from ipgeo API
         # Determines timezone by IP address unless config file contains GPS coords
-        # Retry up to 5 times if API call fails, reboot after 5th failure
         while True:
             try:
                 log.debug("Getting system time from ipgeolocation.io API...")
@@ -421,10 +616,18 @@ class Config():
                 # Parse date parameters
                 year, month, day = map(int, response.json()["date"].split("-"))
 
-                # Set RTC (uses different parameter order than time.localtime)
-                RTC().datetime(
-                    (year, month, day, 0, int(hour), int(minute), int(second), int(millisecond))
-                )
+                # Sync system clock with NTP, derive UTC offset from local time
+                # Timezone (last arg) is none (required for cpython test environment)
+                synced = self.time_sync.sync(local_time=time.mktime(
+                    (year, month, day, int(hour), int(minute), int(second), 0, 0, -1)
+                ))
+
+                # Set RTC from API if NTP server unreachable
+                # (uses different parameter order than time.localtime)
+                if not synced:
+                    RTC().datetime(
+                        (year, month, day, 0, int(hour), int(minute), int(second), int(millisecond))
+                    )
                 log.debug("System clock set")
 
                 # Set sunrise/sunset times
@@ -446,12 +649,16 @@ class Config():
                 log.error(
                     'ERROR (ipgeolocation.io): %s', response.json()["message"]
                 )
+                if has_fallback:
+                    return False
                 reboot()
 
             # Network issue
             except OSError:
                 print_with_timestamp("Failed to set system time, retrying...")
                 log.error("Failed to set system time, retrying...")
+                if has_fallback:
+                    return False
                 failed_attempts += 1
                 if failed_attempts > 5:
                     log.critical(
@@ -461,82 +668,118 @@ class Config():
                 time.sleep_ms(1500)  # If failed, wait 1.5 seconds before retrying
                 gc.collect()  # Free up memory before retrying
 
-        log.info(
-            "Finished API calls (timestamp may look weird due to system clock change)"
-        )
-
-        # Stop timer once API calls finish
-        reboot_timer.deinit()
-
-        # Turn off LED to confirm setup completed successfully
-        led.value(0)
-
-    def _convert_rules(self, rules):
-        '''Takes dict of schedule rules with HH:MM timestamps, returns dict of
-        same rules with unix epoch timestamps for next time rule should run.
-        Called every day between 3-4 am (epoch times only work once).
+        # Use UTC offset derived by NTP sync if successful, otherwise derive
+        # from sunrise if GPS coordinates configured (used to convert NTP time
+        # and compute sunrise/sunset locally on future boots)
+        utc_offset = self.time_sync.utc_offset if synced else None
+        if utc_offset is None and "gps" in self._metadata:
+            times = get_sun_times(
+                self._metadata['gps']['lat'],
+                self._metadata['gps']['lon'],
+                year, month, day
+            )
+            if times is not None:
+                utc_offset = get_utc_offset(self.schedule_keywords["sunrise"], times[0])
+                self.time_sync.utc_offset = utc_offset
+
+        # Cache response (fallback if next API call fails)
+        write_astronomy_to_disk({
+            'time': time.time(),
+            'sunrise': self.schedule_keywords["sunrise"],
+            'sunset': self.schedule_keywords["sunset"],
+            'utc_offset': utc_offset
+        })
+        return True
+
+    def _set_sun_times_from_gps(self, utc_offset):
+        '''Takes UTC offset (minutes), computes sunrise/sunset times for current
+        date from GPS coordinates in metadata. Returns True if set, False if
+        no GPS coordinates or sun does not rise/set today (polar regions).
         '''
+        if "gps" not in self._metadata:
+            return False
 
-        # Create empty dict to store new schedule rules
-        result = {}
+        now = time.localtime()
+        times = get_local_sun_times(
+            self._metadata['gps']['lat'],
+            self._metadata['gps']['lon'],
+            now[0], now[1], now[2],
+            utc_offset
+        )
+        if times is None:
+            return False
 
-        # Replace keywords with timestamp from dict, timestamps convert to epoch below
-        for keyword, timestamp in self.schedule_keywords.items():
-            if keyword in rules:
-                rules[timestamp] = rules[keyword]
-                del rules[keyword]
+        self.schedule_keywords["sunrise"], self.schedule_keywords["sunset"] = times
+        log.debug(
+            "Computed sunrise time = %s, sunset time = %s",
+            self.schedule_keywords["sunrise"],
+            self.schedule_keywords["sunset"]
+        )
+        return True
 
-        # Get epoch time in current timezone
-        epoch = time.time()
-        # Get time tuple in current timezone
-        now = time.localtime(epoch)
+    def _use_cached_astronomy(self, cache):
+        '''Called when API call fails, takes cached API response. Computes
+        sunrise/sunset from GPS coordinates if UTC offset known, otherwise uses
+        cached sunrise/sunset times (from last successful API call).
+        '''
+        print_with_timestamp("Using cached sunrise/sunset times")
+        log.warning("API call failed, using cached sunrise/sunset times")
+        if cache.get('utc_offset') is not None:
+            if self._set_sun_times_from_gps(cache['utc_offset']):
+                return
+        self.schedule_keywords["sunrise"] = cache['sunrise']
+        self.schedule_keywords["sunset"] = cache['sunset']
+
+    def _compile_schedule(self, rules):
+        '''Takes dict of schedule rules with HH:MM timestamps or keywords as
+        keys, returns compiled schedule (2-tuple):
+          - array of rule minute-of-day (minutes since midnight), sorted
+          - parallel list of rules for each minute
+
+        Keywords are replaced with timestamp from self.schedule_keywords (if
+        keyword and HH:MM rule have same timestamp keyword rule is used).
+        Skips keywords that do not exist and invalid timestamps.
+        '''
 
-        for rule in rules:
-            # Skip unconverted keywords
-            if not re.match("^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$", rule):
+        # Keys are minute-of-day, values are rules
+        minutes = {}
+        for timestamp, rule in rules.items():
+            keyword = timestamp in self.schedule_keywords
+            minute = _minute_of_day(self.schedule_keywords.get(timestamp, timestamp))
+            if minute is None:
                 continue
+            if keyword or minute not in minutes:
+                minutes[minute] = rule
 
-            # Get epoch time by substituting rule hour and minute into current date params
-            # Timezone (last arg) is none (required for cpython test environment)
-            hour, minute = rule.split(":")
-            trigger_time = time.mktime(
-                (now[0], now[1], now[2], int(hour), int(minute), 0, now[6], now[7], -1)
-            )
+        sorted_minutes = array('H', sorted(minutes))
+        return (sorted_minutes, [minutes[minute] for minute in sorted_minutes])
 
-            # Add to results: Key = unix timestamp, value = rule from original dict
-            result[trigger_time] = rules[rule]
-
-            # Add the same rule with timestamp 24 hours earlier (used below to
-            # determine current_rule, iterates expired rules until first non-expired )
-            result[trigger_time - 86400] = rules[rule]
-
-            # If the rule will expire between midnight and reload timer add the
-            # same rule with timestamp 24 hours later (tomorrow). Rules that
-            # expire after reload timer will be added when reload timer runs.
-            if rule < self._metadata["_reload_time"]:
-                result[trigger_time + 86400] = rules[rule]
-
-        # Get chronological list of rule timestamps
-        schedule = list(result)
-        schedule.sort()
-
-        # Find current scheduled rule (last rule with timestamp before current time)
-        for rule in schedule:
-            if epoch > rule:
-                current = rule
-            # Found
-            else:
-                break
+    def _get_compiled_schedule(self, instance):
+        '''Takes device or sensor instance, returns compiled schedule (see
+        _compile_schedule). Compiles and stores schedule if not stored yet.
+        '''
+        compiled = self._compiled_schedules.get(instance.name)
+        if compiled is None:
+            compiled = self._compile_schedule(instance.schedule)
+            self._compiled_schedules[instance.name] = compiled
+        return compiled
+
+    def get_scheduled_rule(self, instance, seconds=None):
+        '''Takes device or sensor instance and optional seconds since midnight
+        (default current time), returns schedule rule that applies at that time
+        (last rule before time, wraps to last rule of previous day). Returns
+        default_rule if instance has no schedule rules.
+        '''
+        minutes, rules = self._get_compiled_schedule(instance)
+        if not minutes:
+            return instance.default_rule
 
-        # Delete all expired rules except current
-        for rule in schedule:
-            if not rule == current:
-                del result[rule]
-            else:
-                break
+        if seconds is None:
+            now = time.localtime()
+            seconds = now[3] * 3600 + now[4] * 60 + now[5]
 
-        # Return the finished dictionairy
-        return result
+        # Same lookup as _build_instance_queue (index -1 is previous day)
+        return rules[bisect_right(minutes, (seconds - 1) // 60) - 1]
 
     def _build_queue(self):
         '''Iterates all devices and sensors, converts schedule rule HH:MM times
@@ -545,10 +788,8 @@ class Config():
         '''
         log.debug("Building schedule rule queue for all devices and sensors")
 
-        # Delete all existing schedule rule timers to avoid conflicts
-        app_context.timer_instance.cancel("scheduler")
-
         # Iterate device and sensor instances, create timers for all rules
+        # (each instance cancels its own existing schedule rule timers)
         for instance in self.devices:
             self._build_instance_queue(instance)
             gc.collect()
@@ -559,21 +800,82 @@ class Config():
         print_with_timestamp("Finished building schedule rule queue")
         log.debug(
             "Finished building queue, total timers = %s",
-            len(app_context.timer_instance.queue)
+            len(app_context.timer_instance.schedule)
         )
 
+    def schedule_rebuild(self, instances):
+        '''Takes list of device and/or sensor instances with changed schedule
+        rules, creates timer to rebuild their rule queues after 1.2 seconds
+        (allows API to reply before blocking). Instances from multiple calls
+        within the delay are rebuilt together by the same timer.
+        '''
+        for instance in instances:
+            # Compiled schedule outdated, recompiled on next lookup or rebuild
+            self._compiled_schedules.pop(instance.name, None)
+            if instance not in self._pending_rebuild:
+                self._pending_rebuild.append(instance)
+
+        if self._pending_rebuild:
+            app_context.timer_instance.create(
+                1200,
+                self._rebuild_pending,
+                "rebuild_queue"
+            )
+
+    def schedule_keyword_rebuild(self, keyword):
+        '''Takes schedule keyword, calls schedule_rebuild with all instances
+        that have rules using the keyword.
+        '''
+        self.schedule_rebuild(self._keyword_index.get(keyword, []))
+
+    def _rebuild_pending(self):
+        '''Called by timer created in schedule_rebuild, rebuilds rule queue for
+        each instance in self._pending_rebuild.
+        '''
+        pending = self._pending_rebuild
+        self._pending_rebuild = []
+        log.debug("Rebuilding schedule rule queue for %s instances", len(pending))
+        for instance in pending:
+            self._build_instance_queue(instance)
+            gc.collect()
+
+    def _index_keywords(self, instance):
+        '''Takes device or sensor instance, updates self._keyword_index with
+        all schedule keywords used by instance schedule rules.
+        '''
+        for keyword in list(self._keyword_index):
+            if instance in self._keyword_index[keyword]:
+                self._keyword_index[keyword].remove(instance)
+                if not self._keyword_index[keyword]:
+                    del self._keyword_index[keyword]
+
+        for rule in instance.schedule:
+            if _minute_of_day(rule) is None:
+                if rule in self._keyword_index:
+                    self._keyword_index[rule].append(instance)
+                else:
+                    self._keyword_index[rule] = [instance]
+
     def _build_instance_queue(self, instance):
         '''Takes device or sensor instance, converts HH:MM times in schedule
         attribute (dict of time-rule pairs) to unix epoch times, creates timers
         for each rule change, and sets correct current_rule and scheduled_rule.
+        Cancels existing schedule rule timers for the instance before creating
+        new timers (does not affect other instances).
         '''
 
-        # Convert HH:MM timestamps to unix epoch timestamp of next run
-        # Copy avoids overwriting schedule keywords with HH:MM in original
-        epoch_rules = self._convert_rules(instance.schedule.copy().copy())
+        # Delete existing schedule rule timers to avoid conflicts
+        app_context.timer_instance.cancel("scheduler_" + instance.name)
+
+        # Track which schedule keywords are used by instance rules
+        self._index_keywords(instance)
+
+        # Convert HH:MM timestamps and keywords to sorted minute-of-day array
+        self._compiled_schedules[instance.name] = self._compile_schedule(instance.schedule)
+        minutes, rules = self._compiled_schedules[instance.name]
 
         # No rules: set default_rule as scheduled_rule, skip to next instance
-        if len(epoch_rules) == 0:
+        if not minutes:
             # Set current_rule and scheduled_rule (returns False if invalid)
             if not instance.set_rule(instance.default_rule, True):
                 # Disable instance if default invalid (prevent unpredictable behavior)
@@ -587,13 +889,16 @@ class Config():
                 instance.disable()
             return
 
-        # Get list of timestamps, sort chronologically
-        # First item in queue is current scheduled rule
-        queue = list(epoch_rules)
-        queue.sort()
+        # Get seconds since midnight in current timezone
+        now = time.localtime()
+        seconds = now[3] * 3600 + now[4] * 60 + now[5]
+
+        # Find index of first non-expired rule (rule at current minute has
+        # expired unless current second is 0), rule before is current rule
+        first = bisect_right(minutes, (seconds - 1) // 60)
 
         # Set current_rule and scheduled_rule (returns False if invalid)
-        if not instance.set_rule(epoch_rules[queue.pop(0)], True):
+        if not instance.set_rule(rules[first - 1], True):
             # Fall back to default_rule if scheduled rule is invalid
             log.error(
                 "%s scheduled rule invalid, falling back to default rule",
@@ -613,22 +918,34 @@ class Config():
         # Clear target's queue
         instance.rule_queue = []
 
-        # Populate target's queue with chronological rule values
-        for k in queue:
-            instance.rule_queue.append(epoch_rules[k])
-
-        # Get epoch time in current timezone
-        epoch = time.time()
+        # Create timers for remaining rules today
+        for i in range(first, len(minutes)):
+            self._create_rule_timer(instance, rules[i], minutes[i] * 60 - seconds)
 
-        # Create timers for all epoch_rules
-        for k in queue:
-            milliseconds = (k - epoch) * 1000
-            app_context.timer_instance.create(
-                milliseconds,
-                instance.next_rule,
-                "scheduler"
+        # If rules expire between midnight and reload timer create timers for
+        # tomorrow. Rules that expire after reload timer will be added when
+        # reload timer runs.
+        reload_minute = _minute_of_day(self._metadata["_reload_time"]) or 0
+        for i in range(len(minutes)):
+            if minutes[i] >= reload_minute:
+                break
+            self._create_rule_timer(
+                instance,
+                rules[i],
+                (minutes[i] + 1440) * 60 - seconds
             )
-            gc.collect()
+
+    def _create_rule_timer(self, instance, rule, seconds):
+        '''Takes device or sensor instance, schedule rule, and number of seconds
+        until rule is due. Adds rule to instance rule_queue and creates timer
+        to call next_rule method when due.
+        '''
+        instance.rule_queue.append(rule)
+        app_context.timer_instance.create(
+            seconds * 1000,
+            instance.next_rule,
+            "scheduler_" + instance.name
+        )
 
     def find(self, target):
         '''Takes ID (device1, sensor2, etc), returns instance or False.'''
@@ -649,6 +966,29 @@ class Config():
         log.debug("Config.find: Unable to find %s", target)
         return False
 
+    def _start_time_sync_timer(self):
+        '''Schedules callback to sync system clock with NTP server after the
+        interval chosen by TimeSync (based on measured RTC drift rate).
+        '''
+        app_context.timer_instance.create(
+            self.time_sync.interval,
+            self.sync_time,
+            "sync_time"
+        )
+
+    def sync_time(self):
+        '''Called by timer, syncs system clock with NTP server in background
+        task (corrects RTC drift since last sync), schedules next sync.
+        '''
+        asyncio.create_task(self._sync_time_async())
+
+    async def _sync_time_async(self):
+        '''Awaits NTP sync (does not block event loop while waiting for server
+        response), schedules next sync with interval chosen by TimeSync.
+        '''
+        await self.time_sync.sync_async()
+        self._start_time_sync_timer()
+
     def reload_schedule_rules(self):
         '''Called by timer between 3-4 am every day, updates sunrise/sunset
         times and generates schedule rule epoch timestamps for next day.
@@ -656,7 +996,8 @@ class Config():
         print_with_timestamp("Reloading schedule rules...")
         log.info("Callback: Reloading schedule rules")
         # Updated sunrise/sunset times, set system clock (fix daylight savings)
-        self._api_calls()
+        # Does not skip API call (refreshes cached UTC offset)
+        self._api_calls(False)
         gc.collect()
 
         # Set timer to run again tomorrow between 3-4 am
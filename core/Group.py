@@ -1,6 +1,24 @@
+import asyncio
 import logging
+from random import randint
+from micropython import schedule
 import app_context
 
+# Max seconds to wait for each device send_async call before treating as failed
+SEND_TIMEOUT = 5
+
+# Milliseconds before first retry after a device send fails (doubles after
+# each consecutive failure up to RETRY_MAX_DELAY)
+RETRY_DELAY = 5000
+RETRY_MAX_DELAY = 300000
+
+# Max random delay added to each retry (fraction of delay), prevents devices
+# that failed at the same time from retrying at the same time
+RETRY_JITTER = 0.2
+
+# Number of retries before device is marked unreachable and retries stop
+RETRY_LIMIT = 8
+
 
 class Group():
     '''Class used to group one or more sensors with identical targets.
@@ -14,10 +32,29 @@ class Group():
     sensor conditions, determines correct action, calls all device send methods
     if correct action does not match current state).
 
+    Sensors request refreshes with request_refresh (safe to call in ISR),
+    which schedules a single refresh and sets a dirty flag. Any number of
+    requests received before the scheduled refresh runs are coalesced into it
+    (counted in coalesced_refreshes). Sensors with a debounce window delay the
+    refresh until the window expires. Debounced and immediate requests are
+    tracked separately (a pending debounce window does not delay refreshes
+    requested by sensors without one).
+
     Devices are turned on when one or more sensor conditions are True.
     Devices are turned off when all sensor conditions are False.
     Devices do not change if one or more sensor conditions are None and no
     sensor conditions are True.
+
+    Devices with a send_async coroutine (drivers that make network requests)
+    are sent to concurrently in a background task with a timeout for each
+    device, other devices are sent to immediately. The action is finished
+    (group state set, post-action routines called) after all devices respond.
+
+    If any send fails only the failed devices are retried, each with its own
+    exponential backoff (RETRY_DELAY doubling up to RETRY_MAX_DELAY, plus
+    jitter). After RETRY_LIMIT failed retries the device is marked unreachable
+    and retries stop until the next action is applied. The action is finished
+    when the last failed device is retried successfully.
     '''
 
     def __init__(self, name, sensors):
@@ -44,9 +81,31 @@ class Group():
         # method to populate this list with functions to call.
         self.post_action_routines = []
 
+        # Action currently being sent by async task (prevents sending again)
+        self.pending_action = None
+
+        # Incremented each time apply_action sends an action, prevents outdated
+        # async task from changing state if a newer action started since
+        self._action_id = 0
+
+        # Device names as keys, number of consecutive failed sends as values
+        # (devices removed after successful send), action being retried
+        self.retry_attempts = {}
+        self.retry_action = None
+
+        # Set when request_refresh schedules a refresh, cleared when refresh
+        # runs (requests received while set are coalesced)
+        self.refresh_pending = False
+
+        # Same as refresh_pending for refreshes delayed by debounce window
+        self.debounce_pending = False
+
+        # Number of refresh requests merged into an already pending refresh
+        self.coalesced_refreshes = 0
+
         # Preallocate reference to bound method so it can be called in ISR
         # https://docs.micropython.org/en/latest/reference/isr_rules.html#creation-of-python-objects
-        self._refresh = self.refresh
+        self._refresh = self._scheduled_refresh
 
         self.log.info("Instantiated Group")
 
@@ -56,6 +115,7 @@ class Group():
         '''
         self.log.debug("reset state to None")
         self.state = None
+        self.pending_action = None
 
     def add_post_action_routine(self):
         '''Decorator used inside sensor add_routines methods.
@@ -102,34 +162,121 @@ class Group():
         Sets device.state to match action if send call succeeds.
         Sets group.state to match action if all send calls succeeded.
         Sets group.state to None if any send calls fail.
+
+        Devices with send_async method are sent to concurrently in a task, the
+        group state is set when all have responded (see _apply_action_async).
         '''
 
-        # No action needed if group state already matches desired state
-        if self.state == action:
+        # No action needed if group state already matches desired state (or
+        # same action is currently being sent to async devices)
+        if self.state == action or self.pending_action == action:
             self.log.debug("current state already matches action")
             return
 
-        failed = False
+        # Failed devices are sent action again below, cancel pending retries.
+        # Different action gets full backoff retries again if it fails, same
+        # action re-triggered while retrying keeps backing off.
+        self._cancel_retries()
+        if action != self.retry_action:
+            self.retry_attempts = {}
+
+        failed = []
+        async_targets = []
+
+        # Async device states are not reliable while a different action is
+        # being sent (may have already turned on/off), send to all of them
+        in_flight = self.pending_action is not None
 
         for device in self.targets:
+            is_async = hasattr(device, "send_async")
+
             # Do not turn device on/off if already on/off
-            if not action == device.state:
+            if not action == device.state or (is_async and in_flight):
                 self.log.debug("applying action to %s", device.name)
+
+                # Network devices: send concurrently after loop
+                if is_async:
+                    async_targets.append(device)
+                    continue
+
                 # int converts True to 1, False to 0
                 success = device.send(int(action))
 
                 # Only change device state if send returned True
                 if success:
-                    device.state = action
+                    self._send_succeeded(device, action)
 
                 else:
-                    failed = True
+                    failed.append(device)
             else:
                 self.log.debug(
                     "%s: skipping %s (state already matches action)",
                     self.name, device.name
                 )
 
+        # Invalidate results of async task started by previous action (if any)
+        self._action_id += 1
+        self.pending_action = None
+
+        # Send to network devices without blocking, finish when all respond
+        if async_targets:
+            self.pending_action = action
+            asyncio.create_task(
+                self._apply_action_async(action, async_targets, failed, self._action_id)
+            )
+        else:
+            self._finish_action(action, failed)
+
+    async def _send_async(self, device, action):
+        '''Takes device and action, awaits device.send_async with SEND_TIMEOUT.
+        Returns send result, False if timed out or raised exception.
+        '''
+        try:
+            return await asyncio.wait_for(device.send_async(int(action)), SEND_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.log.error("%s: send timed out", device.name)
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            self.log.error("%s: send failed: %s", device.name, ex)
+        return False
+
+    async def _apply_action_async(self, action, devices, failed, action_id):
+        '''Takes action, list of devices with send_async method, list of
+        devices that already failed synchronous send, and action ID. Sends
+        action to all devices concurrently, updates device states and finishes
+        action. Results are ignored if a newer action started while waiting.
+        '''
+        results = await asyncio.gather(*[self._send_async(device, action) for device in devices])
+
+        # Newer action started while waiting, let it set states
+        if action_id != self._action_id:
+            self.log.debug("ignoring results of outdated action: %s", action)
+            return
+
+        self.pending_action = None
+        for device, success in zip(devices, results):
+            # Only change device state if send returned True
+            if success:
+                self._send_succeeded(device, action)
+            else:
+                failed.append(device)
+
+        self._finish_action(action, failed)
+
+    def _send_succeeded(self, device, action):
+        '''Takes device and action after successful send, updates device state
+        and clears retry count and unreachable flag.
+        '''
+        device.state = action
+        self.retry_attempts.pop(device.name, None)
+        device.unreachable = False
+
+    def _finish_action(self, action, failed):
+        '''Called after all devices in group have been sent action. Takes
+        action and list of devices where send failed. Sets group state and runs
+        post-action routines if all succeeded, resets state and schedules retry
+        for each failed device if any failed.
+        '''
+
         # If all succeeded, change group state to prevent re-sending
         if not failed:
             self.log.debug("finished applying action, no errors")
@@ -139,24 +286,137 @@ class Group():
             for function in self.post_action_routines:
                 function()
 
-        # If send failed schedule retry in 5 seconds + reset group state to
-        # prevent getting stuck (if action is True and group.state remains
+        # If send failed schedule retry for failed devices + reset group state
+        # to prevent getting stuck (if action is True and group.state remains
         # False due to a failed send then when action changes to False it will
         # match current state and send will not be called. Changing state to
         # None allows any action to be applied).
         else:
             self.log.debug("encountered errors while applying action")
             self.reset_state()
+            for device in failed:
+                self._schedule_retry(device, action)
+
+    def _schedule_retry(self, device, action):
+        '''Takes device where send failed and action. Creates timer to resend
+        action to device after exponential backoff delay with jitter. Marks
+        device unreachable instead if RETRY_LIMIT reached.
+        '''
+        attempts = self.retry_attempts.get(device.name, 0) + 1
+        self.retry_attempts[device.name] = attempts
+        self.retry_action = action
+
+        if attempts > RETRY_LIMIT:
+            if not device.unreachable:
+                self.log.error("%s unreachable, stopped retrying", device.name)
+                device.print("unreachable, stopped retrying")
+                device.unreachable = True
+            return
+
+        delay = min(RETRY_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+        delay += randint(0, int(delay * RETRY_JITTER))
+        self.log.debug("retrying %s in %s ms", device.name, delay)
+
+        action_id = self._action_id
+        app_context.timer_instance.create(
+            delay,
+            lambda: self._retry(device, action, action_id),
+            f"{self.name}_retry_{device.name}"
+        )
+
+    def _cancel_retries(self):
+        '''Cancels retry timers for all devices that failed previous action.'''
+        for name in self.retry_attempts:
+            app_context.timer_instance.cancel(f"{self.name}_retry_{name}")
+
+    def _retry(self, device, action, action_id):
+        '''Timer callback created by _schedule_retry, resends action to device
+        (does not refresh group or send to other devices).
+        '''
+        self.log.debug("retrying %s after failed send", device.name)
+        if device.state == action:
+            self._retry_finished(device, action, action_id, True)
+        elif hasattr(device, "send_async"):
+            asyncio.create_task(self._retry_async(device, action, action_id))
+        else:
+            self._retry_finished(device, action, action_id, device.send(int(action)))
+
+    async def _retry_async(self, device, action, action_id):
+        '''Awaits send_async for device with failed send, passes result to
+        _retry_finished.
+        '''
+        success = await self._send_async(device, action)
+        self._retry_finished(device, action, action_id, success)
+
+    def _retry_finished(self, device, action, action_id, success):
+        '''Takes device, action, action ID, and retry result. Schedules next
+        retry if failed. If succeeded and all devices match action finishes
+        action (sets group state, runs post-action routines). Ignored if a
+        newer action was applied since retry was scheduled.
+        '''
+        if action_id != self._action_id:
+            self.log.debug("ignoring retry result for outdated action: %s", action)
+            return
+
+        if not success:
+            self._schedule_retry(device, action)
+            return
+
+        self._send_succeeded(device, action)
+        if self.pending_action is None and all(d.state == action for d in self.targets):
+            self._finish_action(action, [])
+
+    def request_refresh(self, debounce_ms=0):
+        '''Schedules refresh unless a refresh is already pending (safe to call
+        in ISR). Takes optional debounce window (milliseconds), refresh runs
+        after window expires if set. Called by Sensor.refresh_group.
+        '''
+        if debounce_ms:
+            if self.debounce_pending:
+                self.coalesced_refreshes += 1
+                return
+            self.debounce_pending = True
+        else:
+            if self.refresh_pending:
+                self.coalesced_refreshes += 1
+                return
+            self.refresh_pending = True
+        try:
+            schedule(self._refresh, debounce_ms)
+        except RuntimeError:
+            # Schedule queue full, allow next request to try again
+            if debounce_ms:
+                self.debounce_pending = False
+            else:
+                self.refresh_pending = False
+
+    def _scheduled_refresh(self, debounce_ms):
+        '''Called by micropython.schedule after request_refresh. Refreshes
+        immediately, or creates timer to refresh after debounce window.
+        '''
+        if debounce_ms:
             app_context.timer_instance.create(
-                5000,
-                self.retry,
-                self.name + "_retry"
+                debounce_ms,
+                self._debounced_refresh,
+                self.name + "_debounce"
             )
+        else:
+            # Clear pending flag first (requests received after this point
+            # schedule a new refresh)
+            self.refresh_pending = False
+            self.refresh()
+
+    def _debounced_refresh(self):
+        '''Called by debounce timer, clears debounce pending flag and
+        refreshes (requests received after this point start a new window).
+        '''
+        self.debounce_pending = False
+        self.refresh()
 
     def refresh(self, *args):
         '''Checks all sensors conditions, turns devices on or off if needed.
-        Called by all sensors when condition changes.
-        Args not used (required for micropython schedule).
+        Called when sensor condition changes (see request_refresh).
+        Args not used (allows calling from micropython schedule).
         '''
         self.log.debug("refresh group")
         action = self.determine_correct_action(self.check_sensor_conditions())
@@ -164,10 +424,3 @@ class Group():
         if action is not None:
             self.log.info("applying action: %s", action)
             self.apply_action(action)
-
-    def retry(self):
-        '''Callback function scheduled to run in 5 seconds when send fails.
-        Calls refresh method to attempt to turn failed device on/off again.
-        '''
-        self.log.debug("retrying after failed send")
-        self.refresh()
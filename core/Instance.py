@@ -1,4 +1,5 @@
 import logging
+from random import randint
 from util import print_with_timestamp
 
 
@@ -20,8 +21,27 @@ class Instance():
 
     Supports universal rules ("enabled" and "disabled"). Additional rules can
     be supported by replacing the validator method in subclass.
+
+    The current_rule, scheduled_rule, and enabled attributes are properties
+    which call status_changed when their value changes. The status_version
+    class attribute is shared by all instances and incremented each time any
+    instance status changes (used by status_since API endpoint). The boot_id
+    class attribute is a random ID generated on each boot (status_version
+    restarts at 0, clients compare boot_id to detect reboot). Functions in
+    the status_listeners class attribute are called after each change (used
+    by subscribe API endpoint to push changes to clients).
     '''
 
+    # Incremented each time status of any instance changes
+    status_version = 0
+
+    # Random ID generated on boot, included in status with status_version
+    # (versions from before a reboot are not comparable)
+    boot_id = randint(0, 0x3FFFFFFF)
+
+    # Functions called (no args) each time status of any instance changes
+    status_listeners = []
+
     def __init__(self, name, nickname, _type, enabled, default_rule, schedule):
 
         # Set name for module's log lines
@@ -33,23 +53,26 @@ class Instance():
         # User-configurable name used in frontend
         self.nickname = nickname
 
+        # Value of status_version when this instance status last changed
+        self.changed_version = Instance.status_version
+
         # Instance type, arg determines which class is instantiated by Config.instantiate_hardware
         # Attribute is used in status object, determines UI shown by frontend
         self._type = _type
 
         # Bool, set with enable/disable methods
         # Determines whether instance affects other instances in group
-        self.enabled = enabled
+        self._enabled = enabled
 
         # The rule currently being followed, has different effects depending on subclass
         # - Devices: determines whether device can be turned on, device brightness, etc
         # - Sensors: determines how sensor is triggered, how long before sensor resets, etc
-        self.current_rule = None
+        self._current_rule = None
 
         # The rule that should be followed at the current time unless changed by API
         # The reset_rule endpoint overwrites current_rule with this rule
         # This rule will be set when a disabled instance is re-enabled
-        self.scheduled_rule = None
+        self._scheduled_rule = None
 
         # The fallback rule used when no other valid rules are available, examples:
         # - Config file contains invalid schedule rules
@@ -70,6 +93,48 @@ class Instance():
         # next rule in queue.
         self.rule_queue = []
 
+    def status_changed(self):
+        '''Increments shared status_version and saves as changed_version.
+        Called when any attribute included in get_status return value changes.
+        '''
+        Instance.status_version += 1
+        self.changed_version = Instance.status_version
+        for listener in Instance.status_listeners:
+            listener()
+
+    @property
+    def current_rule(self):
+        '''The rule currently being followed.'''
+        return self._current_rule
+
+    @current_rule.setter
+    def current_rule(self, value):
+        if value != self._current_rule:
+            self._current_rule = value
+            self.status_changed()
+
+    @property
+    def scheduled_rule(self):
+        '''The rule that should be followed at the current time.'''
+        return self._scheduled_rule
+
+    @scheduled_rule.setter
+    def scheduled_rule(self, value):
+        if value != self._scheduled_rule:
+            self._scheduled_rule = value
+            self.status_changed()
+
+    @property
+    def enabled(self):
+        '''Enable state bool.'''
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value):
+        if value != self._enabled:
+            self._enabled = value
+            self.status_changed()
+
     def enable(self):
         '''Sets enabled bool to True (allows sensors to be checked, devices to
         be turned on/off), and ensures current_rule contains a usable value.
@@ -191,8 +256,13 @@ class Instance():
         '''
         attributes = self.__dict__.copy()
 
-        # Remove logger instance (not serializable)
+        # Remove logger instance (not serializable), status version
         del attributes["log"]
+        del attributes["changed_version"]
+
+        # Replace property storage attributes with property names
+        for name in ("enabled", "current_rule", "scheduled_rule"):
+            attributes[name] = attributes.pop("_" + name)
 
         # Replace group object with group name (JSON-compatibility)
         if self.group:
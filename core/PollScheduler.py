@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import clock
+
+# Set name for module's log lines
+log = logging.getLogger("PollScheduler")
+
+# Default milliseconds between polls for each registered instance
+DEFAULT_INTERVAL = 5000
+
+# Milliseconds between polls while in fast window (after send or change)
+FAST_INTERVAL = 1000
+
+# Milliseconds to poll at FAST_INTERVAL after boost is called
+FAST_WINDOW = 15000
+
+# Max milliseconds between polls for unreachable instances (exponential
+# backoff doubles interval after each consecutive failure up to this limit)
+MAX_BACKOFF = 300000
+
+# Milliseconds between first poll of each registered instance (prevents all
+# instances polling at the same moment)
+STAGGER = 700
+
+# Max polls running at the same time
+MAX_CONCURRENT = 2
+
+# Weight of newest latency in average (exponential moving average)
+LATENCY_WEIGHT = 0.25
+
+
+class PollScheduler():
+    '''Shared scheduler for drivers that poll a network device to stay in sync
+    (eg Tplink, TasmotaRelay). Replaces a separate fixed-interval monitor loop
+    in each instance with a single loop that decides when each instance polls.
+
+    Drivers call register with an async poll method that returns True if the
+    device responded, False if the request failed. The first poll of each
+    instance is staggered, consecutive failures back off exponentially (up to
+    MAX_BACKOFF), and drivers can call boost after sending a command or
+    detecting a change to poll at FAST_INTERVAL for FAST_WINDOW milliseconds.
+    No more than MAX_CONCURRENT polls run at the same time.
+
+    Poll latency and failure counters for each instance are returned by
+    get_stats (used by API poll_stats endpoint).
+    '''
+
+    def __init__(self):
+        # Keys are instance names, values are dicts with poll coroutine
+        # function, interval, next poll time, fast window end (monotonic ms,
+        # see clock module), and stats
+        self.entries = {}
+
+        # Set by register and boost to wake loop before next poll is due
+        self.wake = asyncio.Event()
+
+        # Number of polls currently running (limited to MAX_CONCURRENT)
+        self.running = 0
+
+        # Loop task, created when first instance registered
+        self.loop_task = None
+
+    def register(self, instance, poll, interval=DEFAULT_INTERVAL):
+        '''Takes instance, async poll method (returns True if successful, False
+        if failed), and interval (milliseconds between polls). Schedules first
+        poll STAGGER ms after the previously registered instance.
+        '''
+        self.entries[instance.name] = {
+            'poll': poll,
+            'interval': interval,
+            'next_poll': clock.deadline(STAGGER * (len(self.entries) + 1)),
+            'fast_until': None,
+            'running': False,
+            'polls': 0,
+            'failures': 0,
+            'consecutive_failures': 0,
+            'last_latency_ms': None,
+            'avg_latency_ms': None
+        }
+        log.debug("registered %s, interval=%s", instance.name, interval)
+
+        if self.loop_task is None:
+            self.loop_task = asyncio.create_task(self.loop())
+        self.wake.set()
+
+    def unregister(self, instance):
+        '''Takes instance, stops polling it.'''
+        if self.entries.pop(instance.name, None):
+            log.debug("unregistered %s", instance.name)
+
+    def boost(self, instance):
+        '''Takes instance, polls at FAST_INTERVAL for the next FAST_WINDOW ms
+        (called after sending command or detecting change from wall switch).
+        Does not shorten backoff of unreachable instances.
+        '''
+        entry = self.entries.get(instance.name)
+        if entry is None:
+            return
+        entry['fast_until'] = clock.deadline(FAST_WINDOW)
+        if not entry['consecutive_failures']:
+            if clock.remaining(entry['next_poll']) > FAST_INTERVAL:
+                entry['next_poll'] = clock.deadline(FAST_INTERVAL)
+            self.wake.set()
+
+    def _next_delay(self, entry):
+        '''Takes entry, returns milliseconds until next poll based on result of
+        last poll and fast window.
+        '''
+        if entry['consecutive_failures']:
+            return min(
+                entry['interval'] * 2 ** entry['consecutive_failures'],
+                MAX_BACKOFF
+            )
+        if entry['fast_until'] is not None and clock.remaining(entry['fast_until']) > 0:
+            return min(entry['interval'], FAST_INTERVAL)
+        return entry['interval']
+
+    async def _poll(self, name, entry):
+        '''Takes name and entry, awaits poll method, updates stats and
+        schedules next poll.
+        '''
+        start = clock.now()
+        try:
+            success = await entry['poll']()
+        except Exception as ex:  # pylint: disable=W0718
+            log.error("%s poll raised exception: %s", name, ex)
+            success = False
+        latency = clock.elapsed(start)
+
+        entry['polls'] += 1
+        entry['last_latency_ms'] = latency
+        if entry['avg_latency_ms'] is None:
+            entry['avg_latency_ms'] = latency
+        else:
+            entry['avg_latency_ms'] = int(
+                entry['avg_latency_ms'] * (1 - LATENCY_WEIGHT) + latency * LATENCY_WEIGHT
+            )
+
+        if success:
+            entry['consecutive_failures'] = 0
+        else:
+            entry['failures'] += 1
+            entry['consecutive_failures'] += 1
+            log.debug("%s poll failed (%s consecutive)", name, entry['consecutive_failures'])
+
+        entry['next_poll'] = clock.deadline(self._next_delay(entry))
+        entry['running'] = False
+        self.running -= 1
+        self.wake.set()
+
+    async def loop(self):
+        '''Async coroutine that starts polls when they are due, sleeps until
+        next poll is due (or until woken by register, boost, or finished poll).
+        '''
+        while True:
+            # Milliseconds until first poll that is not due yet
+            next_due = None
+            for name, entry in self.entries.items():
+                if entry['running']:
+                    continue
+                remaining = clock.remaining(entry['next_poll'])
+                if remaining > 0:
+                    if next_due is None or remaining < next_due:
+                        next_due = remaining
+                # Due, start unless too many running (woken when one finishes)
+                elif self.running < MAX_CONCURRENT:
+                    entry['running'] = True
+                    self.running += 1
+                    asyncio.create_task(self._poll(name, entry))
+
+            # Sleep until next poll due, or until woken
+            self.wake.clear()
+            try:
+                if next_due is None:
+                    await self.wake.wait()
+                else:
+                    await asyncio.wait_for(self.wake.wait(), next_due / 1000)
+            except asyncio.TimeoutError:
+                pass
+
+    def get_stats(self):
+        '''Returns dict with instance names as keys, dicts with poll counters,
+        latency, and current interval as values.
+        '''
+        stats = {}
+        for name, entry in self.entries.items():
+            stats[name] = {
+                'polls': entry['polls'],
+                'failures': entry['failures'],
+                'consecutive_failures': entry['consecutive_failures'],
+                'last_latency_ms': entry['last_latency_ms'],
+                'avg_latency_ms': entry['avg_latency_ms'],
+                'interval_ms': self._next_delay(entry),
+                'next_poll_ms': max(0, clock.remaining(entry['next_poll']))
+            }
+        return stats
@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import clock
+
+# Set name for module's log lines
+log = logging.getLogger("SensorSampler")
+
+# Default milliseconds between reads for each registered sensor
+DEFAULT_INTERVAL = 1000
+
+# Minimum milliseconds between the end of one read and the start of the next
+# (phase offsets keep at least this much idle time between reads)
+MIN_GAP = 100
+
+# Weight of newest read duration in average (exponential moving average)
+DURATION_WEIGHT = 0.25
+
+
+class SensorSampler():
+    '''Shared sampler for sensors that poll hardware or a network API to detect
+    when their condition changes (SensorWithLoop subclasses: Thermostat,
+    LoadCell, DesktopTrigger). Replaces a separate fixed-interval monitor loop
+    in each sensor with a single loop that runs every read.
+
+    Sensors call register with a sample method (reads sensor and refreshes
+    group if condition changed) and a get_interval method (returns ms until
+    next read, called after each read so sensors can adapt their rate, eg
+    thermostat near threshold). Reads block the event loop, so the sampler
+    runs them one at a time and assigns each read a phase offset that keeps
+    it clear of every other sensor's next read (based on measured duration
+    of each read plus MIN_GAP). This prevents reads from several sensors
+    lining up and stalling the event loop.
+
+    Read duration and lateness (ms between scheduled and actual start) for
+    each sensor are returned by get_stats (used by API sample_stats endpoint).
+    '''
+
+    def __init__(self):
+        # Keys are instance names, values are dicts with instance, sample and
+        # get_interval methods, next read time (monotonic ms, see clock
+        # module), and stats
+        self.entries = {}
+
+        # Set by register to wake loop before next read is due
+        self.wake = asyncio.Event()
+
+        # Loop task, created when first instance registered
+        self.loop_task = None
+
+        # Timestamp when last read finished (next read waits at least MIN_GAP,
+        # even if durations used to assign phase offsets are not known yet),
+        # None before first read
+        self.last_read_end = None
+
+    def register(self, instance, sample, get_interval):
+        '''Takes instance, sample method (reads sensor), and get_interval method
+        (returns milliseconds until next read). Schedules first read in the
+        first free slot.
+        '''
+        self.entries[instance.name] = {
+            'instance': instance,
+            'sample': sample,
+            'get_interval': get_interval,
+            'interval': None,
+            'next_read': self._find_slot(clock.now(), instance.name),
+            'reads': 0,
+            'failures': 0,
+            'last_duration_ms': None,
+            'avg_duration_ms': None,
+            'max_duration_ms': 0,
+            'last_lateness_ms': None,
+            'max_lateness_ms': 0
+        }
+        log.debug("registered %s", instance.name)
+
+        if self.loop_task is None:
+            self.loop_task = asyncio.create_task(self.loop())
+        self.wake.set()
+
+    def unregister(self, instance):
+        '''Takes instance, stops reading it. Ignored if a different instance
+        with the same name is registered (eg after config reload).
+        '''
+        entry = self.entries.get(instance.name)
+        if entry is not None and entry['instance'] is instance:
+            del self.entries[instance.name]
+            log.debug("unregistered %s", instance.name)
+
+    def _find_slot(self, target, name):
+        '''Takes requested read time and instance name, returns first time at
+        or after target that does not overlap the next read of any other entry
+        (each read occupies its average duration plus MIN_GAP).
+        '''
+        duration = 0
+        if name in self.entries:
+            duration = self.entries[name]['avg_duration_ms'] or 0
+
+        moved = True
+        while moved:
+            moved = False
+            for other, other_entry in self.entries.items():
+                if other == name:
+                    continue
+                # Other read start and end relative to target
+                start = clock.diff(other_entry['next_read'], target)
+                end = start + (other_entry['avg_duration_ms'] or 0) + MIN_GAP
+                if start - duration - MIN_GAP < 0 < end:
+                    target = clock.add(target, end)
+                    moved = True
+        return target
+
+    def _read(self, name, entry):
+        '''Takes name and entry, calls sample method, updates stats and
+        schedules next read.
+        '''
+        start = clock.now()
+        lateness = clock.diff(start, entry['next_read'])
+        try:
+            entry['sample']()
+        except Exception as ex:  # pylint: disable=W0718
+            log.error("%s read raised exception: %s", name, ex)
+            entry['failures'] += 1
+        self.last_read_end = clock.now()
+        duration = clock.diff(self.last_read_end, start)
+
+        entry['reads'] += 1
+        entry['last_duration_ms'] = duration
+        entry['max_duration_ms'] = max(entry['max_duration_ms'], duration)
+        if entry['avg_duration_ms'] is None:
+            entry['avg_duration_ms'] = duration
+        else:
+            entry['avg_duration_ms'] = int(
+                entry['avg_duration_ms'] * (1 - DURATION_WEIGHT) + duration * DURATION_WEIGHT
+            )
+        entry['last_lateness_ms'] = lateness
+        entry['max_lateness_ms'] = max(entry['max_lateness_ms'], lateness)
+
+        # Sample may have unregistered instance (eg disabled itself)
+        if self.entries.get(name) is not entry:
+            return
+
+        try:
+            entry['interval'] = int(entry['get_interval']())
+        except Exception as ex:  # pylint: disable=W0718
+            log.error("%s get_interval raised exception: %s", name, ex)
+            entry['interval'] = DEFAULT_INTERVAL
+
+        # Keep phase (interval measured from scheduled start, not actual start)
+        # unless read was late by more than interval, move to next free slot
+        target = clock.add(entry['next_read'], entry['interval'])
+        if clock.diff(target, self.last_read_end) < 0:
+            target = clock.add(self.last_read_end, entry['interval'])
+        entry['next_read'] = self._find_slot(target, name)
+
+    async def loop(self):
+        '''Async coroutine that runs reads when they are due (one at a time,
+        yields between reads), sleeps until next read is due (or until woken
+        by register).
+        '''
+        while True:
+            # Find entry with earliest next read
+            name = None
+            entry = None
+            for other, other_entry in self.entries.items():
+                if entry is None or clock.diff(other_entry['next_read'], entry['next_read']) < 0:
+                    name, entry = other, other_entry
+
+            if entry is not None:
+                # Milliseconds until read due (at least MIN_GAP after last read)
+                wait = clock.remaining(entry['next_read'])
+                if self.last_read_end is not None:
+                    wait = max(wait, MIN_GAP - clock.elapsed(self.last_read_end))
+                if wait <= 0:
+                    self._read(name, entry)
+                    # Allow other tasks to run before next read
+                    await asyncio.sleep(0)
+                    continue
+
+            # Sleep until next read due, or until woken
+            self.wake.clear()
+            try:
+                if entry is None:
+                    await self.wake.wait()
+                else:
+                    await asyncio.wait_for(self.wake.wait(), wait / 1000)
+            except asyncio.TimeoutError:
+                pass
+
+    def get_stats(self):
+        '''Returns dict with instance names as keys, dicts with read counters,
+        duration, lateness, and current interval as values.
+        '''
+        stats = {}
+        for name, entry in self.entries.items():
+            stats[name] = {
+                'reads': entry['reads'],
+                'failures': entry['failures'],
+                'last_duration_ms': entry['last_duration_ms'],
+                'avg_duration_ms': entry['avg_duration_ms'],
+                'max_duration_ms': entry['max_duration_ms'],
+                'last_lateness_ms': entry['last_lateness_ms'],
+                'max_lateness_ms': entry['max_lateness_ms'],
+                'interval_ms': entry['interval'],
+                'next_read_ms': max(0, clock.remaining(entry['next_read']))
+            }
+        return stats
@@ -1,5 +1,6 @@
 import time
 import asyncio
+from heapq import heappush, heappop, heapify
 from machine import Timer
 
 
@@ -9,6 +10,11 @@ class SoftwareTimer():
     create an interrupt when the next virtual timer is due. This ensures that
     callbacks run when scheduled, unlike asyncio tasks which may not run until
     other tasks yield.
+
+    Timers are stored in a heap ordered by expiration time with an index of
+    expiration times for each caller name. Create, cancel, and expire are each
+    O(log n). Canceled timers are removed from the heap lazily (skipped when
+    they reach the top, heap is compacted if mostly canceled timers).
     '''
 
     def __init__(self):
@@ -17,19 +23,25 @@ class SoftwareTimer():
 
         # Keys are expiration times (epoch), values are 2-tuples with caller
         # name as first member and callback function as second member.
+        # Only contains timers that have not expired or been canceled.
         self.schedule = {}
 
-        # Keys from self.schedule sorted chronologically, used to determine
-        # next due timer
+        # Heap of expiration times, first item is next due timer. May contain
+        # expiration times of canceled timers (not in self.schedule), these
+        # are discarded when they reach the top of the heap.
         self.queue = []
 
-        # Stores keys of expired timers after their callback is run, used to
-        # remove from self.schedule after running all due timers
-        self.delete = []
+        # Keys are caller names, values are sets of expiration times for all
+        # timers created by caller (used to cancel without scanning schedule)
+        self.names = {}
 
-        # Allows loop to be paused when no timers are expiring soon
+        # Allows loop to be paused until next timer is due
         self.pause = False
 
+        # Set by hardware interrupt and create/cancel methods to wake up loop
+        # while paused (safe to set from interrupt handler)
+        self.flag = asyncio.ThreadSafeFlag()
+
         # Used to prevent modifying queue while loop is iterating queue
         self.lock = asyncio.Lock()
 
@@ -41,7 +53,7 @@ class SoftwareTimer():
         '''Takes period (milliseconds), callback function, and name of caller.
         Creates timer to run callback after period expires. If a timer created
         by name already exists it will be canceled to prevent conflicts (except
-        scheduler name used for schedule rule callbacks).
+        names starting with scheduler, used for schedule rule callbacks).
         '''
         asyncio.create_task(self._create(period, callback, name))
 
@@ -55,26 +67,24 @@ class SoftwareTimer():
             expiration = self.epoch_now() + int(period)
 
             # Prevent overwriting existing item with same expiration time
-            if expiration in self.schedule:
-                while True:
-                    # Add 1 ms until expiration is unique
-                    expiration += 1
-                    if expiration not in self.schedule:
-                        break
+            while expiration in self.schedule:
+                # Add 1 ms until expiration is unique
+                expiration += 1
 
             # Callers are only allowed 1 timer each (except schedule rule timers)
             # Delete existing timers with same name before adding
-            if not name == "scheduler":
-                for i in list(self.schedule).copy():
-                    if name in self.schedule[i]:
-                        del self.schedule[i]
+            if not name.startswith("scheduler"):
+                self._remove(name)
 
             self.schedule[expiration] = (name, callback)
-
-            self._rebuild_queue()
+            heappush(self.queue, expiration)
+            if name in self.names:
+                self.names[name].add(expiration)
+            else:
+                self.names[name] = {expiration}
 
             # Resume loop if paused
-            self.pause = False
+            self._resume()
 
     def cancel(self, name):
         '''Takes caller name, cancels all timers with the same name.'''
@@ -86,70 +96,77 @@ class SoftwareTimer():
         # Wait for loop to finish iterating queue before modifying, prevent
         # loop from running next iteration until done modifying
         async with self.lock:
-            # Delete any items with same name
-            for i in list(self.schedule).copy():
-                if name in self.schedule[i]:
-                    del self.schedule[i]
+            self._remove(name)
 
+            # Resume loop if paused (recalculates interrupt for next timer)
+            self._resume()
+
+    def _remove(self, name):
+        '''Takes caller name, deletes all timers with the same name from
+        self.schedule. Expiration times are left in heap (skipped by loop),
+        heap is rebuilt if more than half of its items were canceled.
+        '''
+        for expiration in self.names.pop(name, ()):
+            self.schedule.pop(expiration, None)
+
+        if len(self.queue) > 2 * len(self.schedule) + 16:
             self._rebuild_queue()
 
     def _rebuild_queue(self):
-        '''Clears queue, repopulates with keys of self.schedule and sorts
-        chronologically. Must be called after self.schedule is modified.
-        '''
-        self.queue = []
-        for i in self.schedule:
-            self.queue.append(i)
-        self.queue.sort()
+        '''Rebuilds heap from keys of self.schedule (drops canceled timers).'''
+        self.queue = list(self.schedule)
+        heapify(self.queue)
 
     def _resume(self, _=None):
-        '''Callback used to unpause loop right before next timer expires'''
+        '''Callback used to unpause loop when next timer expires (also
+        called by create and cancel methods to wake loop immediately).
+        '''
         self.pause = False
+        self.flag.set()
 
     async def loop(self):
         '''Coroutine checks for expired timers in queue, runs their callbacks,
-        and removes them from the queue. If no timers are due within the next
-        second loop pauses and creates interrupt to resume when next timer due.
+        and removes them from the queue. Pauses after each iteration and awaits
+        flag set by interrupt created to resume when next timer due (or by the
+        create and cancel methods), uses no CPU while waiting.
         '''
         while True:
-            if not self.pause:
-                # Acquire lock to prevent modifying queue while iterating
-                async with self.lock:
-                    # Iterate chronological queue until first unexpired timer found
-                    for i in self.queue:
-                        if self.epoch_now() >= i:
-                            # Run expired timer callback, add timestamp to list
-                            # of items to be removed from queue
-                            self.schedule[i][1]()
-                            self.delete.append(i)
-                        else:
-                            # First unexpired timer found
-                            # If not due for >1 second: pause loop, create
-                            # interrupt to resume when timer due
-                            period = int(i - self.epoch_now())
-                            if period > 1000:
-                                self.pause = True
-                                self.timer.init(
-                                    period=period,
-                                    mode=Timer.ONE_SHOT,
-                                    callback=self._resume
-                                )
-                            break
+            # Acquire lock to prevent modifying queue while iterating
+            async with self.lock:
+                # Pop timers from heap until first unexpired timer found
+                while self.queue:
+                    expiration = self.queue[0]
 
+                    # Discard canceled timer
+                    if expiration not in self.schedule:
+                        heappop(self.queue)
+                        continue
+
+                    if self.epoch_now() >= expiration:
+                        # Remove expired timer, run callback
+                        heappop(self.queue)
+                        name, callback = self.schedule.pop(expiration)
+                        self.names[name].discard(expiration)
+                        if not self.names[name]:
+                            del self.names[name]
+                        callback()
                     else:
-                        # Pause loop indefinitely if no unexpired timer found
-                        # (ran all timers, will unpause when new timer created)
+                        # First unexpired timer found
+                        # Pause loop, create interrupt to resume when due
                         self.pause = True
-                        self.timer.deinit()
-
-                    # Delete timers that were just run
-                    for i in self.delete:
-                        del self.schedule[i]
-                        del self.queue[self.queue.index(i)]
+                        self.timer.init(
+                            period=max(1, int(expiration - self.epoch_now())),
+                            mode=Timer.ONE_SHOT,
+                            callback=self._resume
+                        )
+                        break
 
-                    # Clear list for next loop
-                    self.delete = []
+                else:
+                    # Pause loop indefinitely if no unexpired timer found
+                    # (ran all timers, will unpause when new timer created)
+                    self.pause = True
+                    self.timer.deinit()
 
-            else:
-                # Wait for hardware interrupt to unpause loop
-                await asyncio.sleep_ms(50)
+            # Wait for hardware interrupt or create/cancel to unpause loop
+            while self.pause:
+                await self.flag.wait()
@@ -18,3 +18,9 @@ config_instance = None
 
 # Stores SoftwareTimer instance (core/SoftwareTimer.py)
 timer_instance = None
+
+# Stores PollScheduler instance (core/PollScheduler.py)
+poll_scheduler_instance = None
+
+# Stores SensorSampler instance (core/SensorSampler.py)
+sensor_sampler_instance = None
@@ -3,10 +3,15 @@ import gc
 import vfs
 import logging
 from flashbdev import bdev
+from startup_profile import ProfileStep
 try:
     from log_level import LOG_LEVEL
 except ImportError:
     LOG_LEVEL = 'ERROR'
+try:
+    from log_format import LOG_FORMAT
+except ImportError:
+    LOG_FORMAT = 'text'
 
 print("--------Booted--------")
 
@@ -19,20 +24,27 @@ except OSError:  # pragma: no cover
     inisetup.setup()
 gc.collect()
 
-# Set log file and syntax
+# Set log file and syntax (buffered, rotates app.log, app.log.1 etc)
+# Binary log stores packed records, decoded to same syntax on host
+if LOG_FORMAT == 'binary':
+    log_handler = logging.BinaryRingBufferHandler('app.log')
+else:
+    log_handler = logging.RingBufferHandler('app.log')
 logging.basicConfig(
     level=logging._nameToLevel[LOG_LEVEL],  # pylint: disable=W0212
-    filename='app.log',
+    handlers=[log_handler],
     format='%(asctime)s - %(levelname)s - %(name)s - %(message)s',
     style='%'
 )
 log = logging.getLogger("Boot")
-log.critical("Booted, log level: %s", LOG_LEVEL)
+log.critical("Booted, log level: %s, log format: %s", LOG_LEVEL, LOG_FORMAT)
 
 
 # Start main loop if wifi_credentials file exists
 if "wifi_credentials.json" in os.listdir():
-    from main import start
+    # Record time and heap used to import main and all core modules
+    with ProfileStep('import', 'main'):
+        from main import start
     start()
 # Serve access point, wait for setup if no wifi_credentials
 else:
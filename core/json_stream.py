@@ -0,0 +1,99 @@
+import json
+import asyncio
+
+# Default max bytes buffered before writing to stream and draining
+CHUNK_SIZE = 512
+
+
+class LazyDict():
+    '''Dict-like object that wraps a function which returns an iterator of
+    key-value pairs. Values are not generated until the dict is serialized by
+    dump, allows large replies (eg status) to be built one item at a time.
+    '''
+
+    def __init__(self, items_func):
+        self._items_func = items_func
+
+    def items(self):
+        '''Returns iterator of key-value pairs (same as dict.items).'''
+        return self._items_func()
+
+    def to_dict(self):
+        '''Returns regular dict with all items (nested LazyDict included).'''
+        return {key: value.to_dict() if isinstance(value, LazyDict) else value
+                for key, value in self.items()}
+
+
+class JsonStreamWriter():
+    '''Serializes dicts, lists, and JSON-compatible values to an asyncio stream
+    writer without building the full JSON string in memory. Encoded output is
+    buffered until it exceeds chunk_size, then written and drained.
+
+    Args:
+      swriter:    Open asyncio stream writer instance
+      chunk_size: Max bytes buffered before writing to stream (default 512)
+      timeout:    Max seconds to wait for each drain (default None)
+    '''
+
+    def __init__(self, swriter, chunk_size=CHUNK_SIZE, timeout=None):
+        self.swriter = swriter
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self._buffer = []
+        self._buffered = 0
+
+    async def write(self, string):
+        '''Takes string, adds to buffer, flushes if buffer exceeds chunk_size.'''
+        self._buffer.append(string)
+        self._buffered += len(string)
+        if self._buffered >= self.chunk_size:
+            await self.flush()
+
+    async def flush(self):
+        '''Writes buffered strings to stream and drains.'''
+        if self._buffer:
+            self.swriter.write(''.join(self._buffer).encode())
+            self._buffer = []
+            self._buffered = 0
+            await asyncio.wait_for(self.swriter.drain(), self.timeout)
+
+    async def encode(self, obj):
+        '''Takes dict (or object with items method), list, tuple, or JSON
+        serializable value, writes JSON representation to buffer.
+        '''
+        if hasattr(obj, 'items'):
+            await self.write('{')
+            first = True
+            for key, value in obj.items():
+                if not first:
+                    await self.write(', ')
+                first = False
+                # Non-string keys are converted same as json.dumps
+                if not isinstance(key, str):
+                    key = json.dumps(key)
+                await self.write(json.dumps(key))
+                await self.write(': ')
+                await self.encode(value)
+            await self.write('}')
+
+        elif isinstance(obj, (list, tuple)):
+            await self.write('[')
+            first = True
+            for value in obj:
+                if not first:
+                    await self.write(', ')
+                first = False
+                await self.encode(value)
+            await self.write(']')
+
+        else:
+            await self.write(json.dumps(obj))
+
+
+async def dump(obj, swriter, chunk_size=CHUNK_SIZE, timeout=None):
+    '''Takes object and open asyncio stream writer, writes obj as JSON in
+    chunks of approximately chunk_size bytes and drains after each chunk.
+    '''
+    writer = JsonStreamWriter(swriter, chunk_size, timeout)
+    await writer.encode(obj)
+    await writer.flush()
@@ -5,8 +5,11 @@ import webrepl
 import app_context
 from Api import Api
 from Config import Config
+from PollScheduler import PollScheduler
+from SensorSampler import SensorSampler
 from SoftwareTimer import SoftwareTimer
-from util import read_config_from_disk, check_log_size
+from startup_profile import finish as finish_startup_profile
+from util import read_config_from_disk, flush_log
 
 log = logging.getLogger("Main")
 
@@ -25,6 +28,12 @@ def start():
     # Instantiate SoftwareTimer, add to shared context
     app_context.timer_instance = SoftwareTimer()
 
+    # Instantiate PollScheduler (used by device drivers), add to shared context
+    app_context.poll_scheduler_instance = PollScheduler()
+
+    # Instantiate SensorSampler (used by sensor drivers), add to shared context
+    app_context.sensor_sampler_instance = SensorSampler()
+
     # Instantiate config object (connects to wifi, sets up hardware, etc)
     try:
         app_context.config_instance = Config(read_config_from_disk())
@@ -38,8 +47,8 @@ def start():
     # Start webrepl (OTA updates)
     webrepl.start()
 
-    # Check if log exceeded 100 KB every 60 seconds
-    app_context.timer_instance.create(60000, check_log_size, "check_log_size")
+    # Write buffered log lines to disk every 5 seconds
+    app_context.timer_instance.create(5000, flush_log, "flush_log")
 
     # Get event loop, add custom exception handler that logs all uncaught
     # exceptions to disk before calling default exception handler
@@ -55,5 +64,12 @@ def start():
     # Start server and await requests
     loop.create_task(app_context.api_instance._run())  # pylint: disable=W0212
 
+    # Record boot time and free heap, stop recording startup profile
+    finish_startup_profile()
+
+    # Drop log floods from now on (boot logs too many lines for rate limit)
+    for handler in logging.root.handlers:
+        handler.start_rate_limit()
+
     # Run forever
     loop.run_forever()
@@ -1,4 +1,3 @@
-import os
 import time
 import json
 import logging
@@ -86,45 +85,55 @@ def write_ir_macros_to_disk(conf):
     return True
 
 
+def read_astronomy_from_disk():
+    '''Reads astronomy.json (last astronomy API response) from disk and
+    returns as dict. Returns empty dict if file does not exist.
+    '''
+    try:
+        with open('astronomy.json', 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_astronomy_to_disk(data):
+    '''Takes dict with astronomy API values, writes to astronomy.json on disk'''
+    if not isinstance(data, dict):
+        return False
+    with open('astronomy.json', 'w', encoding='utf-8') as file:
+        json.dump(data, file)
+    return True
+
+
 def reboot(*args):
     '''Writes log message and performs hard reboot. Accepts args to allow
     calling with hardware timer (passes self as arg).
     '''
     print_with_timestamp("Reboot function called, rebooting...")
     log.critical("Reboot function called, rebooting...\n")
+    # Write buffered log lines to disk
+    logging.shutdown()
     from machine import reset  # pylint: disable=C0415
     reset()
 
 
 def clear_log():
-    '''Deletes app.log from disk, creates blank log and new handler'''
-
-    # Close file, remove
-    logging.root.handlers[0].close()
-    os.remove('app.log')
-
-    # Create new handler, set format
-    h = logging.FileHandler('app.log')
-    h.setFormatter(logging.Formatter(
-        '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
-    ))
-
-    # Replace old handler with new
-    logging.root.handlers.clear()
-    logging.root.addHandler(h)
+    '''Deletes app.log and all rotated log segments (app.log.1 etc) from
+    disk, discards buffered log lines, creates blank log.
+    '''
+    logging.root.handlers[0].clear()
 
 
-def check_log_size():
-    '''Checks app.log size, deletes if larger than 100 KB.
-    Called by SoftwareTimer every 60 seconds to keep log from filling disk.
+def flush_log():
+    '''Writes buffered log lines to disk (log handler rotates segment files
+    to keep log from filling disk). Called by SoftwareTimer every 5 seconds,
+    log handler also writes when buffer is full or CRITICAL line logged.
     '''
-    if os.stat('app.log')[6] > 100000:
-        print_with_timestamp("\nLog exceeded 100 KB, clearing...\n")
-        clear_log()
-        log.critical("Deleted old log (exceeded 100 KB size limit)")
+    for handler in logging.root.handlers:
+        handler.flush()
 
     # Add back to queue
-    app_context.timer_instance.create(60000, check_log_size, "check_log_size")
+    app_context.timer_instance.create(5000, flush_log, "flush_log")
 
 
 def get_timestamp():
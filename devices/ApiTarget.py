@@ -1,11 +1,20 @@
 import json
 import socket
+import asyncio
 import network
 import app_context
 from Device import Device
+from Api import ASYNC_ENDPOINTS
 from util import is_device, is_sensor, is_device_or_sensor
 
 
+class ConnectionClosed(Exception):
+    '''Raised by ApiTarget._send_keepalive if the request could not be sent or
+    the target node closed the connection before sending any reply byte (the
+    command was not run, safe to resend on a new connection).
+    '''
+
+
 class ApiTarget(Device):
     '''Software-only device driver that sends API calls to another node (or to
     self) when turned on and off. A separate API call can be configured for the
@@ -38,6 +47,13 @@ class ApiTarget(Device):
         # Port defaults to 8123 except in unit tests
         self.port = port
 
+        # Keep-alive connection to target node, opened by first request and
+        # reused by subsequent requests until target node closes it
+        self._sock = None
+
+        # Incremented each request, target node returns id with reply
+        self._request_id = 0
+
         # IP of ESP32, used to detect self-target
         self.node_ip = None
         self.get_node_ip()
@@ -212,26 +228,115 @@ class ApiTarget(Device):
         self.print(f"Send method failed with payload {msg}")
         self.print(f"Response: {err}")
 
+    def _connect(self):
+        '''Opens keep-alive connection to target node (1 second timeout).'''
+        self._sock = socket.socket()
+        self._sock.settimeout(1)
+        self._sock.connect((self.ip, self.port))
+
+    def _close(self):
+        '''Closes keep-alive connection (next request will reconnect).'''
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def _send_keepalive(self, msg):
+        '''Takes API command, sends keep-alive request on open connection and
+        returns reply. Raises ConnectionClosed if the request could not be sent
+        or the target node closed the connection without replying, OSError or
+        ValueError if the request failed after the target may have received it
+        (timeout, partial or invalid reply).
+        '''
+        self._request_id += 1
+        payload = {'id': self._request_id, 'cmd': msg}
+        try:
+            self._sock.sendall(f'{json.dumps(payload)}\n'.encode())
+        except OSError as ex:
+            raise ConnectionClosed from ex
+        chunk = self._sock.recv(1000)
+        if not chunk:
+            raise ConnectionClosed
+
+        # Read until end of reply (newline)
+        res = chunk
+        while not res.endswith(b'\n'):
+            chunk = self._sock.recv(1000)
+            if not chunk:
+                raise OSError
+            res += chunk
+
+        res = json.loads(res)
+        if res['id'] != self._request_id:
+            raise ValueError
+        return res['reply']
+
     def request(self, msg):
         '''Called by send method. Takes API command and sends to target IP.
         Returns True if request successful, False if request failed.
+
+        Reuses keep-alive connection if open (avoids connection setup and
+        teardown on every request). Resends once on a new connection only if
+        the reused connection failed before any reply byte arrived (target
+        node closed idle connection, rebooted, etc). Never resends after a
+        timeout or on a new connection (target may have run the command).
         '''
-        s = socket.socket()
-        s.settimeout(1)
+        reused = self._sock is not None
         try:
-            s.connect((self.ip, self.port))
-            s.sendall(f'{json.dumps(msg)}\n'.encode())
-            res = s.recv(1000).decode()
-            res = json.loads(res)
-        except (OSError, ValueError):
+            if not reused:
+                self._connect()
+            try:
+                res = self._send_keepalive(msg)
+            except ConnectionClosed:
+                if not reused:
+                    raise
+                self._close()
+                self._connect()
+                res = self._send_keepalive(msg)
+        except (ConnectionClosed, OSError, ValueError, KeyError):
+            self._close()
             self.log.error("exception during request")
-            res = False
-        s.close()
+            return False
 
         # Return False if request failed
         if not res:
             return False
 
+        return self.check_reply(msg, res)
+
+    async def request_async(self, msg):
+        '''Called by send_async method. Takes API command and sends to target
+        IP without blocking the event loop (opens a new connection for each
+        request). Returns True if request successful, False if failed.
+        '''
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.ip, self.port),
+                1
+            )
+            try:
+                writer.write(f'{json.dumps(msg)}\n'.encode())
+                await writer.drain()
+                res = json.loads(await asyncio.wait_for(reader.read(-1), 2))
+            finally:
+                writer.close()
+                await writer.wait_closed()
+        except (OSError, ValueError, asyncio.TimeoutError):
+            self.log.error("exception during request")
+            return False
+
+        return self.check_reply(msg, res)
+
+    def check_reply(self, msg, res):
+        '''Takes API command and reply received from target node. Returns
+        True if reply does not contain an error, logs error and returns False
+        if it does or if reply is not a dict or list (unexpected type).
+        '''
+        if isinstance(res, list):
+            return True
+        if not isinstance(res, dict):
+            self.log_failed_request(msg, res)
+            return False
+
         # Log payload + error and return False if response contains error
         if "Error" in res.keys() or "ERROR" in res.keys():
             self.log_failed_request(msg, res)
@@ -240,6 +345,28 @@ class ApiTarget(Device):
         # Return True if request successful
         return True
 
+    def get_command(self, state):
+        '''Returns API command from current_rule "on" key if argument is True,
+        "off" key if argument is False. Returns None if there is nothing to
+        send (current_rule is not a dict or command is "ignore").
+        '''
+
+        # Prevent exception if current rule is string ("Disabled")
+        # TODO fix incorrect API response if turn_off called while rule is Disabled
+        if not isinstance(self.current_rule, dict):
+            return None
+
+        # Get correct command for state argument
+        if state:
+            command = self.current_rule["on"]
+        else:
+            command = self.current_rule["off"]
+
+        # Return early if rule is "ignore"
+        if command[0] == "ignore":
+            return None
+        return command
+
     def send(self, state=1):
         '''Sends API call in current_rule "on" key if argument is True.
         Sends API call in current_rule "off" key if argument is False.
@@ -255,52 +382,87 @@ class ApiTarget(Device):
         if not self.enabled and state:
             return True
 
-        # Prevent exception if current rule is string ("Disabled")
-        # TODO fix incorrect API response if turn_off called while rule is Disabled
-        if not isinstance(self.current_rule, dict):
+        command = self.get_command(state)
+        if command is None:
             return True
 
-        # Get correct command for state argument
-        if state:
-            command = self.current_rule["on"]
-        else:
-            command = self.current_rule["off"]
+        # Send request, return False if failed
+        if self.ip != self.get_node_ip():
+            return self.request(command)
 
-        # Return early if rule is "ignore"
-        if command[0] == "ignore":
+        # Self targeting, pass request directly to API backend
+        return self.send_to_self(command)
+
+    async def send_async(self, state=1):
+        '''Awaitable equivalent of send used by Group.apply_action (does not
+        block event loop while waiting for target node to respond).
+        '''
+        self.log.debug(
+            "send_async method called, rule=%s, state=%s",
+            self.current_rule, state
+        )
+
+        # Refuse to turn disabled device on, but allow turning off
+        if not self.enabled and state:
+            return True
+
+        command = self.get_command(state)
+        if command is None:
             return True
 
         # Send request, return False if failed
         if self.ip != self.get_node_ip():
-            if not self.request(command):
-                return False
+            return await self.request_async(command)
 
         # Self targeting, pass request directly to API backend
-        else:
-            if not self.send_to_self(command):
-                return False
-
-        # Tells group send succeeded
-        return True
+        return await self.send_to_self_async(command)
 
     def send_to_self(self, command):
         '''Called by send method (instead of request) when target IP is self.
         Passes current_rule directly to API backend without opening connection
         (request method is synchronous, blocks Api.run_client method).
+
+        Async endpoints (turn_on, turn_off, etc) can't be awaited here, they
+        are run in a task (returns True, failure is logged by check_reply).
         '''
         self.log.debug("send_to_self method called, command=%s", command)
         path = command[0]
         args = command[1:]
 
+        if path in ASYNC_ENDPOINTS:
+            asyncio.create_task(self.send_to_self_async(command))
+            return True
+
         try:
             reply = getattr(app_context.api_instance, path)(args)
         except AttributeError:
             return False
 
-        # Log payload + error and return False if response contains error
-        if "Error" in reply.keys() or "ERROR" in reply.keys():
-            self.log_failed_request(command, reply)
+        return self.check_reply(command, reply)
+
+    async def send_to_self_async(self, command):
+        '''Awaitable equivalent of send_to_self used by send_async, awaits
+        async endpoints before checking reply.
+        '''
+        self.log.debug("send_to_self_async method called, command=%s", command)
+        path = command[0]
+        args = command[1:]
+
+        try:
+            reply = getattr(app_context.api_instance, path)(args)
+        except AttributeError:
             return False
+        if path in ASYNC_ENDPOINTS:
+            reply = await reply
 
-        # Return True if request successful
-        return True
+        return self.check_reply(command, reply)
+
+    def get_attributes(self):
+        '''Return JSON-serializable dict containing all current attributes
+        Called by API get_attributes endpoint, more verbose than status
+        '''
+        attributes = super().get_attributes()
+        # Remove keep-alive connection attributes (socket not serializable)
+        del attributes["_sock"]
+        del attributes["_request_id"]
+        return attributes
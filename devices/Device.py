@@ -16,6 +16,10 @@ class Device(Instance):
     Subclassed by all device drivers. Drivers must implement send method (takes
     bool argument, turns device ON if True, turns device OFF if False).
 
+    Drivers that make network requests should also implement send_async, an
+    awaitable version of send that does not block the event loop. If present
+    Group.apply_action uses send_async to send to all devices concurrently.
+
     Supports universal rules ("enabled" and "disabled"). Additional rules can
     be supported by replacing the validator method in subclass.
     '''
@@ -25,12 +29,38 @@ class Device(Instance):
 
         # Track device on/off state, prevent turning on/off when already on/off
         # Included in status object, used by API to display device state
-        self.state = None
+        self._state = None
 
         # List of Sensor instances which control the device, populated by
         # Config when sensors are instantiated
         self.triggered_by = []
 
+        # Set by Group when retries stop after repeated failed sends, cleared
+        # by next successful send. Included in status object.
+        self._unreachable = False
+
+    @property
+    def state(self):
+        '''Device on/off state bool (None if unknown).'''
+        return self._state
+
+    @state.setter
+    def state(self, value):
+        if value != self._state:
+            self._state = value
+            self.status_changed()
+
+    @property
+    def unreachable(self):
+        '''True if Group stopped retrying after repeated failed sends.'''
+        return self._unreachable
+
+    @unreachable.setter
+    def unreachable(self, value):
+        if value != self._unreachable:
+            self._unreachable = value
+            self.status_changed()
+
     def enable(self):
         '''Sets enabled bool to True (allows device to be turned on), ensures
         current_rule contains a usable value, and turns the device on if group
@@ -92,6 +122,8 @@ class Device(Instance):
         Called by API get_attributes endpoint, more verbose than status
         '''
         attributes = super().get_attributes()
+        attributes["state"] = attributes.pop("_state")
+        attributes["unreachable"] = attributes.pop("_unreachable")
 
         # Replace sensor instances with instance.name attributes
         attributes["triggered_by"] = []
@@ -107,4 +139,5 @@ class Device(Instance):
         '''
         status = super().get_status()
         status['turned_on'] = self.state
+        status['unreachable'] = self.unreachable
         return status
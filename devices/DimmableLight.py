@@ -1,6 +1,74 @@
 import app_context
 from Device import Device
 
+# Name of SoftwareTimer used to run fade steps for all instances
+FADE_TIMER = "dimmable_light_fade"
+
+
+class FadeScheduler():
+    '''Runs fade steps for all DimmableLight instances with a fade in progress
+    from a single SoftwareTimer (instead of each instance creating a timer for
+    every step).
+
+    Each tick calls the fade method of every active instance (computes current
+    brightness from fade start time and period, only calls send if brightness
+    changed), then creates the timer for the earliest next step. Fades with the
+    same period are aligned to the same step times so they run in one tick.
+
+    Instances are removed lazily when their fade is complete or aborted.
+    '''
+
+    def __init__(self):
+        # Keys are instance names, values are instances with fade in progress
+        self.active = {}
+
+    def add(self, instance):
+        '''Takes instance with fading dict, runs its steps until fade complete.
+        If another active fade has the same period the start time is moved back
+        (less than 1 period) so both step at the same time.
+        '''
+        period = instance.fading["period"]
+        for other in self.active.values():
+            if other is not instance and other.fading and other.fading["period"] == period:
+                offset = (instance.fading["started"] - other.fading["started"]) % period
+                instance.fading["started"] -= offset
+                break
+
+        self.active[instance.name] = instance
+        self._schedule()
+
+    def tick(self):
+        '''SoftwareTimer callback, runs fade step for all active instances and
+        creates timer for next step.
+        '''
+        for instance in list(self.active.values()):
+            if instance.fading:
+                instance.fade()
+        self._schedule()
+
+    def _schedule(self):
+        '''Removes instances that are no longer fading, creates timer for the
+        earliest next step (cancels timer if no fades in progress).
+        '''
+        for name in [name for name, instance in self.active.items() if not instance.fading]:
+            del self.active[name]
+
+        if not self.active:
+            app_context.timer_instance.cancel(FADE_TIMER)
+            return
+
+        now = app_context.timer_instance.epoch_now()
+        # Milliseconds until each instance's next step, use earliest
+        next_step = min(
+            fading["period"] - (now - fading["started"]) % fading["period"]
+            for fading in (instance.fading for instance in self.active.values())
+        )
+        app_context.timer_instance.create(max(1, int(next_step)), self.tick, FADE_TIMER)
+
+
+# Shared by all DimmableLight instances
+fade_scheduler = FadeScheduler()
+
 
 class DimmableLight(Device):
     '''Base class for all devices which support a range of brightness levels.
@@ -67,7 +135,7 @@ class DimmableLight(Device):
           scheduled: Optional, if True also sets scheduled_rule if rule valid
 
         If fade rule received (syntax: fade/target_rule/duration_seconds) calls
-        _start_fade method (creates interrupts that run when each step is due).
+        _start_fade method (adds instance to shared FadeScheduler).
 
         Aborts in-progress fade if it receives an integer rule that causes rule
         to move in opposite direction of fade (eg if new rule is greater than
@@ -194,9 +262,9 @@ class DimmableLight(Device):
     def _start_fade(self, valid_rule, scheduled=False):
         '''Called by set_rule when it receives a fade rule. Calculates number
         of steps to reach target brightness and delay between each step, saves
-        in self.fading attribute (dict), and creates interrupt to update rule
-        when each step is due. If scheduled arg is True each step also updates
-        scheduled_rule.
+        in self.fading attribute (dict), and adds instance to FadeScheduler
+        (updates rule when each step is due). If scheduled arg is True each
+        step also updates scheduled_rule.
         '''
         self.log.debug(
             "_start_fade called with %s (scheduled=%s)",
@@ -253,12 +321,8 @@ class DimmableLight(Device):
         }
         self.log.debug("fade parameters: %s", self.fading)
 
-        # Create fade timer
-        app_context.timer_instance.create(
-            fade_period,
-            self.fade,
-            self.name + "_fade"
-        )
+        # Run steps from shared fade timer
+        fade_scheduler.add(self)
 
         return True
 
@@ -306,10 +370,11 @@ class DimmableLight(Device):
         return False
 
     def fade(self):
-        '''Called by SoftwareTimer when each step of ongoing fade is due.
+        '''Called by FadeScheduler when a step of ongoing fade may be due.
         Updates current_rule (and scheduled_rule if _start_fade was called with
-        scheduled arg), calls send method so new brightness takes effect, and
-        checks if fade is complete (creates next interrupt if not complete).
+        scheduled arg) based on time since fade started, calls send method if
+        brightness changed so new brightness takes effect, and checks if fade
+        is complete.
         '''
 
         # Fade to next step (unless fade already complete)
@@ -334,7 +399,7 @@ class DimmableLight(Device):
             if self.fading["scheduled"]:
                 self.scheduled_rule = int(new_rule)
 
-            # Don't override user-set brightness
+            # Don't override user-set brightness, skip send if unchanged
             if (
                 (self.fading["down"] and int(new_rule) < self.current_rule)
                 or (not self.fading["down"] and int(new_rule) > self.current_rule)
@@ -344,17 +409,8 @@ class DimmableLight(Device):
                 if self.state is True:
                     self.send(1)
 
-        # Start timer for next step (unless fade already complete)
-        if not self._fade_complete():
-            # Sleep until next step
-            next_step = int(self.fading["period"] - ((
-                app_context.timer_instance.epoch_now() - self.fading["started"]
-            ) % self.fading["period"]))
-            app_context.timer_instance.create(
-                next_step,
-                self.fade,
-                self.name + "_fade"
-            )
+            # Cleanup if target reached (removed from FadeScheduler next tick)
+            self._fade_complete()
 
     def get_status(self):
         '''Return JSON-serializable dict containing status information.
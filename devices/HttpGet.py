@@ -1,5 +1,6 @@
 import re
 import requests
+import async_requests
 from Device import Device
 
 # Regular expression matches domain or IP with optional port number and sub-path
@@ -67,9 +68,33 @@ class HttpGet(Device):
 
     def request(self, url):
         '''Takes URL, makes request, returns response object'''
-
         return requests.get(url, timeout=2)
 
+    async def request_async(self, url):
+        '''Takes URL, makes request without blocking event loop, returns
+        response object.
+        '''
+        return await async_requests.get(url, timeout=2)
+
+    def handle_response(self, state, response):
+        '''Takes state arg passed to send and response object, returns True if
+        request succeeded, False if failed. Called by send and send_async.
+        '''
+        self.log.debug("response status: %s", response.status_code)
+        if state:
+            self.print("Turned on")
+        else:
+            self.print("Turned off")
+
+        # Request succeeded if status code is 200
+        return bool(response.status_code == 200)
+
+    def send_failed(self):
+        '''Logs network error, returns False. Called by send and send_async.'''
+        self.log.error("send method failed (wifi error)")
+        self.print(f"{self.name}: send failed (wifi error)")
+        return False
+
     def send(self, state=1):
         '''Makes request to ON action URL if argument is True.
         Makes request to OFF action URL if argument is False.
@@ -87,16 +112,29 @@ class HttpGet(Device):
 
         try:
             response = self.request(self.get_url(state))
-            self.log.debug("response status: %s", response.status_code)
-            if state:
-                self.print("Turned on")
-            else:
-                self.print("Turned off")
         except OSError:
             # Wifi interruption, send failed
-            self.log.error("send method failed (wifi error)")
-            self.print(f"{self.name}: send failed (wifi error)")
-            return False
+            return self.send_failed()
 
-        # Request succeeded if status code is 200
-        return bool(response.status_code == 200)
+        return self.handle_response(state, response)
+
+    async def send_async(self, state=1):
+        '''Awaitable equivalent of send used by Group.apply_action (does not
+        block event loop while waiting for response).
+        '''
+        self.log.debug(
+            "send_async method called, rule=%s, state=%s",
+            self.current_rule, state
+        )
+
+        # Refuse to turn disabled device on, but allow turning off
+        if not self.enabled and state:
+            return True
+
+        try:
+            response = await self.request_async(self.get_url(state))
+        except OSError:
+            # Wifi interruption or timeout, send failed
+            return self.send_failed()
+
+        return self.handle_response(state, response)
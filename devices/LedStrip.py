@@ -1,7 +1,13 @@
-import time
 from machine import Pin, PWM
+import app_context
 from DimmableLight import DimmableLight
 
+# Milliseconds to fade from current duty cycle to new duty cycle
+FADE_DURATION = 1000
+
+# Default milliseconds between duty cycle changes while fading
+FADE_STEP_MS = 20
+
 
 class LedStrip(DimmableLight):
     '''Driver for PWM-driven MOSFET used to dim an LED strip or other device.
@@ -17,6 +23,8 @@ class LedStrip(DimmableLight):
       min_rule:     The minimum supported integer rule, used by rule validator
       max_rule:     The maximum supported integer rule, used by rule validator
       pin:          The ESP32 pin connected to the MOSFET gate pin
+      fade_step_ms: Optional milliseconds between duty cycle steps while
+                    fading (lower is smoother, higher uses less CPU)
 
     The min_rule and max_rule attributes determine the range of supported int
     rules. This can be used to remove very low duty cycles from the supported
@@ -26,9 +34,13 @@ class LedStrip(DimmableLight):
     Supports universal rules ("enabled" and "disabled"), brightness rules (int
     between 0-1023), and fade rules (syntax: fade/target_rule/duration_seconds).
     The default_rule must be an integer or fade (not universal rule).
+
+    The send method does not block while fading, each step is run by a
+    SoftwareTimer callback. Calling send while a fade is in progress retargets
+    the fade starting from the current duty cycle.
     '''
 
-    def __init__(self, name, nickname, _type, default_rule, schedule, min_rule, max_rule, pin):
+    def __init__(self, name, nickname, _type, default_rule, schedule, min_rule, max_rule, pin, fade_step_ms=FADE_STEP_MS):
         super().__init__(name, nickname, _type, True, default_rule, schedule, min_rule, max_rule)
 
         # TODO - Find optimal PWM freq. Default (5 KHz) causes coil whine in
@@ -46,12 +58,18 @@ class LedStrip(DimmableLight):
         # Store current brightness, allows smooth transition when rule changes
         self.bright = 0
 
+        # Milliseconds between steps, dict with starting duty cycle, target
+        # duty cycle, and start time (epoch ms) while fade in progress
+        self.fade_step_ms = int(fade_step_ms)
+        self.pwm_fade = None
+
         self.log.info("Instantiated, pin=%s", pin)
 
     def send(self, state=1):
         '''Sets PWM duty cycle to current_rule if argument is True.
         Sets PWM duty cycle to 0 if argument is False.
-        Gradually fades to new brightness with 1 second transition.
+        Gradually fades to new brightness with 1 second transition (returns
+        immediately, fade runs in SoftwareTimer callbacks).
         '''
         self.log.debug(
             "send method called, rule=%s, state=%s",
@@ -69,43 +87,60 @@ class LedStrip(DimmableLight):
         else:
             target = 0
 
-        # Exit if current already matches target, prevent division by 0 below
+        # Exit if current already matches target (stop fade if in progress)
         if self.bright == target:
+            if self.pwm_fade is not None:
+                self.pwm_fade = None
+                app_context.timer_instance.cancel(self.name + "_pwm_fade")
             return True
 
-        # Fade DOWN
-        if self.bright > target:
-            # Calculate correct delay for 1 second fade
-            steps = self.bright - target
-            delay = int(1000000 / steps)
-
-            while self.bright > target:
-                self.bright -= 1
-                self.pwm.duty(self.bright)
-                time.sleep_us(delay)
-
-            self.print(f"Faded down to {target}")
-
-        # Fade UP
-        else:
-            # Calculate correct delay for 1 second fade
-            steps = target - self.bright
-            delay = int(1000000 / steps)
-
-            while self.bright < target:
-                self.bright += 1
-                self.pwm.duty(self.bright)
-                time.sleep_us(delay)
-
-            self.print(f"Faded up to {target}")
+        # Start new fade from current duty cycle (replaces fade in progress)
+        self.pwm_fade = {
+            'start': self.bright,
+            'target': target,
+            'started': app_context.timer_instance.epoch_now()
+        }
+        self._pwm_fade_step()
 
         return True  # Tell calling function that request succeeded
 
+    def _pwm_fade_step(self):
+        '''Sets duty cycle to value for current time in fade (linear from start
+        to target over FADE_DURATION), creates timer to run next step until
+        target reached. Called by send and by SoftwareTimer.
+        '''
+        fade = self.pwm_fade
+        if fade is None:
+            return
+
+        elapsed = app_context.timer_instance.epoch_now() - fade['started']
+
+        # Fade complete
+        if elapsed >= FADE_DURATION:
+            self.bright = fade['target']
+            self.pwm.duty(self.bright)
+            self.pwm_fade = None
+            if fade['target'] < fade['start']:
+                self.print(f"Faded down to {self.bright}")
+            else:
+                self.print(f"Faded up to {self.bright}")
+            return
+
+        # Set duty cycle for current step, create timer for next step
+        self.bright = fade['start'] + (fade['target'] - fade['start']) * elapsed // FADE_DURATION
+        self.pwm.duty(self.bright)
+        app_context.timer_instance.create(
+            min(self.fade_step_ms, FADE_DURATION - elapsed),
+            self._pwm_fade_step,
+            self.name + "_pwm_fade"
+        )
+
     def get_attributes(self):
         '''Return JSON-serializable dict containing all current attributes
         Called by API get_attributes endpoint, more verbose than status
         '''
         attributes = super().get_attributes()
-        # Remove Pin object (not serializable)
+        # Remove PWM object (not serializable) and fade in progress
         del attributes["pwm"]
+        del attributes["pwm_fade"]
         return attributes
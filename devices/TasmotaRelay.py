@@ -1,5 +1,5 @@
-import asyncio
-import requests
+import app_context
+import async_requests
 from HttpGet import HttpGet
 
 # Paths used by Tasmota to turn on, off
@@ -21,63 +21,55 @@ class TasmotaRelay(HttpGet):
       ip:           The IPv4 address of the Tasmota relay
 
     Supports universal rules ("enabled" and "disabled").
+
+    Polls are scheduled by the shared PollScheduler (keeps in sync if user
+    flips wall switch).
     '''
 
     def __init__(self, name, nickname, _type, default_rule, schedule, ip):
         super().__init__(name, nickname, _type, default_rule, schedule, ip, ON_PATH, OFF_PATH)
 
-        # Run monitor loop (requests power state every 5 seconds to keep in
-        # sync if user flips wall switch)
-        self.monitor_task = asyncio.create_task(self.monitor())
+        # Request power state periodically to keep in sync if user flips
+        # wall switch
+        app_context.poll_scheduler_instance.register(self, self.poll)
 
         self.log.info("Instantiated, ip=%s", self.uri)
 
-    def check_state(self):
+    async def check_state(self):
         '''Makes API call to get Tasmota relay power state, return response'''
 
         try:
-            return requests.get(
+            response = await async_requests.get(
                 f'http://{self.uri}/cm?cmnd=Power',
                 timeout=2
-            ).json()["POWER"]
-        except OSError:
+            )
+            return response.json()["POWER"]
+        except (OSError, ValueError, KeyError):
             self.log.error("network error while checking state")
-            raise RuntimeError
+            raise RuntimeError  # pylint: disable=W0707
 
-    async def monitor(self):
-        '''Async coroutine that runs while device is enabled. Queries power
-        state from Tasmota device every 5 seconds and updates self.state (keeps
-        in sync with actual device when user uses wall switch).
+    def handle_response(self, state, response):
+        '''Takes state arg passed to send and response object, returns True if
+        request succeeded, False if failed. Polls more often for a few seconds
+        after successful request to confirm new state.
         '''
-        self.log.debug("Starting TasmotaRelay.monitor coro")
-        try:
-            while True:
-                try:
-                    power = self.check_state() == "ON"
-                    if power != self.state:
-                        self.log.debug("monitor: power state changed to %s", power)
-                        self.state = power
-                except RuntimeError:
-                    # Error during request, ignore
-                    pass
+        success = super().handle_response(state, response)
+        if success:
+            app_context.poll_scheduler_instance.boost(self)
+        return success
 
-                # Poll every 5 seconds
-                await asyncio.sleep(5)
-
-        # Device disabled, exit loop
-        except asyncio.CancelledError:
-            self.log.debug("Exiting TasmotaRelay.monitor coro")
-            return False
-
-    def get_attributes(self):
-        '''Return JSON-serializable dict containing all current attributes
-        Called by API get_attributes endpoint, more verbose than status
+    async def poll(self):
+        '''Called by PollScheduler. Queries power state from Tasmota device and
+        updates self.state (keeps in sync with actual device when user uses
+        wall switch). Returns True if request succeeded, False if failed.
         '''
-        attributes = super().get_attributes()
-        # Replace monitor_task with True or False
-        if attributes["monitor_task"] is not None:
-            attributes["monitor_task"] = True
-        else:
-            attributes["monitor_task"] = False
-        return attributes
+        try:
+            power = await self.check_state() == "ON"
+        except RuntimeError:
+            return False
 
+        if power != self.state:
+            self.log.debug("poll: power state changed to %s", power)
+            self.state = power
+            app_context.poll_scheduler_instance.boost(self)
+        return True
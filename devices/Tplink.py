@@ -1,8 +1,23 @@
-import socket
 import asyncio
-from struct import pack
+from json import loads
+from struct import pack_into, unpack
+import app_context
+from outbox import Outbox
 from DimmableLight import DimmableLight
 
+# Port used by Kasa API (not configurable on device)
+KASA_PORT = 9999
+
+# Max seconds to wait for connection to open, and for each response
+CONNECT_TIMEOUT = 2
+RESPONSE_TIMEOUT = 3
+
+# Payload used to request power state and brightness
+STATUS_PAYLOAD = '{"system":{"get_sysinfo":{}}}'
+
+# Default max requests per second (Kasa devices stop responding if flooded)
+MAX_SEND_RATE = 4
+
 
 class Tplink(DimmableLight):
     '''Driver for TP-Link Kasa dimmers and smart bulbs. Makes API calls to set
@@ -18,6 +33,7 @@ class Tplink(DimmableLight):
       min_rule:     The minimum supported integer rule, used by rule validator
       max_rule:     The maximum supported integer rule, used by rule validator
       ip:           The IPv4 address of the TP-Link device
+      max_send_rate: Optional max requests per second sent to TP-Link device
 
     The _type argument must be set to "dimmer" or "bulb" (determines API call
     syntax, bulbs and dimmers use different syntax).
@@ -30,59 +46,88 @@ class Tplink(DimmableLight):
     Supports universal rules ("enabled" and "disabled"), brightness rules (int
     between 1-100), and fade rules (syntax: fade/target_rule/duration_seconds).
     The default_rule must be an integer or fade (not universal rule).
+
+    All requests are made with asyncio streams with bounded timeouts (does not
+    block event loop if device is unreachable). Requests are sent by an Outbox
+    (see lib/outbox.py): sends are skipped if the device already acknowledged
+    the same state and brightness, values submitted while a request is in
+    flight replace each other (only the latest is sent), and no more than
+    max_send_rate requests are sent per second. Dimmer relay state is only
+    sent when it differs from the last acknowledged state. The send method
+    returns immediately (False if the previous request failed). Failed
+    requests set state to None so the group resends its next action, the
+    next poll resyncs state and brightness from the device.
+
+    Polls are scheduled by the shared PollScheduler (keeps in sync if user
+    changes brightness from wall dimmer).
     '''
 
-    def __init__(self, name, nickname, _type, default_rule, schedule, min_rule, max_rule, ip):
+    def __init__(self, name, nickname, _type, default_rule, schedule, min_rule, max_rule, ip, max_send_rate=MAX_SEND_RATE):
         super().__init__(name, nickname, _type, True, default_rule, schedule, min_rule, max_rule)
 
         self.ip = ip
 
-        # Run monitor loop (requests status every 5 seconds to keep in sync if
-        # user changes brightness from wall dimmer)
-        self.monitor_task = asyncio.create_task(self.monitor())
+        # Coalesces rapid sends (fades, slider), limits request rate
+        self.outbox = Outbox(self._send, int(1000 / float(max_send_rate)))
+
+        # Request status periodically to keep in sync if user changes
+        # brightness from wall dimmer
+        app_context.poll_scheduler_instance.register(self, self.poll)
 
         self.log.info("Instantiated, ip=%s", self.ip)
 
     def encrypt(self, string):
-        '''Encrypts an API call using TP-Link's very weak algorithm.'''
-
+        '''Encrypts an API call using TP-Link's very weak algorithm.
+        Returns bytearray with 4 byte length header followed by payload.
+        '''
+        data = string.encode()
+        result = bytearray(len(data) + 4)
+        pack_into(">I", result, 0, len(data))
         key = 171
-        result = pack(">I", len(string))
-        for i in string:
-            a = key ^ ord(i)
-            key = a
-            result += bytes([a])
+        for i, byte in enumerate(data):
+            key ^= byte
+            result[i + 4] = key
         return result
 
-    def decrypt(self, string):
-        '''Decrypts an API call using TP-Link's very weak algorithm.'''
-
+    def decrypt(self, data):
+        '''Decrypts an API call using TP-Link's very weak algorithm.
+        Takes payload bytes (without length header), returns string.
+        '''
+        result = bytearray(len(data))
         key = 171
-        result = ""
-        for i in string:
-            a = key ^ i
-            key = i
-            result += chr(a)
-        return result
-
-    def _send_payload(self, payload):
-        '''Takes payload string, encrypts and sends to Tplink device IP.
-        Returns decrypted response from Tplink device.
+        for i, byte in enumerate(data):
+            result[i] = key ^ byte
+            key = byte
+        return result.decode()
+
+    async def _request(self, *payloads):
+        '''Takes one or more payload strings, encrypts and sends each to Tplink
+        device IP over a single connection. Returns list of decrypted responses
+        (same order as payloads), or False if any request failed or timed out.
         '''
-        self.log.debug("Sending payload: %s", payload)
+        self.log.debug("Sending payloads: %s", payloads)
+        writer = None
         try:
-            sock_tcp = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock_tcp.settimeout(10)
-            sock_tcp.connect((self.ip, 9999))
-
-            sock_tcp.send(self.encrypt(payload))
-            data = sock_tcp.recv(2048)
-            sock_tcp.close()
-
-            response = self.decrypt(data[4:])
-            self.log.debug("Response: %s", response)
-
-            return response
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.ip, KASA_PORT),
+                CONNECT_TIMEOUT
+            )
+
+            responses = []
+            for payload in payloads:
+                writer.write(self.encrypt(payload))
+                await asyncio.wait_for(writer.drain(), RESPONSE_TIMEOUT)
+
+                # Read length header, then read full response
+                header = await asyncio.wait_for(reader.readexactly(4), RESPONSE_TIMEOUT)
+                data = await asyncio.wait_for(
+                    reader.readexactly(unpack(">I", header)[0]),
+                    RESPONSE_TIMEOUT
+                )
+                responses.append(self.decrypt(data))
+
+            self.log.debug("Response: %s", responses)
+            return responses
 
         except Exception as ex:
             self.print(f"Could not connect to host {self.ip}, exception: {ex}")
@@ -91,44 +136,142 @@ class Tplink(DimmableLight):
             # Tell calling function that request failed
             return False
 
+        finally:
+            if writer is not None:
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except OSError:
+                    pass
+
     def _parse_response(self, response):
-        '''Takes decrypted response from Tplink device, returns False if the
-        response contains an error, return True if no error.
+        '''Takes decrypted response from Tplink device, returns True if every
+        result in the response has err_code 0, returns False if the response
+        contains an error, is empty, or is not valid JSON.
         '''
 
-        # Bool (returned when exception occurs in _send_payload)
-        if isinstance(response, bool):
-            return False
-        # Empty object {} (returned when request syntax incorrect)
-        if len(response) == 2:
-            return False
-        # Slice right after "err_code":, if next character is 0 no error
-        if response[response.index('err_code') + 10:].startswith('0'):
+        # Results are nested under module and method names, eg:
+        # {"system":{"set_relay_state":{"err_code":0}}}
+        try:
+            results = [
+                result
+                for module in loads(response).values()
+                for result in module.values()
+            ]
+            # Empty object {} returned when request syntax incorrect
+            if not results:
+                return False
+            for result in results:
+                if result.get("err_code") != 0:
+                    return False
             return True
-        # If next character after "err_code": is not 0 an error occurred
-        return False
+        # Micropython json raises OSError on syntax error
+        except (AttributeError, TypeError, ValueError, OSError):
+            return False
 
-    def _check_device_status(self):
-        '''Requests status object from Tplink device, parses power state and
-        current brightness, returns power state (bool) and brightness (int).
+    def _parse_status(self, response):
+        '''Takes decrypted get_sysinfo response, returns power state (bool)
+        and brightness (int). Raises RuntimeError if response is invalid.
         '''
-        response = self._send_payload('{"system":{"get_sysinfo":{}}}')
         try:
+            sysinfo = loads(response)["system"]["get_sysinfo"]
             if self._type == "dimmer":
-                power = bool(int(response.split('"relay_state":')[1].split(',')[0]))
-                brightness = int(response.split('"brightness":')[1].split(',')[0])
+                return bool(sysinfo["relay_state"]), int(sysinfo["brightness"])
+
+            # Bulbs only report brightness in light_state while turned on,
+            # brightness used when turned back on is in dft_on_state while off
+            light_state = sysinfo["light_state"]
+            if "brightness" in light_state:
+                brightness = light_state["brightness"]
             else:
-                power = bool(int(response.split('"on_off":')[1].split(',')[0]))
-                brightness = int(response.split('"brightness":')[1].split('}')[0])
-            return power, brightness
-        except (AttributeError, IndexError, ValueError):
+                brightness = light_state["dft_on_state"]["brightness"]
+            return bool(light_state["on_off"]), int(brightness)
+        except (KeyError, TypeError, ValueError, OSError):
             self.log.error("Failed to parse status response: %s", response)
             raise RuntimeError  # pylint: disable=W0707
 
+    async def _check_device_status(self):
+        '''Requests status object from Tplink device, returns power state
+        (bool) and brightness (int). Raises RuntimeError if request failed.
+        '''
+        responses = await self._request(STATUS_PAYLOAD)
+        if not responses:
+            raise RuntimeError
+        return self._parse_status(responses[0])
+
+    def _get_payloads(self, state, brightness, include_state=True):
+        '''Takes power state, brightness, and optional include_state bool.
+        Returns tuple of payload strings that set Tplink device power state
+        and brightness. Dimmer relay state payload is omitted if include_state
+        is False (state already set, only brightness changed).
+        '''
+
+        # Dimmer has separate brightness and on/off commands
+        if self._type == "dimmer":
+            brightness_payload = (
+                '{"smartlife.iot.dimmer":{"set_brightness":{"brightness":'
+                + str(brightness)
+                + '}}}'
+            )
+            if not include_state:
+                return (brightness_payload,)
+            return (
+                '{"system":{"set_relay_state":{"state":'
+                + str(int(state))
+                + '}}}',
+                brightness_payload
+            )
+
+        # Bulb combines brightness and on/off into single command
+        return (
+            '{"smartlife.iot.smartbulb.lightingservice":{"transition_light_state":{"ignore_default":1,"on_off":'
+            + str(int(state))
+            + ',"transition_period":0,"brightness":'
+            + str(brightness)
+            + '}}}',
+        )
+
+    def _send_failed(self):
+        '''Called by _send when a request fails. Sets state to None (unknown,
+        group and API see the failure and resend) until the next successful
+        send or poll, returns False.
+        '''
+        self.log.error("send failed, state unknown until next send or poll")
+        self.state = None
+        return False
+
+    async def _send(self, value):
+        '''Takes (state, brightness) tuple from outbox, makes API call to set
+        Tplink device power state and brightness. Returns True if all requests
+        succeeded, False if any failed.
+        '''
+        state, brightness = value
+
+        # Skip dimmer relay state request if device already in same state
+        acked = self.outbox.acked
+        include_state = acked is None or not self.outbox.is_acked(acked) or acked[0] != state
+
+        responses = await self._request(*self._get_payloads(state, brightness, include_state))
+        if not responses or not all(self._parse_response(r) for r in responses):
+            return self._send_failed()
+
+        self.print(f"brightness = {brightness}, state = {state}")
+        self.log.debug("Success")
+
+        # Poll more often for a few seconds to confirm new state
+        app_context.poll_scheduler_instance.boost(self)
+
+        # Tell outbox that request succeeded
+        return True
+
     def send(self, state=1):
-        '''Makes API call to turn Tplink device ON if argument is True.
-        Makes API call to turn Tplink device OFF if argument is False.
+        '''Queues API call to turn Tplink device ON if argument is True.
+        Queues API call to turn Tplink device OFF if argument is False.
         Sets Tplink device brightness to current_rule.
+
+        Returns immediately (does not block while request is sent). Returns
+        False if the previous request failed (device unreachable), otherwise
+        True.
         '''
         self.log.debug(
             "send method called, rule=%s, state=%s",
@@ -141,75 +284,60 @@ class Tplink(DimmableLight):
         if not self.enabled and state:
             return True
 
-        # Dimmer has separate brightness and on/off commands
-        if self._type == "dimmer":
-            if not self._parse_response(self._send_payload(
-                '{"system":{"set_relay_state":{"state":'
-                + str(state)
-                + '}}}'
-            )):
-                return False
-            if not self._parse_response(self._send_payload(
-                '{"smartlife.iot.dimmer":{"set_brightness":{"brightness":'
-                + str(self.current_rule)
-                + '}}}'
-            )):
-                return False
+        self.outbox.submit((bool(state), self.current_rule))
+        return not self.outbox.failed
 
-        # Bulb combines brightness and on/off into single command
-        else:
-            if not self._parse_response(self._send_payload(
-                '{"smartlife.iot.smartbulb.lightingservice":{"transition_light_state":{"ignore_default":1,"on_off":'
-                + str(state)
-                + ',"transition_period":0,"brightness":'
-                + str(self.current_rule)
-                + '}}}'
-            )):
-                return False
+    async def send_async(self, state=1, force=False):
+        '''Awaitable equivalent of send used by Group.apply_action. Returns
+        True if device acknowledged the request (or a newer request merged
+        into it), False if any request failed. Sends even if device already
+        acknowledged the same state and brightness if force is True.
+        '''
+        self.log.debug(
+            "send_async method called, rule=%s, state=%s",
+            self.current_rule, state
+        )
 
-        self.print(f"brightness = {self.current_rule}, state = {state}")
-        self.log.debug("Success")
+        # Refuse to turn disabled device on, but allow turning off
+        if not self.enabled and state:
+            return True
 
-        # Tell calling function that request succeeded
-        return True
+        return await self.outbox.send_value((bool(state), self.current_rule), force)
 
-    async def monitor(self):
-        '''Async coroutine that runs while device is enabled. Queries power
-        state and brightness from Tplink device every 5 seconds and updates
-        self.state and self.current_rule respectively (keeps in sync with
-        actual device when user uses dimmer on wall).
+    async def poll(self):
+        '''Called by PollScheduler. Queries power state and brightness from
+        Tplink device and updates self.state and self.current_rule respectively
+        (keeps in sync with actual device when user uses dimmer on wall).
+        Returns True if request succeeded, False if failed.
         '''
-        self.log.debug("Starting Tplink.monitor coro")
         try:
-            while True:
-                try:
-                    power, brightness = self._check_device_status()
-                    if brightness != self.current_rule:
-                        self.log.debug("monitor: current rule changed to %s", brightness)
-                        self.current_rule = brightness
-                    if power != self.state:
-                        self.log.debug("monitor: power state changed to %s", power)
-                        self.state = power
-                except RuntimeError:
-                    # Error during request, ignore
-                    pass
-
-                # Poll every 5 seconds
-                await asyncio.sleep(5)
-
-        # Device disabled, exit loop
-        except asyncio.CancelledError:
-            self.log.debug("Exiting Tplink.monitor coro")
+            power, brightness = await self._check_device_status()
+        except RuntimeError:
             return False
 
+        # Device reported actual state, used by outbox to skip duplicate sends
+        self.outbox.set_acked((power, brightness))
+
+        changed = False
+        if brightness != self.current_rule:
+            self.log.debug("poll: current rule changed to %s", brightness)
+            self.current_rule = brightness
+            changed = True
+        if power != self.state:
+            self.log.debug("poll: power state changed to %s", power)
+            self.state = power
+            changed = True
+
+        # Poll more often for a few seconds (user may still be adjusting)
+        if changed:
+            app_context.poll_scheduler_instance.boost(self)
+        return True
+
     def get_attributes(self):
         '''Return JSON-serializable dict containing all current attributes
         Called by API get_attributes endpoint, more verbose than status
         '''
         attributes = super().get_attributes()
-        # Replace monitor_task with True or False
-        if attributes["monitor_task"] is not None:
-            attributes["monitor_task"] = True
-        else:
-            attributes["monitor_task"] = False
+        # Replace outbox (not serializable) with request counters
+        attributes["outbox"] = self.outbox.get_stats()
         return attributes
@@ -1,6 +1,10 @@
-import requests
+import async_requests
+from outbox import Outbox
 from DimmableLight import DimmableLight
 
+# Default max requests per second (WLED controller drops requests if flooded)
+MAX_SEND_RATE = 5
+
 
 class Wled(DimmableLight):
     '''Driver for WLED instances. Makes API calls to set power state and
@@ -16,7 +20,8 @@ class Wled(DimmableLight):
       schedule:     Dict with timestamps/keywords as keys, rules as values
       min_rule:     The minimum supported integer rule, used by rule validator
       max_rule:     The maximum supported integer rule, used by rule validator
-      ip:           The IPv4 address of the TP-Link device
+      ip:           The IPv4 address of the WLED instance
+      max_send_rate: Optional max requests per second sent to WLED instance
 
     The min_rule and max_rule attributes determine the range of supported int
     rules. This can be used to remove very low duty cycles from the supported
@@ -26,27 +31,66 @@ class Wled(DimmableLight):
     Supports universal rules ("enabled" and "disabled"), brightness rules (int
     between 1-255), and fade rules (syntax: fade/target_rule/duration_seconds).
     The default_rule must be an integer or fade (not universal rule).
+
+    Requests are sent by an Outbox (see lib/outbox.py): sends are skipped if
+    WLED already acknowledged the same state and brightness, values submitted
+    while a request is in flight replace each other (only the latest is sent),
+    and no more than max_send_rate requests are sent per second.
     '''
 
-    def __init__(self, name, nickname, _type, default_rule, schedule, min_rule, max_rule, ip):
+    def __init__(self, name, nickname, _type, default_rule, schedule, min_rule, max_rule, ip, max_send_rate=MAX_SEND_RATE):
         super().__init__(name, nickname, _type, True, default_rule, schedule, min_rule, max_rule)
 
         self.ip = ip
 
+        # Coalesces rapid sends (fades, slider), limits request rate
+        self.outbox = Outbox(self._post, int(1000 / float(max_send_rate)))
+
         self.log.info("Instantiated, ip=%s", self.ip)
 
-    def get_payload(self, state=True):
-        '''Returns WLED API payload (JSON) to set power state and brightness.
-        Power state is set by state argument, brightness set to current_rule.
+    def send_failed(self, reason="wifi error"):
+        '''Called by _post when a request fails. Logs reason, sets state to
+        None (unknown, group and API see the failure and resend) until the
+        next successful send, returns False.
         '''
-        if state:
-            return {"on": True, "bri": self.current_rule}
-        return {"on": False, "bri": self.current_rule}
+        self.print(f"{self.name}: send failed ({reason})")
+        self.log.error("send failed (%s), state unknown until next send", reason)
+        self.state = None
+        return False
+
+    async def _post(self, value):
+        '''Takes (state, brightness) tuple from outbox, makes API call to set
+        WLED power state and brightness. Returns True if request succeeded,
+        False if failed.
+        '''
+        state, brightness = value
+        try:
+            response = await async_requests.post(
+                f'http://{self.ip}/json/state',
+                json={"on": state, "bri": brightness},
+                timeout=2
+            )
+        except OSError:
+            # Wifi error or timeout, send failed
+            return self.send_failed()
+
+        self.log.debug("response status: %s", response.status_code)
+
+        # Request failed if status code is not 200 (state unknown)
+        if response.status_code != 200:
+            return self.send_failed(f"status code {response.status_code}")
+
+        self.print(f"brightness = {brightness}, state = {state}")
+        return True
 
     def send(self, state=1):
-        '''Makes API call to turn WLED instance ON if argument is True.
-        Makes API call to turn WLED instance OFF if argument is False.
+        '''Queues API call to turn WLED instance ON if argument is True.
+        Queues API call to turn WLED instance OFF if argument is False.
         Sets WLED instance brightness to current_rule.
+
+        Returns immediately (does not block while request is sent). Returns
+        False if the previous request failed (device unreachable), otherwise
+        True.
         '''
         self.log.debug(
             "send method called, rule=%s, state=%s",
@@ -59,19 +103,31 @@ class Wled(DimmableLight):
         if not self.enabled and state:
             return True
 
-        try:
-            response = requests.post(
-                f'http://{self.ip}/json/state',
-                json=self.get_payload(state),
-                timeout=2
-            )
-            self.log.debug("response status: %s", response.status_code)
-            self.print(f"brightness = {self.current_rule}, state = {state}")
-        except OSError:
-            # Wifi error, send failed
-            self.print(f"{self.name}: send failed (wifi error)")
-            self.log.error("send failed (wifi error)")
-            return False
+        self.outbox.submit((bool(state), self.current_rule))
+        return not self.outbox.failed
+
+    async def send_async(self, state=1, force=False):
+        '''Awaitable equivalent of send used by Group.apply_action. Returns
+        True if WLED acknowledged the request (or a newer request merged into
+        it), False if request failed. Sends even if WLED already acknowledged
+        the same state and brightness if force is True.
+        '''
+        self.log.debug(
+            "send_async method called, rule=%s, state=%s",
+            self.current_rule, state
+        )
 
-        # Request succeeded if status code is 200
-        return bool(response.status_code == 200)
+        # Refuse to turn disabled device on, but allow turning off
+        if not self.enabled and state:
+            return True
+
+        return await self.outbox.send_value((bool(state), self.current_rule), force)
+
+    def get_attributes(self):
+        '''Return JSON-serializable dict containing all current attributes
+        Called by API get_attributes endpoint, more verbose than status
+        '''
+        attributes = super().get_attributes()
+        # Replace outbox (not serializable) with request counters
+        attributes["outbox"] = self.outbox.get_stats()
+        return attributes
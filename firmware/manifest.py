@@ -1,5 +1,6 @@
 include("$(PORT_DIR)/boards/manifest.py")
 require("unittest")
+require("bisect")
 
 # Core modules
 module("Api.py", base_path="../core")
@@ -12,6 +13,9 @@ module("util.py", base_path="../core")
 module("wifi_setup.py", base_path="../core")
 module("Instance.py", base_path="../core")
 module("app_context.py", base_path="../core")
+module("json_stream.py", base_path="../core")
+module("PollScheduler.py", base_path="../core")
+module("SensorSampler.py", base_path="../core")
 
 # Device driver modules
 module("ApiTarget.py", base_path="../devices")
@@ -42,6 +46,12 @@ module("Thermostat.py", base_path="../sensors")
 module("logging.py", base_path="../lib")
 module("testing.py", base_path="../lib")
 module("cpython_only.py", base_path="../lib")
+module("async_requests.py", base_path="../lib")
+module("clock.py", base_path="../lib")
+module("outbox.py", base_path="../lib")
+module("solar.py", base_path="../lib")
+module("sntp.py", base_path="../lib")
+module("startup_profile.py", base_path="../lib")
 
 # Hardware driver libraries
 package("ir_tx", base_path="../lib")
@@ -46,7 +46,7 @@ class Macro(models.Model):
     # JSON-encoded list, contains dicts with 2 parameters:
     # - ip: IP of the target node
     # - args: API command + arguments (if any)
-    # run_macro view iterates actions and passes each to parse_command view
+    # run_macro view passes actions to run_commands (one batch request per node)
     actions = models.JSONField(null=False, blank=False, default=default_actions)
 
     def add_action(self, action):
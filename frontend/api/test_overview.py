@@ -425,13 +425,15 @@ class MacroTests(TestCase):
         self.client.post('/add_macro_action', self.action2)
         self.assertEqual(len(Macro.objects.all()), 1)
 
-        # Mock parse_command to do nothing
-        with patch('api.views.parse_command', return_value=True) as mock_parse_command:
-            # Call view to run macro, confirm response, confirm parse_command called twice
+        # Mock run_commands to do nothing
+        with patch('api.views.run_commands', return_value=[]) as mock_run_commands:
+            # Call view to run macro, confirm response, confirm both actions
+            # passed to run_commands in a single call
             response = self.client.get('/run_macro/First Macro')
             self.assertEqual(response.status_code, 200)
             self.assertEqual(response.json()['message'], 'Done')
-            self.assertEqual(mock_parse_command.call_count, 2)
+            self.assertEqual(mock_run_commands.call_count, 1)
+            self.assertEqual(len(mock_run_commands.call_args[0][0]), 2)
 
     def test_get_macro_actions(self):
         # Create macro with 2 actions, verify exists
@@ -223,21 +223,65 @@ class ApiCardTests(TestCase):
 
     def test_get_status(self):
         # Mock request to return status object
-        with patch('api_endpoints.request', return_value=config1_status):
+        with patch('api.views.persistent_request', return_value=config1_status) as mock_request:
             response = self.client.get('/get_status/Test1')
+            mock_request.assert_called_once_with('192.168.1.123', ['status'])
             self.assertEqual(response.status_code, 200)
             self.assertEqual(response.json()['message'], config1_status)
 
+    def test_get_status_since(self):
+        # Mock subscription to return status changed since version 5
+        changes = {'devices': {}, 'sensors': {}, 'status_version': 7}
+        with patch('api.views.get_subscription') as mock_subscription, \
+             patch('api.views.persistent_request') as mock_request:
+            mock_subscription.return_value.wait_for_change.return_value = changes
+            response = self.client.get('/get_status/Test1?since=5')
+            mock_subscription.assert_called_once_with('192.168.1.123')
+            mock_subscription.return_value.wait_for_change.assert_called_once_with(5, 20)
+            mock_request.assert_not_called()
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['message'], changes)
+
+    def test_get_status_since_subscribe_failed(self):
+        # Mock subscription to fail (node offline or firmware has no subscribe)
+        changes = {'devices': {}, 'sensors': {}, 'status_version': 7}
+        with patch('api.views.get_subscription') as mock_subscription, \
+             patch('api.views.persistent_request', return_value=changes) as mock_request:
+            mock_subscription.return_value.wait_for_change.return_value = None
+            response = self.client.get('/get_status/Test1?since=5')
+            mock_request.assert_called_once_with('192.168.1.123', ['status_since', '5'])
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['message'], changes)
+
+    def test_get_status_since_unsupported(self):
+        # Mock request to simulate node with firmware that has no status_since
+        with patch('api.views.get_subscription') as mock_subscription, \
+             patch('api.views.persistent_request', side_effect=[
+                 {'ERROR': 'Invalid command'},
+                 config1_status
+             ]) as mock_request:
+            mock_subscription.return_value.wait_for_change.return_value = None
+            response = self.client.get('/get_status/Test1?since=5')
+            self.assertEqual(mock_request.call_count, 2)
+            mock_request.assert_called_with('192.168.1.123', ['status'])
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['message'], config1_status)
+
+    def test_get_status_since_invalid(self):
+        response = self.client.get('/get_status/Test1?since=latest')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['message'], 'since must be integer')
+
     def test_get_status_offline(self):
         # Mock request to simulate offline target node
-        with patch('api_endpoints.request', side_effect=OSError("Unable to connect")):
+        with patch('api.views.persistent_request', side_effect=OSError("Unable to connect")):
             response = self.client.get('/get_status/Test1')
             self.assertEqual(response.status_code, 502)
             self.assertEqual(response.json()['message'], "Unable to connect")
 
     def test_get_status_time_out(self):
         # Mock request to simulate network connection time out
-        with patch('api_endpoints.request', return_value="Error: Request timed out"):
+        with patch('api.views.persistent_request', return_value="Error: Request timed out"):
             response = self.client.get('/get_status/Test1')
             self.assertEqual(response.status_code, 502)
             self.assertEqual(response.json()['message'], "Error: Request timed out")
@@ -251,15 +295,39 @@ class ApiCardTests(TestCase):
         # Create mock app.log contents
         mock_log = '2000-01-01 00:00:00 - CRITICAL - Boot - Booted, log level: ERROR'
 
-        # Mock Webrepl.get_file_mem to return the mock log
-        with patch.object(Webrepl, 'get_file_mem', return_value=mock_log.encode()) as mock_get_file:
-            # Confirm endpoint returns mock log contents
+        # Mock Webrepl.get_file_mem to return the mock log for the active
+        # segment and 1 rotated segment (AssertionError = file not found)
+        side_effect = [AssertionError, AssertionError, AssertionError, b'old\n', mock_log.encode()]
+        with patch.object(Webrepl, 'get_file_mem', side_effect=side_effect) as mock_get_file:
+            # Confirm endpoint returns all segments oldest to newest
             response = self.client.get('/get_log/Test1')
             self.assertEqual(response.status_code, 200)
-            self.assertEqual(response.json()['message'], mock_log)
-            # Confirm correct file downloaded from node
+            self.assertEqual(response.json()['message'], 'old\n' + mock_log)
+            # Confirm correct files downloaded from node
+            self.assertEqual(mock_get_file.call_count, 5)
+            mock_get_file.assert_any_call('app.log.4')
             mock_get_file.assert_called_with('app.log')
 
+    def test_get_log_binary(self):
+        # Create mock binary log segment (MAGIC, logger name and format string
+        # definitions, CRITICAL record with 1 string arg at 2000-01-01 00:00:00)
+        mock_log = (
+            b'BLG1'
+            + b'\x00\x00\x00\x04\x00Boot'
+            + b'\x00\x01\x00\x16\x00Booted, log format: %s'
+            + b'\x32\x00\x00\x00\x00\x00\x00\x01\x00\x01\x06\x06\x00binary'
+        )
+
+        # Mock Webrepl.get_log_mem to return the mock log
+        with patch.object(Webrepl, 'get_log_mem', return_value=mock_log):
+            # Confirm endpoint returns log decoded to text format
+            response = self.client.get('/get_log/Test1')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                response.json()['message'],
+                '2000-01-01 00:00:00 - CRITICAL - Boot - Booted, log format: binary\n'
+            )
+
     def test_get_log_connection_error(self):
         # Mock Webrepl.get_file_mem to simulate connection error
         with patch.object(Webrepl, 'get_file_mem', side_effect=OSError):
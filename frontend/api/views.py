@@ -8,7 +8,8 @@ from django.shortcuts import render
 from django.http import HttpResponse
 from django.views.decorators.csrf import ensure_csrf_cookie
 from Webrepl import Webrepl
-from api_endpoints import endpoint_map
+from log_decoder import decode_log
+from api_endpoints import endpoint_map, persistent_request, get_subscription, run_commands
 from helper_functions import (
     is_device,
     get_schedule_keywords_dict,
@@ -20,6 +21,10 @@ from node_configuration.get_api_target_menu_options import get_api_target_menu_o
 from api.models import Macro
 
 
+# Max seconds get_status waits for status to change when since param passed
+LONG_POLL_TIMEOUT = 20
+
+
 def get_target_node(func):
     '''Decorator looks up target node, returns error if does not exist
     Passes node model entry to wrapped function as second arg
@@ -65,12 +70,34 @@ def get_metadata_map():
 @get_target_node
 def get_status(request, node):
     '''Requests status object from ESP32 node and returns.
-    Called by API card interface every 5 seconds to update state.
+    Called by API card interface to update state.
+    Uses persistent keep-alive connection (avoids reconnecting every poll).
+
+    If optional since querystring parameter (status_version from previous
+    response) is passed waits up to LONG_POLL_TIMEOUT seconds for status to
+    change, returns status as soon as the node pushes a change (one subscribe
+    connection per node shared by all browsers). Falls back to status_since
+    request (only instances that changed since version) if unable to subscribe.
     '''
 
-    # Query status object
+    # Query status object (or changes since version if since param passed)
+    since = request.GET.get('since')
+    if since is not None:
+        try:
+            status = get_subscription(node.ip).wait_for_change(int(since), LONG_POLL_TIMEOUT)
+        except ValueError:
+            return error_response(message='since must be integer', status=400)
+        if status is not None:
+            return standard_response(message=status)
+
     try:
-        status = parse_command(node.ip, ["status"])
+        if since is not None:
+            status = persistent_request(node.ip, ["status_since", since])
+            # Fall back to full status if node firmware has no status_since
+            if isinstance(status, dict) and "ERROR" in status:
+                status = persistent_request(node.ip, ["status"])
+        else:
+            status = persistent_request(node.ip, ["status"])
     except OSError:
         return error_response(message='Unable to connect', status=502)
 
@@ -83,13 +110,15 @@ def get_status(request, node):
 
 @get_target_node
 def get_log(request, node):
-    '''Downloads requested node log file with webrepl and returns to client.'''
+    '''Downloads requested node log files with webrepl and returns to client
+    (binary log segments are decoded to text format).
+    '''
 
     try:
         webrepl = Webrepl(node.ip)
-        log_file = webrepl.get_file_mem('app.log')
+        log_file = webrepl.get_log_mem()
         webrepl.close_connection()
-        return standard_response(message=log_file.decode())
+        return standard_response(message=decode_log(log_file))
     except OSError:
         return error_response(message="Failed to download log", status=502)
 
@@ -357,7 +386,9 @@ def parse_command_wrapper(node, args):
 
 
 def run_macro(request, name):
-    '''Takes name of Macro model entry, runs all actions in parallel.'''
+    '''Takes name of Macro model entry, runs all actions. Actions targeting
+    the same node are sent in a single batch request, nodes run in parallel.
+    '''
     try:
         macro = Macro.objects.get(name=name)
     except Macro.DoesNotExist:
@@ -367,9 +398,8 @@ def run_macro(request, name):
     # example: ('192.168.1.246', ['disable', 'device2'])
     actions = [(action['ip'], action['args']) for action in json.loads(macro.actions)]
 
-    # Run all actions in parallel
-    with ThreadPoolExecutor(max_workers=20) as executor:
-        executor.map(parse_command, *zip(*actions))
+    # Run all actions (one request per node)
+    run_commands(actions)
 
     return standard_response(message='Done')
 
@@ -488,6 +488,9 @@ class GetModulesTests(TestCase):
             os.path.join(settings.REPO_DIR, 'core', 'Group.py'): 'Group.py',
             os.path.join(settings.REPO_DIR, 'core', 'SoftwareTimer.py'): 'SoftwareTimer.py',
             os.path.join(settings.REPO_DIR, 'core', 'app_context.py'): 'app_context.py',
+            os.path.join(settings.REPO_DIR, 'core', 'json_stream.py'): 'json_stream.py',
+            os.path.join(settings.REPO_DIR, 'core', 'PollScheduler.py'): 'PollScheduler.py',
+            os.path.join(settings.REPO_DIR, 'core', 'SensorSampler.py'): 'SensorSampler.py',
             os.path.join(settings.REPO_DIR, 'core', 'Api.py'): 'Api.py',
             os.path.join(settings.REPO_DIR, 'core', 'util.py'): 'util.py',
             os.path.join(settings.REPO_DIR, 'core', 'main.py'): 'main.py'
@@ -502,6 +505,9 @@ class GetModulesTests(TestCase):
             os.path.join(settings.REPO_DIR, 'core', 'Group.py'): 'Group.py',
             os.path.join(settings.REPO_DIR, 'core', 'SoftwareTimer.py'): 'SoftwareTimer.py',
             os.path.join(settings.REPO_DIR, 'core', 'app_context.py'): 'app_context.py',
+            os.path.join(settings.REPO_DIR, 'core', 'json_stream.py'): 'json_stream.py',
+            os.path.join(settings.REPO_DIR, 'core', 'PollScheduler.py'): 'PollScheduler.py',
+            os.path.join(settings.REPO_DIR, 'core', 'SensorSampler.py'): 'SensorSampler.py',
             os.path.join(settings.REPO_DIR, 'core', 'Api.py'): 'Api.py',
             os.path.join(settings.REPO_DIR, 'core', 'util.py'): 'util.py',
             os.path.join(settings.REPO_DIR, 'core', 'main.py'): 'main.py'
@@ -538,6 +544,9 @@ class GetModulesTests(TestCase):
             os.path.join(settings.REPO_DIR, 'core', 'Group.py'): 'Group.py',
             os.path.join(settings.REPO_DIR, 'core', 'SoftwareTimer.py'): 'SoftwareTimer.py',
             os.path.join(settings.REPO_DIR, 'core', 'app_context.py'): 'app_context.py',
+            os.path.join(settings.REPO_DIR, 'core', 'json_stream.py'): 'json_stream.py',
+            os.path.join(settings.REPO_DIR, 'core', 'PollScheduler.py'): 'PollScheduler.py',
+            os.path.join(settings.REPO_DIR, 'core', 'SensorSampler.py'): 'SensorSampler.py',
             os.path.join(settings.REPO_DIR, 'core', 'Api.py'): 'Api.py',
             os.path.join(settings.REPO_DIR, 'core', 'util.py'): 'util.py',
             os.path.join(settings.REPO_DIR, 'core', 'main.py'): 'main.py'
@@ -572,6 +581,9 @@ class GetModulesTests(TestCase):
             os.path.join(settings.REPO_DIR, 'core', 'Group.py'): 'Group.py',
             os.path.join(settings.REPO_DIR, 'core', 'SoftwareTimer.py'): 'SoftwareTimer.py',
             os.path.join(settings.REPO_DIR, 'core', 'app_context.py'): 'app_context.py',
+            os.path.join(settings.REPO_DIR, 'core', 'json_stream.py'): 'json_stream.py',
+            os.path.join(settings.REPO_DIR, 'core', 'PollScheduler.py'): 'PollScheduler.py',
+            os.path.join(settings.REPO_DIR, 'core', 'SensorSampler.py'): 'SensorSampler.py',
             os.path.join(settings.REPO_DIR, 'core', 'Api.py'): 'Api.py',
             os.path.join(settings.REPO_DIR, 'core', 'util.py'): 'util.py',
             os.path.join(settings.REPO_DIR, 'core', 'main.py'): 'main.py'
@@ -605,6 +617,9 @@ class GetModulesTests(TestCase):
             os.path.join(settings.REPO_DIR, 'core', 'Group.py'): 'Group.py',
             os.path.join(settings.REPO_DIR, 'core', 'SoftwareTimer.py'): 'SoftwareTimer.py',
             os.path.join(settings.REPO_DIR, 'core', 'app_context.py'): 'app_context.py',
+            os.path.join(settings.REPO_DIR, 'core', 'json_stream.py'): 'json_stream.py',
+            os.path.join(settings.REPO_DIR, 'core', 'PollScheduler.py'): 'PollScheduler.py',
+            os.path.join(settings.REPO_DIR, 'core', 'SensorSampler.py'): 'SensorSampler.py',
             os.path.join(settings.REPO_DIR, 'core', 'Api.py'): 'Api.py',
             os.path.join(settings.REPO_DIR, 'core', 'util.py'): 'util.py',
             os.path.join(settings.REPO_DIR, 'core', 'main.py'): 'main.py'
@@ -251,6 +251,26 @@ class WebreplTests(TestCase):
                 node.get_file_mem("/path/to/remote")
             self.assertEqual(mock_read.call_count, 4)
 
+    def test_get_log_mem(self):
+        node = Webrepl('123.45.67.89', 'password')
+
+        # Mock get_file_mem to raise AssertionError (file not found) for 2
+        # oldest rotated segments, return contents for remaining segments
+        side_effect = [AssertionError, AssertionError, b'seg2\n', b'seg1\n', b'active\n']
+        with patch.object(node, 'get_file_mem', side_effect=side_effect) as mock_get_file:
+            # Confirm returns existing segments concatenated oldest to newest
+            result = node.get_log_mem()
+            self.assertEqual(result, b'seg2\nseg1\nactive\n')
+            self.assertEqual(
+                [call.args[0] for call in mock_get_file.call_args_list],
+                ['app.log.4', 'app.log.3', 'app.log.2', 'app.log.1', 'app.log']
+            )
+
+        # Confirm OSError raised if active segment can not be downloaded
+        with patch.object(node, 'get_file_mem', side_effect=[b'', b'', b'', b'', OSError]):
+            with self.assertRaises(OSError):
+                node.get_log_mem()
+
     def test_put_file(self):
         node = Webrepl('123.45.67.89', 'password')
 
@@ -1,9 +1,17 @@
-import { useState, useContext, useEffect } from 'react';
+import { useState, useContext, useEffect, useRef } from 'react';
 import { ApiCardContext } from 'root/ApiCardContext';
 import { showErrorModal, hideErrorModal } from 'modals/ErrorModal';
 
 export const UpdateStatus = () => {
-    const {setStatus, overview} = useContext(ApiCardContext);
+    const {status, setStatus, overview} = useContext(ApiCardContext);
+
+    // Version of last received status, node only sends instances that changed
+    // since this version (full status if undefined)
+    const statusVersion = useRef(status.status_version);
+
+    // Random ID generated when node booted (versions restart at 0 on reboot,
+    // versions from different boots cannot be compared)
+    const bootId = useRef(status.boot_id);
 
     // Get node name from URL (status.metadata.id may contain a different name
     // than django database if new config was uploaded without updating django)
@@ -20,34 +28,84 @@ export const UpdateStatus = () => {
         });
     };
 
-    // Get current status object, overwrite state, update cards
-    // Called every 5 seconds by effect below
+    // Takes status_since response, merges changed sections into status state
+    // Replaces status if response has lower version (node rebooted)
+    // Returns true if node rebooted since last update (boot_id changed), the
+    // update is discarded and the next request gets full status
+    const apply_status_update = (update) => {
+        if (statusVersion.current === undefined ||
+            update.status_version < statusVersion.current
+        ) {
+            setStatus(update);
+        } else if (update.boot_id !== bootId.current) {
+            // Changes since version from previous boot are incomplete
+            statusVersion.current = undefined;
+            return true;
+        } else if (!update.unchanged) {
+            setStatus(prevStatus => ({
+                ...prevStatus,
+                ...update,
+                devices: { ...prevStatus.devices, ...update.devices },
+                sensors: { ...prevStatus.sensors, ...update.sensors }
+            }));
+        }
+        statusVersion.current = update.status_version;
+        bootId.current = update.boot_id;
+        return false;
+    };
+
+    // Get status changes since last update, update state and cards
+    // Backend holds request until status changes (or timeout) if version known
+    // Returns true if status changed since known version or node rebooted,
+    // false if unchanged, request failed, or node does not report versions
+    // (old firmware)
     const get_new_status = async () => {
         try {
-            const response = await fetch(`/get_status/${nodeName}`);
+            const url = statusVersion.current === undefined
+                ? `/get_status/${nodeName}`
+                : `/get_status/${nodeName}?since=${statusVersion.current}`;
+            const response = await fetch(url);
             if (response.status !== 200) {
                 const error = await response.json();
                 throw new Error(`${error.message} (status ${response.status})`);
             }
             const data = await response.json();
-            setStatus(data.message);
+            const rebooted = apply_status_update(data.message);
             console.log("update", data.message);
             if (targetOffline) {
                 hideErrorModal();
                 targetOffline = false;
             }
+            return rebooted || (statusVersion.current !== undefined && !data.message.unchanged);
         } catch (error) {
+            // Request full status next (node may reboot while unreachable)
+            statusVersion.current = undefined;
             if (!targetOffline) {
                 show_connection_error();
                 targetOffline = true;
             }
             console.error('Failed to update status:', error);
+            return false;
         }
     };
 
-    // Update state every 5 seconds
+    // Request next update immediately if status changed (backend waits for
+    // next change), otherwise request 5 seconds after previous request started
     useEffect(() => {
-        const timer = setInterval(get_new_status, 5000);
-        return () => clearInterval(timer);
+        let timer;
+        let stopped = false;
+        const poll = async () => {
+            const started = Date.now();
+            const changed = await get_new_status();
+            if (!stopped) {
+                const delay = changed ? 0 : Math.max(0, 5000 - (Date.now() - started));
+                timer = setTimeout(poll, delay);
+            }
+        };
+        timer = setTimeout(poll, 5000);
+        return () => {
+            stopped = true;
+            clearTimeout(timer);
+        };
     }, []);
 };
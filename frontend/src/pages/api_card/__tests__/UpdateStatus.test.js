@@ -134,3 +134,163 @@ describe('UpdateStatus', () => {
         });
     });
 });
+
+describe('UpdateStatus with status versions', () => {
+    let app;
+
+    // Status from node firmware that reports versions (status_since support)
+    const versionedStatus = { ...mockContext.status, status_version: 5, boot_id: 1234 };
+
+    // Takes status message, returns mock fetch response
+    const mockResponse = (message) => Promise.resolve({
+        ok: true,
+        status: 200,
+        json: () => Promise.resolve({
+            status: 'success',
+            message: message
+        })
+    });
+
+    const unchanged = { unchanged: true, status_version: 5, boot_id: 1234 };
+
+    beforeAll(() => {
+        // Replace status context created by previous describe block
+        document.getElementById('status').remove();
+        createMockContext('status', versionedStatus);
+    });
+
+    beforeEach(() => {
+        jest.useFakeTimers();
+        app = render(
+            <MetadataContextProvider>
+                <ApiCardContextProvider>
+                    <App />
+                </ApiCardContextProvider>
+            </MetadataContextProvider>
+        );
+    });
+
+    afterEach(() => {
+        jest.useRealTimers();
+    });
+
+    it('merges changed instances into status', async () => {
+        // Simulate node reply with changed device, then no changes
+        global.fetch = jest.fn()
+            .mockReturnValueOnce(mockResponse({
+                devices: { device1: { ...mockContext.status.devices.device1, nickname: 'Space Heater' } },
+                sensors: {},
+                status_version: 6,
+                boot_id: 1234
+            }))
+            .mockReturnValue(mockResponse({ ...unchanged, status_version: 6 }));
+
+        // Fast forward 5 seconds, confirm requested changes since version
+        await act(() => jest.advanceTimersByTimeAsync(5001));
+        expect(global.fetch).toHaveBeenNthCalledWith(1, '/get_status/Test Node?since=5');
+
+        // Confirm changed device updated, other instances unchanged
+        expect(app.queryByText('Space Heater')).not.toBeNull();
+        expect(app.queryByText('Accent lights')).not.toBeNull();
+        expect(app.queryByText('Door switch')).not.toBeNull();
+
+        // Confirm next update requested immediately with new version
+        expect(global.fetch).toHaveBeenNthCalledWith(2, '/get_status/Test Node?since=6');
+        expect(global.fetch).toHaveBeenCalledTimes(2);
+    });
+
+    it('waits 5 seconds after unchanged reply', async () => {
+        global.fetch = jest.fn(() => mockResponse(unchanged));
+
+        // Fast forward 5 seconds, confirm requested changes since version
+        await act(() => jest.advanceTimersByTimeAsync(5001));
+        expect(global.fetch).toHaveBeenCalledTimes(1);
+        expect(global.fetch).toHaveBeenCalledWith('/get_status/Test Node?since=5');
+
+        // Confirm status not changed, next request sent 5 seconds later
+        expect(app.queryByText('Heater')).not.toBeNull();
+        await act(() => jest.advanceTimersByTimeAsync(4990));
+        expect(global.fetch).toHaveBeenCalledTimes(1);
+        await act(() => jest.advanceTimersByTimeAsync(10));
+        expect(global.fetch).toHaveBeenCalledTimes(2);
+        expect(global.fetch).toHaveBeenLastCalledWith('/get_status/Test Node?since=5');
+    });
+
+    it('retries long-poll immediately if reply took longer than 5 seconds', async () => {
+        // Simulate backend holding request 6 seconds before unchanged reply
+        global.fetch = jest.fn(() => new Promise(resolve => {
+            setTimeout(() => resolve(mockResponse(unchanged)), 6000);
+        }));
+
+        // Fast forward until first reply received, confirm next request sent
+        // immediately (more than 5 seconds since previous request started)
+        await act(() => jest.advanceTimersByTimeAsync(5001));
+        expect(global.fetch).toHaveBeenCalledTimes(1);
+        await act(() => jest.advanceTimersByTimeAsync(6000));
+        expect(global.fetch).toHaveBeenCalledTimes(2);
+        expect(global.fetch.mock.calls).toEqual([
+            ['/get_status/Test Node?since=5'],
+            ['/get_status/Test Node?since=5']
+        ]);
+    });
+
+    it('requests full status after failed request', async () => {
+        // Simulate failed request, then node back online
+        global.fetch = jest.fn()
+            .mockReturnValueOnce(Promise.resolve({
+                ok: false,
+                status: 502,
+                json: () => Promise.resolve({
+                    status: 'error',
+                    message: 'Unable to connect'
+                })
+            }))
+            .mockReturnValueOnce(mockResponse({ ...versionedStatus, status_version: 9 }))
+            .mockReturnValue(mockResponse({ ...unchanged, status_version: 9 }));
+
+        // Fast forward 5 seconds, confirm error modal shown
+        await act(() => jest.advanceTimersByTimeAsync(5001));
+        expect(global.fetch).toHaveBeenCalledWith('/get_status/Test Node?since=5');
+        await waitFor(() => {
+            expect(app.queryByText('Attempting to reestablish connection...')).not.toBeNull();
+        });
+
+        // Fast forward 5 seconds, confirm full status requested, modal closed,
+        // next request uses version from full status
+        await act(() => jest.advanceTimersByTimeAsync(5000));
+        expect(global.fetch.mock.calls).toEqual([
+            ['/get_status/Test Node?since=5'],
+            ['/get_status/Test Node'],
+            ['/get_status/Test Node?since=9']
+        ]);
+        await waitFor(() => {
+            expect(app.queryByText('Attempting to reestablish connection...')).toBeNull();
+        });
+    });
+
+    it('requests full status if node rebooted', async () => {
+        // Simulate changes from node that rebooted (boot_id changed), followed
+        // by full status from new boot
+        const rebootedStatus = { ...mockContext.status, status_version: 2, boot_id: 999 };
+        global.fetch = jest.fn()
+            .mockReturnValueOnce(mockResponse({
+                devices: { device1: { ...mockContext.status.devices.device1, nickname: 'Space Heater' } },
+                sensors: {},
+                status_version: 7,
+                boot_id: 999
+            }))
+            .mockReturnValueOnce(mockResponse(rebootedStatus))
+            .mockReturnValue(mockResponse({ unchanged: true, status_version: 2, boot_id: 999 }));
+
+        // Fast forward 5 seconds, confirm requested changes since version
+        await act(() => jest.advanceTimersByTimeAsync(5001));
+        expect(global.fetch).toHaveBeenNthCalledWith(1, '/get_status/Test Node?since=5');
+
+        // Confirm changes were discarded, full status requested immediately,
+        // next request uses version from new boot
+        expect(global.fetch).toHaveBeenNthCalledWith(2, '/get_status/Test Node');
+        expect(global.fetch).toHaveBeenNthCalledWith(3, '/get_status/Test Node?since=2');
+        expect(app.queryByText('Space Heater')).toBeNull();
+        expect(app.queryByText('Heater')).not.toBeNull();
+    });
+});
@@ -0,0 +1,111 @@
+'''Minimal asyncio HTTP client with the same call signatures as the subset of
+requests used by device drivers (get and post with json payload). Requests do
+not block the event loop, allowing drivers to send to multiple devices at the
+same time (see Group.apply_action).
+
+Only supports plain HTTP. Sends HTTP/1.0 requests so the server closes the
+connection after the response. All errors (including timeouts) are raised as
+OSError, matching requests behavior on micropython.
+'''
+
+import asyncio
+from json import dumps, loads
+
+
+class Response():
+    '''Contains status code and raw body of an HTTP response.'''
+
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+    @property
+    def text(self):
+        '''Response body decoded to string.'''
+        return self.content.decode()
+
+    def json(self):
+        '''Returns response body parsed as JSON (raises ValueError if invalid).'''
+        return loads(self.content)
+
+
+def _parse_url(url):
+    '''Takes URL (http://host:port/path), returns host, port, and path.'''
+    if url.startswith('http://'):
+        url = url[7:]
+    if '/' in url:
+        host, path = url.split('/', 1)
+    else:
+        host, path = url, ''
+    if ':' in host:
+        host, port = host.split(':', 1)
+        port = int(port)
+    else:
+        port = 80
+    return host, port, '/' + path
+
+
+async def _request(method, url, body):
+    '''Sends request to url, returns Response. Called by request.'''
+    host, port, path = _parse_url(url)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        headers = f'{method} {path} HTTP/1.0\r\nHost: {host}\r\n'
+        if body is not None:
+            headers += f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n'
+        writer.write((headers + '\r\n').encode())
+        if body is not None:
+            writer.write(body)
+        await writer.drain()
+
+        # Read status code from status line (HTTP/1.0 200 OK)
+        status = await reader.readline()
+        try:
+            status_code = int(status.split(None, 2)[1])
+        except (IndexError, ValueError):
+            raise OSError('Invalid response')  # pylint: disable=W0707
+
+        # Read headers until blank line, get body length if present
+        length = None
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            if line.lower().startswith(b'content-length:'):
+                length = int(line.split(b':', 1)[1])
+
+        if length is None:
+            content = await reader.read(-1)
+        else:
+            content = await reader.readexactly(length)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+    return Response(status_code, content)
+
+
+async def request(method, url, json=None, timeout=2):
+    '''Takes HTTP method, URL, optional JSON payload, and timeout (seconds,
+    applies to entire request). Returns Response, raises OSError if request
+    fails or does not complete before timeout.
+    '''
+    body = None if json is None else dumps(json).encode()
+    try:
+        return await asyncio.wait_for(_request(method, url, body), timeout)
+    except asyncio.TimeoutError:
+        raise OSError('Request timed out')  # pylint: disable=W0707
+    except (EOFError, ValueError):
+        raise OSError('Invalid response')  # pylint: disable=W0707
+
+
+async def get(url, timeout=2):
+    '''Makes async GET request to url, returns Response.'''
+    return await request('GET', url, timeout=timeout)
+
+
+async def post(url, json=None, timeout=2):
+    '''Makes async POST request to url with optional JSON payload, returns
+    Response.
+    '''
+    return await request('POST', url, json=json, timeout=timeout)
@@ -0,0 +1,55 @@
+'''Millisecond clock helpers shared by modules that measure intervals (outbox
+rate limit, poll and sensor sample deadlines, reading age) or read the RTC
+(epoch_ms, used by TimeSync).
+
+Intervals use time.ticks_ms (monotonic) instead of the RTC. The RTC jumps
+when TimeSync sets the clock or the UTC offset changes for DST, which stalled
+or skipped anything scheduled against epoch time until the clock caught up.
+
+Ticks wrap around, so timestamps must only be compared with diff, elapsed,
+and remaining (never with < or >). Results are only valid for intervals shorter
+than half the ticks period (about 6 days on esp32).
+'''
+
+import time
+
+
+def now():
+    '''Returns current monotonic time in milliseconds (time.ticks_ms).'''
+    return time.ticks_ms()
+
+
+def add(ticks, ms):
+    '''Takes monotonic timestamp and milliseconds, returns timestamp ms later.'''
+    return time.ticks_add(ticks, ms)
+
+
+def diff(end, start):
+    '''Takes 2 monotonic timestamps, returns milliseconds from start to end
+    (negative if end is before start).
+    '''
+    return time.ticks_diff(end, start)
+
+
+def deadline(ms):
+    '''Takes milliseconds, returns monotonic timestamp ms in the future.'''
+    return time.ticks_add(now(), ms)
+
+
+def elapsed(start):
+    '''Takes monotonic timestamp, returns milliseconds since timestamp.'''
+    return time.ticks_diff(now(), start)
+
+
+def remaining(end):
+    '''Takes monotonic timestamp, returns milliseconds until timestamp
+    (negative if timestamp has passed).
+    '''
+    return time.ticks_diff(end, now())
+
+
+def epoch_ms():
+    '''Returns current RTC time (epoch) in milliseconds. Only used where wall
+    time is needed (NTP timestamps, RTC drift), never for intervals.
+    '''
+    return time.time_ns() // 1000000
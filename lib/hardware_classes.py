@@ -0,0 +1 @@
+hardware_classes = {"devices": {"dimmer": "Tplink", "api-target": "ApiTarget", "tasmota-relay": "TasmotaRelay", "pwm": "LedStrip", "bulb": "Tplink", "wled": "Wled", "desktop": "DesktopTarget", "relay": "Relay", "http-get": "HttpGet"}, "sensors": {"desktop": "DesktopTrigger", "si7021": "Si7021", "pir": "MotionSensor", "switch": "Switch", "load-cell": "LoadCell", "ld2410": "MotionSensor", "dummy": "Dummy", "dht22": "Dht22"}}
\ No newline at end of file
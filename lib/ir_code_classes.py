@@ -0,0 +1 @@
+ir_code_classes = {"whynter_ac": "whynter_ac_ir_codes", "treadmill": "treadmill_ir_codes", "samsung_tv": "samsung_tv_ir_codes"}
\ No newline at end of file
@@ -3,9 +3,14 @@
 # Changes:
 #   - FileHandler.formatTime() prepends leading 0s to single-digit month/day/hour/min/sec
 #   - Use time instead of utime
+#   - Add RingBufferHandler (buffered writes, rotating segment files, flood suppression)
+#   - basicConfig() accepts handlers list, add shutdown()
+#   - Add BinaryRingBufferHandler (packed records decoded on host by util/log_decoder.py)
 
+import os
 import time
 import sys
+import struct
 import uio
 
 CRITICAL = 50
@@ -26,6 +31,21 @@ _level_dict = {
 
 _nameToLevel = {v: k for k, v in _level_dict.items()}
 
+# First bytes of each BinaryRingBufferHandler segment file
+MAGIC = b"BLG1"
+
+# Seconds between epoch used by time module and 2000-01-01 (binary timestamps)
+EPOCH = 946684800 if time.gmtime(0)[0] == 1970 else 0
+
+# Binary record arg types (LONG and FLOAT are stored as decimal strings)
+ARG_NONE  = 0
+ARG_TRUE  = 1
+ARG_FALSE = 2
+ARG_INT   = 3
+ARG_LONG  = 4
+ARG_FLOAT = 5
+ARG_STR   = 6
+
 
 def addLevelName(level, name):
     _level_dict[level] = name
@@ -132,15 +152,19 @@ def critical(msg, *args):
 def exception(msg, *args):
     getLogger(None).exception(msg, *args)
 
-def basicConfig(level=INFO, filename=None, stream=None, format=None, style="%"):
+def basicConfig(level=INFO, filename=None, stream=None, format=None, style="%", handlers=None):
     root.setLevel(level)
-    if filename:
-        h = FileHandler(filename)
-    else:
-        h = StreamHandler(stream)
-    h.setFormatter(Formatter(format or "%(levelname)s:%(name)s:%(message)s", style=style))
+    if not handlers:
+        handlers = [FileHandler(filename) if filename else StreamHandler(stream)]
     root.handlers.clear()
-    root.addHandler(h)
+    for h in handlers:
+        h.setFormatter(Formatter(format or "%(levelname)s:%(name)s:%(message)s", style=style))
+        root.addHandler(h)
+
+def shutdown():
+    # Write buffered lines to disk (call before reboot)
+    for h in root.handlers:
+        h.flush()
 
 
 class Handler:
@@ -153,6 +177,15 @@ class Handler:
     def format(self, record):
         return self.formatter.format(record)
 
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def start_rate_limit(self):
+        pass
+
 
 class StreamHandler(Handler):
     def __init__(self, stream=None):
@@ -191,6 +224,310 @@ class FileHandler(StreamHandler):
             self._stream.close()
 
 
+class RingBufferHandler(Handler):
+    """Buffers formatted lines in RAM and writes them to flash in batches.
+
+    Lines are written when the buffer reaches flush_size bytes, when a
+    CRITICAL record is logged, or when flush() is called (periodic timer).
+    If a write fails the oldest buffered lines are discarded once the buffer
+    exceeds max_buffer bytes (RAM ring buffer).
+
+    The log is stored in fixed-size segment files: filename is the current
+    segment, filename.1 the previous segment etc. When the current segment
+    is full the oldest segment is deleted and the others are renamed, so the
+    last (segments * segment_size) bytes are always kept on disk.
+
+    Consecutive identical records are written once followed by a repeat
+    count, and at most rate_limit records per second are kept (CRITICAL is
+    never dropped), which prevents log floods from wearing out flash. The
+    rate limit is not applied until start_rate_limit() is called once boot
+    is finished (Config setup logs hundreds of lines at DEBUG level).
+    """
+
+    # Segment file contents (BinaryRingBufferHandler writes bytes)
+    binary = False
+    mode = "a"
+
+    def __init__(self, filename, segment_size=20000, segments=5,
+                 flush_size=1024, max_buffer=4096, rate_limit=20):
+        super().__init__()
+        self.filename = filename
+        self.segment_size = segment_size
+        self.segments = segments
+        self.flush_size = flush_size
+        self.max_buffer = max_buffer
+        self.rate_limit = rate_limit
+        self.terminator = "\n"
+
+        # Formatted lines waiting to be written, total bytes of buffered lines
+        self._buffer = []
+        self._buffered = 0
+
+        # Bytes in current segment file (avoids stat on every write)
+        try:
+            self._size = os.stat(filename)[6]
+        except OSError:
+            self._size = 0
+
+        # Start new segment if current segment was written in other format
+        if self._size and self._is_binary() != self.binary:
+            self._rotate()
+
+        # Last record (name, level, msg, args), number of suppressed repeats
+        self._last = None
+        self._last_record = None
+        self._repeats = 0
+
+        # Rate limit enabled (after boot), second of current rate limit
+        # window, records kept in window, records dropped since last summary
+        self._limited = False
+        self._window = 0
+        self._count = 0
+        self._dropped = 0
+
+    def emit(self, record):
+        key = (record.name, record.levelno, record.msg, record.args)
+        if key == self._last:
+            self._repeats += 1
+            return
+        self._write_repeats()
+        self._last = key
+        self._last_record = record
+
+        if self._limited and record.levelno < CRITICAL:
+            now = int(time.time())
+            if now != self._window:
+                self._window = now
+                self._count = 0
+            self._count += 1
+            if self._count > self.rate_limit:
+                self._dropped += 1
+                return
+        if self._dropped:
+            self._append(LogRecord(
+                "logging", WARNING, None, None,
+                "Rate limit exceeded, dropped %d messages", (self._dropped,), None
+            ))
+            self._dropped = 0
+
+        self._append(record)
+        if record.levelno >= CRITICAL or self._buffered >= self.flush_size:
+            self.flush()
+
+    def _append(self, record):
+        line = self.format(record) + self.terminator
+        self._buffer.append(line)
+        self._buffered += len(line)
+
+    def _write_repeats(self):
+        # Add line with number of suppressed repeats (same name and level)
+        if self._repeats:
+            self._append(LogRecord(
+                self._last_record.name, self._last_record.levelno, None, None,
+                "Last message repeated %d times", (self._repeats,), None
+            ))
+            self._repeats = 0
+
+    def _is_binary(self):
+        with open(self.filename, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+
+    def _rotate(self):
+        # Delete oldest segment, shift others (filename -> filename.1 etc)
+        try:
+            os.remove("%s.%d" % (self.filename, self.segments - 1))
+        except OSError:
+            pass
+        for i in range(self.segments - 1, 0, -1):
+            src = self.filename if i == 1 else "%s.%d" % (self.filename, i - 1)
+            try:
+                os.rename(src, "%s.%d" % (self.filename, i))
+            except OSError:
+                pass
+        self._size = 0
+
+    def flush(self):
+        self._write_repeats()
+        try:
+            while self._buffer:
+                data, count = self._take(self.segment_size - self._size)
+                if count:
+                    with open(self.filename, self.mode) as f:
+                        f.write(data)
+                    self._wrote(data, count)
+                # Start new segment if lines left over
+                if self._buffer:
+                    self._rotate()
+        except OSError:
+            # Keep newest lines in RAM if write failed (eg filesystem full)
+            while self._buffered > self.max_buffer and self._buffer:
+                self._buffered -= len(self._buffer.pop(0))
+
+    def _take(self, space):
+        # Returns buffered lines that fit in space bytes (empty segment always
+        # receives at least 1 line) joined, and number of lines
+        count = 0
+        size = 0
+        for line in self._buffer:
+            if size + len(line) > space and (count or self._size):
+                break
+            count += 1
+            size += len(line)
+        return "".join(self._buffer[:count]), count
+
+    def _wrote(self, data, count):
+        # Remove written lines from buffer
+        for line in self._buffer[:count]:
+            self._buffered -= len(line)
+        del self._buffer[:count]
+        self._size += len(data)
+
+    def close(self):
+        self.flush()
+
+    def start_rate_limit(self):
+        self._limited = True
+
+    def clear(self):
+        # Discard buffered lines, delete all segments, create empty current
+        # segment (raises OSError if current segment does not exist)
+        self._buffer = []
+        self._buffered = 0
+        self._repeats = 0
+        self._last = None
+        for i in range(1, self.segments):
+            try:
+                os.remove("%s.%d" % (self.filename, i))
+            except OSError:
+                pass
+        os.remove(self.filename)
+        open(self.filename, "w").close()
+        self._size = 0
+
+
+def _pack_arg(arg):
+    # Returns type byte followed by value (see ARG_* constants)
+    if arg is None:
+        return bytes((ARG_NONE,))
+    if arg is True:
+        return bytes((ARG_TRUE,))
+    if arg is False:
+        return bytes((ARG_FALSE,))
+    if isinstance(arg, int):
+        if -0x80000000 <= arg <= 0x7FFFFFFF:
+            return struct.pack("<Bi", ARG_INT, arg)
+        kind = ARG_LONG
+    elif isinstance(arg, float):
+        kind = ARG_FLOAT
+    else:
+        kind = ARG_STR
+    data = str(arg).encode()[:0xFFFF]
+    return struct.pack("<BH", kind, len(data)) + data
+
+
+class BinaryRingBufferHandler(RingBufferHandler):
+    """RingBufferHandler that writes packed binary records instead of
+    formatted lines. Message and timestamp are not formatted on the node and
+    records are several times smaller, the log is decoded back to the text
+    format on the host (util/log_decoder.py).
+
+    Each segment file starts with MAGIC. Logger names and format strings are
+    assigned ids, each string is written once per segment (definition record)
+    before the first record that uses it:
+
+      definition: 0, id (uint16), length (uint16), utf-8 string
+      record:     level (uint8), seconds since 2000-01-01 (uint32), logger
+                  name id (uint16), format string id (uint16), number of args
+                  (uint8), args (type byte followed by value, see ARG_*)
+
+    At most max_strings format strings get an id, and only format strings up
+    to max_string_length characters (keeps dynamic messages such as
+    tracebacks from Logger.exc out of RAM). Other messages are formatted on
+    the node and written as the only arg of format string "%s".
+    """
+
+    binary = True
+    mode = "ab"
+
+    def __init__(self, filename, max_strings=256, max_string_length=120, **kwargs):
+        self.max_strings = max_strings
+        self.max_string_length = max_string_length
+
+        # String to id dict, list of strings (index is id)
+        self._ids = {}
+        self._strings = []
+
+        # Ids defined in current segment, ids defined after pending write
+        self._defined = set()
+        self._pending = None
+        super().__init__(filename, **kwargs)
+
+    def _id(self, string, limit=True):
+        # Returns id of string, assigns new id if not seen before (None if
+        # limit reached)
+        i = self._ids.get(string)
+        if i is None and (not limit or len(self._strings) < self.max_strings):
+            i = len(self._strings)
+            self._ids[string] = i
+            self._strings.append(string)
+        return i
+
+    def _append(self, record):
+        msg = record.msg
+        args = record.args
+        msg_id = None
+        if isinstance(msg, str) and len(msg) <= self.max_string_length and len(args) < 256:
+            msg_id = self._id(msg)
+        if msg_id is None:
+            msg_id = self._id("%s", False)
+            args = (msg % args,)
+
+        data = bytearray(struct.pack(
+            "<BIHHB",
+            record.levelno,
+            int(record.created) - EPOCH,
+            self._id(record.name, False),
+            msg_id,
+            len(args)
+        ))
+        for arg in args:
+            data += _pack_arg(arg)
+        self._buffer.append(data)
+        self._buffered += len(data)
+
+    def _take(self, space):
+        # Returns records that fit in space bytes preceded by MAGIC (new
+        # segment) and definitions of strings not used in segment yet, and
+        # number of records (empty segment always receives at least 1 record)
+        data = bytearray()
+        if self._size:
+            defined = set(self._defined)
+        else:
+            data += MAGIC
+            defined = set()
+
+        count = 0
+        for record in self._buffer:
+            chunk = bytearray()
+            for i in set(struct.unpack_from("<HH", record, 5)):
+                if i not in defined:
+                    string = self._strings[i].encode()
+                    chunk += struct.pack("<BHH", 0, i, len(string)) + string
+            if len(data) + len(chunk) + len(record) > space and (count or self._size):
+                break
+            defined.update(struct.unpack_from("<HH", record, 5))
+            data += chunk
+            data += record
+            count += 1
+
+        self._pending = defined
+        return data, count
+
+    def _wrote(self, data, count):
+        super()._wrote(data, count)
+        self._defined = self._pending
+
+
 class Formatter:
 
     converter = time.localtime
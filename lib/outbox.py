@@ -0,0 +1,146 @@
+'''Per-device "latest value wins" outbox used by network dimmer drivers (Wled,
+Tplink) to avoid flooding cheap controllers with requests during fades and
+rapid brightness changes (eg frontend slider calling increment_rule).
+
+Drivers submit (state, brightness) tuples instead of sending immediately. The
+outbox runs a single worker task per device which:
+  - Skips values equal to the last value the device acknowledged
+  - Replaces the queued value if submit is called again before it is sent
+    (intermediate values are never sent)
+  - Waits at least min_interval ms between requests (max request rate)
+
+Acknowledged values expire after ACK_MAX_AGE ms, so the device will resync if
+it was changed by something else (eg WLED app, wall dimmer).
+
+The failed attribute records the outcome of the last request, used by
+non-blocking driver send methods to report the device is unreachable.
+'''
+
+import asyncio
+import clock
+
+# Milliseconds an acknowledged value is trusted for skipping duplicate sends
+ACK_MAX_AGE = 60000
+
+
+class Outbox():
+    '''Takes async send coroutine function (accepts value, returns True if
+    device acknowledged, False if request failed) and min_interval (minimum
+    milliseconds between the start of each request).
+    '''
+
+    def __init__(self, send, min_interval=0):
+        self.send = send
+        self.min_interval = min_interval
+
+        # Value queued for next request, dict with value, result, and event
+        # (shared by all submit calls merged into the same request)
+        self.pending = None
+
+        # Last value acknowledged by device and timestamp it was acknowledged
+        # (monotonic ms, see clock module)
+        self.acked = None
+        self.acked_time = 0
+
+        # Timestamp of last request start (None before first request), worker
+        # task (None when idle)
+        self.last_sent = None
+        self.task = None
+
+        # True if last request failed, False if succeeded
+        self.failed = False
+
+        # Counters returned by get_stats
+        self.sent = 0
+        self.skipped = 0
+        self.merged = 0
+
+    def is_acked(self, value):
+        '''Returns True if value matches last acknowledged value and the
+        acknowledgement has not expired.
+        '''
+        return value == self.acked and 0 <= clock.elapsed(self.acked_time) < ACK_MAX_AGE
+
+    def set_acked(self, value):
+        '''Takes value confirmed by device (eg from poll response), updates
+        last acknowledged value. Pass None to force next send.
+        '''
+        self.acked = value
+        self.acked_time = clock.now()
+
+    def submit(self, value):
+        '''Takes value, queues for next request and starts worker if idle.
+        Returns queued entry (dict), or None if value was skipped because the
+        device already acknowledged it.
+        '''
+        if self.task is None and self.pending is None and self.is_acked(value):
+            self.skipped += 1
+            return None
+
+        # Replace value queued by previous call (not sent yet)
+        if self.pending is not None:
+            self.pending['value'] = value
+            self.merged += 1
+        else:
+            self.pending = {'value': value, 'result': None, 'event': asyncio.Event()}
+
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+        return self.pending
+
+    async def send_value(self, value, force=False):
+        '''Takes value, submits and waits until the request containing value
+        (or a newer value merged into it) completes. Returns True if device
+        acknowledged, False if request failed.
+
+        Value is sent even if device already acknowledged it if force is True.
+        '''
+        if force:
+            self.set_acked(None)
+        entry = self.submit(value)
+        if entry is None:
+            return True
+        await entry['event'].wait()
+        return entry['result']
+
+    async def _run(self):
+        '''Worker task, sends queued value until queue is empty, waits for
+        min_interval between requests (new values submitted while waiting
+        replace the queued value).
+        '''
+        try:
+            while self.pending is not None:
+                if self.last_sent is not None:
+                    # Never wait longer than min_interval (ticks wrapped)
+                    delay = self.min_interval - clock.elapsed(self.last_sent)
+                    if 0 < delay <= self.min_interval:
+                        await asyncio.sleep_ms(delay)
+
+                entry = self.pending
+                self.pending = None
+                value = entry['value']
+
+                if self.is_acked(value):
+                    self.skipped += 1
+                    entry['result'] = True
+                else:
+                    self.last_sent = clock.now()
+                    self.sent += 1
+                    try:
+                        entry['result'] = bool(await self.send(value))
+                    except Exception:  # pylint: disable=W0718
+                        entry['result'] = False
+                    self.failed = not entry['result']
+                    # Forget acknowledged value if failed (state unknown)
+                    self.set_acked(value if entry['result'] else None)
+                entry['event'].set()
+        finally:
+            self.task = None
+
+    def get_stats(self):
+        '''Returns dict with request, skipped, and merged counters.'''
+        return {
+            'sent': self.sent,
+            'skipped': self.skipped,
+            'merged': self.merged
+        }
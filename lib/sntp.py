@@ -0,0 +1,327 @@
+'''Minimal SNTP client (RFC 4330) used by Config to set the system clock
+without the astronomy API, plus drift tracking used to decide how often the
+clock needs to be corrected.
+
+The RTC stores local time (schedule rules compare local timestamps), NTP
+servers return UTC. The UTC offset is derived from the astronomy API response
+(see TimeSync.sync local_time argument) and cached by Config, so later syncs
+(boot, background timer) do not need the API.
+
+After each sync the clock error (NTP time minus RTC time) is divided by the
+time elapsed since the previous sync to get the RTC drift rate (parts per
+million). The interval until the next sync is chosen so the expected drift
+stays below MAX_ERROR_MS.
+
+Background syncs (Config.sync_time timer) use sync_async, which sends the
+request from a non-blocking socket and polls for the response in an asyncio
+task (never blocks the event loop while waiting for the server). The server
+address is resolved once and cached (re-resolved after a failed query).
+'''
+
+import time
+import errno
+import select
+import socket
+import struct
+import asyncio
+import logging
+from machine import RTC
+from clock import epoch_ms, deadline, remaining
+
+# Set name for module's log lines
+log = logging.getLogger("TimeSync")
+
+# Used if config file metadata does not contain ntp_server
+DEFAULT_HOST = "pool.ntp.org"
+NTP_PORT = 123
+
+# Seconds between NTP epoch (1900) and epoch used by time module (2000 on
+# older micropython ports, 1970 on newer ports and cpython)
+NTP_DELTA = 3155673600 if time.gmtime(0)[0] == 2000 else 2208988800
+
+# Milliseconds between syncs before drift rate is known, and limits for the
+# interval chosen from drift rate
+MIN_INTERVAL = 900000
+MAX_INTERVAL = 21600000
+
+# Maximum clock error (ms) allowed to accumulate between syncs
+MAX_ERROR_MS = 100
+
+# Errors larger than this (ms) are treated as a clock step (first sync after
+# power loss, UTC offset changed) instead of drift
+MAX_DRIFT_ERROR = 60000
+
+# Weight of newest drift measurement in average (exponential moving average)
+DRIFT_WEIGHT = 0.5
+
+# Milliseconds between checks for response in query_async
+POLL_INTERVAL = 20
+
+
+def _to_ntp(ms):
+    '''Takes epoch time in milliseconds, returns 2-tuple with NTP timestamp
+    seconds and fraction (1/2^32 seconds).
+    '''
+    seconds, ms = divmod(ms, 1000)
+    return (seconds + NTP_DELTA) & 0xFFFFFFFF, (ms << 32) // 1000
+
+
+def _from_ntp(seconds, fraction):
+    '''Takes NTP timestamp seconds and fraction, returns epoch time in
+    milliseconds.
+    '''
+    return (seconds - NTP_DELTA) * 1000 + ((fraction * 1000 + 0x80000000) >> 32)
+
+
+def build_request(sent):
+    '''Takes epoch time in milliseconds (local clock when request sent),
+    returns 48 byte client request packet with sent time as transmit timestamp
+    (server copies to originate timestamp, used to match response).
+    '''
+    packet = bytearray(48)
+    # Leap indicator 0, version 4, mode 3 (client)
+    packet[0] = 0x23
+    struct.pack_into("!II", packet, 40, *_to_ntp(sent))
+    return packet
+
+
+def parse_response(packet, sent, received):
+    '''Takes 48 byte server response, local clock when request was sent and
+    when response was received (epoch ms). Returns 2-tuple with clock offset
+    (ms to add to local clock to get server time) and round trip delay (ms).
+    Raises ValueError if response is not a valid reply to request.
+    '''
+    if len(packet) < 48:
+        raise ValueError("Response too short")
+
+    # Reference, originate, receive, transmit timestamps (seconds, fraction)
+    fields = struct.unpack("!8I", packet[16:48])
+    mode = packet[0] & 0x7
+    stratum = packet[1]
+    if mode != 4 or stratum == 0 or fields[6] == 0:
+        # Stratum 0 is a kiss-of-death packet (server asked client to back off)
+        raise ValueError("Invalid server response")
+    if (fields[2], fields[3]) != _to_ntp(sent):
+        raise ValueError("Response does not match request")
+
+    server_received = _from_ntp(fields[4], fields[5])
+    server_sent = _from_ntp(fields[6], fields[7])
+    offset = ((server_received - sent) + (server_sent - received)) // 2
+    delay = (received - sent) - (server_sent - server_received)
+    return offset, delay
+
+
+def resolve(host, port=NTP_PORT):
+    '''Takes NTP server hostname or IP, returns socket address (blocks while
+    hostname is resolved). Raises OSError if unable to resolve.
+    '''
+    return socket.getaddrinfo(host, port)[0][-1]
+
+
+def query(addr, timeout=1):
+    '''Takes NTP server socket address (see resolve). Returns 2-tuple with
+    clock offset (ms to add to local clock to get UTC) and round trip delay
+    (ms). Raises OSError if server unreachable, ValueError if response invalid.
+    Blocks until response received or timeout (seconds) expires.
+    '''
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.settimeout(timeout)
+        sent = epoch_ms()
+        sock.sendto(build_request(sent), addr)
+        packet = sock.recv(48)
+        received = epoch_ms()
+    finally:
+        sock.close()
+    return parse_response(packet, sent, received)
+
+
+async def query_async(addr, timeout=1000):
+    '''Awaitable equivalent of query (timeout in milliseconds). Sends request
+    from non-blocking socket, polls for response every POLL_INTERVAL ms
+    (other tasks run while waiting for the server).
+    '''
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.setblocking(False)
+        poller = select.poll()
+        poller.register(sock, select.POLLIN)
+        end = deadline(timeout)
+        sent = epoch_ms()
+        sock.sendto(build_request(sent), addr)
+        while not poller.poll(0):
+            if remaining(end) <= 0:
+                raise OSError(errno.ETIMEDOUT)
+            await asyncio.sleep_ms(POLL_INTERVAL)
+        packet = sock.recv(48)
+        received = epoch_ms()
+    finally:
+        sock.close()
+    return parse_response(packet, sent, received)
+
+
+class TimeSync():
+    '''Takes NTP server hostname or IP. Sets RTC to local time from NTP server
+    (see sync method), tracks RTC drift rate between syncs and chooses next
+    sync interval (used by Config to schedule background syncs).
+    '''
+
+    def __init__(self, host=DEFAULT_HOST):
+        self.host = host
+
+        # UTC offset in minutes (None until set by Config or derived from API)
+        self.utc_offset = None
+
+        # Cached server socket address (None until resolved, cleared if query
+        # fails so next sync resolves hostname again)
+        self.addr = None
+
+        # Local clock (epoch ms) after last successful sync, used to measure
+        # drift at next sync (None if clock not synced or stepped)
+        self.last_sync = None
+
+        # RTC drift rate in parts per million (positive = RTC running slow)
+        self.drift_ppm = None
+
+        # Milliseconds until next sync
+        self.interval = MIN_INTERVAL
+
+        # Counters and last measurements returned by get_status
+        self.syncs = 0
+        self.failures = 0
+        self.last_error_ms = None
+        self.last_delay_ms = None
+
+    def set_clock(self, ms):
+        '''Takes local epoch time in milliseconds, sets RTC.'''
+        seconds, ms = divmod(ms, 1000)
+        now = time.gmtime(seconds)
+        # RTC tuple has weekday before hour, last member is microseconds
+        RTC().datetime((now[0], now[1], now[2], now[6], now[3], now[4], now[5], ms * 1000))
+
+    def sync(self, utc_offset=None, local_time=None):
+        '''Queries NTP server, sets RTC to local time. Returns True if
+        successful, False if server unreachable or UTC offset unknown.
+
+        Optional utc_offset (minutes) replaces current offset. Optional
+        local_time (epoch seconds, eg from astronomy API response) is used to
+        derive UTC offset (rounded to nearest 15 minutes).
+        '''
+        if not self._check_offset(utc_offset, local_time):
+            return False
+
+        try:
+            offset, delay = query(self._resolve())
+        except (OSError, ValueError) as ex:
+            return self._query_failed(ex)
+        return self._apply(offset, delay, local_time)
+
+    async def sync_async(self, utc_offset=None, local_time=None):
+        '''Awaitable equivalent of sync used by background syncs (does not
+        block while waiting for NTP server response).
+        '''
+        if not self._check_offset(utc_offset, local_time):
+            return False
+
+        try:
+            offset, delay = await query_async(self._resolve())
+        except (OSError, ValueError) as ex:
+            return self._query_failed(ex)
+        return self._apply(offset, delay, local_time)
+
+    def _check_offset(self, utc_offset, local_time):
+        '''Takes sync arguments, updates UTC offset if given. Returns False if
+        UTC offset unknown and cannot be derived (sync not possible).
+        '''
+        if utc_offset is not None:
+            self.utc_offset = utc_offset
+        elif self.utc_offset is None and local_time is None:
+            log.error("Unable to sync time, UTC offset unknown")
+            return False
+        return True
+
+    def _resolve(self):
+        '''Returns cached server socket address, resolves hostname if not
+        cached yet.
+        '''
+        if self.addr is None:
+            self.addr = resolve(self.host)
+        return self.addr
+
+    def _query_failed(self, ex):
+        '''Takes exception raised by query, counts failure, clears cached
+        address (server may have moved). Returns False.
+        '''
+        self.addr = None
+        self.failures += 1
+        log.error("Failed to sync time with %s: %s", self.host, ex)
+        return False
+
+    def _apply(self, offset, delay, local_time):
+        '''Takes clock offset and round trip delay from query and optional
+        local_time (see sync), sets RTC to local time and updates drift rate.
+        Returns True.
+        '''
+        now = epoch_ms()
+        utc = now + offset
+        if local_time is not None:
+            minutes = (local_time * 1000 - utc) / 60000
+            self.utc_offset = int(round(minutes / 15)) * 15
+
+        # Clock error: milliseconds RTC must move to match NTP local time
+        target = utc + self.utc_offset * 60000
+        error = target - now
+        self._update_drift(error, now)
+
+        self.set_clock(target)
+        self.last_sync = epoch_ms()
+        self.syncs += 1
+        self.last_error_ms = error
+        self.last_delay_ms = delay
+        log.debug(
+            "Synced time with %s, error=%sms, delay=%sms",
+            self.host, error, delay
+        )
+        return True
+
+    def _update_drift(self, error, now):
+        '''Takes clock error (ms) and local clock before correction, updates
+        drift rate and interval until next sync.
+        '''
+        # Ignore clock steps (no previous sync, power loss, offset changed)
+        if self.last_sync is None or abs(error) > MAX_DRIFT_ERROR:
+            self.last_sync = None
+            return
+
+        elapsed = now - self.last_sync
+        if elapsed <= 0:
+            return
+
+        drift = error * 1000000 / elapsed
+        if self.drift_ppm is None:
+            self.drift_ppm = drift
+        else:
+            self.drift_ppm = self.drift_ppm * (1 - DRIFT_WEIGHT) + drift * DRIFT_WEIGHT
+
+        # Sync often enough that drift never exceeds MAX_ERROR_MS
+        if self.drift_ppm:
+            interval = int(MAX_ERROR_MS * 1000000 / abs(self.drift_ppm))
+            self.interval = max(MIN_INTERVAL, min(MAX_INTERVAL, interval))
+        else:
+            self.interval = MAX_INTERVAL
+
+    def get_status(self):
+        '''Returns dict with NTP server, UTC offset, drift rate, last clock
+        error and round trip delay, and sync counters.
+        '''
+        return {
+            'host': self.host,
+            'utc_offset': self.utc_offset,
+            'syncs': self.syncs,
+            'failures': self.failures,
+            'last_error_ms': self.last_error_ms,
+            'last_delay_ms': self.last_delay_ms,
+            'drift_ppm': None if self.drift_ppm is None else round(self.drift_ppm, 2),
+            'interval_ms': self.interval,
+            'last_sync_ms': None if self.last_sync is None else max(0, epoch_ms() - self.last_sync)
+        }
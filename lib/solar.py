@@ -0,0 +1,110 @@
+'''Computes sunrise and sunset times from GPS coordinates using the NOAA
+general solar position equations (fractional year approximation of the
+equation of time and solar declination, accurate to about 1-2 minutes).
+
+Used by Config to set the sunrise and sunset schedule keywords without an
+API call. Times are calculated in minutes after midnight UTC, the UTC offset
+needed to convert to local time is derived from the last API response (see
+get_utc_offset) since the node has no timezone database.
+'''
+
+from math import sin, cos, tan, acos, radians, degrees, pi
+
+# Zenith angle of sun at sunrise/sunset (90 degrees + atmospheric refraction
+# and solar disk radius)
+SUNRISE_ZENITH = radians(90.833)
+
+# Days before first day of each month (non-leap year)
+_CUMULATIVE_DAYS = (0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+
+
+def _is_leap_year(year):
+    '''Takes year, returns True if leap year.'''
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def _day_of_year(year, month, day):
+    '''Takes year, month, and day, returns day of year (1-366).'''
+    leap_day = 1 if month > 2 and _is_leap_year(year) else 0
+    return _CUMULATIVE_DAYS[month - 1] + day + leap_day
+
+
+def _solar_params(year, month, day):
+    '''Takes date, returns 2-tuple with equation of time (minutes) and solar
+    declination (radians) at noon.
+    '''
+    days_in_year = 366 if _is_leap_year(year) else 365
+    gamma = 2 * pi / days_in_year * (_day_of_year(year, month, day) - 1)
+
+    eqtime = 229.18 * (
+        0.000075
+        + 0.001868 * cos(gamma)
+        - 0.032077 * sin(gamma)
+        - 0.014615 * cos(2 * gamma)
+        - 0.040849 * sin(2 * gamma)
+    )
+    decl = (
+        0.006918
+        - 0.399912 * cos(gamma)
+        + 0.070257 * sin(gamma)
+        - 0.006758 * cos(2 * gamma)
+        + 0.000907 * sin(2 * gamma)
+        - 0.002697 * cos(3 * gamma)
+        + 0.00148 * sin(3 * gamma)
+    )
+    return eqtime, decl
+
+
+def get_sun_times(lat, lon, year, month, day):
+    '''Takes latitude, longitude (degrees, east positive), and date. Returns
+    2-tuple with sunrise and sunset in minutes after midnight UTC (may be
+    negative or greater than 1440 depending on longitude). Returns None if
+    the sun does not rise or set on this date (polar day or night).
+    '''
+    eqtime, decl = _solar_params(year, month, day)
+    lat = radians(float(lat))
+
+    # Hour angle of sunrise (sunset is the same angle after solar noon)
+    cos_ha = cos(SUNRISE_ZENITH) / (cos(lat) * cos(decl)) - tan(lat) * tan(decl)
+    if not -1 <= cos_ha <= 1:
+        return None
+    ha = degrees(acos(cos_ha))
+
+    # Solar noon in minutes after midnight UTC (4 minutes per degree)
+    noon = 720 - 4 * float(lon) - eqtime
+    return noon - 4 * ha, noon + 4 * ha
+
+
+def format_minutes(minutes):
+    '''Takes minutes after midnight (wraps if outside 0-1439), returns HH:MM
+    timestamp rounded to nearest minute.
+    '''
+    minutes = int(round(minutes)) % 1440
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def get_utc_offset(local_time, utc_minutes):
+    '''Takes HH:MM local timestamp of an event (eg sunrise from API) and the
+    same event in minutes after midnight UTC (from get_sun_times). Returns UTC
+    offset in minutes rounded to nearest 15 (all timezones are multiples).
+    '''
+    hour, minute = local_time.split(":")
+    offset = int(hour) * 60 + int(minute) - utc_minutes
+
+    # Constrain to -12 to +12 hours (event may fall on a different UTC day)
+    offset = (offset + 720) % 1440 - 720
+    return int(round(offset / 15)) * 15
+
+
+def get_local_sun_times(lat, lon, year, month, day, utc_offset):
+    '''Takes latitude, longitude, date, and UTC offset (minutes). Returns
+    2-tuple with local sunrise and sunset HH:MM timestamps, or None if the sun
+    does not rise or set on this date.
+    '''
+    times = get_sun_times(lat, lon, year, month, day)
+    if times is None:
+        return None
+    return (
+        format_minutes(times[0] + utc_offset),
+        format_minutes(times[1] + utc_offset)
+    )
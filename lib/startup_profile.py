@@ -0,0 +1,79 @@
+'''Records how long each boot step takes (time.ticks_us) and free heap before
+and after each step. Used to find the phase, driver, or module that makes a
+node slow to become reachable or leaves little free memory.
+
+Steps are recorded with the ProfileStep context manager:
+
+    with ProfileStep('phase', '_build_queue'):
+        self._build_queue()
+
+Results are stored in a compact dict with categories (phase, import, init) as
+keys and dicts as values. Inner dicts have step names as keys and lists with
+duration (microseconds), free heap before, and free heap after as values.
+Recording stops when finish is called once the node is reachable (results
+returned by the startup_profile API endpoint).
+'''
+
+import gc
+import time
+
+# Keys are categories, values are dicts with step names as keys and lists with
+# [duration_us, free_before, free_after] as values
+_steps = {}
+
+# Microseconds since reset and free heap when finish was called (boot done)
+_boot_us = None
+_free = None
+
+
+class ProfileStep():
+    '''Context manager, takes category and step name. Records duration of body
+    and free heap before and after (garbage collected outside timed region).
+
+    Does nothing after finish is called, or if the step was already recorded
+    (eg second import of a driver module is cached and takes no time).
+    '''
+
+    def __init__(self, category, name):
+        self.category = category
+        self.name = name
+        self.free = None
+        self.start = None
+
+    def __enter__(self):
+        if _boot_us is None and self.name not in _steps.get(self.category, {}):
+            gc.collect()
+            self.free = gc.mem_free()
+            self.start = time.ticks_us()
+        return self
+
+    def __exit__(self, *args):
+        if self.start is not None:
+            duration = time.ticks_diff(time.ticks_us(), self.start)
+            gc.collect()
+            if self.category not in _steps:
+                _steps[self.category] = {}
+            _steps[self.category][self.name] = [duration, self.free, gc.mem_free()]
+        # Do not suppress exceptions raised in body
+        return False
+
+
+def finish():
+    '''Called when boot complete, records time since reset and free heap,
+    stops recording steps.
+    '''
+    global _boot_us, _free  # pylint: disable=W0603
+    if _boot_us is None:
+        _boot_us = time.ticks_us()
+        _free = gc.mem_free()
+
+
+def get_profile():
+    '''Returns dict with microseconds from reset until boot finished, free
+    heap when finished, and steps dict (see module docstring).
+    '''
+    return {
+        'boot_us': _boot_us,
+        'free': _free,
+        'steps': _steps
+    }
@@ -1,4 +1,3 @@
-import asyncio
 import requests
 from SensorWithLoop import SensorWithLoop
 
@@ -45,7 +44,7 @@ class DesktopTrigger(SensorWithLoop):
         else:
             raise ValueError('Invalid mode, must be "screen" or "activity"')
 
-        # Find desktop target so monitor loop (below) can update target's state
+        # Find desktop target so sample method (below) can update target's state
         # attribute when screen turns on/off
         for i in self.targets:
             if i._type == "desktop" and i.uri == f"{self.uri}":
@@ -54,19 +53,19 @@ class DesktopTrigger(SensorWithLoop):
         else:
             self.desktop_target = None
 
-        # Run monitor loop
-        self.monitor_task = asyncio.create_task(self.monitor())
+        # Start sampling (makes API call every second)
+        self.start_sampling()
 
         self.log.info("Instantiated, ip=%s, port=%s, mode=%s", ip, port, mode)
 
     def disable(self):
         '''Sets enabled bool to False (prevents sensor from being checked),
-        stops monitor loop, clears self.current, and refreshes group (turn
+        stops sampling, clears self.current, and refreshes group (turn
         devices OFF if other sensor conditions not met).
         '''
 
         # Prevent using outdated reading if computer is in sleep mode when
-        # sensor re-enabled (if not in sleep mode loop will get new reading)
+        # sensor re-enabled (if not in sleep mode sample will get new reading)
         self.current = None
         super().disable()
 
@@ -215,9 +214,9 @@ class DesktopTrigger(SensorWithLoop):
             if self.condition_met() != self.group.state:
                 self.refresh_group()
 
-    async def monitor(self):
-        '''Async coroutine that runs while sensor is enabled. Makes API call
-        to desktop daemon every second, refreshes group when condition changes.
+    def sample(self):
+        '''Called by SensorSampler every second while sensor is enabled. Makes
+        API call to desktop daemon, refreshes group when condition changes.
 
         Screen mode: Check if computer monitors are turned On or Off, save
         response in self.current, refresh group when response changes.
@@ -226,22 +225,11 @@ class DesktopTrigger(SensorWithLoop):
         self.current, refresh group when time exceeds/no longer exceeds 60
         seconds.
         '''
-        self.log.debug("Starting DesktopTrigger.monitor coro")
-        try:
-            while True:
-                # Check correct condition for configured mode
-                if self.mode == "screen":
-                    self._get_current_screen_mode()
-                else:
-                    self._get_current_activity_mode()
-
-                # Poll every second
-                await asyncio.sleep(1)
-
-        # Sensor disabled, exit loop
-        except asyncio.CancelledError:
-            self.log.debug("Exiting DesktopTrigger.monitor coro")
-            return False
+        # Check correct condition for configured mode
+        if self.mode == "screen":
+            self._get_current_screen_mode()
+        else:
+            self._get_current_activity_mode()
 
     def get_attributes(self):
         '''Return JSON-serializable dict containing all current attributes
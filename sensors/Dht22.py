@@ -43,7 +43,7 @@ class Dht22(Thermostat):
         # Instantiate pin and sensor driver
         self.temp_sensor = dht.DHT22(Pin(int(pin)))
 
-        # Set mode, tolerance, units, current_rule, create monitor task
+        # Set mode, tolerance, units, current_rule, start sampling
         super().__init__(name, nickname, _type, default_rule, schedule, mode, tolerance, units, targets)
         self.log.info("Instantiated, units=%s, tolerance=%s", units, tolerance)
 
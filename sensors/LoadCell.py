@@ -1,4 +1,3 @@
-import asyncio
 from math import isnan
 from machine import Pin
 from hx711 import HX711
@@ -25,6 +24,9 @@ class LoadCell(SensorWithLoop):
     Supports universal rules ("enabled" and "disabled") and integers or floats
     (load cell reading threshold when the sensor is activated).
     The default_rule must be an integer or float (not universal rule).
+
+    The sample method caches the load cell reading every second, condition_met
+    uses the cached reading (HX711 read can block for up to 500ms).
     '''
 
     def __init__(self, name, nickname, _type, default_rule, schedule, targets, pin_data, pin_clock):
@@ -36,11 +38,11 @@ class LoadCell(SensorWithLoop):
         self.sensor = HX711(clock, data)
         self.tare_sensor()
 
-        # Track output of condition_met (set by monitor callback)
+        # Track output of condition_met (set by sample method)
         self.current = None
 
-        # Start monitor loop (checks if threshold met every second)
-        self.monitor_task = asyncio.create_task(self.monitor())
+        # Start sampling (checks if threshold met every second)
+        self.start_sampling()
 
         self.log.info(
             "Instantiated, pin_data=%s, pin_clock=%s",
@@ -70,12 +72,19 @@ class LoadCell(SensorWithLoop):
 
         return self.sensor.get_value()
 
+    def read_sensor(self):
+        '''Returns raw reading from load cell sensor. Called by update_reading
+        to cache reading.
+        '''
+        return self.sensor.get_value()
+
     def condition_met(self):
         '''Returns True if absolute value of current load cell reading exceeds
-        current_rule threshold, otherwise False.
+        current_rule threshold, otherwise False. Uses cached reading unless
+        older than max_age.
         '''
         try:
-            if abs(self.sensor.get_value()) > self.current_rule:
+            if abs(self.get_reading()) > self.current_rule:
                 return True
             return False
         except TypeError:
@@ -89,32 +98,22 @@ class LoadCell(SensorWithLoop):
         self.log.debug("tare_sensor method called")
         self.sensor.tare()
 
-    async def monitor(self):
-        '''Async coroutine, checks load cell condition every second. Turns
+    def sample(self):
+        '''Called by SensorSampler every second, reads load cell and turns
         target devices on or off when condition changes.
         '''
-        self.log.debug("Starting LoadCell.monitor coro")
-        try:
-            while True:
-                self.log.debug("sensor value: %s", self.get_raw_reading())
-                new = self.condition_met()
-
-                # If condition changed, overwrite and refresh group
-                if new != self.current and new is not None:
-                    self.log.debug(
-                        "monitor: condition changed from %s to %s",
-                        self.current, new
-                    )
-                    self.current = new
-                    self.refresh_group()
-
-                # Poll every second
-                await asyncio.sleep(1)
-
-        # Sensor disabled, exit loop
-        except asyncio.CancelledError:
-            self.log.debug("Exiting LoadCell.monitor coro")
-            return False
+        # Read sensor, cache reading used by condition_met
+        self.log.debug("sensor value: %s", self.update_reading())
+        new = self.condition_met()
+
+        # If condition changed, overwrite and refresh group
+        if new != self.current and new is not None:
+            self.log.debug(
+                "sample: condition changed from %s to %s",
+                self.current, new
+            )
+            self.current = new
+            self.refresh_group()
 
     def get_attributes(self):
         '''Return JSON-serializable dict containing all current attributes
@@ -1,4 +1,3 @@
-from micropython import schedule
 from Instance import Instance
 
 
@@ -21,6 +20,11 @@ class Sensor(Instance):
 
     Supports universal rules ("enabled" and "disabled"). Additional rules can
     be supported by replacing the validator method in subclass.
+
+    The optional debounce_ms config key (set by Config after instantiation)
+    delays group refreshes by the configured number of milliseconds, all
+    condition changes during the window are coalesced into a single refresh
+    (prevents bouncing switches or chattering sensors flooding the group).
     '''
 
     def __init__(self, name, nickname, _type, enabled, default_rule, schedule, targets):
@@ -30,13 +34,20 @@ class Sensor(Instance):
         # adds sensors with identical targets attribute to same Group instance)
         self.targets = targets
 
+        # Milliseconds to wait before refreshing group after condition changes
+        self.debounce_ms = 0
+
     def refresh_group(self):
-        '''Calls Group._refresh method to check conditions of all sensors in
-        group, update state of all devices in group to match condition.
+        '''Requests group refresh to check conditions of all sensors in group,
+        update state of all devices in group to match condition. Multiple calls
+        before the refresh runs are coalesced into a single refresh.
         '''
+        # Condition changed, status object contains new condition
+        self.status_changed()
+
         if self.group:
             self.print(f"Refreshing {self.group.name}")
-            schedule(self.group._refresh, None)  # pylint: disable=W0212
+            self.group.request_refresh(self.debounce_ms)
 
     def enable(self):
         '''Sets enabled bool to True (allows sensor to be checked), ensures
@@ -87,6 +98,10 @@ class Sensor(Instance):
         for i in self.targets:
             attributes["targets"].append(i.name)
 
+        # Add number of group refreshes coalesced (see Group.request_refresh)
+        if self.group:
+            attributes["coalesced_refreshes"] = self.group.coalesced_refreshes
+
         return attributes
 
     def get_status(self):
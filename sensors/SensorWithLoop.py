@@ -1,6 +1,16 @@
-import asyncio
+import clock
+import app_context
 from Sensor import Sensor
 
+# Default milliseconds between reads (subclasses override in init, can be
+# configured with optional sample_interval config key)
+DEFAULT_SAMPLE_INTERVAL = 1000
+
+# Default max milliseconds a cached reading is used before get_reading reads
+# the sensor again (sample methods update the cache more often than this, can
+# be configured with optional max_age config key)
+DEFAULT_MAX_AGE = 10000
+
 
 class SensorWithLoop(Sensor):
     '''Base class for all sensor drivers which use a loop to detect when their
@@ -17,15 +27,22 @@ class SensorWithLoop(Sensor):
       schedule:     Dict with timestamps/keywords as keys, rules as values
       targets:      List of device names (device1 etc) controlled by sensor
 
-    Subclasses must implement an async monitor method containing an infinite
-    loop that checks the sensor condition and calls self.refresh_group when the
-    condition is met. The loop must await asyncio.sleep at some point to allow
-    other tasks to run (use this to set the polling interval, eg 1 second). The
-    loop should be wrapped in try/except and exit when asyncio.CancelledError
-    is raised.
+    Subclasses must implement a sample method that checks the sensor condition
+    and calls self.refresh_group when the condition changes, and must call
+    start_sampling at the end of their init method. The shared SensorSampler
+    calls sample every sample_interval milliseconds (staggered so reads from
+    different sensors never run back to back). Subclasses can override
+    get_sample_interval to adapt the rate (eg read faster near threshold).
+
+    The disable method stops sampling to prevent the group from refreshing
+    while the sensor is disabled. The enable method restarts sampling.
 
-    The disable method stops the loop to prevent the group from refreshing
-    while the sensor is disabled. The enable method recreates the loop.
+    Sensors that read hardware should implement read_sensor (returns a new
+    reading) and call update_reading in their sample method. The reading is
+    cached with a timestamp, condition_met and get_status should call
+    get_reading (returns cached reading, only reads hardware if the cache is
+    older than max_age milliseconds). This prevents group refreshes and status
+    requests from blocking on slow hardware reads.
 
     Supports universal rules ("enabled" and "disabled"). Additional rules can
     be supported by replacing the validator method in subclass.
@@ -34,40 +51,88 @@ class SensorWithLoop(Sensor):
     def __init__(self, name, nickname, _type, enabled, default_rule, schedule, targets):
         super().__init__(name, nickname, _type, enabled, default_rule, schedule, targets)
 
-        # Stores monitor loop asyncio.Task object (subclass init method should
-        # assign this to return value of asyncio.create_task(self.monitor()))
-        self.monitor_task = None
+        # True while registered with SensorSampler (set by start_sampling)
+        self.sampling = False
+
+        # Milliseconds between sample calls (returned by get_sample_interval)
+        self.sample_interval = DEFAULT_SAMPLE_INTERVAL
+
+        # Latest reading from read_sensor, epoch ms timestamp of reading, and
+        # max age (ms) before get_reading ignores cache and reads sensor
+        self.reading = None
+        self.reading_time = None
+        self.max_age = DEFAULT_MAX_AGE
 
     def enable(self):
         '''Sets enabled bool to True (allows sensor to be checked), ensures
         current_rule contains a usable value, refreshes group (check sensor),
-        restarts monitor loop if stopped (checks user activity every second).
+        restarts sampling if stopped.
         '''
-
-        # Restart loop if stopped
-        if self.monitor_task is None:
-            self.log.debug("%s: start monitor loop", self.name)
-            self.monitor_task = asyncio.create_task(self.monitor())
+        self.start_sampling()
         super().enable()
 
     def disable(self):
         '''Sets enabled bool to False (prevents sensor from being checked),
-        stops monitor loop, and refreshes group (turn devices OFF if other
-        sensor conditions not met).
+        stops sampling, and refreshes group (turn devices OFF if other sensor
+        conditions not met).
         '''
-
-        # Stop loop if running
-        if self.monitor_task is not None:  # pragma: no branch
-            self.log.debug("%s: stop monitor loop", self.name)
-            self.monitor_task.cancel()
-            # Allow enable method to restart loop
-            self.monitor_task = None
+        self.stop_sampling()
         super().disable()
 
-    async def monitor(self):
-        '''Placeholder method - subclasses must implement method containing an
-        infinite loop that checks the sensor condition and calls refresh_group
-        when the condition changes.
+    def start_sampling(self):
+        '''Registers sample method with SensorSampler (called every
+        sample_interval ms). Does nothing if already sampling.
+        '''
+        if not self.sampling:
+            self.log.debug("%s: start sampling", self.name)
+            app_context.sensor_sampler_instance.register(
+                self,
+                self.sample,
+                self.get_sample_interval
+            )
+            self.sampling = True
+
+    def stop_sampling(self):
+        '''Unregisters from SensorSampler (sample method no longer called).'''
+        if self.sampling:
+            self.log.debug("%s: stop sampling", self.name)
+            app_context.sensor_sampler_instance.unregister(self)
+            self.sampling = False
+
+    def get_sample_interval(self):
+        '''Returns milliseconds until next sample call. Called by SensorSampler
+        after each read, subclasses may override to adapt rate to condition.
+        '''
+        return self.sample_interval
+
+    def read_sensor(self):
+        '''Placeholder method - subclasses that cache readings must implement
+        method which reads sensor hardware and returns the reading.
+        '''
+        raise NotImplementedError('Must be implemented in subclass')
+
+    def update_reading(self):
+        '''Reads sensor, caches reading with timestamp, and returns reading.
+        Called by sample method (and get_reading when cache is outdated).
+        '''
+        self.reading = self.read_sensor()
+        self.reading_time = clock.now()
+        return self.reading
+
+    def get_reading(self):
+        '''Returns cached reading if newer than max_age, otherwise reads
+        sensor and returns new reading.
+        '''
+        # Negative age means ticks wrapped (reading is at least 6 days old)
+        if self.reading_time is None or not 0 <= clock.elapsed(self.reading_time) <= self.max_age:
+            self.log.debug("cached reading outdated, reading sensor")
+            return self.update_reading()
+        return self.reading
+
+    def sample(self):
+        '''Placeholder method - subclasses must implement method that checks
+        the sensor condition and calls refresh_group when the condition
+        changes. Called by SensorSampler every sample_interval milliseconds.
         '''
         raise NotImplementedError('Must be implemented in subclass')
 
@@ -76,9 +141,6 @@ class SensorWithLoop(Sensor):
         Called by API get_attributes endpoint, more verbose than status
         '''
         attributes = super().get_attributes()
-        # Replace monitor_task with True or False
-        if attributes["monitor_task"] is not None:
-            attributes["monitor_task"] = True
-        else:
-            attributes["monitor_task"] = False
+        # Remove cached reading (may not be serializable)
+        del attributes["reading"]
         return attributes
@@ -44,7 +44,7 @@ class Si7021(Thermostat):
         self.i2c = SoftI2C(Pin(22), Pin(21))
         self.temp_sensor = si7021.Si7021(self.i2c)
 
-        # Set mode, tolerance, units, current_rule, create monitor task
+        # Set mode, tolerance, units, current_rule, start sampling
         super().__init__(name, nickname, _type, default_rule, schedule, mode, tolerance, units, targets)
         self.log.info("Instantiated, units=%s, tolerance=%s", units, tolerance)
 
@@ -1,8 +1,16 @@
-import asyncio
 from math import isnan
 import app_context
 from SensorWithLoop import SensorWithLoop
 
+# Default milliseconds between temperature reads
+SAMPLE_INTERVAL = 5000
+
+# Milliseconds between reads while temperature is near next threshold
+FAST_SAMPLE_INTERVAL = 1000
+
+# Fraction of tolerance around next threshold where fast interval is used
+FAST_SAMPLE_MARGIN = 0.5
+
 
 def fahrenheit_to_celsius(fahrenheit):
     '''Takes temperature in fahrenheit, converts to celsius and returns.'''
@@ -48,6 +56,11 @@ class Thermostat(SensorWithLoop):
     temperature reading). Drivers for sensors which detect humidity may also
     implement a get_humidity method (returns current humidity reading).
 
+    The sample method caches temperature and humidity every 5 seconds (every
+    second while temperature is near the threshold it will cross next),
+    the condition_met and get_status methods use the cached reading (only read
+    the sensor if the cached reading is older than max_age).
+
     Supports universal rules ("enabled" and "disabled") and temperature cutoff
     rules (float between 18 and 27 celsius or equivalent in configured units).
     The default_rule must be a float (not universal rule).
@@ -86,12 +99,13 @@ class Thermostat(SensorWithLoop):
         # command (ir command didn't reach ac, etc)
         self.recent_temps = []
 
-        # Track output of condition_met (set by monitor coro, calls
+        # Track output of condition_met (set by sample method, calls
         # refresh_group when current changes instead of every read)
         self.current = None
 
-        # Start monitor loop (checks temp every 5 seconds)
-        self.monitor_task = asyncio.create_task(self.monitor())
+        # Start sampling (checks temp every 5 seconds)
+        self.sample_interval = SAMPLE_INTERVAL
+        self.start_sampling()
 
     def get_temperature(self):
         '''Returns current temperature reading in configured units.'''
@@ -120,6 +134,12 @@ class Thermostat(SensorWithLoop):
 
         return "Sensor does not support humidity"
 
+    def read_sensor(self):
+        '''Returns tuple with current temperature (configured units) and
+        humidity. Called by update_reading to cache reading.
+        '''
+        return self.get_temperature(), self.get_humidity()
+
     def set_threshold(self):
         '''Calculates on and off temperature thresholds based on current_rule
         and tolerance attribute. Called after changing current_rule.
@@ -189,8 +209,9 @@ class Thermostat(SensorWithLoop):
         '''Returns True if current temperature exceeds configured on_threshold.
         Returns False if current temperature exceeds configured off_threshold.
         Returns None if current temperature is between on and off thresholds.
+        Uses cached temperature unless older than max_age.
         '''
-        current = self.get_temperature()
+        current = self.get_reading()[0]
 
         if self.mode == "cool":
             if current > self.on_threshold:
@@ -207,31 +228,45 @@ class Thermostat(SensorWithLoop):
         # No action needed if temperature between on/off thresholds
         return None
 
-    async def monitor(self):
-        '''Async coroutine, checks temperature every 5 seconds and turns target
-        devices on or off if on_threshold or off_threshold exceeded.
+    def sample(self):
+        '''Called by SensorSampler, reads temperature and turns target devices
+        on or off if on_threshold or off_threshold exceeded.
+        '''
+        # Read sensor, cache reading used by condition_met and status
+        previous = self.reading
+        self.log.debug("temperature: %s", self.update_reading()[0])
+        new = self.condition_met()
+
+        # Status object contains temperature, humidity, and condition (only
+        # changes if reading changed, thresholds changed by set_rule)
+        if self.reading != previous:
+            self.status_changed()
+
+        # If condition changed, overwrite and refresh group
+        if new != self.current and new is not None:
+            self.log.debug(
+                "sample: condition changed from %s to %s",
+                self.current, new
+            )
+            self.current = new
+            self.refresh_group()
+
+    def get_sample_interval(self):
+        '''Returns FAST_SAMPLE_INTERVAL if last temperature reading is close to
+        the threshold that can be crossed next (on_threshold while condition
+        is not met, off_threshold while met) to detect crossing quickly,
+        otherwise returns sample_interval. Close means within
+        FAST_SAMPLE_MARGIN * tolerance (thresholds are 2 * tolerance apart).
         '''
-        self.log.debug("Starting Thermostat.monitor coro")
         try:
-            while True:
-                self.log.debug("temperature: %s", self.get_temperature())
-                new = self.condition_met()
-
-                # If condition changed, overwrite and refresh group
-                if new != self.current and new is not None:
-                    self.log.debug(
-                        "monitor: condition changed from %s to %s",
-                        self.current, new
-                    )
-                    self.current = new
-                    self.refresh_group()
-
-                await asyncio.sleep(5)
-
-        # Sensor disabled, exit loop
-        except asyncio.CancelledError:
-            self.log.debug("Exiting Thermostat.monitor coro")
-            return False
+            temp = self.reading[0]
+            threshold = self.off_threshold if self.current else self.on_threshold
+            if abs(temp - threshold) <= self.tolerance * FAST_SAMPLE_MARGIN:
+                return min(self.sample_interval, FAST_SAMPLE_INTERVAL)
+        except TypeError:
+            # No reading yet or no thresholds (disabled)
+            pass
+        return self.sample_interval
 
     def validator(self, rule):
         '''Accepts any integer or float between 18 and 27 celsius (or
@@ -347,7 +382,6 @@ class Thermostat(SensorWithLoop):
         Contains all attributes displayed on the web frontend.
         '''
         status = super().get_status()
-        status['temp'] = self.get_temperature()
+        status['temp'], status['humid'] = self.get_reading()
         status['units'] = self.units
-        status['humid'] = self.get_humidity()
         return status
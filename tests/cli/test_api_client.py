@@ -4,12 +4,24 @@
 
 import sys
 import json
+import socket
 import asyncio
 from io import StringIO
 from unittest import TestCase, IsolatedAsyncioTestCase
 from unittest.mock import patch, MagicMock, AsyncMock
 from api_client import endpoint_error, parse_ip, parse_command, main, example_usage_error
-from api_endpoints import ir_blaster_options, request
+from api_endpoints import (
+    ir_blaster_options,
+    request,
+    persistent_request,
+    persistent_connections,
+    PersistentConnection,
+    StatusSubscription,
+    get_subscription,
+    status_subscriptions,
+    run_commands,
+    CommandBatch
+)
 from mock_cli_config import mock_cli_config
 
 mock_status_object = {
@@ -195,6 +207,156 @@ class RequestTests(IsolatedAsyncioTestCase):
             self.assertEqual(response, "Error: Timed out waiting for response")
 
 
+class PersistentConnectionTests(TestCase):
+    def setUp(self):
+        # Create mock socket, mock file object returned by makefile
+        self.mock_socket = MagicMock()
+        self.mock_file = MagicMock()
+        self.mock_socket.makefile.return_value = self.mock_file
+
+    def test_request_reuses_connection(self):
+        self.mock_file.readline.side_effect = [
+            b'{"id": 1, "reply": {"Enabled": "device1"}}\n',
+            b'{"id": 2, "reply": {"Disabled": "device1"}}\n'
+        ]
+        with patch('api_endpoints.socket.create_connection', return_value=self.mock_socket) as mock_connect:
+            connection = PersistentConnection('192.168.1.123')
+            self.assertEqual(connection.request(['enable', 'device1']), {"Enabled": "device1"})
+            self.assertEqual(connection.request(['disable', 'device1']), {"Disabled": "device1"})
+
+            # Confirm only connected once, confirm sent keep-alive requests
+            mock_connect.assert_called_once_with(('192.168.1.123', 8123), 5)
+            self.assertEqual(
+                self.mock_socket.sendall.call_args_list[1][0][0],
+                b'{"id": 2, "cmd": ["disable", "device1"]}\n'
+            )
+
+    def test_request_reconnects_after_connection_closed(self):
+        # Simulate node closing idle connection, reply on new connection
+        self.mock_file.readline.side_effect = [
+            b'{"id": 1, "reply": {"Enabled": "device1"}}\n',
+            b'',
+            b'{"id": 3, "reply": {"Enabled": "device1"}}\n'
+        ]
+        with patch('api_endpoints.socket.create_connection', return_value=self.mock_socket) as mock_connect:
+            connection = PersistentConnection('192.168.1.123')
+            connection.request(['enable', 'device1'])
+            self.assertEqual(connection.request(['enable', 'device1']), {"Enabled": "device1"})
+            self.assertEqual(mock_connect.call_count, 2)
+
+    def test_request_errors(self):
+        # Simulate failed connection (target node offline, wrong IP, etc)
+        with patch('api_endpoints.socket.create_connection', side_effect=OSError):
+            connection = PersistentConnection('192.168.1.123')
+            self.assertEqual(connection.request(['status']), "Error: Failed to connect")
+
+        # Simulate timed out read (target node event loop blocked)
+        self.mock_file.readline.side_effect = socket.timeout
+        with patch('api_endpoints.socket.create_connection', return_value=self.mock_socket):
+            connection = PersistentConnection('192.168.1.123')
+            self.assertEqual(
+                connection.request(['status']),
+                "Error: Timed out waiting for response"
+            )
+            # Confirm socket closed
+            self.assertIsNone(connection._sock)
+
+        # Simulate invalid response
+        self.mock_file.readline.side_effect = [b'not json\n']
+        with patch('api_endpoints.socket.create_connection', return_value=self.mock_socket):
+            connection = PersistentConnection('192.168.1.123')
+            self.assertEqual(
+                connection.request(['status']),
+                "Error: Unable to decode response"
+            )
+
+    def test_persistent_request(self):
+        persistent_connections.clear()
+        with patch.object(PersistentConnection, 'request', return_value={}) as mock_request:
+            persistent_request('192.168.1.123', ['status'])
+            persistent_request('192.168.1.123', ['status'])
+            persistent_request('192.168.1.234', ['status'])
+
+            # Confirm created 1 connection per IP, passed message to request
+            self.assertEqual(list(persistent_connections), ['192.168.1.123', '192.168.1.234'])
+            mock_request.assert_called_with(['status'])
+        persistent_connections.clear()
+
+
+class StatusSubscriptionTests(TestCase):
+    def setUp(self):
+        # Create mock socket, mock file object returned by makefile
+        self.mock_socket = MagicMock()
+        self.mock_socket.__enter__.return_value = self.mock_socket
+        self.mock_file = MagicMock()
+        self.mock_file.__enter__.return_value = self.mock_file
+        self.mock_socket.makefile.return_value = self.mock_file
+        self.subscription = StatusSubscription('192.168.1.123')
+
+    def test_listen_merges_events(self):
+        # Simulate full status event, changed device event, unchanged event
+        self.mock_file.readline.side_effect = [
+            json.dumps({'node_ms': 1, 'status': mock_status_object}).encode() + b'\n',
+            b'{"node_ms": 2, "status": {"devices": {"device1": {"enabled": false}}, '
+            b'"sensors": {}, "status_version": 8}}\n',
+            b'{"node_ms": 3, "status": {"unchanged": true, "status_version": 8}}\n',
+            b''
+        ]
+        with patch('api_endpoints.socket.create_connection', return_value=self.mock_socket):
+            with self.assertRaises(OSError):
+                self.subscription._listen()
+
+        # Confirm sent subscribe request, merged changed device into status
+        self.mock_socket.sendall.assert_called_once_with(b'["subscribe"]\n')
+        self.assertEqual(self.subscription.status['status_version'], 8)
+        self.assertEqual(self.subscription.status['devices']['device1'], {'enabled': False})
+        self.assertEqual(
+            self.subscription.status['devices']['device2'],
+            mock_status_object['devices']['device2']
+        )
+        self.assertEqual(self.subscription.status['metadata'], mock_status_object['metadata'])
+        self.assertNotIn('unchanged', self.subscription.status)
+
+    def test_listen_error_reply(self):
+        # Simulate node rejecting subscription
+        self.mock_file.readline.side_effect = [b'{"ERROR": "Too many subscribers"}']
+        with patch('api_endpoints.socket.create_connection', return_value=self.mock_socket):
+            with self.assertRaises(OSError):
+                self.subscription._listen()
+        self.assertIsNone(self.subscription.status)
+
+    def test_wait_for_change(self):
+        self.subscription.status = {'devices': {}, 'sensors': {}, 'status_version': 5}
+        with patch.object(self.subscription, '_start'):
+            # Confirm returns status immediately if version changed
+            self.assertEqual(self.subscription.wait_for_change(3, 1), self.subscription.status)
+
+            # Confirm returns unchanged after timeout if version did not change
+            self.assertEqual(
+                self.subscription.wait_for_change(5, 0.01),
+                {'unchanged': True, 'status_version': 5}
+            )
+
+            # Confirm unchanged reply includes boot_id if node reports it
+            self.subscription.status['boot_id'] = 1234
+            self.assertEqual(
+                self.subscription.wait_for_change(5, 0.01),
+                {'unchanged': True, 'status_version': 5, 'boot_id': 1234}
+            )
+
+            # Confirm returns None if unable to connect
+            self.subscription.status = None
+            self.subscription.error = 'Error: Failed to connect'
+            self.assertIsNone(self.subscription.wait_for_change(5, 1))
+
+    def test_get_subscription(self):
+        status_subscriptions.clear()
+        first = get_subscription('192.168.1.123')
+        self.assertIs(get_subscription('192.168.1.123'), first)
+        self.assertIsNot(get_subscription('192.168.1.234'), first)
+        status_subscriptions.clear()
+
+
 # Test function that takes all args, finds IP, and passes IP + remaining args to parse_command
 class TestParseIP(TestCase):
 
@@ -699,6 +861,19 @@ class TestEndpoints(TestCase):
                 {"Success": "Log level set (takes effect after reboot)"}
             )
 
+    def test_set_log_format(self):
+        # Mock request to return expected response
+        with patch(
+            'api_endpoints.request',
+            return_value={"Success": "Log format set (takes effect after reboot)"}
+        ):
+            # Send request, verify response
+            response = parse_command('192.168.1.123', ['set_log_format', 'binary'])
+            self.assertEqual(
+                response,
+                {"Success": "Log format set (takes effect after reboot)"}
+            )
+
     def test_condition_met(self):
         # Mock request to return expected response
         with patch('api_endpoints.request', return_value={'Condition': False}):
@@ -760,6 +935,78 @@ class TestEndpoints(TestCase):
             response = parse_command('192.168.1.123', ['mem_info'])
             self.assertEqual(response, mem_info)
 
+    def test_poll_stats(self):
+        poll_stats = {
+            "device1": {
+                "polls": 42,
+                "failures": 2,
+                "consecutive_failures": 0,
+                "last_latency_ms": 38,
+                "avg_latency_ms": 45,
+                "interval_ms": 5000,
+                "next_poll_ms": 3120
+            }
+        }
+        # Mock request to return expected response
+        with patch('api_endpoints.request', return_value=poll_stats):
+            # Send request, verify response
+            response = parse_command('192.168.1.123', ['poll_stats'])
+            self.assertEqual(response, poll_stats)
+
+    def test_sample_stats(self):
+        sample_stats = {
+            "sensor1": {
+                "reads": 120,
+                "failures": 0,
+                "last_duration_ms": 24,
+                "avg_duration_ms": 26,
+                "max_duration_ms": 41,
+                "last_lateness_ms": 3,
+                "max_lateness_ms": 112,
+                "interval_ms": 5000,
+                "next_read_ms": 2480
+            }
+        }
+        # Mock request to return expected response
+        with patch('api_endpoints.request', return_value=sample_stats):
+            # Send request, verify response
+            response = parse_command('192.168.1.123', ['sample_stats'])
+            self.assertEqual(response, sample_stats)
+
+    def test_time_sync(self):
+        time_sync = {
+            "host": "pool.ntp.org",
+            "utc_offset": -420,
+            "syncs": 12,
+            "failures": 1,
+            "last_error_ms": 38,
+            "last_delay_ms": 24,
+            "drift_ppm": 10.55,
+            "interval_ms": 9478672,
+            "last_sync_ms": 3600120
+        }
+        # Mock request to return expected response
+        with patch('api_endpoints.request', return_value=time_sync):
+            # Send request, verify response
+            response = parse_command('192.168.1.123', ['time_sync'])
+            self.assertEqual(response, time_sync)
+
+    def test_startup_profile(self):
+        startup_profile = {
+            "boot_us": 9482113,
+            "free": 58112,
+            "steps": {
+                "import": {"main": [1850223, 102400, 81920], "Thermostat": [92340, 66880, 64320]},
+                "phase": {"_api_calls": [4210551, 79872, 78720]},
+                "init": {"sensor1": [1204332, 64320, 63104]}
+            }
+        }
+        # Mock request to return expected response
+        with patch('api_endpoints.request', return_value=startup_profile):
+            # Send request, verify response
+            response = parse_command('192.168.1.123', ['startup_profile'])
+            self.assertEqual(response, startup_profile)
+
 
 # Confirm that correct errors are shown when endpoint arguments are omitted/incorrect
 class TestEndpointErrors(TestCase):
@@ -993,3 +1240,69 @@ class TestMain(TestCase):
 
         # Reset stdout
         sys.stdout = sys.__stdout__
+
+
+class RunCommandsTests(TestCase):
+    def test_run_commands_groups_by_ip(self):
+        # Mock request to return one reply per batched command
+        async def mock_request(ip, msg):
+            if isinstance(ip, CommandBatch):
+                return ip.add(msg)
+            return [{'ip': ip, 'cmd': cmd} for cmd in msg[1:]]
+
+        actions = [
+            ('192.168.1.123', ['turn_on', 'device1']),
+            ('192.168.1.234', ['disable', 'sensor1']),
+            ('192.168.1.123', ['set_rule', 'device2', '50']),
+            ('192.168.1.123', ['turn_on', 'sensor1']),
+            ('192.168.1.123', ['notacommand']),
+            ('192.168.1.234', [])
+        ]
+        with patch('api_endpoints.request', side_effect=mock_request) as mock_send:
+            responses = run_commands(actions)
+
+            # Confirm sent 1 batch request per node (not 1 per action)
+            sent = [call.args for call in mock_send.call_args_list if isinstance(call.args[0], str)]
+            self.assertEqual(sorted(sent), [
+                ('192.168.1.123', ['batch', ['turn_on', 'device1'], ['set_rule', 'device2', '50']]),
+                ('192.168.1.234', ['batch', ['disable', 'sensor1']])
+            ])
+
+        # Confirm responses in same order as actions, invalid commands were
+        # not sent and returned error from endpoint function or lookup
+        self.assertEqual(responses[0], {'ip': '192.168.1.123', 'cmd': ['turn_on', 'device1']})
+        self.assertEqual(responses[1], {'ip': '192.168.1.234', 'cmd': ['disable', 'sensor1']})
+        self.assertEqual(responses[2], {'ip': '192.168.1.123', 'cmd': ['set_rule', 'device2', '50']})
+        self.assertEqual(responses[3], {'ERROR': 'Can only turn on/off devices, use enable/disable for sensors'})
+        self.assertEqual(responses[4], 'Error: Command not found')
+        self.assertEqual(responses[5], 'Error: No command received')
+
+    def test_batch_unsupported(self):
+        # Simulate node firmware with no batch endpoint
+        async def mock_request(ip, msg):
+            if isinstance(ip, CommandBatch):
+                return ip.add(msg)
+            if msg[0] == 'batch':
+                return {'ERROR': 'Invalid command'}
+            return {'Enabled': msg[1]}
+
+        batch = CommandBatch('192.168.1.123')
+        batch.add(['enable', 'device1'])
+        batch.add(['enable', 'device2'])
+        with patch('api_endpoints.request', side_effect=mock_request) as mock_send:
+            # Confirm sent each command separately after batch failed
+            self.assertEqual(batch.send(), [{'Enabled': 'device1'}, {'Enabled': 'device2'}])
+            self.assertEqual(mock_send.call_count, 3)
+
+    def test_batch_split_into_chunks(self):
+        # Add commands larger than max batch size combined
+        batch = CommandBatch('192.168.1.123')
+        for i in range(4):
+            batch.add(['set_rule', 'device1', 'x' * 1000])
+        with patch('api_endpoints.request', AsyncMock(side_effect=[[1, 2, 3], [4]])) as mock_send:
+            self.assertEqual(batch.send(), [1, 2, 3, 4])
+            self.assertEqual(mock_send.call_count, 2)
+
+        # Confirm failed request returns error for each command
+        with patch('api_endpoints.request', AsyncMock(return_value="Error: Failed to connect")):
+            self.assertEqual(batch.send(), ["Error: Failed to connect"] * 4)
@@ -747,6 +747,36 @@ class InteractiveMenuTests(TestCase):
                 ("192.168.1.123", ["status"])
             )
 
+    def test_set_log_format_endpoint(self):
+        # Simulate user selecting node1, set_log_format, binary
+        self.mock_ask.unsafe_ask.side_effect = [
+            'node1',
+            'set_log_format',
+            'binary',
+            'Done',
+            'Done'
+        ]
+
+        # Mock parse_command to return status, then API response from ESP32,
+        # then status again (prompt restarts)
+        with patch('api_client.parse_command', side_effect=[
+            mock_status_object,
+            {"Success": "Log format set (takes effect after reboot)"},
+            mock_status_object
+        ]) as mock_parse_command:
+
+            # Run prompt, will complete immediately with mock input
+            api_prompt()
+
+            # Confirm called parse_command 3 times
+            self.assertEqual(mock_parse_command.call_count, 3)
+
+            # Second call: sent set_log_format command with correct arg
+            self.assertEqual(
+                mock_parse_command.call_args_list[1][0],
+                ("192.168.1.123", ["set_log_format", "binary"])
+            )
+
     def test_exit_without_selecting_node(self):
         # Simulate user selecting "Done" at node select prompt
         self.mock_ask.unsafe_ask.side_effect = ['Done']
@@ -1261,8 +1291,13 @@ class GetEndpointOptionsTests(TestCase):
                 'save_schedule_keywords',
                 'clear_log',
                 'set_log_level',
+                'set_log_format',
                 'set_gps_coords',
                 'mem_info',
+                'poll_stats',
+                'sample_stats',
+                'time_sync',
+                'startup_profile',
                 'Done'
             ]
         )
@@ -1306,10 +1341,15 @@ class GetEndpointOptionsTests(TestCase):
                 'get_attributes',
                 'clear_log',
                 'set_log_level',
+                'set_log_format',
                 'condition_met',
                 'trigger_sensor',
                 'set_gps_coords',
                 'mem_info',
+                'poll_stats',
+                'sample_stats',
+                'time_sync',
+                'startup_profile',
                 'Done'
             ]
         )
@@ -1353,10 +1393,15 @@ class GetEndpointOptionsTests(TestCase):
                 'get_attributes',
                 'clear_log',
                 'set_log_level',
+                'set_log_format',
                 'turn_on',
                 'turn_off',
                 'set_gps_coords',
                 'mem_info',
+                'poll_stats',
+                'sample_stats',
+                'time_sync',
+                'startup_profile',
                 'Done'
             ]
         )
@@ -1390,8 +1435,13 @@ class GetEndpointOptionsTests(TestCase):
                 'ir_run_macro',
                 'clear_log',
                 'set_log_level',
+                'set_log_format',
                 'set_gps_coords',
                 'mem_info',
+                'poll_stats',
+                'sample_stats',
+                'time_sync',
+                'startup_profile',
                 'Done'
             ]
         )
@@ -1438,10 +1488,15 @@ class GetEndpointOptionsTests(TestCase):
                 'get_climate',
                 'clear_log',
                 'set_log_level',
+                'set_log_format',
                 'condition_met',
                 'trigger_sensor',
                 'set_gps_coords',
                 'mem_info',
+                'poll_stats',
+                'sample_stats',
+                'time_sync',
+                'startup_profile',
                 'Done'
             ]
         )
@@ -1485,12 +1540,17 @@ class GetEndpointOptionsTests(TestCase):
                 'get_attributes',
                 'clear_log',
                 'set_log_level',
+                'set_log_format',
                 'condition_met',
                 'trigger_sensor',
                 'set_gps_coords',
                 'load_cell_tare',
                 'load_cell_read',
                 'mem_info',
+                'poll_stats',
+                'sample_stats',
+                'time_sync',
+                'startup_profile',
                 'Done'
             ]
         )
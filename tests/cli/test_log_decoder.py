@@ -0,0 +1,105 @@
+# pylint: disable=line-too-long, missing-function-docstring, missing-module-docstring, missing-class-docstring
+
+import struct
+from unittest import TestCase
+from log_decoder import decode_log, format_line, MAGIC
+
+TEXT_LOG = (
+    b'2026-01-01 12:00:00 - CRITICAL - Boot - Booted, log level: ERROR, log format: text\n'
+    b'2026-01-01 12:00:05 - ERROR - API - Failed to sync time\n'
+)
+
+
+def definition(string_id, string):
+    '''Returns definition record (same format as BinaryRingBufferHandler)'''
+    string = string.encode()
+    return struct.pack('<BHH', 0, string_id, len(string)) + string
+
+
+def record(level, timestamp, name_id, msg_id, args=b'', count=0):
+    '''Returns log record with packed args (same format as BinaryRingBufferHandler)'''
+    return struct.pack('<BIHHB', level, timestamp, name_id, msg_id, count) + args
+
+
+def string_arg(kind, value):
+    '''Returns packed arg stored as string (LONG, FLOAT, or STR type)'''
+    value = value.encode()
+    return struct.pack('<BH', kind, len(value)) + value
+
+
+# 2026-01-01 12:00:00 in seconds since 2000-01-01
+TIMESTAMP = 820584000
+
+# Segment with 2 loggers, 3 format strings, and every arg type
+BINARY_LOG = (
+    MAGIC
+    + definition(0, 'Boot')
+    + definition(1, 'Booted, log level: %s, log format: %s')
+    + record(50, TIMESTAMP, 0, 1, string_arg(6, 'ERROR') + string_arg(6, 'binary'), 2)
+    + definition(2, 'Relay(relay1)')
+    + definition(3, 'enabled=%s, rule=%d, big=%d, temp=%s, target=%r')
+    + record(
+        20, TIMESTAMP + 5, 2, 3,
+        b'\x01' + struct.pack('<Bi', 3, -5) + string_arg(4, '1099511627776') + string_arg(5, '21.5') + b'\x00',
+        5
+    )
+    + record(40, TIMESTAMP + 65, 0, 3, b'\x02', 1)
+)
+
+
+class TestLogDecoder(TestCase):
+
+    def test_format_line(self):
+        # Confirm same format as text log
+        self.assertEqual(
+            format_line(TIMESTAMP, 40, 'API', 'Request %s took %dms', ('status', 15)),
+            '2026-01-01 12:00:00 - ERROR - API - Request status took 15ms\n'
+        )
+
+        # Confirm unknown level and args that do not match format string
+        # are decoded instead of raising exception
+        self.assertEqual(
+            format_line(0, 25, 'API', 'Request %d', ('status',)),
+            "2000-01-01 00:00:00 - LVL25 - API - Request %d ('status',)\n"
+        )
+
+    def test_decode_text_log(self):
+        # Confirm text log returned unchanged
+        self.assertEqual(decode_log(TEXT_LOG), TEXT_LOG.decode())
+        self.assertEqual(decode_log(b''), '')
+
+    def test_decode_binary_log(self):
+        # Confirm all arg types decoded, args that do not match format string
+        # (1 arg, 5 placeholders) appended to message
+        self.assertEqual(decode_log(BINARY_LOG), (
+            '2026-01-01 12:00:00 - CRITICAL - Boot - Booted, log level: ERROR, log format: binary\n'
+            '2026-01-01 12:00:05 - INFO - Relay(relay1) - enabled=True, rule=-5, big=1099511627776, temp=21.5, target=None\n'
+            "2026-01-01 12:01:05 - ERROR - Boot - enabled=%s, rule=%d, big=%d, temp=%s, target=%r (False,)\n"
+        ))
+
+    def test_decode_multiple_segments(self):
+        # Simulate log format changed from text to binary and back (text
+        # segment, binary segment, binary segment after reboot, text segment)
+        # Second binary segment redefines id 0 (ids assigned on each boot)
+        reboot = MAGIC + definition(0, 'Other') + definition(1, 'no args') + record(30, TIMESTAMP, 0, 1)
+        data = TEXT_LOG + BINARY_LOG + reboot + TEXT_LOG
+        lines = decode_log(data).splitlines()
+        self.assertEqual(len(lines), 8)
+        self.assertEqual(lines[:2], TEXT_LOG.decode().splitlines())
+        self.assertTrue(lines[2].endswith('CRITICAL - Boot - Booted, log level: ERROR, log format: binary'))
+        self.assertEqual(lines[5], '2026-01-01 12:00:00 - WARNING - Other - no args')
+        self.assertEqual(lines[6:], TEXT_LOG.decode().splitlines())
+
+    def test_decode_invalid_binary_data(self):
+        # Confirm record using undefined id is not decoded (not a binary
+        # record), returned as text
+        invalid = record(50, TIMESTAMP, 0, 7)
+        data = MAGIC + definition(0, 'Boot') + invalid
+        self.assertEqual(decode_log(data), invalid.decode('utf-8', errors='replace'))
+
+        # Confirm partially written record at end of segment is not decoded,
+        # following segment is still decoded
+        data = BINARY_LOG[:-1] + BINARY_LOG
+        lines = decode_log(data).splitlines()
+        self.assertEqual(lines[:2], decode_log(BINARY_LOG).splitlines()[:2])
+        self.assertEqual(lines[-3:], decode_log(BINARY_LOG).splitlines())
@@ -264,11 +264,17 @@ class TestInstantiation(TestCase):
             os.path.join(repo, 'tests', 'firmware', 'test_core_util.py'): 'test_core_util.py',
             os.path.join(repo, 'tests', 'firmware', 'test_core_group.py'): 'test_core_group.py',
             os.path.join(repo, 'tests', 'firmware', 'test_core_wifi_setup.py'): 'test_core_wifi_setup.py',
+            os.path.join(repo, 'tests', 'firmware', 'test_core_json_stream.py'): 'test_core_json_stream.py',
+            os.path.join(repo, 'tests', 'firmware', 'test_core_poll_scheduler.py'): 'test_core_poll_scheduler.py',
+            os.path.join(repo, 'tests', 'firmware', 'test_core_sensor_sampler.py'): 'test_core_sensor_sampler.py',
             os.path.join(repo, 'core', 'Instance.py'): 'Instance.py',
             os.path.join(repo, 'core', 'Config.py'): 'Config.py',
             os.path.join(repo, 'core', 'Group.py'): 'Group.py',
             os.path.join(repo, 'core', 'SoftwareTimer.py'): 'SoftwareTimer.py',
             os.path.join(repo, 'core', 'app_context.py'): 'app_context.py',
+            os.path.join(repo, 'core', 'json_stream.py'): 'json_stream.py',
+            os.path.join(repo, 'core', 'PollScheduler.py'): 'PollScheduler.py',
+            os.path.join(repo, 'core', 'SensorSampler.py'): 'SensorSampler.py',
             os.path.join(repo, 'core', 'Api.py'): 'Api.py',
             os.path.join(repo, 'core', 'util.py'): 'util.py',
             os.path.join(repo, 'tests', 'firmware', 'unit_test_main.py'): 'main.py'
@@ -453,6 +459,9 @@ class TestGetModules(TestCase):
             os.path.join(repo, 'core', 'Group.py'): 'Group.py',
             os.path.join(repo, 'core', 'SoftwareTimer.py'): 'SoftwareTimer.py',
             os.path.join(repo, 'core', 'app_context.py'): 'app_context.py',
+            os.path.join(repo, 'core', 'json_stream.py'): 'json_stream.py',
+            os.path.join(repo, 'core', 'PollScheduler.py'): 'PollScheduler.py',
+            os.path.join(repo, 'core', 'SensorSampler.py'): 'SensorSampler.py',
             os.path.join(repo, 'core', 'Api.py'): 'Api.py',
             os.path.join(repo, 'core', 'util.py'): 'util.py',
             os.path.join(repo, 'core', 'main.py'): 'main.py'
@@ -467,6 +476,9 @@ class TestGetModules(TestCase):
             os.path.join(repo, 'core', 'Group.py'): 'Group.py',
             os.path.join(repo, 'core', 'SoftwareTimer.py'): 'SoftwareTimer.py',
             os.path.join(repo, 'core', 'app_context.py'): 'app_context.py',
+            os.path.join(repo, 'core', 'json_stream.py'): 'json_stream.py',
+            os.path.join(repo, 'core', 'PollScheduler.py'): 'PollScheduler.py',
+            os.path.join(repo, 'core', 'SensorSampler.py'): 'SensorSampler.py',
             os.path.join(repo, 'core', 'Api.py'): 'Api.py',
             os.path.join(repo, 'core', 'util.py'): 'util.py',
             os.path.join(repo, 'core', 'main.py'): 'main.py'
@@ -503,6 +515,9 @@ class TestGetModules(TestCase):
             os.path.join(repo, 'core', 'Group.py'): 'Group.py',
             os.path.join(repo, 'core', 'SoftwareTimer.py'): 'SoftwareTimer.py',
             os.path.join(repo, 'core', 'app_context.py'): 'app_context.py',
+            os.path.join(repo, 'core', 'json_stream.py'): 'json_stream.py',
+            os.path.join(repo, 'core', 'PollScheduler.py'): 'PollScheduler.py',
+            os.path.join(repo, 'core', 'SensorSampler.py'): 'SensorSampler.py',
             os.path.join(repo, 'core', 'Api.py'): 'Api.py',
             os.path.join(repo, 'core', 'util.py'): 'util.py',
             os.path.join(repo, 'core', 'main.py'): 'main.py'
@@ -537,6 +552,9 @@ class TestGetModules(TestCase):
             os.path.join(repo, 'core', 'Group.py'): 'Group.py',
             os.path.join(repo, 'core', 'SoftwareTimer.py'): 'SoftwareTimer.py',
             os.path.join(repo, 'core', 'app_context.py'): 'app_context.py',
+            os.path.join(repo, 'core', 'json_stream.py'): 'json_stream.py',
+            os.path.join(repo, 'core', 'PollScheduler.py'): 'PollScheduler.py',
+            os.path.join(repo, 'core', 'SensorSampler.py'): 'SensorSampler.py',
             os.path.join(repo, 'core', 'Api.py'): 'Api.py',
             os.path.join(repo, 'core', 'util.py'): 'util.py',
             os.path.join(repo, 'core', 'main.py'): 'main.py'
@@ -570,6 +588,9 @@ class TestGetModules(TestCase):
             os.path.join(repo, 'core', 'Group.py'): 'Group.py',
             os.path.join(repo, 'core', 'SoftwareTimer.py'): 'SoftwareTimer.py',
             os.path.join(repo, 'core', 'app_context.py'): 'app_context.py',
+            os.path.join(repo, 'core', 'json_stream.py'): 'json_stream.py',
+            os.path.join(repo, 'core', 'PollScheduler.py'): 'PollScheduler.py',
+            os.path.join(repo, 'core', 'SensorSampler.py'): 'SensorSampler.py',
             os.path.join(repo, 'core', 'Api.py'): 'Api.py',
             os.path.join(repo, 'core', 'util.py'): 'util.py',
             os.path.join(repo, 'core', 'main.py'): 'main.py'
@@ -0,0 +1,236 @@
+# pylint: disable=line-too-long, missing-function-docstring, missing-module-docstring, missing-class-docstring
+
+import io
+import os
+import sys
+import tempfile
+import importlib.util
+from unittest import TestCase
+from unittest.mock import patch
+from log_decoder import decode_log
+
+# Load firmware logging library (lib/logging.py) under a different name (would
+# shadow standard library logging), uio is the micropython name of io
+sys.modules.setdefault('uio', io)
+spec = importlib.util.spec_from_file_location(
+    'firmware_logging',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'lib', 'logging.py')
+)
+firmware_logging = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(firmware_logging)
+
+
+def record(msg, *args, level=firmware_logging.INFO, name='Test'):
+    '''Returns LogRecord with given message, args, level, and logger name'''
+    return firmware_logging.LogRecord(name, level, None, None, msg, args, None)
+
+
+class TestRingBufferHandler(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp.name, 'app.log')
+
+        # Each line is 15 bytes ("INFO - line 00\n"), 6 lines fit in segment
+        self.handler = firmware_logging.RingBufferHandler(
+            self.filename,
+            segment_size=100,
+            segments=3,
+            flush_size=10000,
+            max_buffer=50
+        )
+        self.handler.setFormatter(firmware_logging.Formatter('%(levelname)s - %(message)s'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, suffix=''):
+        '''Returns list of lines in log segment with given suffix'''
+        with open(self.filename + suffix, 'r', encoding='utf-8') as file:
+            return file.read().splitlines()
+
+    def test_segment_rotation(self):
+        for i in range(20):
+            self.handler.emit(record('line %02d', i))
+        self.handler.flush()
+
+        # Confirm oldest segment deleted, newest lines kept in 3 segments
+        # (full segments have 6 lines, current segment has remaining 2)
+        self.assertEqual(self.read('.2'), [f'INFO - line {i:02d}' for i in range(6, 12)])
+        self.assertEqual(self.read('.1'), [f'INFO - line {i:02d}' for i in range(12, 18)])
+        self.assertEqual(self.read(), ['INFO - line 18', 'INFO - line 19'])
+        self.assertFalse(os.path.exists(self.filename + '.3'))
+        self.assertEqual(self.handler._buffer, [])
+        self.assertEqual(self.handler._size, 30)
+
+        # Confirm next flush appends to current segment (size tracked)
+        self.handler.emit(record('line %02d', 20))
+        self.handler.flush()
+        self.assertEqual(self.read(), ['INFO - line 18', 'INFO - line 19', 'INFO - line 20'])
+
+    def test_repeated_messages(self):
+        self.handler.segment_size = 10000
+
+        # Log same message 3 times, confirm written once followed by count
+        for _ in range(3):
+            self.handler.emit(record('Poll failed: %s', 'timeout'))
+        self.handler.emit(record('Poll succeeded'))
+
+        # Confirm pending repeat count written by flush
+        self.handler.emit(record('Poll succeeded'))
+        self.handler.flush()
+        self.assertEqual(self.read(), [
+            'INFO - Poll failed: timeout',
+            'INFO - Last message repeated 2 times',
+            'INFO - Poll succeeded',
+            'INFO - Last message repeated 1 times'
+        ])
+
+        # Confirm different args are not counted as repeat
+        self.handler.emit(record('Poll failed: %s', 'timeout'))
+        self.handler.emit(record('Poll failed: %s', 'refused'))
+        self.handler.flush()
+        self.assertEqual(self.read()[-2:], ['INFO - Poll failed: timeout', 'INFO - Poll failed: refused'])
+
+    def test_rate_limit(self):
+        self.handler.rate_limit = 5
+        self.handler.segment_size = 10000
+
+        with patch('time.time', return_value=1000.0):
+            # Confirm rate limit not applied before start_rate_limit (boot)
+            for i in range(10):
+                self.handler.emit(record('boot %d', i))
+            self.handler.start_rate_limit()
+
+            # Log 8 messages in same second, confirm only 5 kept
+            for i in range(8):
+                self.handler.emit(record('flood %d', i))
+
+            # Confirm CRITICAL never dropped
+            self.handler.emit(record('critical', level=firmware_logging.CRITICAL))
+
+        # Log message in next second, confirm summary written first
+        with patch('time.time', return_value=1001.0):
+            self.handler.emit(record('next second'))
+        self.handler.flush()
+
+        lines = self.read()
+        self.assertEqual(lines[:10], [f'INFO - boot {i}' for i in range(10)])
+        self.assertEqual(lines[10:], [
+            'INFO - flood 0',
+            'INFO - flood 1',
+            'INFO - flood 2',
+            'INFO - flood 3',
+            'INFO - flood 4',
+            'WARNING - Rate limit exceeded, dropped 3 messages',
+            'CRITICAL - critical',
+            'INFO - next second'
+        ])
+
+    def test_flush_write_failed(self):
+        for i in range(6):
+            self.handler.emit(record('line %02d', i))
+
+        # Simulate write failure (eg filesystem full), confirm oldest lines
+        # discarded until buffer fits in max_buffer (50 bytes)
+        with patch.object(firmware_logging, 'open', side_effect=OSError, create=True):
+            self.handler.flush()
+        self.assertEqual(self.handler._buffer, ['INFO - line 03\n', 'INFO - line 04\n', 'INFO - line 05\n'])
+        self.assertEqual(self.handler._buffered, 45)
+
+        # Confirm kept lines written by next successful flush
+        self.handler.flush()
+        self.assertEqual(self.read(), ['INFO - line 03', 'INFO - line 04', 'INFO - line 05'])
+        self.assertEqual(self.handler._buffered, 0)
+
+    def test_clear(self):
+        for i in range(10):
+            self.handler.emit(record('line %02d', i))
+        self.handler.flush()
+        self.handler.emit(record('buffered'))
+        self.assertTrue(os.path.exists(self.filename + '.1'))
+
+        # Confirm all segments deleted, buffered lines discarded, empty
+        # current segment created
+        self.handler.clear()
+        self.assertFalse(os.path.exists(self.filename + '.1'))
+        self.assertEqual(self.read(), [])
+        self.assertEqual(self.handler._buffer, [])
+        self.assertEqual(self.handler._size, 0)
+
+        # Confirm next flush only writes new lines
+        self.handler.emit(record('after clear'))
+        self.handler.flush()
+        self.assertEqual(self.read(), ['INFO - after clear'])
+
+
+class TestBinaryRingBufferHandler(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp.name, 'app.log')
+        self.handler = firmware_logging.BinaryRingBufferHandler(
+            self.filename,
+            max_strings=4,
+            max_string_length=40,
+            segment_size=150,
+            segments=5,
+            flush_size=10000
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_all(self):
+        '''Returns contents of all log segments concatenated oldest to newest'''
+        data = b''
+        for suffix in ('.4', '.3', '.2', '.1', ''):
+            if os.path.exists(self.filename + suffix):
+                with open(self.filename + suffix, 'rb') as file:
+                    data += file.read()
+        return data
+
+    def test_round_trip(self):
+        traceback = 'Exception in poll\nTraceback (most recent call last):\n  File "Tplink.py", line 120\nOSError: 113'
+
+        # 2026-01-01 12:00:00 (binary timestamps are decoded without timezone)
+        with patch('time.time', return_value=1767268800.0):
+            records = [
+                record('Booted, log level: %s', 'DEBUG', level=firmware_logging.CRITICAL, name='Boot'),
+                record('on=%s rule=%d big=%d temp=%s target=%r', True, -5, 2 ** 40, 21.5, None),
+                record('no args'),
+                record('no args'),
+                record(traceback, level=firmware_logging.ERROR),
+                record('Long message with args %s, %s, %s, %s', 'a', 'b', 'c', 'd'),
+                record('String %s', 'past max_strings limit'),
+                record('line %d', 1),
+                record('line %d', 2)
+            ]
+            for item in records:
+                self.handler.emit(item)
+            self.handler.flush()
+
+        # Confirm written in several segments (each redefines its strings)
+        self.assertTrue(os.path.exists(self.filename + '.1'))
+
+        # Confirm decoded log matches text log format
+        prefix = '2026-01-01 12:00:00 - '
+        self.assertEqual(decode_log(self.read_all()).splitlines(), [
+            prefix + 'CRITICAL - Boot - Booted, log level: DEBUG',
+            prefix + 'INFO - Test - on=True rule=-5 big=1099511627776 temp=21.5 target=None',
+            prefix + 'INFO - Test - no args',
+            prefix + 'INFO - Test - Last message repeated 1 times',
+        ] + (prefix + 'ERROR - Test - ' + traceback).splitlines() + [
+            prefix + 'INFO - Test - Long message with args a, b, c, d',
+            prefix + 'INFO - Test - String past max_strings limit',
+            prefix + 'INFO - Test - line 1',
+            prefix + 'INFO - Test - line 2'
+        ])
+
+        # Confirm messages longer than max_string_length and messages after
+        # max_strings limit were not interned (logger names always are)
+        self.assertNotIn(traceback, self.handler._strings)
+        self.assertNotIn('Long message with args %s, %s, %s, %s', self.handler._strings)
+        self.assertNotIn('line %d', self.handler._strings)
+        self.assertIn('Booted, log level: %s', self.handler._strings)
+        self.assertIn('Test', self.handler._strings)
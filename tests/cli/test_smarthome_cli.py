@@ -92,6 +92,30 @@ class TestCommandLineArguments(TestCase):
             main()
             mock_config_main.assert_called_once()
 
+    def test_decode_log_arg(self):
+        # Mock --decode-log arg with path to binary log file
+        mock_log = b'BLG1\x00\x00\x00\x04\x00Boot\x00\x01\x00\x02\x00%s\x32\x00\x00\x00\x00\x00\x00\x01\x00\x01\x06\x02\x00hi'
+        with patch('sys.argv', ['smarthome_cli', '--decode-log', 'app.log']), \
+             patch('builtins.open', mock_open(read_data=mock_log)) as mock_file, \
+             patch('builtins.print') as mock_print:
+
+            # Simulate calling from command line, confirm prints decoded log
+            main()
+            mock_file.assert_called_once_with('app.log', 'rb')
+            mock_print.assert_called_once_with(
+                '2000-01-01 00:00:00 - CRITICAL - Boot - hi\n',
+                end=''
+            )
+
+        # Mock --decode-log arg with path to file that does not exist
+        with patch('sys.argv', ['smarthome_cli', '--decode-log', 'missing.log']), \
+             patch('builtins.open', side_effect=FileNotFoundError), \
+             patch('builtins.print') as mock_print:
+
+            # Simulate calling from command line, confirm prints error
+            main()
+            mock_print.assert_called_once_with('Error: missing.log not found')
+
     def test_invalid_arg(self):
         # Mock invalid arg (should print example usage)
         with patch('sys.argv', ['smarthome_cli', '--invalid']), \
@@ -110,8 +134,8 @@ class TestCommandLineArguments(TestCase):
             mock_provision_main.assert_not_called()
             mock_config_main.assert_not_called()
 
-            # Confirm called print 4 times (example usage)
-            self.assertEqual(mock_print.call_count, 4)
+            # Confirm called print 5 times (example usage)
+            self.assertEqual(mock_print.call_count, 5)
 
 
 class TestMainPrompt(TestCase):
@@ -925,7 +949,7 @@ class TestManageNodeFunctions(TestCase):
 
         # Create mock Webrepl instance to confirm methods were called
         mock_connection = MagicMock()
-        mock_connection.get_file_mem = MagicMock(return_value=b'mock_log')
+        mock_connection.get_log_mem = MagicMock(return_value=b'mock_log')
         mock_connection.close_connection = MagicMock()
 
         # Mock select prompt to return mocked node selection
@@ -948,8 +972,8 @@ class TestManageNodeFunctions(TestCase):
             # Confirm Webrepl was instantiated with selected node IP + webrepl password
             mock_webrepl_class.assert_called_once_with('192.168.1.123', 'password')
 
-            # Confirm get_file_mem was called with name of log file
-            mock_connection.get_file_mem.assert_called_once_with('app.log')
+            # Confirm get_log_mem was called to download log
+            mock_connection.get_log_mem.assert_called_once()
 
             # Confirm connection was closed
             mock_connection.close_connection.assert_called_once()
@@ -970,7 +994,7 @@ class TestManageNodeFunctions(TestCase):
 
         # Create mock Webrepl instance to confirm methods were called
         mock_connection = MagicMock()
-        mock_connection.get_file_mem = MagicMock(return_value=b'mock_log')
+        mock_connection.get_log_mem = MagicMock(return_value=b'mock_log')
 
         # Mock select prompt to return mocked node selection
         # Mock text prompt to return mocked log filename
@@ -992,8 +1016,8 @@ class TestManageNodeFunctions(TestCase):
             # Confirm Webrepl was instantiated with selected node IP + webrepl password
             mock_webrepl_class.assert_called_once_with('192.168.1.123', 'password')
 
-            # Confirm get_file_mem was called with name of log file
-            mock_connection.get_file_mem.assert_called_once_with('app.log')
+            # Confirm get_log_mem was called to download log
+            mock_connection.get_log_mem.assert_called_once()
 
             # Confirm pager was called with decoded log
             mock_pager.assert_called_once_with('mock_log')
@@ -1009,7 +1033,7 @@ class TestManageNodeFunctions(TestCase):
 
         # Create mock Webrepl instance, simulate connection error while reading
         mock_connection = MagicMock()
-        mock_connection.get_file_mem = MagicMock(side_effect=OSError)
+        mock_connection.get_log_mem = MagicMock(side_effect=OSError)
 
         # Mock select prompt to return mocked node selection
         # Mock text prompt to return mocked log filename
@@ -1030,8 +1054,8 @@ class TestManageNodeFunctions(TestCase):
             # Confirm Webrepl was instantiated with selected node IP + webrepl password
             mock_webrepl_class.assert_called_once_with('192.168.1.123', 'password')
 
-            # Confirm get_file_mem was called with name of log file
-            mock_connection.get_file_mem.assert_called_once_with('app.log')
+            # Confirm get_log_mem was called to download log
+            mock_connection.get_log_mem.assert_called_once()
 
             # Confirm pager was NOT called (exits when connection error occurs)
             mock_pager.assert_not_called()
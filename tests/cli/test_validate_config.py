@@ -104,6 +104,74 @@ class ValidateConfigTests(TestCase):
             'Invalid URI localhost'
         )
 
+    def test_sensor_debounce(self):
+        # Confirm optional debounce window accepted
+        self.valid_config['sensor1']['debounce_ms'] = 50
+        self.assertIs(validate_full_config(self.valid_config), True)
+
+        # Confirm negative and non-integer windows rejected
+        self.valid_config['sensor1']['debounce_ms'] = -5
+        self.assertEqual(
+            validate_full_config(self.valid_config),
+            'Invalid debounce_ms -5 (must be non-negative integer)'
+        )
+        self.valid_config['sensor1']['debounce_ms'] = '50'
+        self.assertEqual(
+            validate_full_config(self.valid_config),
+            'Invalid debounce_ms 50 (must be non-negative integer)'
+        )
+
+    def test_sensor_sample_interval(self):
+        # Confirm optional sample interval accepted
+        self.valid_config['sensor5']['sample_interval'] = 30000
+        self.assertIs(validate_full_config(self.valid_config), True)
+
+        # Confirm intervals below 100ms and non-integer intervals rejected
+        self.valid_config['sensor5']['sample_interval'] = 50
+        self.assertEqual(
+            validate_full_config(self.valid_config),
+            'Invalid sample_interval 50 (must be integer >= 100)'
+        )
+        self.valid_config['sensor5']['sample_interval'] = True
+        self.assertEqual(
+            validate_full_config(self.valid_config),
+            'Invalid sample_interval True (must be integer >= 100)'
+        )
+
+    def test_sensor_max_age(self):
+        # Confirm optional max reading age accepted
+        self.valid_config['sensor5']['max_age'] = 60000
+        self.assertIs(validate_full_config(self.valid_config), True)
+
+        # Confirm ages below 100ms and non-integer ages rejected
+        self.valid_config['sensor5']['max_age'] = 50
+        self.assertEqual(
+            validate_full_config(self.valid_config),
+            'Invalid max_age 50 (must be integer >= 100)'
+        )
+        self.valid_config['sensor5']['max_age'] = '60000'
+        self.assertEqual(
+            validate_full_config(self.valid_config),
+            'Invalid max_age 60000 (must be integer >= 100)'
+        )
+
+    def test_ntp_server(self):
+        # Confirm optional NTP server accepted
+        self.valid_config['metadata']['ntp_server'] = '192.168.1.1'
+        self.assertIs(validate_full_config(self.valid_config), True)
+
+        # Confirm empty string and non-string values rejected
+        self.valid_config['metadata']['ntp_server'] = ''
+        self.assertEqual(
+            validate_full_config(self.valid_config),
+            'Invalid ntp_server  (must be IP or hostname)'
+        )
+        self.valid_config['metadata']['ntp_server'] = 123
+        self.assertEqual(
+            validate_full_config(self.valid_config),
+            'Invalid ntp_server 123 (must be IP or hostname)'
+        )
+
     def test_thermostat_tolerance_out_of_range(self):
         self.valid_config['sensor5']['tolerance'] = 12.5
         result = validate_full_config(self.valid_config)
@@ -8,6 +8,7 @@ import unittest
 from machine import reset, Pin
 import app_context
 from Config import Config
+from DimmableLight import fade_scheduler, FADE_TIMER
 from cpython_only import cpython_only
 
 # Read mock API receiver address
@@ -136,6 +137,11 @@ class TestApi(unittest.TestCase):
         except OSError:
             pass
 
+        try:
+            os.remove('log_format.py')
+        except OSError:
+            pass
+
     @classmethod
     def tearDownClass(cls):
         try:
@@ -148,11 +154,18 @@ class TestApi(unittest.TestCase):
         except OSError:
             pass
 
+        try:
+            os.remove('log_format.py')
+        except OSError:
+            pass
+
     def tearDown(self):
         # Cancel timers started by endpoints after each test
         app_context.timer_instance.cancel('rebuild_queue')
+        app_context.config_instance._pending_rebuild = []
         app_context.timer_instance.cancel('device1_enable_in')
-        app_context.timer_instance.cancel('device1_fade')
+        fade_scheduler.active.clear()
+        app_context.timer_instance.cancel(FADE_TIMER)
         asyncio.run(self.sleep(10))
 
     async def request(self, msg):
@@ -160,7 +173,7 @@ class TestApi(unittest.TestCase):
         try:
             writer.write('{}\n'.format(json.dumps(msg)).encode())
             await writer.drain()
-            res = await asyncio.wait_for(reader.read(1500), timeout=1)
+            res = await asyncio.wait_for(reader.read(), timeout=1)
         except asyncio.TimeoutError:
             return "Error: Timed out waiting for response"
         except OSError:
@@ -185,7 +198,7 @@ class TestApi(unittest.TestCase):
             writer.write('Accept-Language: en-US,en;q=0.5\r\n'.encode())
             writer.write('\r\n\r\n'.encode())
             await writer.drain()
-            res = await reader.read(1500)
+            res = await asyncio.wait_for(reader.read(), timeout=1)
         except OSError:
             pass
         writer.close()
@@ -313,7 +326,7 @@ class TestApi(unittest.TestCase):
         response = self.send_command(['set_rule', 'device1', 'fade%2F50%2F3600'])
         self.assertEqual(response, {'device1': 'fade/50/3600'})
         # Confirm timer added to queue
-        self.assertIn('device1_fade', str(app_context.timer_instance.schedule))
+        self.assertIn(FADE_TIMER, str(app_context.timer_instance.schedule))
 
     def test_08_increment_rule(self):
         # Set known starting values
@@ -487,8 +500,18 @@ class TestApi(unittest.TestCase):
         response = self.send_command(['add_schedule_keyword', {'invalid': '3:00'}])
         self.assertEqual(response, {"ERROR": "Timestamp format must be HH:MM (no AM/PM)"})
 
-        # Confirm created timer to rebuild queue with new keyword timestamp
+        # Confirm did not create rebuild timer (no rules use new keyword)
+        self.assertTrue("rebuild_queue" not in str(app_context.timer_instance.schedule))
+
+        # Add rule using keyword, rebuild queue (adds device1 to keyword index)
+        self.device1.schedule['sleep'] = 50
+        app_context.config_instance._build_instance_queue(self.device1)
+
+        # Change keyword timestamp, confirm created timer to rebuild device1
+        response = self.send_command(['add_schedule_keyword', {'sleep': '22:00'}])
+        self.assertEqual(response, {"Keyword added": 'sleep', "time": '22:00'})
         self.assertIn("rebuild_queue", str(app_context.timer_instance.schedule))
+        self.assertEqual(app_context.config_instance._pending_rebuild, [self.device1])
 
     def test_17_remove_schedule_keyword(self):
         # Confirm no rebuild_queue timer in queue
@@ -514,6 +537,10 @@ class TestApi(unittest.TestCase):
 
         # Confirm created timer to rebuild queue without deleted keyword
         self.assertIn("rebuild_queue", str(app_context.timer_instance.schedule))
+        self.assertEqual(
+            app_context.config_instance._pending_rebuild,
+            [self.device1, self.sensor1]
+        )
 
     def test_18_save_schedule_keywords(self):
         response = self.send_command(['save_schedule_keywords'])
@@ -936,6 +963,9 @@ class TestApi(unittest.TestCase):
         response = self.send_command(['set_log_level'])
         self.assertEqual(response, {'ERROR': 'Invalid syntax'})
 
+        response = self.send_command(['set_log_format'])
+        self.assertEqual(response, {'ERROR': 'Invalid syntax'})
+
         response = self.send_command(['ir_key'])
         self.assertEqual(response, {'ERROR': 'Invalid syntax'})
 
@@ -1083,7 +1113,9 @@ class TestApi(unittest.TestCase):
                 'default_rule': 'enabled',
                 'scheduled_rule': 'enabled',
                 'current_rule': 'enabled',
-                'switch_closed': bool(Pin(19, Pin.IN, Pin.PULL_DOWN).value())
+                'switch_closed': bool(Pin(19, Pin.IN, Pin.PULL_DOWN).value()),
+                'debounce_ms': 0,
+                'coalesced_refreshes': 0
             }
         )
 
@@ -1148,6 +1180,332 @@ class TestApi(unittest.TestCase):
         self.assertEqual(self.device1.current_rule, 100)
         self.assertEqual(response, {'device1': 100})
 
+    def test_58_read_only_endpoints_do_not_wait_for_lock(self):
+        from Api import lock
+
+        async def request_while_locked():
+            # Hold lock (simulate slow client connected to mutating endpoint)
+            async with lock:
+                status = await self.request(['status'])
+                condition = await self.request(['condition_met', 'sensor2'])
+                enable = await self.request(['enable', 'device1'])
+            return status, condition, enable
+
+        status, condition, enable = asyncio.run(request_while_locked())
+
+        # Confirm read-only endpoints responded while lock was held
+        self.assertIsInstance(status, dict)
+        self.assertIn('Condition', condition)
+
+        # Confirm mutating endpoint waited for lock (client timed out)
+        self.assertEqual(enable, "Error: Timed out waiting for response")
+
+    def test_59_request_exceeds_max_size(self):
+        # Send request longer than MAX_REQUEST_SIZE, confirm connection closed
+        # without response (client receives empty response)
+        from Api import MAX_REQUEST_SIZE
+        response = self.send_command(['set_rule', 'device1', 'x' * MAX_REQUEST_SIZE])
+        self.assertEqual(response, "Error: Unable to decode response")
+
+        # Confirm API still responds to normal requests
+        response = self.send_command(['status'])
+        self.assertIsInstance(response, dict)
+
+    def test_60_keepalive_connection(self):
+        async def keepalive_requests():
+            reader, writer = await asyncio.open_connection(ip, 8123)
+            responses = []
+            for msg in [
+                {'id': 1, 'cmd': ['status']},
+                {'id': 2, 'cmd': ['enable', 'device1']},
+                {'id': 3, 'cmd': ['notacommand']},
+                {'id': 4, 'cmd': ['_run_client']},
+                {'id': 5, 'cmd': []}
+            ]:
+                writer.write('{}\n'.format(json.dumps(msg)).encode())
+                await writer.drain()
+                res = await asyncio.wait_for(reader.readline(), timeout=1)
+                responses.append(json.loads(res))
+
+            # Send invalid JSON, confirm error and connection still open
+            writer.write(b'{"id": 6, "cmd": ["status"]\n')
+            await writer.drain()
+            res = await asyncio.wait_for(reader.readline(), timeout=1)
+            responses.append(json.loads(res))
+            writer.write('{}\n'.format(json.dumps({'id': 7, 'cmd': ['status']})).encode())
+            await writer.drain()
+            res = await asyncio.wait_for(reader.readline(), timeout=1)
+            responses.append(json.loads(res))
+
+            writer.close()
+            await writer.wait_closed()
+            return responses
+
+        responses = asyncio.run(keepalive_requests())
+
+        # Confirm each reply has matching request id and correct response
+        self.assertEqual(responses[0]['id'], 1)
+        self.assertIn('devices', responses[0]['reply'])
+        self.assertEqual(responses[1], {'id': 2, 'reply': {'Enabled': 'device1'}})
+        self.assertEqual(responses[2], {'id': 3, 'reply': {'ERROR': 'Invalid command'}})
+        self.assertEqual(responses[3], {'id': 4, 'reply': {'ERROR': 'Invalid command'}})
+        self.assertEqual(responses[4], {'id': 5, 'reply': {'ERROR': 'Invalid syntax'}})
+        self.assertEqual(
+            responses[5],
+            {'id': None, 'reply': {'ERROR': 'Syntax error in received JSON'}}
+        )
+        self.assertEqual(responses[6]['id'], 7)
+        self.assertIn('devices', responses[6]['reply'])
+
+    @cpython_only
+    def test_61_keepalive_connection_idle_timeout(self):
+        async def idle_connection():
+            reader, writer = await asyncio.open_connection(ip, 8123)
+            writer.write('{}\n'.format(json.dumps({'id': 1, 'cmd': ['status']})).encode())
+            await writer.drain()
+            await asyncio.wait_for(reader.readline(), timeout=1)
+            # Wait for server to close idle connection, read should return EOF
+            res = await asyncio.wait_for(reader.read(), timeout=1)
+            writer.close()
+            await writer.wait_closed()
+            return res
+
+        # Reduce idle timeout, confirm server closes idle connection
+        app_context.api_instance.keepalive_timeout = 0.1
+        try:
+            self.assertEqual(asyncio.run(idle_connection()), b'')
+        finally:
+            app_context.api_instance.keepalive_timeout = 60
+
+    def test_62_status_since(self):
+        # Get full status, confirm includes status_version and boot_id
+        status = self.send_command(['status'])
+        version = status['status_version']
+        self.assertIsInstance(version, int)
+        self.assertIsInstance(status['boot_id'], int)
+
+        # Disable device1, confirm only changed device included in reply
+        self.send_command(['disable', 'device1'])
+        response = self.send_command(['status_since', version])
+        self.assertIn('device1', response['devices'])
+        self.assertNotIn('metadata', response)
+        self.assertGreater(response['status_version'], version)
+        self.assertEqual(response['boot_id'], status['boot_id'])
+        self.assertFalse(response['devices']['device1']['enabled'])
+        self.send_command(['enable', 'device1'])
+
+        # Confirm full status returned if version newer than current
+        response = self.send_command(['status_since', response['status_version'] + 1000])
+        self.assertIn('metadata', response)
+        self.assertEqual(len(response['devices']), len(status['devices']))
+
+        # Confirm correct errors for missing and invalid version
+        response = self.send_command(['status_since'])
+        self.assertEqual(response, {'ERROR': 'Invalid syntax'})
+        response = self.send_command(['status_since', 'latest'])
+        self.assertEqual(response, {'ERROR': 'Version argument must be int'})
+
+    def test_63_subscribe(self):
+        async def subscribe():
+            reader, writer = await asyncio.open_connection(ip, 8123)
+            writer.write('{}\n'.format(json.dumps(['subscribe'])).encode())
+            await writer.drain()
+            events = [json.loads(await asyncio.wait_for(reader.readline(), timeout=1))]
+
+            # Disable device1 on another connection, read pushed event
+            await asyncio.to_thread(self.send_command, ['disable', 'device1'])
+            events.append(json.loads(await asyncio.wait_for(reader.readline(), timeout=1)))
+            await asyncio.to_thread(self.send_command, ['enable', 'device1'])
+            events.append(json.loads(await asyncio.wait_for(reader.readline(), timeout=1)))
+
+            writer.close()
+            await writer.wait_closed()
+            return events
+
+        events = asyncio.run(subscribe())
+
+        # Confirm first event contains full status
+        self.assertIn('metadata', events[0]['status'])
+        self.assertIsInstance(events[0]['node_ms'], int)
+
+        # Confirm following events only contain changed device
+        self.assertEqual(list(events[1]['status']['devices'].keys()), ['device1'])
+        self.assertFalse(events[1]['status']['devices']['device1']['enabled'])
+        self.assertEqual(events[1]['status']['sensors'], {})
+        self.assertGreater(events[1]['status']['status_version'], events[0]['status']['status_version'])
+        self.assertTrue(events[2]['status']['devices']['device1']['enabled'])
+        self.assertGreaterEqual(events[2]['node_ms'], events[1]['node_ms'])
+
+    def test_64_subscribe_errors(self):
+        # Confirm error if version arg is not int
+        response = self.send_command(['subscribe', 'latest'])
+        self.assertEqual(response, {'ERROR': 'Version argument must be int'})
+
+        # Confirm error if max subscribers already connected
+        app_context.api_instance.subscribers = 3
+        try:
+            response = self.send_command(['subscribe'])
+            self.assertEqual(response, {'ERROR': 'Too many subscribers'})
+        finally:
+            app_context.api_instance.subscribers = 0
+
+    def test_65_batch(self):
+        # Send batch with valid, invalid, and non-endpoint commands
+        response = self.send_command(['batch',
+            ['disable', 'device1'],
+            ['get_attributes', 'device1'],
+            ['notacommand'],
+            ['_run_client'],
+            ['batch', ['enable', 'device1']],
+            'enable',
+            [],
+            ['enable', 'device1']
+        ])
+
+        # Confirm one reply per command in same order
+        self.assertEqual(len(response), 8)
+        self.assertEqual(response[0], {'Disabled': 'device1'})
+        self.assertFalse(response[1]['enabled'])
+        self.assertEqual(response[2], {'ERROR': 'Invalid command'})
+        self.assertEqual(response[3], {'ERROR': 'Invalid command'})
+        self.assertEqual(response[4], {'ERROR': 'Invalid command'})
+        self.assertEqual(response[5], {'ERROR': 'Invalid syntax'})
+        self.assertEqual(response[6], {'ERROR': 'Invalid syntax'})
+        self.assertEqual(response[7], {'Enabled': 'device1'})
+
+        # Confirm error if no commands
+        self.assertEqual(self.send_command(['batch']), {'ERROR': 'Invalid syntax'})
+
+    def test_66_poll_stats(self):
+        # Register instance with poll scheduler
+        class MockInstance():
+            name = 'unit_test_poll'
+
+            async def poll(self):
+                return True
+
+        instance = MockInstance()
+        app_context.poll_scheduler_instance.register(instance, instance.poll)
+
+        # Confirm response contains registered instance with poll stats
+        response = self.send_command(['poll_stats'])
+        self.assertIn('unit_test_poll', response)
+        self.assertEqual(
+            list(response['unit_test_poll'].keys()),
+            [
+                'polls',
+                'failures',
+                'consecutive_failures',
+                'last_latency_ms',
+                'avg_latency_ms',
+                'interval_ms',
+                'next_poll_ms'
+            ]
+        )
+        app_context.poll_scheduler_instance.unregister(instance)
+
+    def test_67_sample_stats(self):
+        # Register instance with sensor sampler
+        class MockInstance():
+            name = 'unit_test_sample'
+
+            def sample(self):
+                pass
+
+            def get_interval(self):
+                return 1000
+
+        instance = MockInstance()
+        app_context.sensor_sampler_instance.register(instance, instance.sample, instance.get_interval)
+
+        # Confirm response contains registered instance with read stats
+        response = self.send_command(['sample_stats'])
+        self.assertIn('unit_test_sample', response)
+        self.assertEqual(
+            list(response['unit_test_sample'].keys()),
+            [
+                'reads',
+                'failures',
+                'last_duration_ms',
+                'avg_duration_ms',
+                'max_duration_ms',
+                'last_lateness_ms',
+                'max_lateness_ms',
+                'interval_ms',
+                'next_read_ms'
+            ]
+        )
+        app_context.sensor_sampler_instance.unregister(instance)
+
+    def test_68_time_sync(self):
+        # Confirm response contains NTP sync status and drift rate
+        response = self.send_command(['time_sync'])
+        self.assertEqual(
+            list(response.keys()),
+            [
+                'host',
+                'utc_offset',
+                'syncs',
+                'failures',
+                'last_error_ms',
+                'last_delay_ms',
+                'drift_ppm',
+                'interval_ms',
+                'last_sync_ms'
+            ]
+        )
+
+    def test_69_startup_profile(self):
+        # Confirm response contains boot time, free heap, and recorded steps
+        response = self.send_command(['startup_profile'])
+        self.assertEqual(list(response.keys()), ['boot_us', 'free', 'steps'])
+        self.assertIsInstance(response['steps'], dict)
+
+    def test_70_set_log_format(self):
+        # Confirm module does not exist
+        self.assertFalse('log_format.py' in os.listdir())
+
+        # Call with invalid log format, confirm error
+        response = self.send_command(['set_log_format', 'json'])
+        self.assertEqual(response, {
+            "ERROR": "Unsupported log format",
+            "options": ["text", "binary"]
+        })
+
+        # Call with valid log format, confirm response
+        response = self.send_command(['set_log_format', 'binary'])
+        self.assertEqual(
+            response,
+            {"Success": "Log format set (takes effect after reboot)"}
+        )
+
+        # Confirm module created on disk with correct contents
+        self.assertTrue('log_format.py' in os.listdir())
+        with open('log_format.py', 'r') as file:
+            self.assertEqual(file.read(), "LOG_FORMAT = 'binary'")
+
+    @cpython_only
+    def test_71_keepalive_handler_value_error(self):
+        from unittest.mock import patch
+
+        async def keepalive_request():
+            reader, writer = await asyncio.open_connection(ip, 8123)
+            writer.write('{}\n'.format(json.dumps({'id': 1, 'cmd': ['mem_info']})).encode())
+            await writer.drain()
+            res = await asyncio.wait_for(reader.read(), timeout=1)
+            writer.close()
+            await writer.wait_closed()
+            return res
+
+        # Simulate ValueError raised by handler after JSON was parsed, confirm
+        # connection closed without JSON syntax error
+        with patch.object(app_context.api_instance, 'mem_info', side_effect=ValueError):
+            self.assertEqual(asyncio.run(keepalive_request()), b'')
+
+        # Confirm JSON that is not a list or dict returns syntax error
+        self.assertEqual(self.send_command(5), {"ERROR": "Syntax error in received JSON"})
+        self.assertEqual(self.send_command([]), {"ERROR": "Syntax error in received JSON"})
+
     # Must run last, lock in reboot coro blocks future API requests
     @cpython_only
     def test_999_reboot_endpoint(self):
@@ -1,5 +1,7 @@
+import os
 import sys
 import json
+import struct
 import time
 import asyncio
 import network
@@ -7,7 +9,13 @@ import unittest
 from machine import Pin, Timer
 import app_context
 from cpython_only import cpython_only
-from Config import Config, instantiate_hardware
+from Config import Config, instantiate_hardware, ASTRONOMY_CACHE_MAX_AGE
+from Instance import Instance
+from solar import get_local_sun_times
+import sntp
+import startup_profile
+from sntp import TimeSync
+from util import read_astronomy_from_disk, write_astronomy_to_disk
 
 # Read mock API receiver address
 with open('config.json', 'r') as file:
@@ -46,6 +54,14 @@ loaded_json = {
 }
 
 
+# Deletes cached astronomy API response (astronomy.json) if it exists
+def remove_astronomy_cache():
+    try:
+        os.remove('astronomy.json')
+    except OSError:
+        pass
+
+
 # Takes config, undoes _instantiate_peripherals, returns
 # Used to instantiate various configs without repeating all steps
 def reset_test_config(config):
@@ -159,10 +175,11 @@ class TestConfig(unittest.TestCase):
 
     def test_05_build_queue(self):
         # Confirm no schedule rule timers in SoftwareTimer queue
-        app_context.timer_instance.cancel('scheduler')
+        app_context.timer_instance.cancel('scheduler_device1')
+        app_context.timer_instance.cancel('scheduler_sensor1')
         asyncio.run(self.sleep(10))
         rules = [time for time, rule in app_context.timer_instance.schedule.items()
-                 if rule[0] == "scheduler"]
+                 if rule[0].startswith("scheduler")]
         self.assertEqual(len(rules), 0)
 
         # Run _build_queue method
@@ -185,7 +202,7 @@ class TestConfig(unittest.TestCase):
 
         # Confirm schedule rule timers were added to SoftwareTimer queue
         rules = [time for time, rule in app_context.timer_instance.schedule.items()
-                 if rule[0] == "scheduler"]
+                 if rule[0] == "scheduler_device1"]
         self.assertGreaterEqual(len(rules), 1)
 
     def test_06_build_groups(self):
@@ -261,6 +278,12 @@ class TestConfig(unittest.TestCase):
         # Should return dict of current status info
         self.assertEqual(type(self.config.get_status()), dict)
 
+        # Lazy status should contain same items when converted to dict
+        self.assertEqual(
+            self.config.get_status(lazy=True).to_dict(),
+            self.config.get_status()
+        )
+
     # TODO different results on micropython than in test env
     def test_10_rebuilding_queue(self):
         # Get current rule queue before rebuilding
@@ -624,6 +647,9 @@ class TestConfig(unittest.TestCase):
         import util
         util.reboot = mock_reboot
 
+        # Remove cached API response (prevents using fallback instead of reboot)
+        remove_astronomy_cache()
+
         # Mock API key to simulate error response from API
         import api_keys
         api_keys.ipgeo_key = "invalid"
@@ -634,8 +660,9 @@ class TestConfig(unittest.TestCase):
         from Config import Config
 
         # Simulate network error in API call, confirm error triggers reboot
+        # (call re-imported method directly, self.config uses original class)
         with self.assertRaises(MockRebootCalled):
-            Config._api_calls(self.config)
+            Config._get_astronomy_from_api(self.config, False)
 
         # Create requests.get mock that raises OSError (failed connection)
         def mock_get(*args, **kwargs):
@@ -650,7 +677,24 @@ class TestConfig(unittest.TestCase):
 
         # Call method, confirm error triggers reboot
         with self.assertRaises(MockRebootCalled):
-            Config._api_calls(self.config)
+            Config._get_astronomy_from_api(self.config, False)
+
+        # Confirm does not reboot if cached response available
+        self.assertFalse(Config._get_astronomy_from_api(self.config, True))
+
+        # Simulate cached response from previous API call
+        write_astronomy_to_disk({
+            'time': time.time(),
+            'sunrise': '06:12',
+            'sunset': '19:34',
+            'utc_offset': None
+        })
+
+        # Confirm cached sunrise/sunset used when API call fails
+        Config._use_cached_astronomy(self.config, read_astronomy_from_disk())
+        self.assertEqual(self.config.schedule_keywords['sunrise'], '06:12')
+        self.assertEqual(self.config.schedule_keywords['sunset'], '19:34')
+        remove_astronomy_cache()
 
     @cpython_only
     def test_24_regression_no_rules_expired_when_convert_rules_runs(self):
@@ -662,6 +706,10 @@ class TestConfig(unittest.TestCase):
         an uncaught UnboundLocalError. For devices/sensors with no schedule
         rules between midnight and 3 am this happened every time the reload
         timer expired between 3 and 4 am.
+
+        Config._convert_rules has since been replaced by _compile_schedule and
+        _build_instance_queue, which must wrap to the last rule of the previous
+        day when no rules have expired.
         '''
 
         from unittest.mock import patch
@@ -671,27 +719,30 @@ class TestConfig(unittest.TestCase):
         with patch('time.time', return_value=1730283000.0), \
              patch('time.localtime', return_value=(2024, 10, 30, 3, 10, 0, 2, 304, 1)):
 
-            # Convert schedule with no expired rules (should not raise exception)
-            epoch_rules = self.config._convert_rules({
-                "23:00": "fade/32/7200",
-                "06:00": "disabled",
-                "18:00": "1023"
-            })
-
-            # Confirm that 23:00 (current_rule) is first even though timestamp
-            # is last, confirm that other rules are in chronological order
-
-            # Confirm that 23:00 rule is first (current rule), timestamps for
-            # other rules are chronological (23:00 < sunrise < sunset)
-            self.assertEqual(
-                epoch_rules,
-                {
-                    1730354400.0: 'fade/32/7200',
-                    1730268000.0: 'fade/32/7200',
-                    1730293200.0: 'disabled',
-                    1730336400.0: '1023'
-                }
-            )
+            # Compile schedule with no expired rules
+            device = self.config.devices[0]
+            original_schedule = device.schedule
+            device.schedule = {
+                "23:00": "disabled",
+                "06:00": "enabled",
+                "18:00": "disabled"
+            }
+
+            # Confirm rules are in chronological order
+            minutes, rules = self.config._compile_schedule(device.schedule)
+            self.assertEqual(list(minutes), [360, 1080, 1380])
+            self.assertEqual(rules, ['enabled', 'disabled', 'disabled'])
+
+            # Build queue (should not raise exception), confirm that 23:00
+            # rule (previous day) is current rule
+            self.config._build_instance_queue(device)
+            self.assertEqual(device.scheduled_rule, 'disabled')
+            self.assertEqual(device.rule_queue[:3], ['enabled', 'disabled', 'disabled'])
+
+        # Restore original schedule (re-enables device)
+        device.schedule = original_schedule
+        self.config._build_instance_queue(device)
+        self.assertTrue(device.enabled)
 
     def test_25_regression_sensor_target_order_broke_group_matching(self):
         '''Original bug: Config._build_groups determines which sensors are part
@@ -753,3 +804,599 @@ class TestConfig(unittest.TestCase):
         self.assertEqual(len(config.sensors), 2)
         # Confirm all 4 instances are part of a single group
         self.assertEqual(len(config.groups), 1)
+
+    def test_26_keyword_index(self):
+        # Instantiate config with 2 devices that use different keywords
+        config = Config(
+            {
+                'metadata': {
+                    'id': 'test',
+                    'floor': 1,
+                    'location': 'unit tests'
+                },
+                'schedule_keywords': {'sleep': '23:00'},
+                'device1': {
+                    'nickname': 'device1',
+                    'schedule': {'sunrise': 'enabled', 'sleep': 'disabled'},
+                    '_type': 'relay',
+                    'pin': 18,
+                    'default_rule': 'enabled'
+                },
+                'device2': {
+                    'nickname': 'device2',
+                    'schedule': {'sunset': 'enabled', '10:00': 'disabled'},
+                    '_type': 'relay',
+                    'pin': 19,
+                    'default_rule': 'enabled'
+                }
+            },
+            delay_setup=True
+        )
+        config._instantiate_peripherals()
+        config._build_queue()
+        asyncio.run(self.sleep(10))
+        device1 = config.find('device1')
+        device2 = config.find('device2')
+
+        # Confirm each keyword maps to instances with rules using keyword
+        self.assertEqual(config._keyword_index, {
+            'sunrise': [device1],
+            'sleep': [device1],
+            'sunset': [device2]
+        })
+
+        # Remove keyword rule from device1, rebuild, confirm removed from index
+        del device1.schedule['sleep']
+        config._build_instance_queue(device1)
+        asyncio.run(self.sleep(10))
+        self.assertEqual(config._keyword_index, {
+            'sunrise': [device1],
+            'sunset': [device2]
+        })
+
+        # Cancel schedule rule timers for both devices
+        app_context.timer_instance.cancel('scheduler_device1')
+        app_context.timer_instance.cancel('scheduler_device2')
+        asyncio.run(self.sleep(10))
+
+    def test_27_schedule_rebuild_only_affected_instances(self):
+        # Instantiate config with 2 devices, only device1 uses sleep keyword
+        config = Config(
+            {
+                'metadata': {
+                    'id': 'test',
+                    'floor': 1,
+                    'location': 'unit tests'
+                },
+                'schedule_keywords': {'sleep': '23:00'},
+                'device1': {
+                    'nickname': 'device1',
+                    'schedule': {'sleep': 'disabled', '10:00': 'enabled'},
+                    '_type': 'relay',
+                    'pin': 18,
+                    'default_rule': 'enabled'
+                },
+                'device2': {
+                    'nickname': 'device2',
+                    'schedule': {'10:00': 'enabled'},
+                    '_type': 'relay',
+                    'pin': 19,
+                    'default_rule': 'enabled'
+                }
+            },
+            delay_setup=True
+        )
+        config._instantiate_peripherals()
+        config._build_queue()
+        asyncio.run(self.sleep(10))
+        device1 = config.find('device1')
+        device2 = config.find('device2')
+
+        # Mock _build_instance_queue to record which instances were rebuilt
+        rebuilt = []
+        config._build_instance_queue = rebuilt.append
+
+        # Change keyword, confirm only device1 is pending rebuild
+        config.schedule_keywords['sleep'] = '22:00'
+        config.schedule_keyword_rebuild('sleep')
+        self.assertEqual(config._pending_rebuild, [device1])
+        asyncio.run(self.sleep(10))
+        self.assertIn('rebuild_queue', str(app_context.timer_instance.schedule))
+
+        # Edit device2 rules, confirm both pending (single rebuild timer)
+        config.schedule_rebuild([device2])
+        config.schedule_rebuild([device2])
+        self.assertEqual(config._pending_rebuild, [device1, device2])
+
+        # Run timer callback, confirm both rebuilt once and pending cleared
+        config._rebuild_pending()
+        self.assertEqual(rebuilt, [device1, device2])
+        self.assertEqual(config._pending_rebuild, [])
+
+        # Confirm keyword with no rules does not create rebuild timer
+        app_context.timer_instance.cancel('rebuild_queue')
+        asyncio.run(self.sleep(10))
+        config.schedule_keyword_rebuild('unused')
+        asyncio.run(self.sleep(10))
+        self.assertNotIn('rebuild_queue', str(app_context.timer_instance.schedule))
+
+        # Cancel schedule rule timers for both devices
+        app_context.timer_instance.cancel('scheduler_device1')
+        app_context.timer_instance.cancel('scheduler_device2')
+        asyncio.run(self.sleep(10))
+
+    def test_28_compile_schedule(self):
+        # Add keyword with same timestamp as existing HH:MM rule
+        self.config.schedule_keywords['morning'] = '08:00'
+
+        # Compile schedule with keywords, HH:MM rules, and invalid timestamps
+        minutes, rules = self.config._compile_schedule({
+            '08:00': 10,
+            'morning': 20,
+            '9:30': 30,
+            '23:59': 40,
+            'missing_keyword': 50,
+            '24:00': 60,
+            '12:5': 70
+        })
+        del self.config.schedule_keywords['morning']
+
+        # Confirm invalid timestamps skipped, keyword rule replaced HH:MM rule
+        # (replaced rule not kept)
+        self.assertEqual(list(minutes), [480, 570, 1439])
+        self.assertEqual(rules, [20, 30, 40])
+
+    def test_29_get_status_since(self):
+        # Get current version, confirm unchanged
+        version = self.config.get_status()['status_version']
+        self.assertEqual(
+            self.config.get_status_since(version),
+            {'unchanged': True, 'status_version': version, 'boot_id': Instance.boot_id}
+        )
+
+        # Change device rule, confirm only device included
+        device = self.config.devices[0]
+        device.status_changed()
+        response = self.config.get_status_since(version)
+        self.assertEqual(list(response['devices']), [device.name])
+        self.assertEqual(response['sensors'], {})
+        self.assertNotIn('metadata', response)
+        self.assertEqual(response['status_version'], version + 1)
+        self.assertEqual(response['boot_id'], Instance.boot_id)
+
+        # Change metadata, confirm metadata included
+        self.config.metadata_changed()
+        response = self.config.get_status_since(version + 1)
+        self.assertIn('metadata', response)
+        self.assertEqual(response['devices'], {})
+
+        # Confirm full status returned if version is newer than current
+        self.assertEqual(
+            self.config.get_status_since(version + 1000),
+            self.config.get_status()
+        )
+
+    def test_30_sensor_debounce(self):
+        # Instantiate config with 1 sensor with debounce window, 1 without
+        config = Config(
+            {
+                'metadata': {
+                    'id': 'test',
+                    'floor': 1,
+                    'location': 'unit tests'
+                },
+                'schedule_keywords': {},
+                'sensor1': {
+                    'nickname': 'sensor1',
+                    'schedule': {},
+                    'targets': ['device1'],
+                    '_type': 'dummy',
+                    'default_rule': 'on',
+                    'debounce_ms': 50
+                },
+                'sensor2': {
+                    'nickname': 'sensor2',
+                    'schedule': {},
+                    'targets': ['device1'],
+                    '_type': 'dummy',
+                    'default_rule': 'on'
+                },
+                'device1': {
+                    'nickname': 'device1',
+                    'schedule': {},
+                    '_type': 'relay',
+                    'pin': 18,
+                    'default_rule': 'enabled'
+                }
+            }
+        )
+
+        # Confirm both sensors instantiated, debounce window set (not passed
+        # to driver class), defaults to 0 if not configured
+        self.assertEqual(len(config.sensors), 2)
+        self.assertEqual(config.find('sensor1').debounce_ms, 50)
+        self.assertEqual(config.find('sensor2').debounce_ms, 0)
+
+    def test_31_sensor_sample_interval(self):
+        # Instantiate config with 1 thermostat with sample interval and max
+        # reading age, 1 without
+        config = Config(
+            {
+                'metadata': {
+                    'id': 'test',
+                    'floor': 1,
+                    'location': 'unit tests'
+                },
+                'schedule_keywords': {},
+                'sensor1': {
+                    'nickname': 'sensor1',
+                    'schedule': {},
+                    'targets': ['device1'],
+                    '_type': 'si7021',
+                    'default_rule': 74,
+                    'mode': 'cool',
+                    'tolerance': 1,
+                    'units': 'fahrenheit',
+                    'sample_interval': 30000,
+                    'max_age': 60000
+                },
+                'sensor2': {
+                    'nickname': 'sensor2',
+                    'schedule': {},
+                    'targets': ['device1'],
+                    '_type': 'si7021',
+                    'default_rule': 74,
+                    'mode': 'cool',
+                    'tolerance': 1,
+                    'units': 'fahrenheit'
+                },
+                'device1': {
+                    'nickname': 'device1',
+                    'schedule': {},
+                    '_type': 'relay',
+                    'pin': 18,
+                    'default_rule': 'enabled'
+                }
+            }
+        )
+
+        # Confirm both sensors instantiated, sample interval and max age set
+        # (not passed to driver class), uses driver default if not configured
+        self.assertEqual(len(config.sensors), 2)
+        self.assertEqual(config.find('sensor1').sample_interval, 30000)
+        self.assertEqual(config.find('sensor2').sample_interval, 5000)
+        self.assertEqual(config.find('sensor1').max_age, 60000)
+        self.assertEqual(config.find('sensor2').max_age, 10000)
+        for sensor in config.sensors:
+            sensor.disable()
+
+    def test_32_sun_times_from_gps(self):
+        # Call class methods directly (test_22 replaced instance _api_calls)
+        # Add GPS coordinates, remove cached API response
+        self.config._metadata['gps'] = {'lat': '37.7749', 'lon': '-122.4194'}
+        remove_astronomy_cache()
+
+        # Simulate reachable NTP server (UTC offset not derived by mock)
+        def mock_sync(utc_offset=None, local_time=None):
+            return True
+        self.config.time_sync.sync = mock_sync
+        self.config.time_sync.utc_offset = None
+
+        # Confirm API response cached with UTC offset derived from sunrise
+        Config._api_calls(self.config, False)
+        cache = read_astronomy_from_disk()
+        self.assertEqual(cache['sunrise'], self.config.schedule_keywords['sunrise'])
+        self.assertEqual(cache['sunset'], self.config.schedule_keywords['sunset'])
+        self.assertIsInstance(cache['utc_offset'], int)
+        self.assertEqual(cache['utc_offset'] % 15, 0)
+
+        # Mock API method to detect calls
+        calls = []
+
+        def mock_get_astronomy_from_api(has_fallback):
+            calls.append(has_fallback)
+            return True
+        self.config._get_astronomy_from_api = mock_get_astronomy_from_api
+
+        # Get expected local sunrise/sunset for today with known offset
+        cache['utc_offset'] = -420
+        write_astronomy_to_disk(cache)
+        now = time.localtime()
+        expected = get_local_sun_times('37.7749', '-122.4194', now[0], now[1], now[2], -420)
+
+        # Confirm boot skips API call, computes sunrise/sunset locally
+        Config._api_calls(self.config)
+        self.assertEqual(calls, [])
+        self.assertEqual(
+            (self.config.schedule_keywords['sunrise'], self.config.schedule_keywords['sunset']),
+            expected
+        )
+
+        # Simulate unreachable NTP server, confirm API called at boot (clock
+        # may not be set after power loss)
+        self.config.time_sync.sync = lambda utc_offset=None, local_time=None: False
+        Config._api_calls(self.config)
+        self.assertEqual(calls, [True])
+        self.config.time_sync.sync = mock_sync
+
+        # Confirm nightly reload does not skip API call
+        Config._api_calls(self.config, False)
+        self.assertEqual(calls, [True, True])
+
+        # Confirm API called at boot if cached response is outdated
+        cache['time'] -= ASTRONOMY_CACHE_MAX_AGE + 1
+        write_astronomy_to_disk(cache)
+        Config._api_calls(self.config)
+        self.assertEqual(calls, [True, True, True])
+
+        # Simulate failed API call, confirm sunrise/sunset computed locally
+        self.config._get_astronomy_from_api = lambda has_fallback: False
+        self.config.schedule_keywords['sunrise'] = '00:00'
+        Config._api_calls(self.config)
+        self.assertEqual(self.config.schedule_keywords['sunrise'], expected[0])
+
+        # Remove GPS coordinates, confirm cached sunrise/sunset used
+        del self.config._metadata['gps']
+        Config._api_calls(self.config)
+        self.assertEqual(self.config.schedule_keywords['sunrise'], cache['sunrise'])
+        self.assertEqual(self.config.schedule_keywords['sunset'], cache['sunset'])
+
+        # Remove mocks and cache
+        del self.config._get_astronomy_from_api
+        del self.config.time_sync.sync
+        remove_astronomy_cache()
+
+    def test_33_solar_calculation(self):
+        # Confirm matches NOAA calculator (San Francisco, summer solstice, PDT)
+        self.assertEqual(
+            get_local_sun_times(37.7749, -122.4194, 2024, 6, 21, -420),
+            ('05:48', '20:35')
+        )
+        # Confirm matches NOAA calculator (Tokyo, equinox, JST)
+        self.assertEqual(
+            get_local_sun_times(35.68, 139.69, 2024, 3, 20, 540),
+            ('05:45', '17:53')
+        )
+        # Confirm returns None during polar day (Svalbard, summer solstice)
+        self.assertIsNone(get_local_sun_times(78, 15, 2024, 6, 21, 60))
+
+    def test_34_sntp_parse_response(self):
+        # Build request, simulate server 5 seconds ahead of local clock with
+        # 15ms network delay each way and 10ms between receive and transmit
+        sent = 1700000000000
+        request = sntp.build_request(sent)
+        response = bytearray(48)
+        response[0] = 0x24
+        response[1] = 2
+        response[24:32] = request[40:48]
+        response[32:40] = struct.pack("!II", *sntp._to_ntp(sent + 5015))
+        response[40:48] = struct.pack("!II", *sntp._to_ntp(sent + 5025))
+
+        # Confirm returns offset and round trip delay (excludes server time)
+        self.assertEqual(sntp.parse_response(response, sent, sent + 40), (5000, 30))
+
+        # Confirm raises ValueError if response does not match request
+        with self.assertRaises(ValueError):
+            sntp.parse_response(response, sent + 1, sent + 40)
+
+        # Confirm raises ValueError if kiss-of-death packet (stratum 0)
+        response[1] = 0
+        with self.assertRaises(ValueError):
+            sntp.parse_response(response, sent, sent + 40)
+
+    def test_35_time_sync_drift(self):
+        # Mock local clock, NTP query, and RTC
+        clock = [1700000000000]
+        results = []
+        original_now, original_query = sntp.epoch_ms, sntp.query
+        sntp.epoch_ms = lambda: clock[0]
+        sntp.query = lambda host: results.pop(0)
+        time_sync = TimeSync('192.168.1.1')
+        set_times = []
+        time_sync.set_clock = set_times.append
+
+        # Confirm does not query NTP server if UTC offset unknown
+        self.assertFalse(time_sync.sync())
+
+        # Simulate RTC 5 seconds slow, UTC offset -7 hours
+        results.append((25200000 + 5000, 20))
+        self.assertTrue(time_sync.sync(-420))
+        self.assertEqual(set_times, [clock[0] + 5000])
+        self.assertEqual(time_sync.last_error_ms, 5000)
+        self.assertEqual(time_sync.last_delay_ms, 20)
+
+        # Confirm drift not measured after first sync (clock step)
+        self.assertIsNone(time_sync.drift_ppm)
+        self.assertEqual(time_sync.interval, sntp.MIN_INTERVAL)
+
+        # Simulate 36ms slow after 1 hour, confirm drift rate is 10 ppm and
+        # next sync scheduled before error exceeds MAX_ERROR_MS
+        clock[0] += 3600000
+        results.append((25200000 + 36, 20))
+        self.assertTrue(time_sync.sync())
+        self.assertEqual(time_sync.drift_ppm, 10)
+        self.assertEqual(time_sync.interval, 10000000)
+
+        # Simulate daylight savings (1 hour step), confirm drift unchanged
+        clock[0] += 3600000
+        results.append((25200000 - 3600000 + 36, 20))
+        self.assertTrue(time_sync.sync())
+        self.assertEqual(time_sync.drift_ppm, 10)
+
+        # Simulate API local time 2 hours ahead of UTC (plus 40 second API
+        # response delay), confirm offset derived and rounded to 15 minutes
+        results.append((3600000, 20))
+        local_time = (clock[0] + 3600000 + 40000) // 1000 + 120 * 60
+        self.assertTrue(time_sync.sync(local_time=local_time))
+        self.assertEqual(time_sync.utc_offset, 120)
+
+        # Simulate unreachable server, confirm failure counted
+        def mock_query(host):
+            raise OSError
+        sntp.query = mock_query
+        self.assertFalse(time_sync.sync())
+        self.assertEqual(time_sync.failures, 1)
+        self.assertEqual(time_sync.get_status()['syncs'], 4)
+
+        # Confirm cached address cleared after failure (resolved next sync)
+        self.assertIsNone(time_sync.addr)
+
+        # Revert mocks
+        sntp.epoch_ms, sntp.query = original_now, original_query
+
+    def test_36_sync_time(self):
+        # Mock NTP sync to detect calls
+        calls = []
+
+        async def mock_sync_async():
+            calls.append(True)
+        self.config.time_sync.sync_async = mock_sync_async
+
+        # Call timer callback, confirm synced and next sync scheduled
+        app_context.timer_instance.cancel('sync_time')
+        asyncio.run(self.sleep(10))
+        self.config.sync_time()
+        asyncio.run(self.sleep(10))
+        self.assertEqual(calls, [True])
+        self.assertIn('sync_time', app_context.timer_instance.names)
+
+        # Remove mock
+        del self.config.time_sync.sync_async
+
+    def test_37_startup_profile(self):
+        # Simulate booting node (clear recorded steps, not finished)
+        startup_profile._steps.clear()
+        startup_profile._boot_us = None
+
+        # Instantiate sensor, confirm driver import and __init__ recorded
+        instance = instantiate_hardware(
+            'sensor9',
+            _type='dummy',
+            nickname='profiled',
+            default_rule='on',
+            schedule={},
+            targets=[]
+        )
+        steps = startup_profile.get_profile()['steps']
+        self.assertIn('Dummy', steps['import'])
+        self.assertIn('sensor9', steps['init'])
+
+        # Confirm each step contains duration and free heap before/after
+        duration, free_before, free_after = steps['init']['sensor9']
+        self.assertIsInstance(duration, int)
+        self.assertGreaterEqual(duration, 0)
+        self.assertIsInstance(free_before, int)
+        self.assertIsInstance(free_after, int)
+
+        # Confirm second import of same module does not overwrite first
+        first = steps['import']['Dummy']
+        with startup_profile.ProfileStep('import', 'Dummy'):
+            pass
+        self.assertIs(steps['import']['Dummy'], first)
+
+        # Confirm exceptions raised in body are not suppressed
+        with self.assertRaises(ValueError):
+            with startup_profile.ProfileStep('phase', 'failed'):
+                raise ValueError
+        self.assertIn('failed', steps['phase'])
+
+        # Finish boot, confirm boot time recorded and new steps ignored
+        startup_profile.finish()
+        self.assertIsInstance(startup_profile.get_profile()['boot_us'], int)
+        self.assertIsInstance(startup_profile.get_profile()['free'], int)
+        with startup_profile.ProfileStep('phase', 'after_boot'):
+            pass
+        self.assertNotIn('after_boot', steps['phase'])
+        instance.disable()
+
+    @cpython_only
+    def test_38_get_scheduled_rule(self):
+        from unittest.mock import patch
+
+        device = self.config.devices[0]
+        original_schedule = device.schedule
+        device.schedule = {
+            "06:00": "enabled",
+            "18:00": "disabled",
+            "23:00": "enabled"
+        }
+
+        # Confirm same rule as _build_instance_queue at each time (rule at
+        # current minute only applies at second 0 or later in the minute,
+        # wraps to last rule of previous day before first rule)
+        for hour, minute, second in ((0, 0, 0), (5, 59, 59), (6, 0, 0), (6, 0, 1),
+                                     (12, 0, 0), (18, 0, 30), (23, 30, 0)):
+            localtime = (2024, 10, 30, hour, minute, second, 2, 304, 1)
+            with patch('time.localtime', return_value=localtime):
+                self.config._build_instance_queue(device)
+                self.assertEqual(self.config.get_scheduled_rule(device), device.scheduled_rule)
+
+        # Confirm explicit time argument (seconds since midnight)
+        self.assertEqual(self.config.get_scheduled_rule(device, 3600), 'enabled')
+        self.assertEqual(self.config.get_scheduled_rule(device, 43200), 'enabled')
+        self.assertEqual(self.config.get_scheduled_rule(device, 72000), 'disabled')
+
+        # Change schedule, confirm schedule_rebuild discards stored schedule
+        # (lookup uses new rules before rebuild timer expires)
+        device.schedule = {"06:00": "disabled"}
+        self.config.schedule_rebuild([device])
+        self.assertEqual(self.config.get_scheduled_rule(device, 43200), 'disabled')
+        app_context.timer_instance.cancel("rebuild_queue")
+
+        # Confirm returns default_rule if no schedule rules
+        device.schedule = {}
+        self.config.schedule_rebuild([device])
+        app_context.timer_instance.cancel("rebuild_queue")
+        self.config._pending_rebuild = []
+        self.assertEqual(self.config.get_scheduled_rule(device), device.default_rule)
+
+        # Restore original schedule (re-enables device)
+        device.schedule = original_schedule
+        self.config._build_instance_queue(device)
+        self.assertTrue(device.enabled)
+
+    @cpython_only
+    def test_39_sntp_query_async(self):
+        import socket
+        from unittest.mock import patch
+
+        # Create local UDP socket to simulate NTP server
+        server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        server.bind(('127.0.0.1', 0))
+        server.settimeout(1)
+        addr = server.getsockname()
+
+        async def respond():
+            # Start query, wait for request (query task polls for response
+            # without blocking event loop), reply 5 seconds ahead
+            task = asyncio.create_task(sntp.query_async(addr))
+            await self.sleep(10)
+            request, client = server.recvfrom(48)
+            sent = sntp._from_ntp(*struct.unpack("!II", request[40:48]))
+            response = bytearray(48)
+            response[0] = 0x24
+            response[1] = 2
+            response[24:32] = request[40:48]
+            response[32:40] = struct.pack("!II", *sntp._to_ntp(sent + 5000))
+            response[40:48] = struct.pack("!II", *sntp._to_ntp(sent + 5000))
+            server.sendto(response, client)
+            return await task
+
+        # Confirm returns offset from response
+        offset, delay = asyncio.run(respond())
+        self.assertTrue(4900 < offset < 5100)
+        self.assertTrue(0 <= delay < 200)
+
+        # Confirm raises OSError if server does not respond before timeout
+        with self.assertRaises(OSError):
+            asyncio.run(sntp.query_async(addr, 50))
+        server.close()
+
+        # Confirm sync_async resolves address once and caches it
+        time_sync = TimeSync('127.0.0.1')
+        time_sync.set_clock = lambda ms: None
+        with patch.object(sntp, 'query_async', return_value=(0, 20)) as mock_query:
+            self.assertTrue(asyncio.run(time_sync.sync_async(0)))
+            self.assertTrue(asyncio.run(time_sync.sync_async()))
+        self.assertEqual(time_sync.addr, ('127.0.0.1', sntp.NTP_PORT))
+        self.assertEqual(mock_query.call_args.args[0], time_sync.addr)
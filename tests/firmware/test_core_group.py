@@ -1,11 +1,14 @@
 # pylint: disable=missing-function-docstring,missing-class-docstring
 
+import time
 import asyncio
 import unittest
 import app_context
+import Group as group_module
 from Group import Group
 from Device import Device
 from Sensor import Sensor
+from cpython_only import cpython_only
 
 
 class MockDevice(Device):
@@ -29,6 +32,18 @@ class MockDevice(Device):
         return self.send_result
 
 
+class MockAsyncDevice(MockDevice):
+    def __init__(self, name, nickname, _type, enabled, default_rule, schedule):
+        super().__init__(name, nickname, _type, enabled, default_rule, schedule)
+
+        # Seconds send_async waits before returning (simulate network request)
+        self.delay = 0.2
+
+    async def send_async(self, state):
+        await asyncio.sleep(self.delay)
+        return self.send(state)
+
+
 class MockSensor(Sensor):
     def __init__(self, name, nickname, _type, enabled, default_rule, schedule, targets):
         super().__init__(name, nickname, _type, enabled, default_rule, schedule, targets)
@@ -122,9 +137,9 @@ class TestGroup(unittest.TestCase):
         self.assertTrue(self.device.send_method_called)
         self.assertFalse(self.sensor.routine_called)
         self.device.send_method_called = False
-        # Confirm that retry was scheduled
+        # Confirm that retry was scheduled for failed device
         asyncio.run(asyncio.sleep_ms(10))
-        self.assertTrue("group1_retry" in str(app_context.timer_instance.schedule))
+        self.assertTrue("group1_retry_device1" in str(app_context.timer_instance.schedule))
 
     def test_06_refresh(self):
         # Reset mock device: send method not called, send result = True
@@ -159,17 +174,34 @@ class TestGroup(unittest.TestCase):
         self.assertFalse(self.device.send_method_called)
 
     def test_07_retry(self):
-        # Reset mock device: send method not called, send result = True
-        self.device.send_method_called = False
-        self.device.send_result = True
-
-        # Simulate sensor triggered
+        # Reset mock device, simulate failed send
+        self.device.enable()
+        self.group.reset_state()
+        self.device.state = None
+        self.sensor.routine_called = False
+        self.device.send_result = False
         self.sensor.condition = True
+        self.group.refresh()
+
+        # Confirm retry scheduled for failed device
+        asyncio.run(asyncio.sleep_ms(10))
+        self.assertIn("group1_retry_device1", str(app_context.timer_instance.schedule))
+        self.assertEqual(self.group.retry_attempts, {'device1': 1})
+        self.assertFalse(self.sensor.routine_called)
 
-        # Call retry (simulate callback that runs 5 seconds after failed
-        # refresh), confirm device turned on
-        self.group.retry()
+        # Simulate device coming back online, run retry callback
+        self.device.send_result = True
+        self.device.send_method_called = False
+        self.group._retry(self.device, True, self.group._action_id)
+
+        # Confirm device turned on, action finished, retry count cleared
         self.assertTrue(self.device.send_method_called)
+        self.assertTrue(self.device.state)
+        self.assertTrue(self.group.state)
+        self.assertTrue(self.sensor.routine_called)
+        self.assertEqual(self.group.retry_attempts, {})
+        self.sensor.routine_called = False
+        app_context.timer_instance.cancel("group1_retry_device1")
 
     # Original bug: Disabling a device while turned on did not turn off, but did flip state to False
     # This resulted in device staying on even after sensors turned other devices in group off. If
@@ -292,3 +324,282 @@ class TestGroup(unittest.TestCase):
         self.assertTrue(self.device.send_method_called)
         self.assertFalse(self.device.state)
         self.assertFalse(self.group.state)
+
+    @cpython_only
+    def test_11_coalesce_refresh_requests(self):
+        from unittest.mock import patch
+
+        # Replace micropython.schedule with mock that stores callbacks (does
+        # not run until test calls them, simulates multiple ISRs in 1 tick)
+        scheduled = []
+        with patch.object(group_module, 'schedule', side_effect=lambda f, a: scheduled.append((f, a))), \
+             patch.object(self.group, 'refresh') as mock_refresh:
+            coalesced = self.group.coalesced_refreshes
+
+            # Simulate chattering sensor, confirm only 1 refresh scheduled
+            for _ in range(5):
+                self.sensor.refresh_group()
+            self.assertEqual(len(scheduled), 1)
+            self.assertTrue(self.group.refresh_pending)
+            self.assertEqual(self.group.coalesced_refreshes, coalesced + 4)
+
+            # Run scheduled callback, confirm refreshed once and flag cleared
+            func, arg = scheduled.pop()
+            func(arg)
+            mock_refresh.assert_called_once()
+            self.assertFalse(self.group.refresh_pending)
+
+            # Confirm next request schedules a new refresh
+            self.sensor.refresh_group()
+            self.assertEqual(len(scheduled), 1)
+            func, arg = scheduled.pop()
+            func(arg)
+            self.assertEqual(mock_refresh.call_count, 2)
+
+        # Confirm coalesced count included in sensor attributes
+        self.assertEqual(
+            self.sensor.get_attributes()['coalesced_refreshes'],
+            coalesced + 4
+        )
+
+    @cpython_only
+    def test_12_schedule_queue_full(self):
+        from unittest.mock import patch
+
+        # Simulate full micropython schedule queue, confirm flag not stuck
+        with patch.object(group_module, 'schedule', side_effect=RuntimeError):
+            self.group.request_refresh()
+        self.assertFalse(self.group.refresh_pending)
+
+    def test_13_debounce(self):
+        # Set debounce window, simulate bouncing switch
+        self.sensor.debounce_ms = 100
+        self.sensor.enable()
+        self.device.enable()
+        self.group.state = None
+        self.device.send_method_called = False
+        for condition in (True, False, True):
+            self.sensor.condition = condition
+            self.sensor.refresh_group()
+
+        # Confirm refresh delayed until debounce window expires
+        asyncio.run(asyncio.sleep(0.01))
+        self.assertTrue(self.group.debounce_pending)
+        self.assertFalse(self.group.refresh_pending)
+        self.assertIn("group1_debounce", str(app_context.timer_instance.schedule))
+        self.assertFalse(self.device.send_method_called)
+
+        # Wait for window, confirm refreshed once with final condition
+        asyncio.run(asyncio.sleep(0.2))
+        self.assertFalse(self.group.debounce_pending)
+        self.assertTrue(self.device.send_method_called)
+        self.assertTrue(self.device.state)
+
+        # Start new debounce window, request refresh without debounce (other
+        # sensor), confirm refreshed immediately while window still pending
+        self.sensor.condition = False
+        self.sensor.refresh_group()
+        self.device.send_method_called = False
+        self.group.request_refresh()
+        asyncio.run(asyncio.sleep(0.01))
+        self.assertTrue(self.group.debounce_pending)
+        self.assertFalse(self.group.refresh_pending)
+        self.assertTrue(self.device.send_method_called)
+        self.assertFalse(self.device.state)
+
+        # Confirm debounced refresh still runs after window expires
+        asyncio.run(asyncio.sleep(0.2))
+        self.assertFalse(self.group.debounce_pending)
+        self.sensor.debounce_ms = 0
+
+    @cpython_only
+    def test_14_retry_backoff(self):
+        from unittest.mock import patch
+
+        self.group.retry_attempts = {}
+        self.device.unreachable = False
+
+        # Capture retry timer delays (no jitter)
+        with patch.object(app_context.timer_instance, 'create') as mock_create, \
+             patch.object(group_module, 'randint', return_value=0):
+            for _ in range(group_module.RETRY_LIMIT):
+                self.group._schedule_retry(self.device, True)
+            delays = [call.args[0] for call in mock_create.call_args_list]
+
+            # Confirm delay doubles after each failure, capped at max
+            self.assertEqual(delays[:4], [5000, 10000, 20000, 40000])
+            self.assertEqual(delays[-1], group_module.RETRY_MAX_DELAY)
+            self.assertEqual(mock_create.call_args.args[2], "group1_retry_device1")
+            self.assertFalse(self.device.unreachable)
+
+            # Confirm marked unreachable after limit, no more retries
+            mock_create.reset_mock()
+            self.group._schedule_retry(self.device, True)
+            mock_create.assert_not_called()
+            self.assertTrue(self.device.unreachable)
+            self.assertTrue(self.device.get_status()['unreachable'])
+
+        # Confirm jitter adds up to RETRY_JITTER of delay
+        self.group.retry_attempts = {}
+        with patch.object(app_context.timer_instance, 'create') as mock_create, \
+             patch.object(group_module, 'randint', side_effect=lambda a, b: b):
+            self.group._schedule_retry(self.device, True)
+            self.assertEqual(mock_create.call_args.args[0], 6000)
+
+        # Confirm same action re-triggered while retrying keeps retry count
+        # (backoff continues from previous attempt)
+        self.group.retry_attempts = {'device1': 3}
+        self.device.send_result = False
+        self.device.state = None
+        self.group.reset_state()
+        with patch.object(app_context.timer_instance, 'create') as mock_create, \
+             patch.object(group_module, 'randint', return_value=0):
+            self.group.apply_action(True)
+            self.assertEqual(mock_create.call_args.args[0], 40000)
+        self.assertEqual(self.group.retry_attempts, {'device1': 4})
+
+        # Confirm different action resets retry count, failed device gets
+        # backoff retries again (still marked unreachable until send succeeds)
+        self.group.retry_attempts = {'device1': 9}
+        self.group.reset_state()
+        with patch.object(app_context.timer_instance, 'create') as mock_create, \
+             patch.object(group_module, 'randint', return_value=0):
+            self.group.apply_action(False)
+            self.assertEqual(mock_create.call_args.args[0], 5000)
+        self.assertEqual(self.group.retry_attempts, {'device1': 1})
+        self.assertTrue(self.device.unreachable)
+
+        # Confirm successful send clears unreachable flag and retry count
+        self.device.send_result = True
+        self.group.reset_state()
+        self.group.apply_action(False)
+        self.assertFalse(self.device.unreachable)
+        self.assertEqual(self.group.retry_attempts, {})
+
+    def test_15_outdated_retry_ignored(self):
+        # Simulate failed send, then newer action before retry runs
+        self.device.enable()
+        self.group.reset_state()
+        self.device.state = None
+        self.device.send_result = False
+        self.group.apply_action(False)
+        action_id = self.group._action_id
+        self.device.send_result = True
+        self.group.apply_action(True)
+        self.assertTrue(self.group.state)
+
+        # Run retry for outdated action, confirm state not changed
+        self.group._retry(self.device, False, action_id)
+        self.assertTrue(self.device.state)
+        self.assertTrue(self.group.state)
+        self.assertEqual(self.group.retry_attempts, {})
+
+
+class TestGroupAsyncSend(unittest.TestCase):
+
+    def setUp(self):
+        # Instantiate 2 network devices + 1 local device targeted by group
+        self.device1 = MockAsyncDevice('device1', 'device1', 'device', True, 'enabled', {})
+        self.device2 = MockAsyncDevice('device2', 'device2', 'device', True, 'enabled', {})
+        self.device3 = MockDevice('device3', 'device3', 'device', True, 'enabled', {})
+        self.sensor = MockSensor(
+            'sensor1', 'sensor1', 'sensor', True, 'enabled', {},
+            [self.device1, self.device2, self.device3]
+        )
+        self.group = Group("group2", [self.sensor])
+        self.sensor.group = self.group
+        self.sensor.add_routines()
+
+    def test_01_concurrent_send(self):
+        async def apply_and_wait():
+            start = time.time_ns()
+            self.group.apply_action(True)
+
+            # Confirm local device sent immediately, network devices pending
+            self.assertTrue(self.device3.state)
+            self.assertIsNone(self.device1.state)
+            self.assertIsNone(self.group.state)
+            self.assertTrue(self.group.pending_action)
+
+            # Confirm same action not sent again while pending
+            self.device3.send_method_called = False
+            self.group.apply_action(True)
+            self.assertFalse(self.device3.send_method_called)
+
+            while self.group.pending_action is not None:
+                await asyncio.sleep(0.01)
+            return (time.time_ns() - start) / 1000000000
+
+        elapsed = asyncio.run(apply_and_wait())
+
+        # Confirm both network devices sent concurrently (total time equal to
+        # one device, not sum of both), confirm states and routine
+        self.assertLess(elapsed, 0.35)
+        self.assertTrue(self.device1.state)
+        self.assertTrue(self.device2.state)
+        self.assertTrue(self.group.state)
+        self.assertTrue(self.sensor.routine_called)
+
+    def test_02_send_timeout(self):
+        # Simulate unreachable device (send takes longer than timeout)
+        self.device2.delay = 1
+        original_timeout = group_module.SEND_TIMEOUT
+        group_module.SEND_TIMEOUT = 0.3
+        try:
+            self.group.apply_action(True)
+            asyncio.run(asyncio.sleep(0.5))
+        finally:
+            group_module.SEND_TIMEOUT = original_timeout
+
+        # Confirm other devices turned on, timed out device state unchanged,
+        # group state reset and retry scheduled
+        self.assertTrue(self.device1.state)
+        self.assertTrue(self.device3.state)
+        self.assertIsNone(self.device2.state)
+        self.assertIsNone(self.group.state)
+        self.assertIsNone(self.group.pending_action)
+        self.assertFalse(self.sensor.routine_called)
+        self.assertIn("group2_retry_device2", str(app_context.timer_instance.schedule))
+        app_context.timer_instance.cancel("group2_retry_device2")
+
+    def test_03_failed_send(self):
+        # Simulate network device returning error
+        self.device1.send_result = False
+        self.group.apply_action(True)
+        asyncio.run(asyncio.sleep(0.3))
+
+        # Confirm group state reset and retry scheduled
+        self.assertIsNone(self.device1.state)
+        self.assertTrue(self.device2.state)
+        self.assertIsNone(self.group.state)
+        asyncio.run(asyncio.sleep(0.01))
+        self.assertIn("group2_retry_device1", str(app_context.timer_instance.schedule))
+        self.assertNotIn("group2_retry_device2", str(app_context.timer_instance.schedule))
+
+        # Simulate device coming back online, run retry callback
+        self.device1.send_result = True
+        self.device2.send_method_called = False
+        self.device3.send_method_called = False
+        self.group._retry(self.device1, True, self.group._action_id)
+        asyncio.run(asyncio.sleep(0.3))
+
+        # Confirm only failed device sent to, action finished
+        self.assertTrue(self.device1.state)
+        self.assertFalse(self.device2.send_method_called)
+        self.assertFalse(self.device3.send_method_called)
+        self.assertTrue(self.group.state)
+        self.assertTrue(self.sensor.routine_called)
+        app_context.timer_instance.cancel("group2_retry_device1")
+
+    def test_04_newer_action_overrides_pending(self):
+        # Apply True, apply False before network devices respond
+        self.group.apply_action(True)
+        self.group.apply_action(False)
+        asyncio.run(asyncio.sleep(0.5))
+
+        # Confirm final states match newer action (outdated results ignored)
+        self.assertFalse(self.device1.state)
+        self.assertFalse(self.device2.state)
+        self.assertFalse(self.device3.state)
+        self.assertFalse(self.device1.hardware_state)
+        self.assertFalse(self.group.state)
@@ -0,0 +1,93 @@
+import json
+import asyncio
+import unittest
+from json_stream import dump, LazyDict, JsonStreamWriter
+
+
+class MockStreamWriter:
+    '''Records each write and drain call made by JsonStreamWriter.'''
+
+    def __init__(self):
+        self.writes = []
+        self.drains = 0
+
+    def write(self, data):
+        self.writes.append(data)
+
+    async def drain(self):
+        self.drains += 1
+
+    def output(self):
+        return b''.join(self.writes).decode()
+
+
+class TestJsonStream(unittest.TestCase):
+
+    def test_01_output_matches_json_dumps(self):
+        obj = {
+            'string': 'value "quoted"',
+            'int': 5,
+            'float': 1.5,
+            'bool': True,
+            'none': None,
+            'list': [1, 'two', [3], {'four': 4}],
+            'tuple': (1, 2),
+            'nested': {'a': {'b': {}}, 'c': []}
+        }
+        swriter = MockStreamWriter()
+        asyncio.run(dump(obj, swriter))
+        self.assertEqual(swriter.output(), json.dumps(obj))
+
+        # Confirm non-string keys are converted to strings
+        swriter = MockStreamWriter()
+        asyncio.run(dump({5: 'int key', True: 'bool key'}, swriter))
+        self.assertEqual(swriter.output(), '{"5": "int key", "true": "bool key"}')
+
+    def test_02_writes_bounded_chunks(self):
+        # Build dict that serializes to much more than chunk size
+        obj = {f'device{i}': {'schedule': {'10:00': 'enabled'}} for i in range(50)}
+        swriter = MockStreamWriter()
+        asyncio.run(dump(obj, swriter, chunk_size=64))
+
+        # Confirm output written in multiple chunks, drained after each
+        self.assertGreater(len(swriter.writes), 10)
+        self.assertEqual(len(swriter.writes), swriter.drains)
+        # Each chunk should not exceed chunk size + longest single item
+        for chunk in swriter.writes:
+            self.assertLess(len(chunk), 64 + 16)
+        self.assertEqual(json.loads(swriter.output()), obj)
+
+    def test_03_lazy_dict(self):
+        # Track when each value is generated
+        generated = []
+
+        def items():
+            for i in range(3):
+                generated.append(i)
+                yield f'item{i}', {'value': i}
+
+        lazy = LazyDict(items)
+        # Confirm values not generated until serialized
+        self.assertEqual(generated, [])
+
+        swriter = MockStreamWriter()
+        asyncio.run(dump({'items': lazy}, swriter))
+        self.assertEqual(generated, [0, 1, 2])
+        self.assertEqual(
+            json.loads(swriter.output()),
+            {'items': {'item0': {'value': 0}, 'item1': {'value': 1}, 'item2': {'value': 2}}}
+        )
+
+        # Confirm to_dict returns regular dict with same items
+        self.assertEqual(
+            LazyDict(lambda: iter((('a', LazyDict(lambda: iter((('b', 1),)))),))).to_dict(),
+            {'a': {'b': 1}}
+        )
+
+    def test_04_flush_empty_buffer(self):
+        # Confirm flush does not write or drain when buffer is empty
+        swriter = MockStreamWriter()
+        writer = JsonStreamWriter(swriter)
+        asyncio.run(writer.flush())
+        self.assertEqual(swriter.writes, [])
+        self.assertEqual(swriter.drains, 0)
@@ -6,6 +6,7 @@ import app_context
 from Config import Config
 from cpython_only import cpython_only
 from default_config import default_config
+from startup_profile import get_profile
 
 if sys.implementation.name == 'cpython':
     from main import start, async_exception_handler
@@ -51,6 +52,8 @@ class TestMain(unittest.TestCase):
         self.assertEqual(app_context.config_instance, self.config)
         # Confirm webrepl started
         self.assertIsNotNone(webrepl.listen_s)
+        # Confirm boot time recorded in startup profile
+        self.assertIsNotNone(get_profile()['boot_us'])
 
     @cpython_only
     def test_02_start_default_config(self):
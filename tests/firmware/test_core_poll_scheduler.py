@@ -0,0 +1,179 @@
+import asyncio
+import unittest
+import PollScheduler as poll_scheduler_module
+from PollScheduler import PollScheduler
+from cpython_only import cpython_only
+
+
+class MockInstance():
+    '''Minimal instance with name and async poll method that records calls.'''
+
+    def __init__(self, name, result=True, delay=0):
+        self.name = name
+        self.result = result
+        self.delay = delay
+        self.polls = 0
+        # Shared by all instances in concurrency test
+        self.counter = None
+
+    async def poll(self):
+        self.polls += 1
+        if self.counter is not None:
+            self.counter['running'] += 1
+            self.counter['max'] = max(self.counter['max'], self.counter['running'])
+        await asyncio.sleep(self.delay)
+        if self.counter is not None:
+            self.counter['running'] -= 1
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+class TestPollScheduler(unittest.TestCase):
+
+    def setUp(self):
+        # Shorten stagger so tests run quickly
+        self.original_stagger = poll_scheduler_module.STAGGER
+        poll_scheduler_module.STAGGER = 10
+        self.scheduler = PollScheduler()
+
+    def tearDown(self):
+        poll_scheduler_module.STAGGER = self.original_stagger
+        if self.scheduler.loop_task is not None:
+            self.scheduler.loop_task.cancel()
+        asyncio.run(asyncio.sleep(0.01))
+
+    def test_01_register_staggers_first_poll(self):
+        instances = [MockInstance(f'device{i}') for i in range(1, 4)]
+        for instance in instances:
+            self.scheduler.register(instance, instance.poll)
+
+        # Confirm loop started, first polls are STAGGER ms apart
+        self.assertIsNotNone(self.scheduler.loop_task)
+        times = [self.scheduler.entries[i.name]['next_poll'] for i in instances]
+        self.assertAlmostEqual(times[1] - times[0], 10, delta=2)
+        self.assertAlmostEqual(times[2] - times[1], 10, delta=2)
+
+    def test_02_polls_at_interval(self):
+        instance = MockInstance('device1')
+        self.scheduler.register(instance, instance.poll, interval=100)
+
+        # Confirm polled several times, stats updated
+        asyncio.run(asyncio.sleep(0.45))
+        self.assertGreaterEqual(instance.polls, 3)
+        self.assertLessEqual(instance.polls, 5)
+        stats = self.scheduler.get_stats()['device1']
+        self.assertEqual(stats['polls'], instance.polls)
+        self.assertEqual(stats['failures'], 0)
+        self.assertEqual(stats['consecutive_failures'], 0)
+        self.assertIsInstance(stats['last_latency_ms'], int)
+        self.assertIsInstance(stats['avg_latency_ms'], int)
+        self.assertEqual(stats['interval_ms'], 100)
+
+    def test_03_failed_polls_back_off(self):
+        instance = MockInstance('device1', result=False)
+        self.scheduler.register(instance, instance.poll, interval=100)
+
+        # Confirm interval doubles after each consecutive failure
+        # First poll at 10ms, second at 210ms, third at 610ms
+        asyncio.run(asyncio.sleep(0.5))
+        self.assertEqual(instance.polls, 2)
+        stats = self.scheduler.get_stats()['device1']
+        self.assertEqual(stats['failures'], 2)
+        self.assertEqual(stats['consecutive_failures'], 2)
+        self.assertEqual(stats['interval_ms'], 400)
+
+        # Confirm backoff capped at MAX_BACKOFF
+        self.scheduler.entries['device1']['consecutive_failures'] = 20
+        self.assertEqual(
+            self.scheduler.get_stats()['device1']['interval_ms'],
+            poll_scheduler_module.MAX_BACKOFF
+        )
+
+        # Confirm consecutive failures reset after successful poll
+        self.scheduler.entries['device1']['consecutive_failures'] = 2
+        instance.result = True
+        asyncio.run(asyncio.sleep(0.45))
+        stats = self.scheduler.get_stats()['device1']
+        self.assertEqual(stats['consecutive_failures'], 0)
+        self.assertEqual(stats['failures'], 2)
+
+    def test_04_exception_counts_as_failure(self):
+        instance = MockInstance('device1', result=RuntimeError('failed'))
+        self.scheduler.register(instance, instance.poll, interval=100)
+        asyncio.run(asyncio.sleep(0.05))
+        self.assertEqual(self.scheduler.get_stats()['device1']['failures'], 1)
+
+    def test_05_boost(self):
+        instance = MockInstance('device1')
+        self.scheduler.register(instance, instance.poll, interval=5000)
+        asyncio.run(asyncio.sleep(0.05))
+        self.assertEqual(instance.polls, 1)
+
+        # Confirm next poll moved up to FAST_INTERVAL, stays fast after poll
+        self.scheduler.boost(instance)
+        stats = self.scheduler.get_stats()['device1']
+        self.assertLessEqual(stats['next_poll_ms'], poll_scheduler_module.FAST_INTERVAL)
+        self.assertEqual(stats['interval_ms'], poll_scheduler_module.FAST_INTERVAL)
+
+        # Confirm boost does not shorten backoff of unreachable instance
+        entry = self.scheduler.entries['device1']
+        entry['consecutive_failures'] = 3
+        entry['next_poll'] += 60000
+        next_poll = entry['next_poll']
+        self.scheduler.boost(instance)
+        self.assertEqual(entry['next_poll'], next_poll)
+
+        # Confirm unregistered instance ignored
+        self.scheduler.boost(MockInstance('device2'))
+        self.assertNotIn('device2', self.scheduler.entries)
+
+    def test_06_concurrency_limit(self):
+        counter = {'running': 0, 'max': 0}
+        instances = [MockInstance(f'device{i}', delay=0.05) for i in range(1, 6)]
+        for instance in instances:
+            instance.counter = counter
+            self.scheduler.register(instance, instance.poll, interval=1000)
+            # Make all polls due immediately
+            self.scheduler.entries[instance.name]['next_poll'] = 0
+
+        # Confirm all polled, never more than MAX_CONCURRENT at once
+        asyncio.run(asyncio.sleep(0.3))
+        for instance in instances:
+            self.assertEqual(instance.polls, 1)
+        self.assertEqual(counter['max'], poll_scheduler_module.MAX_CONCURRENT)
+
+    def test_07_unregister(self):
+        instance = MockInstance('device1')
+        self.scheduler.register(instance, instance.poll, interval=50)
+        asyncio.run(asyncio.sleep(0.03))
+        self.assertEqual(instance.polls, 1)
+
+        # Confirm not polled after unregistering
+        self.scheduler.unregister(instance)
+        asyncio.run(asyncio.sleep(0.1))
+        self.assertEqual(instance.polls, 1)
+        self.assertEqual(self.scheduler.get_stats(), {})
+
+        # Confirm unregistering again does not raise
+        self.scheduler.unregister(instance)
+
+    @cpython_only
+    def test_08_latency_average(self):
+        from unittest.mock import patch
+
+        instance = MockInstance('device1')
+        self.scheduler.register(instance, instance.poll, interval=100)
+        entry = self.scheduler.entries['device1']
+        # Stop loop (only call _poll directly)
+        self.scheduler.loop_task.cancel()
+        asyncio.run(asyncio.sleep(0.01))
+
+        # Simulate 100ms latency on first poll, 20ms on second
+        with patch.object(poll_scheduler_module.clock, 'now', side_effect=[0, 100, 100, 100]):
+            asyncio.run(self.scheduler._poll('device1', entry))
+        self.assertEqual(entry['avg_latency_ms'], 100)
+        with patch.object(poll_scheduler_module.clock, 'now', side_effect=[0, 20, 20, 20]):
+            asyncio.run(self.scheduler._poll('device1', entry))
+        self.assertEqual(entry['last_latency_ms'], 20)
+        self.assertEqual(entry['avg_latency_ms'], 80)
@@ -0,0 +1,190 @@
+import time
+import clock
+import asyncio
+import unittest
+import SensorSampler as sensor_sampler_module
+from SensorSampler import SensorSampler
+
+
+class MockInstance():
+    '''Minimal instance with name, sample method that records start and end
+    time of each read, and get_interval method that returns interval attribute.
+    '''
+
+    def __init__(self, name, interval=100, duration=0, result=None):
+        self.name = name
+        self.interval = interval
+        self.duration = duration
+        self.result = result
+        # List of (start, end) tuples, one for each read
+        self.reads = []
+
+    def sample(self):
+        start = clock.now()
+        # Simulate blocking hardware read
+        if self.duration:
+            time.sleep(self.duration / 1000)
+        self.reads.append((start, clock.now()))
+        if isinstance(self.result, Exception):
+            raise self.result
+
+    def get_interval(self):
+        return self.interval
+
+
+class TestSensorSampler(unittest.TestCase):
+
+    def setUp(self):
+        # Shorten gap so tests run quickly
+        self.original_gap = sensor_sampler_module.MIN_GAP
+        sensor_sampler_module.MIN_GAP = 20
+        self.sampler = SensorSampler()
+
+    def tearDown(self):
+        sensor_sampler_module.MIN_GAP = self.original_gap
+        if self.sampler.loop_task is not None:
+            self.sampler.loop_task.cancel()
+        asyncio.run(asyncio.sleep(0.01))
+
+    def register(self, instance):
+        self.sampler.register(instance, instance.sample, instance.get_interval)
+
+    def test_01_register_assigns_phase_offsets(self):
+        instances = [MockInstance(f'sensor{i}') for i in range(1, 4)]
+        for instance in instances:
+            self.register(instance)
+
+        # Confirm loop started, first reads are MIN_GAP ms apart
+        self.assertIsNotNone(self.sampler.loop_task)
+        times = [self.sampler.entries[i.name]['next_read'] for i in instances]
+        self.assertAlmostEqual(times[1] - times[0], 20, delta=2)
+        self.assertAlmostEqual(times[2] - times[1], 20, delta=2)
+
+    def test_02_reads_at_interval(self):
+        instance = MockInstance('sensor1', interval=100)
+        self.register(instance)
+
+        # Confirm read several times, stats updated
+        asyncio.run(asyncio.sleep(0.45))
+        self.assertGreaterEqual(len(instance.reads), 4)
+        self.assertLessEqual(len(instance.reads), 6)
+        stats = self.sampler.get_stats()['sensor1']
+        self.assertEqual(stats['reads'], len(instance.reads))
+        self.assertEqual(stats['failures'], 0)
+        self.assertIsInstance(stats['last_duration_ms'], int)
+        self.assertIsInstance(stats['avg_duration_ms'], int)
+        self.assertIsInstance(stats['last_lateness_ms'], int)
+        self.assertEqual(stats['interval_ms'], 100)
+        self.assertLessEqual(stats['next_read_ms'], 100)
+
+    def test_03_adaptive_interval(self):
+        instance = MockInstance('sensor1', interval=200)
+        self.register(instance)
+        asyncio.run(asyncio.sleep(0.05))
+        self.assertEqual(len(instance.reads), 1)
+        self.assertEqual(self.sampler.get_stats()['sensor1']['interval_ms'], 200)
+
+        # Simulate sensor near threshold (faster interval), confirm used for
+        # every read after the next read
+        instance.interval = 50
+        asyncio.run(asyncio.sleep(0.45))
+        self.assertGreaterEqual(len(instance.reads), 6)
+        self.assertEqual(self.sampler.get_stats()['sensor1']['interval_ms'], 50)
+
+    def test_04_reads_never_overlap(self):
+        # Register 3 instances with slow reads and same interval
+        instances = [MockInstance(f'sensor{i}', interval=200, duration=30) for i in range(1, 4)]
+        for instance in instances:
+            self.register(instance)
+        asyncio.run(asyncio.sleep(0.7))
+
+        # Confirm every read started at least MIN_GAP after previous read ended
+        reads = sorted(read for instance in instances for read in instance.reads)
+        self.assertGreaterEqual(len(reads), 6)
+        for previous, current in zip(reads, reads[1:]):
+            self.assertGreaterEqual(current[0] - previous[1], 18)
+
+        # Confirm duration stats reflect blocking read
+        stats = self.sampler.get_stats()['sensor1']
+        self.assertGreaterEqual(stats['max_duration_ms'], 30)
+        self.assertGreaterEqual(stats['avg_duration_ms'], 30)
+
+    def test_05_find_slot(self):
+        # Add entries with known read times and durations
+        self.register(MockInstance('sensor1'))
+        self.register(MockInstance('sensor2'))
+        self.sampler.loop_task.cancel()
+        asyncio.run(asyncio.sleep(0.01))
+        self.sampler.entries['sensor1']['next_read'] = 1000
+        self.sampler.entries['sensor1']['avg_duration_ms'] = 50
+        self.sampler.entries['sensor2']['next_read'] = 1070
+        self.sampler.entries['sensor2']['avg_duration_ms'] = 10
+
+        # Confirm requested time returned if clear of other reads
+        self.assertEqual(self.sampler._find_slot(900, 'sensor3'), 900)
+        self.assertEqual(self.sampler._find_slot(2000, 'sensor3'), 2000)
+
+        # Confirm moved after sensor1 read (+ gap), then after sensor2 read
+        self.assertEqual(self.sampler._find_slot(1000, 'sensor3'), 1100)
+
+        # Confirm own read duration moves slot if it would run into next read
+        self.sampler.entries['sensor3'] = dict(self.sampler.entries['sensor2'])
+        self.sampler.entries['sensor3']['avg_duration_ms'] = 200
+        self.assertEqual(self.sampler._find_slot(900, 'sensor3'), 1100)
+
+    def test_06_exception_counts_as_failure(self):
+        instance = MockInstance('sensor1', result=RuntimeError('failed'))
+        self.register(instance)
+        asyncio.run(asyncio.sleep(0.05))
+        stats = self.sampler.get_stats()['sensor1']
+        self.assertEqual(stats['failures'], 1)
+        self.assertEqual(stats['reads'], 1)
+
+        # Confirm still read after failure
+        asyncio.run(asyncio.sleep(0.15))
+        self.assertGreaterEqual(len(instance.reads), 2)
+
+    def test_07_lateness(self):
+        instance = MockInstance('sensor1', interval=1000)
+        self.register(instance)
+        asyncio.run(asyncio.sleep(0.05))
+
+        # Simulate read scheduled 300ms ago (eg blocked by slow read)
+        self.sampler.entries['sensor1']['next_read'] = clock.deadline(-300)
+        self.sampler.wake.set()
+        asyncio.run(asyncio.sleep(0.05))
+        stats = self.sampler.get_stats()['sensor1']
+        self.assertGreaterEqual(stats['last_lateness_ms'], 300)
+        self.assertGreaterEqual(stats['max_lateness_ms'], 300)
+
+        # Confirm next read keeps phase (interval from scheduled time)
+        self.assertAlmostEqual(stats['next_read_ms'], 650, delta=20)
+
+        # Simulate read late by more than interval
+        self.sampler.entries['sensor1']['next_read'] = clock.deadline(-1200)
+        self.sampler.wake.set()
+        asyncio.run(asyncio.sleep(0.05))
+        stats = self.sampler.get_stats()['sensor1']
+        self.assertGreaterEqual(stats['max_lateness_ms'], 1200)
+
+        # Confirm next read scheduled 1 interval after read (not immediately)
+        self.assertAlmostEqual(stats['next_read_ms'], 950, delta=20)
+
+    def test_08_unregister(self):
+        instance = MockInstance('sensor1', interval=50)
+        self.register(instance)
+        asyncio.run(asyncio.sleep(0.03))
+        self.assertEqual(len(instance.reads), 1)
+
+        # Confirm ignored if different instance with same name registered
+        self.sampler.unregister(MockInstance('sensor1'))
+        self.assertIn('sensor1', self.sampler.entries)
+
+        # Confirm not read after unregistering
+        self.sampler.unregister(instance)
+        asyncio.run(asyncio.sleep(0.1))
+        self.assertEqual(len(instance.reads), 1)
+        self.assertEqual(self.sampler.get_stats(), {})
+
+        # Confirm unregistering again does not raise
+        self.sampler.unregister(instance)
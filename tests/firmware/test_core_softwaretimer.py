@@ -161,8 +161,8 @@ class TestSoftwareTimer(unittest.TestCase):
         app_context.timer_instance.queue = []
         app_context.timer_instance.schedule = {}
 
-        # Confirm loop not paused
-        app_context.timer_instance.pause = False
+        # Wake loop, confirm not paused
+        app_context.timer_instance._resume()
         self.assertFalse(app_context.timer_instance.pause)
 
         # Run event loop for 100ms (branch coverage for iterating empty queue)
@@ -172,6 +172,20 @@ class TestSoftwareTimer(unittest.TestCase):
         self.assertTrue(app_context.timer_instance.pause)
         self.assertIsNone(app_context.timer_instance.timer.start_time)
 
+    def test_loop_wakes_when_timer_created(self):
+        # Ensure loop is paused and awaiting flag
+        asyncio.run(self.sleep(10))
+        self.assertTrue(app_context.timer_instance.pause)
+
+        # Create timer due in 20 ms, run event loop for 40ms
+        start_time = time.time_ns()
+        app_context.timer_instance.create(20, self.callback1, 'test1')
+        asyncio.run(self.sleep(40))
+
+        # Confirm callback ran (loop woke up from flag set by create)
+        self.assertTrue(self.callbacks['test1']['called'])
+        self.assertLess(time.time_ns() - start_time, 100000000)
+
     def test_regression_timer_created_in_callback_function_runs_late(self):
         '''Original bug: If SoftwareTimer.create was called by a timer callback
         function (eg DimmableLight.fade), and the new timer expired before all
@@ -207,3 +221,54 @@ class TestSoftwareTimer(unittest.TestCase):
 
         # Confirm the timer created by callback ran
         self.assertTrue(self.callbacks['test1']['called'])
+
+    def test_cancel_leaves_expiration_in_heap(self):
+        # Create timer, yield to let create coroutine run
+        app_context.timer_instance.create(10000, print, "unit_test")
+        asyncio.run(self.sleep(10))
+        self.assertIn("unit_test", app_context.timer_instance.names)
+
+        # Cancel timer, yield to let cancel coroutine run
+        app_context.timer_instance.cancel("unit_test")
+        asyncio.run(self.sleep(10))
+
+        # Confirm removed from schedule and name index
+        self.assertNotIn("unit_test", str(app_context.timer_instance.schedule))
+        self.assertNotIn("unit_test", app_context.timer_instance.names)
+
+        # Confirm every live timer is still in heap, first item is next due
+        queue = app_context.timer_instance.queue
+        for expiration in app_context.timer_instance.schedule:
+            self.assertIn(expiration, queue)
+        if queue:
+            self.assertEqual(queue[0], min(queue))
+
+    def test_heap_compacted_when_mostly_canceled(self):
+        # Create 100 timers with unique names, yield to let create coroutines run
+        for i in range(100):
+            app_context.timer_instance.create(10000, print, f"unit_test{i}")
+        asyncio.run(self.sleep(10))
+
+        # Cancel all timers, yield to let cancel coroutines run
+        for i in range(100):
+            app_context.timer_instance.cancel(f"unit_test{i}")
+        asyncio.run(self.sleep(10))
+
+        # Confirm canceled expiration times were dropped from heap
+        schedule = app_context.timer_instance.schedule
+        queue = app_context.timer_instance.queue
+        self.assertLessEqual(len(queue), 2 * len(schedule) + 16)
+        self.assertNotIn("unit_test", str(schedule))
+
+    def test_timers_expire_in_order(self):
+        # Create timers in reverse order of expiration
+        order = []
+        app_context.timer_instance.create(30, lambda: order.append(3), 'test3')
+        app_context.timer_instance.create(20, lambda: order.append(2), 'test2')
+        app_context.timer_instance.create(10, lambda: order.append(1), 'test1')
+
+        # Run event loop for 100ms to allow all timers to complete
+        asyncio.run(self.sleep(100))
+
+        # Confirm callbacks ran in order of expiration time
+        self.assertEqual(order, [1, 2, 3])
@@ -1,6 +1,7 @@
 import os
 import json
 import asyncio
+import logging
 import unittest
 from machine import reset
 from util import (
@@ -12,7 +13,7 @@ from util import (
     write_ir_macros_to_disk,
     reboot,
     clear_log,
-    check_log_size
+    flush_log
 )
 import app_context
 from cpython_only import cpython_only
@@ -101,29 +102,28 @@ class TestUtil(unittest.TestCase):
         clear_log()
         self.assertEqual(os.stat('app.log')[6], 0)
 
-    @cpython_only
-    def test_09_check_log_size(self):
-        # Create mock log file with size 100001 bytes
-        with open('app.log', 'wb') as f:
-            f.write(os.urandom(100001))
-        self.assertEqual(os.stat('app.log')[6], 100001)
+    def test_09_flush_log(self):
+        # Add handler that records flush calls
+        class MockHandler():
+            flushed = 0
+
+            def flush(self):
+                self.flushed += 1
 
-        # Confirm no check_log_size timer in SoftwareTimer queue
-        self.assertTrue("check_log_size" not in str(app_context.timer_instance.schedule))
+        handler = MockHandler()
+        logging.root.handlers.append(handler)
+
+        # Confirm no flush_log timer in SoftwareTimer queue
+        app_context.timer_instance.cancel("flush_log")
+        asyncio.run(asyncio.sleep_ms(10))
+        self.assertTrue("flush_log" not in str(app_context.timer_instance.schedule))
 
-        # Run function, confirm log deleted and re-created
-        check_log_size()
-        self.assertLessEqual(os.stat('app.log')[6], 100)
+        # Run function, confirm handler flushed
+        flush_log()
+        self.assertEqual(handler.flushed, 1)
 
-        # Confirm created check_log_size timer (runs every 60 seconds)
+        # Confirm created flush_log timer (runs every 5 seconds)
         asyncio.run(asyncio.sleep_ms(10))
-        self.assertTrue("check_log_size" in str(app_context.timer_instance.schedule))
-        app_context.timer_instance.cancel("check_log_size")
-
-        # Simulate timer expiring while log size is 1kb
-        with open('app.log', 'wb') as f:
-            f.write(os.urandom(1000))
-        self.assertEqual(os.stat('app.log')[6], 1000)
-        check_log_size()
-        # Confirm did not clear log (has not reached limit)
-        self.assertEqual(os.stat('app.log')[6], 1000)
+        self.assertTrue("flush_log" in str(app_context.timer_instance.schedule))
+        app_context.timer_instance.cancel("flush_log")
+        logging.root.handlers.remove(handler)
@@ -1,9 +1,10 @@
 import sys
 import json
+import asyncio
 import network
 import unittest
 import app_context
-from ApiTarget import ApiTarget
+from ApiTarget import ApiTarget, ConnectionClosed
 from cpython_only import cpython_only
 
 # Import dependencies for tests that only run in mocked environment
@@ -36,6 +37,7 @@ expected_attributes = {
     'group': None,
     'rule_queue': [],
     'state': None,
+    'unreachable': False,
     'default_rule': {
         'on': [
             'enable',
@@ -71,6 +73,10 @@ class MockDevice():
     def __init__(self):
         self.name = 'device1'
         self.enabled = True
+        self.state = None
+
+    def send(self, state=1):
+        return True
 
     def enable(self):
         self.enabled = True
@@ -79,6 +85,12 @@ class MockDevice():
         self.enabled = False
 
 
+# Mock keep-alive socket used in request retry tests
+class MockSocket():
+    def close(self):
+        pass
+
+
 class TestApiTarget(unittest.TestCase):
 
     @classmethod
@@ -293,6 +305,48 @@ class TestApiTarget(unittest.TestCase):
         # Revert IP
         self.instance.ip = config["mock_receiver"]["ip"]
 
+    # Async endpoints must be awaited (returned unawaited coroutine, reported
+    # success without turning mock device on or off)
+    def test_12_send_to_self_turn_on_turn_off(self):
+        # Set target IP to own IP
+        self.instance.ip = wlan.ifconfig()[0]
+        self.instance.enable()
+        self.assertTrue(self.instance.set_rule({
+            'on': ['turn_on', 'device1'],
+            'off': ['turn_off', 'device1']
+        }))
+
+        # Confirm send_async awaits endpoint, mock device state changes
+        self.assertTrue(asyncio.run(self.instance.send_async(1)))
+        self.assertTrue(self.target.state)
+        self.assertTrue(asyncio.run(self.instance.send_async(0)))
+        self.assertFalse(self.target.state)
+
+        # Confirm send runs endpoint in task, mock device state changes
+        async def send(state):
+            result = self.instance.send(state)
+            await asyncio.sleep(0.01)
+            return result
+        self.assertTrue(asyncio.run(send(1)))
+        self.assertTrue(self.target.state)
+        self.assertTrue(asyncio.run(send(0)))
+        self.assertFalse(self.target.state)
+
+        # Confirm send_async fails if endpoint returns error
+        self.instance.current_rule = {
+            'on': ['turn_on', 'device2'],
+            'off': ['turn_off', 'device2']
+        }
+        self.assertFalse(asyncio.run(self.instance.send_async(1)))
+        self.assertFalse(asyncio.run(self.instance.send_async(0)))
+
+        # Confirm non-dict/list reply is rejected
+        self.assertFalse(self.instance.check_reply(['turn_on'], None))
+        self.assertTrue(self.instance.check_reply(['status'], []))
+
+        # Revert IP
+        self.instance.ip = config["mock_receiver"]["ip"]
+
     # Original bug: ApiTarget class overwrites parent set_rule method and did not include conditional
     # that overwrites "enabled" with default_rule. This resulted in an unusable rule which caused
     # crash next time send method was called.
@@ -381,3 +435,75 @@ class TestApiTarget(unittest.TestCase):
             self.instance.current_rule,
             {'on': ['enable', 'device2'], 'off': ['enable', 'device2']}
         )
+
+    def test_19_keepalive_connection_reused(self):
+        self.instance.enable()
+        self.instance.set_rule({'on': ['turn_on', 'device2'], 'off': ['turn_off', 'device2']})
+        self.instance._close()
+
+        # First request should open connection
+        self.assertTrue(self.instance.send(1))
+        sock = self.instance._sock
+        self.assertIsNotNone(sock)
+
+        # Second request should reuse same connection
+        self.assertTrue(self.instance.send(0))
+        self.assertIs(self.instance._sock, sock)
+
+        # Simulate target closing connection, confirm request fails and
+        # connection is closed
+        self.assertFalse(self.instance.request(['raise_exception']))
+        self.assertIsNone(self.instance._sock)
+
+        # Confirm next request reconnects
+        self.assertTrue(self.instance.send(1))
+        self.assertIsNotNone(self.instance._sock)
+        self.assertIsNot(self.instance._sock, sock)
+
+    def test_20_send_async(self):
+        self.instance.enable()
+        self.instance.set_rule({'on': ['turn_on', 'device2'], 'off': ['turn_off', 'device2']})
+
+        # Confirm awaitable send succeeds for on and off commands
+        self.assertTrue(asyncio.run(self.instance.send_async(1)))
+        self.assertTrue(asyncio.run(self.instance.send_async(0)))
+
+        # Confirm returns False if target closes connection early
+        self.instance.current_rule['on'] = ['raise_exception']
+        self.assertFalse(asyncio.run(self.instance.send_async(1)))
+
+        # Confirm returns False if target unreachable
+        self.instance.ip = '0.0.0.'
+        self.assertFalse(asyncio.run(self.instance.send_async(0)))
+        self.instance.ip = config["mock_receiver"]["ip"]
+
+
+    # Original bug: request resent command after any failure (including
+    # timeout after target received it), slow target ran command twice
+    @cpython_only
+    def test_21_request_only_resends_if_not_received(self):
+        reply = {'On': 'device2'}
+
+        def connect():
+            self.instance._sock = MockSocket()
+
+        with patch.object(self.instance, '_connect', side_effect=connect) as mock_connect:
+            # Reused connection closed before reply: confirm resent once on
+            # new connection and succeeds
+            self.instance._sock = MockSocket()
+            with patch.object(self.instance, '_send_keepalive', side_effect=[ConnectionClosed, reply]) as mock_send:
+                self.assertTrue(self.instance.request(['turn_on', 'device2']))
+                self.assertEqual(mock_send.call_count, 2)
+                self.assertEqual(mock_connect.call_count, 1)
+
+            # Timeout after sending on reused connection: confirm not resent
+            with patch.object(self.instance, '_send_keepalive', side_effect=[OSError, reply]) as mock_send:
+                self.assertFalse(self.instance.request(['turn_on', 'device2']))
+                self.assertEqual(mock_send.call_count, 1)
+                self.assertIsNone(self.instance._sock)
+
+            # New connection closed before reply: confirm not resent
+            with patch.object(self.instance, '_send_keepalive', side_effect=[ConnectionClosed, reply]) as mock_send:
+                self.assertFalse(self.instance.request(['turn_on', 'device2']))
+                self.assertEqual(mock_send.call_count, 1)
+                self.assertIsNone(self.instance._sock)
@@ -1,4 +1,5 @@
 import json
+import asyncio
 import unittest
 import requests
 from DesktopTarget import DesktopTarget
@@ -43,7 +44,17 @@ class TestDesktopTarget(unittest.TestCase):
         # (prevents group repeatedly trying to turn off while user active)
         self.assertTrue(self.instance.send(0))
 
-    def test_06_network_errors(self):
+    def test_06_send_async(self):
+        # Confirm awaitable send turns screen on/off
+        self.assertTrue(asyncio.run(self.instance.send_async(1)))
+        self.assertTrue(asyncio.run(self.instance.send_async(0)))
+
+        # Confirm returns True without sending when turning on while disabled
+        self.instance.disable()
+        self.assertTrue(asyncio.run(self.instance.send_async(1)))
+        self.instance.enable()
+
+    def test_07_network_errors(self):
         # Change to invalid IP to simulate failed connection, confirm send returns False
         self.instance.uri = f'0.0.0.:{config["mock_receiver"]["port"]}'
         self.assertFalse(self.instance.send(1))
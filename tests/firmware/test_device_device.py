@@ -21,6 +21,7 @@ expected_attributes = {
     'group': 'group1',
     'rule_queue': [10, 20],
     'state': None,
+    'unreachable': False,
     'name': 'device1',
     'triggered_by': ['sensor1']
 }
@@ -315,3 +316,24 @@ class TestDevice(unittest.TestCase):
         # Call enable method, confirm sensor is enabled (did not call disable)
         self.instance.enable()
         self.assertTrue(self.instance.enabled)
+
+    def test_21_status_changed(self):
+        from Instance import Instance
+
+        # Confirm changing state increments status version
+        version = Instance.status_version
+        self.instance.state = not self.instance.state
+        self.assertEqual(Instance.status_version, version + 1)
+        self.assertEqual(self.instance.changed_version, Instance.status_version)
+
+        # Confirm setting same value does not increment version
+        self.instance.state = self.instance.state
+        self.assertEqual(Instance.status_version, version + 1)
+
+        # Confirm changing rule and enabled increment status version
+        self.instance.current_rule = 'changed'
+        self.assertEqual(Instance.status_version, version + 2)
+        self.instance.scheduled_rule = 'changed'
+        self.assertEqual(Instance.status_version, version + 3)
+        self.instance.enabled = not self.instance.enabled
+        self.assertEqual(Instance.status_version, version + 4)
@@ -2,7 +2,7 @@ import time
 import asyncio
 import unittest
 import app_context
-from DimmableLight import DimmableLight
+from DimmableLight import DimmableLight, FadeScheduler, fade_scheduler, FADE_TIMER
 
 
 class TestDimmableLight(unittest.TestCase):
@@ -26,8 +26,9 @@ class TestDimmableLight(unittest.TestCase):
         cls.instance.send = send
 
     def setUp(self):
-        # Ensure no fade timer from previous test in queue
-        app_context.timer_instance.cancel('device1_fade')
+        # Ensure no fade timer or active fade from previous test
+        fade_scheduler.active.clear()
+        app_context.timer_instance.cancel(FADE_TIMER)
         asyncio.run(self.sleep(10))
 
     def test_01_initial_state(self):
@@ -102,7 +103,7 @@ class TestDimmableLight(unittest.TestCase):
 
     def test_07_set_rule(self):
         # Confirm no fade timer in SoftwareTimer queue
-        self.assertTrue("device1_fade" not in str(app_context.timer_instance.schedule))
+        self.assertTrue(FADE_TIMER not in str(app_context.timer_instance.schedule))
 
         # Should accept fade rules
         self.assertTrue(self.instance.set_rule('fade/30/1800'))
@@ -112,7 +113,7 @@ class TestDimmableLight(unittest.TestCase):
 
         # Confirm setting rule created fade timer
         asyncio.run(self.sleep(10))
-        self.assertIn("device1_fade", str(app_context.timer_instance.schedule))
+        self.assertIn(FADE_TIMER, str(app_context.timer_instance.schedule))
 
         # Should accept scheduled fade rule, set scheduled param to True
         self.assertTrue(self.instance.set_rule('fade/30/1800', True))
@@ -182,7 +183,7 @@ class TestDimmableLight(unittest.TestCase):
         self.assertEqual(self.instance.current_rule, 100)
         # Confirm not fading, no timer created
         self.assertFalse(self.instance.fading)
-        self.assertTrue("device1_fade" not in str(app_context.timer_instance.schedule))
+        self.assertTrue(FADE_TIMER not in str(app_context.timer_instance.schedule))
 
     def test_13_start_fade_already_at_target(self):
         # Attempt to fade to current_rule, should return immediately
@@ -193,7 +194,7 @@ class TestDimmableLight(unittest.TestCase):
         asyncio.run(self.sleep(10))
         # Confirm not fading, no timer created
         self.assertFalse(self.instance.fading)
-        self.assertTrue("device1_fade" not in str(app_context.timer_instance.schedule))
+        self.assertTrue(FADE_TIMER not in str(app_context.timer_instance.schedule))
 
     def test_14_start_fade_while_disabled(self):
         # Attempt to fade to 100 while disabled
@@ -203,7 +204,7 @@ class TestDimmableLight(unittest.TestCase):
         asyncio.run(self.sleep(10))
         # Confirm timer created, starting brightness = min_rule
         self.assertEqual(self.instance.fading['starting_brightness'], self.instance.min_rule)
-        self.assertIn("device1_fade", str(app_context.timer_instance.schedule))
+        self.assertIn(FADE_TIMER, str(app_context.timer_instance.schedule))
 
     def test_15_fade_complete(self):
         # Simulate fade up in progress (not scheduled)
@@ -351,12 +352,6 @@ class TestDimmableLight(unittest.TestCase):
             "scheduled": False
         }
 
-        # Confirm no fade timer in queue
-        app_context.timer_instance.cancel("device1_fade")
-        # Yield to let SoftwareTimer.cancel coro run
-        asyncio.run(self.sleep(10))
-        self.assertTrue("device1_fade" not in str(app_context.timer_instance.schedule))
-
         # Wait for 1 step, call method, confirm correct rule
         time.sleep_ms(1000)
         self.instance.fade()
@@ -365,9 +360,11 @@ class TestDimmableLight(unittest.TestCase):
         # Confirm scheduled_rule did not change
         self.assertNotEqual(self.instance.scheduled_rule, 50)
 
-        # Confirm timer exists in queue
-        asyncio.run(self.sleep(10))
-        self.assertIn("device1_fade", str(app_context.timer_instance.schedule))
+        # Call again before next step due, confirm send not called (unchanged)
+        self.instance.send_method_called = False
+        self.instance.fade()
+        self.assertEqual(self.instance.current_rule, 2)
+        self.assertFalse(self.instance.send_method_called)
 
         # Simulate scheduled fade rule
         self.instance.fading = {
@@ -476,3 +473,103 @@ class TestDimmableLight(unittest.TestCase):
         # Confirm BOTH current and scheduled rules were set to fade target
         self.assertEqual(self.instance.current_rule, 100)
         self.assertEqual(self.instance.scheduled_rule, 100)
+
+    def create_instance(self, name):
+        # Returns instance with mock send method that counts calls
+        instance = DimmableLight(name, name, "DimmableLight", True, 50, {}, "1", "100")
+        instance.send_count = 0
+
+        def send(arg=None):
+            instance.send_count += 1
+            return True
+        instance.send = send
+        return instance
+
+    def test_23_fade_scheduler_single_timer(self):
+        # Start fades on 2 instances with different periods
+        device2 = self.create_instance("device2")
+        device3 = self.create_instance("device3")
+        device2.set_rule(1)
+        device3.set_rule(100)
+        device2.set_rule('fade/100/600')
+        device3.set_rule('fade/50/60')
+
+        # Confirm both in shared table, only 1 timer in queue
+        self.assertEqual(fade_scheduler.active, {"device2": device2, "device3": device3})
+        asyncio.run(self.sleep(10))
+        self.assertEqual(str(app_context.timer_instance.schedule).count(FADE_TIMER), 1)
+        self.assertTrue("device2_fade" not in str(app_context.timer_instance.schedule))
+        self.assertTrue("device3_fade" not in str(app_context.timer_instance.schedule))
+
+        # Set device3 past fade target, confirm removed on next tick, timer still exists
+        device3.set_rule(40)
+        fade_scheduler.tick()
+        self.assertEqual(fade_scheduler.active, {"device2": device2})
+        asyncio.run(self.sleep(10))
+        self.assertIn(FADE_TIMER, str(app_context.timer_instance.schedule))
+
+        # Disable device2 (aborts fade), confirm timer canceled on next tick
+        device2.set_rule('disabled')
+        fade_scheduler.tick()
+        self.assertEqual(fade_scheduler.active, {})
+        asyncio.run(self.sleep(10))
+        self.assertTrue(FADE_TIMER not in str(app_context.timer_instance.schedule))
+
+    def test_24_fade_scheduler_coalesce_same_period(self):
+        scheduler = FadeScheduler()
+        device2 = self.create_instance("device2")
+        device3 = self.create_instance("device3")
+
+        # Simulate 2 fades with 1 second period started 300ms apart
+        now = app_context.timer_instance.epoch_now()
+        device2.fading = {
+            "started": now - 1300, "starting_brightness": 1, "target": 100,
+            "period": 1000, "down": False, "scheduled": False
+        }
+        device3.fading = {
+            "started": now, "starting_brightness": 100, "target": 1,
+            "period": 1000, "down": True, "scheduled": False
+        }
+        scheduler.add(device2)
+        scheduler.add(device3)
+
+        # Confirm second fade start moved back to align steps with first
+        self.assertEqual(device3.fading["started"], now - 300)
+
+        # Confirm fades with different period are not aligned
+        device4 = self.create_instance("device4")
+        device4.fading = {
+            "started": now, "starting_brightness": 1, "target": 100,
+            "period": 700, "down": False, "scheduled": False
+        }
+        scheduler.add(device4)
+        self.assertEqual(device4.fading["started"], now)
+
+        for device in (device2, device3, device4):
+            device.fading = False
+        scheduler.tick()
+        self.assertEqual(scheduler.active, {})
+
+    def test_25_fade_scheduler_runs_fade(self):
+        # Fade from 1 to 6 in 0.5 seconds (5 steps, 100ms each)
+        device2 = self.create_instance("device2")
+        device2.set_rule(1)
+        device2.state = True
+        device2.fading = {
+            "started": app_context.timer_instance.epoch_now(),
+            "starting_brightness": 1,
+            "target": 6,
+            "period": 100,
+            "down": False,
+            "scheduled": False
+        }
+        fade_scheduler.add(device2)
+
+        # Wait for fade to complete, confirm reached target, send called once
+        # per step, removed from scheduler and timer canceled
+        asyncio.run(self.sleep(700))
+        self.assertEqual(device2.current_rule, 6)
+        self.assertFalse(device2.fading)
+        self.assertEqual(device2.send_count, 5)
+        self.assertEqual(fade_scheduler.active, {})
+        self.assertTrue(FADE_TIMER not in str(app_context.timer_instance.schedule))
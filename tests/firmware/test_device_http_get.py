@@ -1,6 +1,8 @@
 import re
 import sys
+import asyncio
 import unittest
+import async_requests
 from cpython_only import cpython_only
 from HttpGet import HttpGet, uri_pattern
 
@@ -86,3 +88,21 @@ class TestHttpGet(unittest.TestCase):
         # Confirm forward slashes were removed
         self.assertEqual(test.on_path, 'on')
         self.assertEqual(test.off_path, 'off')
+
+    @cpython_only
+    def test_07_send_async(self):
+        # Mock async_requests.get to return response with status 200
+        async def mock_get(url, timeout):
+            return async_requests.Response(200, b'')
+
+        # Confirm send_async requests correct URL, returns True
+        with patch.object(async_requests, 'get', side_effect=mock_get) as mock_request:
+            self.assertTrue(asyncio.run(self.instance.send_async(1)))
+            self.assertEqual(mock_request.call_args_list[0][0][0], 'http://192.168.1.100/on')
+            self.assertTrue(asyncio.run(self.instance.send_async(0)))
+            self.assertEqual(mock_request.call_args_list[1][0][0], 'http://192.168.1.100/off')
+
+        # Confirm send_async returns False when request fails
+        with patch.object(async_requests, 'get', side_effect=OSError):
+            self.assertFalse(asyncio.run(self.instance.send_async(1)))
+
@@ -1,5 +1,7 @@
+import asyncio
 import unittest
 from machine import PWM
+import LedStrip as led_strip_module
 from LedStrip import LedStrip
 
 # Expected return value of get_attributes method just after instantiation
@@ -16,10 +18,12 @@ expected_attributes = {
     "group": None,
     'rule_queue': [],
     'state': None,
+    'unreachable': False,
     'name': 'device1',
     'triggered_by': [],
     'bright': 0,
-    'fading': False
+    'fading': False,
+    'fade_step_ms': 20
 }
 
 
@@ -27,8 +31,19 @@ class TestLedStrip(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
+        # Shorten fade duration so tests run quickly
+        cls.original_fade_duration = led_strip_module.FADE_DURATION
+        led_strip_module.FADE_DURATION = 100
         cls.instance = LedStrip("device1", "device1", "pwm", 512, {}, 0, 1023, 4)
 
+    @classmethod
+    def tearDownClass(cls):
+        led_strip_module.FADE_DURATION = cls.original_fade_duration
+
+    def wait_for_fade(self):
+        # Yield to SoftwareTimer until fade completes
+        asyncio.run(asyncio.sleep(0.2))
+
     def test_01_initial_state(self):
         self.assertIsInstance(self.instance, LedStrip)
         self.assertFalse(self.instance.pwm.duty())
@@ -41,6 +56,7 @@ class TestLedStrip(unittest.TestCase):
     def test_03_turn_on(self):
         self.instance.set_rule(32)
         self.assertTrue(self.instance.send(1))
+        self.wait_for_fade()
         self.assertEqual(self.instance.pwm.duty(), 32)
 
         # Turn on when already at target brightness (returns True immediately)
@@ -49,18 +65,21 @@ class TestLedStrip(unittest.TestCase):
     def test_04_turn_off(self):
         self.instance.enable()
         self.assertTrue(self.instance.send(0))
+        self.wait_for_fade()
         self.assertEqual(self.instance.pwm.duty(), 0)
 
     def test_05_turn_off_when_disabled(self):
         # Ensure turned on and enabled
         self.instance.enable()
         self.instance.send(1)
+        self.wait_for_fade()
         self.assertEqual(self.instance.pwm.duty(), self.instance.current_rule)
         # Manually set state (normally done by main loop)
         self.instance.state = True
 
         # Disable - should automatically turn off, state should flip
         self.instance.disable()
+        self.wait_for_fade()
         self.assertEqual(self.instance.pwm.duty(), 0)
         self.assertFalse(self.instance.state)
 
@@ -77,6 +96,7 @@ class TestLedStrip(unittest.TestCase):
         # Should not crash, should replace unusable rule with default_rule (512) and fade on
         self.assertNotEqual(self.instance.current_rule, "disabled")
         self.assertEqual(self.instance.current_rule, 512)
+        self.wait_for_fade()
         self.assertEqual(self.instance.pwm.duty(), 512)
 
     # Original bug: Disabled devices manually turned on by user could not be turned off by loop.
@@ -89,6 +109,7 @@ class TestLedStrip(unittest.TestCase):
         # Disable, confirm disabled and off
         self.instance.send(0)
         self.instance.disable()
+        self.wait_for_fade()
         self.assertFalse(self.instance.enabled)
         self.assertEqual(self.instance.pwm.duty(), 0)
 
@@ -98,10 +119,12 @@ class TestLedStrip(unittest.TestCase):
 
         # Off command should still return True, should revert override
         self.assertTrue(self.instance.send(0))
+        self.wait_for_fade()
         self.assertEqual(self.instance.pwm.duty(), 0)
 
         # On command should also return True, but shouldn't cause any action
         self.assertTrue(self.instance.send(1))
+        self.wait_for_fade()
         self.assertEqual(self.instance.pwm.duty(), 0)
 
     # Original bug: Config.__init__ formerly contained a conditional to instantiate devices
@@ -132,3 +155,48 @@ class TestLedStrip(unittest.TestCase):
 
         # Call send method, should not crash
         self.instance.send(1)
+        self.wait_for_fade()
+
+    def test_10_send_does_not_block(self):
+        # Turn off, then start fade to full brightness
+        self.instance.enable()
+        self.instance.send(0)
+        self.wait_for_fade()
+        self.instance.set_rule(1000)
+
+        # Confirm send returns before fade completes, fade in progress
+        self.assertTrue(self.instance.send(1))
+        self.assertIsNotNone(self.instance.pwm_fade)
+        self.assertLess(self.instance.pwm.duty(), 1000)
+
+        # Yield until part way through fade, confirm duty cycle increasing
+        asyncio.run(asyncio.sleep(0.05))
+        midpoint = self.instance.pwm.duty()
+        self.assertGreater(midpoint, 0)
+        self.assertLess(midpoint, 1000)
+
+        # Turn off while fading, confirm new fade starts from current duty cycle
+        self.assertTrue(self.instance.send(0))
+        self.assertEqual(self.instance.pwm_fade['start'], self.instance.bright)
+        self.assertGreaterEqual(self.instance.pwm_fade['start'], midpoint)
+        self.assertEqual(self.instance.pwm_fade['target'], 0)
+        self.wait_for_fade()
+        self.assertEqual(self.instance.pwm.duty(), 0)
+        self.assertEqual(self.instance.bright, 0)
+        self.assertIsNone(self.instance.pwm_fade)
+
+    def test_11_send_current_brightness_stops_fade(self):
+        # Start fading on, send off before first step runs
+        self.instance.send(1)
+        self.assertIsNotNone(self.instance.pwm_fade)
+        self.instance.send(0)
+
+        # Confirm fade stopped (bright was still 0)
+        self.assertIsNone(self.instance.pwm_fade)
+        self.wait_for_fade()
+        self.assertEqual(self.instance.pwm.duty(), 0)
+
+    def test_12_fade_step_ms(self):
+        # Confirm step resolution can be configured, cast to int
+        instance = LedStrip("device2", "device2", "pwm", 512, {}, 0, 1023, 5, fade_step_ms="50")
+        self.assertEqual(instance.fade_step_ms, 50)
@@ -14,6 +14,7 @@ expected_attributes = {
     "group": None,
     'rule_queue': [],
     'state': None,
+    'unreachable': False,
     'name': 'device1',
     'triggered_by': []
 }
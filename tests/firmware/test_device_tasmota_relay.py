@@ -1,6 +1,7 @@
 import json
 import asyncio
 import unittest
+import app_context
 from TasmotaRelay import TasmotaRelay
 from cpython_only import cpython_only
 
@@ -23,12 +24,12 @@ expected_attributes = {
     'group': None,
     'rule_queue': [],
     'state': None,
+    'unreachable': False,
     'name': 'device1',
     'triggered_by': [],
     'enabled': True,
     'on_path': 'cm?cmnd=Power%20On',
-    'off_path': 'cm?cmnd=Power%20Off',
-    'monitor_task': True
+    'off_path': 'cm?cmnd=Power%20Off'
 }
 
 
@@ -50,11 +51,11 @@ class TestTasmotaRelay(unittest.TestCase):
 
     def test_03_turn_on(self):
         self.assertTrue(self.instance.send(1))
-        self.assertEqual(self.instance.check_state(), 'ON')
+        self.assertEqual(asyncio.run(self.instance.check_state()), 'ON')
 
     def test_04_turn_off(self):
         self.assertTrue(self.instance.send(0))
-        self.assertEqual(self.instance.check_state(), 'OFF')
+        self.assertEqual(asyncio.run(self.instance.check_state()), 'OFF')
 
     def test_05_turn_on_while_disabled(self):
         self.instance.disable()
@@ -79,25 +80,17 @@ class TestTasmotaRelay(unittest.TestCase):
 
         # Confirm check_state method raises RuntimeError
         with self.assertRaises(RuntimeError):
-            self.instance.check_state()
+            asyncio.run(self.instance.check_state())
 
         # Revert URI
         self.instance.uri = mock_address
 
     @cpython_only
-    def test_08_monitor(self):
-        from unittest.mock import patch
-
-        # Task breaks monitor loop after first reading
-        async def break_loop(task):
-            await asyncio.sleep(1.1)
-            task.cancel()
+    def test_08_poll(self):
+        from unittest.mock import patch, AsyncMock
 
-        # Runs instance.monitor + task to kill loop after first request
-        async def test_monitor_and_kill():
-            task_monitor = asyncio.create_task(self.instance.monitor())
-            task_kill = asyncio.create_task(break_loop(task_monitor))
-            await asyncio.gather(task_monitor, task_kill)
+        # Confirm instance registered with poll scheduler
+        self.assertIn(self.instance.name, app_context.poll_scheduler_instance.entries)
 
         # Turn on (mock receiver will respond 'ON' to status request)
         self.assertTrue(self.instance.send(1))
@@ -105,8 +98,8 @@ class TestTasmotaRelay(unittest.TestCase):
         # while sensor condition is not met)
         self.instance.state = False
 
-        # Run loop for 1 second, confirm state changed to True
-        asyncio.run(test_monitor_and_kill())
+        # Poll, confirm state changed to True
+        self.assertTrue(asyncio.run(self.instance.poll()))
         self.assertTrue(self.instance.state)
 
         # Turn off (mock receiver will respond 'OFF' to status request)
@@ -115,13 +108,22 @@ class TestTasmotaRelay(unittest.TestCase):
         # while sensor condition is met)
         self.instance.state = True
 
-        # Run loop for 1 second, confirm state changed to False
-        asyncio.run(test_monitor_and_kill())
+        # Poll, confirm state changed to False
+        self.assertTrue(asyncio.run(self.instance.poll()))
         self.assertFalse(self.instance.state)
 
-        # Run loop for 1 second while simulating network error in API call
-        with patch.object(self.instance, 'check_state', side_effect=RuntimeError):
-            asyncio.run(test_monitor_and_kill())
+        # Poll while simulating network error in API call, confirm returns False
+        with patch.object(self.instance, 'check_state', AsyncMock(side_effect=RuntimeError)):
+            self.assertFalse(asyncio.run(self.instance.poll()))
 
         # Confirm state did not change
         self.assertFalse(self.instance.state)
+
+    @cpython_only
+    def test_09_send_boosts_poll_rate(self):
+        from unittest.mock import patch
+
+        # Confirm successful send tells poll scheduler to poll more often
+        with patch.object(app_context.poll_scheduler_instance, 'boost') as mock_boost:
+            self.assertTrue(self.instance.send(1))
+            mock_boost.assert_called_once_with(self.instance)
@@ -1,6 +1,7 @@
 import json
 import asyncio
 import unittest
+import app_context
 from Tplink import Tplink
 from cpython_only import cpython_only
 
@@ -24,9 +25,10 @@ expected_attributes = {
     "group": None,
     'rule_queue': [],
     'state': None,
+    'unreachable': False,
     'name': 'device1',
     'triggered_by': [],
-    'monitor_task': True
+    'outbox': {'sent': 0, 'skipped': 0, 'merged': 0}
 }
 
 
@@ -47,28 +49,30 @@ class TestTplink(unittest.TestCase):
         self.assertEqual(attributes, expected_attributes)
 
     def test_03_turn_off(self):
-        self.assertTrue(self.instance.send(0))
+        self.assertTrue(asyncio.run(self.instance.send_async(0)))
 
         # Repeat as bulb
         self.instance._type = "bulb"
-        self.assertTrue(self.instance.send(0))
+        self.assertTrue(asyncio.run(self.instance.send_async(0)))
 
     def test_04_turn_on(self):
-        self.assertTrue(self.instance.send(1))
+        self.assertTrue(asyncio.run(self.instance.send_async(1)))
 
         # Repeat as dimmer
         self.instance._type = "dimmer"
-        self.assertTrue(self.instance.send(1))
+        self.assertTrue(asyncio.run(self.instance.send_async(1)))
 
     def test_05_turn_on_while_disabled(self):
         self.instance.disable()
-        self.assertTrue(self.instance.send(1))
+        self.assertTrue(asyncio.run(self.instance.send_async(1)))
         self.instance.enable()
 
     def test_06_send_method_error(self):
-        # Instantiate with invalid IP, confirm send method returns False
+        # Instantiate with invalid IP, confirm send_async method returns False
         test = Tplink("device1", "device1", "dimmer", 42, {}, 1, 100, "0.0.0.")
-        self.assertFalse(test.send())
+        self.assertFalse(asyncio.run(test.send_async()))
+        app_context.poll_scheduler_instance.unregister(test)
+        app_context.poll_scheduler_instance.register(self.instance, self.instance.poll)
 
     def test_07_parse_response(self):
         # Should return True if response does not contain error
@@ -87,67 +91,169 @@ class TestTplink(unittest.TestCase):
         # Should return False if response is empty
         self.assertFalse(self.instance._parse_response('{}'))
 
+        # Should return False if response is not valid JSON or missing err_code
+        self.assertFalse(self.instance._parse_response('{"system":{"get_sysinfo":'))
+        self.assertFalse(self.instance._parse_response('{"system":{"get_sysinfo":{}}}'))
+        self.assertFalse(self.instance._parse_response(False))
+
     @cpython_only
     def test_08_send_detects_errors(self):
-        from unittest.mock import patch
+        from unittest.mock import patch, AsyncMock
 
-        # Simulate error response from dimmer, confirm send returns False
-        with patch.object(self.instance, '_send_payload', return_value=False):
-            self.assertFalse(self.instance.send(1))
+        # Simulate failed request to dimmer, confirm send_async returns False
+        self.instance._type = 'dimmer'
+        self.instance.current_rule = 50
+        self.instance.outbox.set_acked(None)
+        with patch.object(self.instance, '_request', AsyncMock(return_value=False)):
+            self.assertFalse(asyncio.run(self.instance.send_async(1)))
 
-        # Simulate error response on second dimmer request, confirm send returns False
-        with patch.object(self.instance, '_send_payload'), \
-             patch.object(self.instance, '_parse_response', side_effect=[True, False]):
-            self.assertFalse(self.instance.send(1))
+        # Simulate error response on second dimmer request, confirm send_async returns False
+        with patch.object(self.instance, '_request', AsyncMock(return_value=[
+            '{"system":{"set_relay_state":{"err_code":0}}}',
+            '{"smartlife.iot.dimmer":{"set_brightness":{"err_code":-3}}}'
+        ])) as mock_request:
+            self.assertFalse(asyncio.run(self.instance.send_async(1)))
+            # Confirm both dimmer payloads were sent in a single request
+            self.assertEqual(len(mock_request.call_args[0]), 2)
+
+        # Simulate successful dimmer request, confirm both payloads sent
+        with patch.object(self.instance, '_request', AsyncMock(return_value=[
+            '{"system":{"set_relay_state":{"err_code":0}}}',
+            '{"smartlife.iot.dimmer":{"set_brightness":{"err_code":0}}}'
+        ])) as mock_request:
+            self.assertTrue(asyncio.run(self.instance.send_async(1)))
+            self.assertEqual(len(mock_request.call_args[0]), 2)
 
-        # Simulate error response from bulb, confirm send returns False
+        # Change brightness without changing state, confirm relay state
+        # request skipped (device already acknowledged state)
+        self.instance.current_rule += 1
+        with patch.object(self.instance, '_request', AsyncMock(return_value=[
+            '{"smartlife.iot.dimmer":{"set_brightness":{"err_code":0}}}'
+        ])) as mock_request:
+            self.assertTrue(asyncio.run(self.instance.send_async(1)))
+            self.assertEqual(
+                mock_request.call_args[0],
+                ('{"smartlife.iot.dimmer":{"set_brightness":{"brightness":'
+                 + str(self.instance.current_rule) + '}}}',)
+            )
+
+            # Send same state and brightness again, confirm no request sent
+            self.assertTrue(asyncio.run(self.instance.send_async(1)))
+            self.assertEqual(mock_request.call_count, 1)
+
+        # Simulate failed request to bulb, confirm send_async returns False
+        # and state set to None (unknown)
         self.instance._type = 'bulb'
-        with patch.object(self.instance, '_send_payload', return_value=False):
+        self.instance.outbox.set_acked(None)
+        self.instance.state = True
+        with patch.object(self.instance, '_request', AsyncMock(return_value=False)):
+            self.assertFalse(asyncio.run(self.instance.send_async(1)))
+            self.assertIsNone(self.instance.state)
+
+            # Confirm send reports failed request (returns before next request)
             self.assertFalse(self.instance.send(1))
+            asyncio.run(asyncio.sleep(0.3))
 
     @cpython_only
     def test_09_check_device_status(self):
-        from unittest.mock import patch
+        from unittest.mock import patch, AsyncMock
 
         # Simulate dimmer status object with dimmer turned on and brightness = 100
         self.instance._type = 'dimmer'
-        with patch.object(self.instance, '_send_payload', return_value='{"system":{"get_sysinfo":{"sw_ver":"1.0.3 Build 200326 Rel.082355","hw_ver":"2.0","model":"HS220(US)","deviceId":"800683BE95BB206B76B732288E8915B47A19CDD1","oemId":"5BB206A037C71BB76B732285E9B0C417","hwId":"CA321B76B73228706FC7C34C5BB206A4","rssi":-42,"latitude_i":0,"longitude_i":0,"alias":"TP-LINK_Smart Dimmer_E9D1","mic_type":"IOT.SMARTPLUGSWITCH","feature":"TIM","mac":"B2:21:A8:2D:E9:D1","updating":0,"led_off":1,"relay_state":1,"brightness":100,"on_time":1230,"icon_hash":"","dev_name":"Wi-Fi Smart Dimmer","active_mode":"none","next_action":{"type":-1},"preferred_state":[{"index":0,"brightness":100},{"index":1,"brightness":75},{"index":2,"brightness":50},{"index":3,"brightness":25}],"err_code":0}}}'):
-            self.assertEqual(self.instance._check_device_status(), (True, 100))
+        with patch.object(self.instance, '_request', AsyncMock(return_value=['{"system":{"get_sysinfo":{"sw_ver":"1.0.3 Build 200326 Rel.082355","hw_ver":"2.0","model":"HS220(US)","deviceId":"800683BE95BB206B76B732288E8915B47A19CDD1","oemId":"5BB206A037C71BB76B732285E9B0C417","hwId":"CA321B76B73228706FC7C34C5BB206A4","rssi":-42,"latitude_i":0,"longitude_i":0,"alias":"TP-LINK_Smart Dimmer_E9D1","mic_type":"IOT.SMARTPLUGSWITCH","feature":"TIM","mac":"B2:21:A8:2D:E9:D1","updating":0,"led_off":1,"relay_state":1,"brightness":100,"on_time":1230,"icon_hash":"","dev_name":"Wi-Fi Smart Dimmer","active_mode":"none","next_action":{"type":-1},"preferred_state":[{"index":0,"brightness":100},{"index":1,"brightness":75},{"index":2,"brightness":50},{"index":3,"brightness":25}],"err_code":0}}}'])):
+            self.assertEqual(asyncio.run(self.instance._check_device_status()), (True, 100))
 
         # Simulate bulb status object with bulb turned off and brightness = 50
         self.instance._type = 'bulb'
-        with patch.object(self.instance, '_send_payload', return_value='{"system":{"get_sysinfo":{"sw_ver":"1.0.6 Build 200630 Rel.102631","hw_ver":"2.0","model":"KL130(US)","deviceId":"800683BE95BB206B76B732288E8915B47A19CDD1","oemId":"5BB206A037C71BB76B732285E9B0C417","hwId":"CA321B76B73228706FC7C34C5BB206A4","rssi":-58,"latitude_i":0,"longitude_i":0,"alias":"TP-LINK_Smart Bulb_E9D1","status":"new","description":"Smart Wi-Fi LED Bulb with Color Changing","mic_type":"IOT.SMARTBULB","mic_mac":"B221A82DE9D1","dev_state":"normal","is_factory":false,"disco_ver":"1.0","ctrl_protocols":{"name":"Linkie","version":"1.0"},"active_mode":"none","is_dimmable":1,"is_color":1,"is_variable_color_temp":1,"light_state":{"on_off":0,"mode":"normal","hue":360,"saturation":0,"color_temp":2801,"brightness":50},"preferred_state":[{"index":0,"hue":0,"saturation":0,"color_temp":2700,"brightness":50},{"index":1,"hue":0,"saturation":100,"color_temp":0,"brightness":100},{"index":2,"hue":120,"saturation":100,"color_temp":0,"brightness":100},{"index":3,"hue":240,"saturation":100,"color_temp":0,"brightness":'):
-            self.assertEqual(self.instance._check_device_status(), (False, 50))
+        with patch.object(self.instance, '_request', AsyncMock(return_value=['{"system":{"get_sysinfo":{"sw_ver":"1.0.6 Build 200630 Rel.102631","hw_ver":"2.0","model":"KL130(US)","deviceId":"800683BE95BB206B76B732288E8915B47A19CDD1","oemId":"5BB206A037C71BB76B732285E9B0C417","hwId":"CA321B76B73228706FC7C34C5BB206A4","rssi":-58,"latitude_i":0,"longitude_i":0,"alias":"TP-LINK_Smart Bulb_E9D1","status":"new","description":"Smart Wi-Fi LED Bulb with Color Changing","mic_type":"IOT.SMARTBULB","mic_mac":"B221A82DE9D1","dev_state":"normal","is_factory":false,"disco_ver":"1.0","ctrl_protocols":{"name":"Linkie","version":"1.0"},"active_mode":"none","is_dimmable":1,"is_color":1,"is_variable_color_temp":1,"light_state":{"on_off":0,"mode":"normal","hue":360,"saturation":0,"color_temp":2801,"brightness":50},"preferred_state":[{"index":0,"hue":0,"saturation":0,"color_temp":2700,"brightness":50},{"index":1,"hue":0,"saturation":100,"color_temp":0,"brightness":100},{"index":2,"hue":120,"saturation":100,"color_temp":0,"brightness":100},{"index":3,"hue":240,"saturation":100,"color_temp":0,"brightness":100}],"err_code":0}}}'])):
+            self.assertEqual(asyncio.run(self.instance._check_device_status()), (False, 50))
 
-        # Simulate error response, confirm _check_device_status raises RuntimeError
-        with patch.object(self.instance, '_send_payload', return_value=False), \
+        # Simulate bulb turned off that only reports brightness in dft_on_state
+        with patch.object(self.instance, '_request', AsyncMock(return_value=[
+            '{"system":{"get_sysinfo":{"light_state":{"on_off":0,"dft_on_state":{"mode":"normal","brightness":30}},"err_code":0}}}'
+        ])):
+            self.assertEqual(asyncio.run(self.instance._check_device_status()), (False, 30))
+
+        # Simulate failed request, confirm _check_device_status raises RuntimeError
+        with patch.object(self.instance, '_request', AsyncMock(return_value=False)), \
              self.assertRaises(RuntimeError):
-            self.instance._check_device_status()
+            asyncio.run(self.instance._check_device_status())
 
-    @cpython_only
-    def test_10_monitor(self):
-        from unittest.mock import patch
+        # Simulate truncated response, confirm _check_device_status raises RuntimeError
+        with patch.object(self.instance, '_request', AsyncMock(return_value=['{"system":{"get_sysinfo":{"relay'])), \
+             self.assertRaises(RuntimeError):
+            asyncio.run(self.instance._check_device_status())
 
-        # Task breaks monitor loop after first reading
-        async def break_loop(task):
-            await asyncio.sleep(1.1)
-            task.cancel()
+    @cpython_only
+    def test_10_poll(self):
+        from unittest.mock import patch, AsyncMock
 
-        # Runs instance.monitor + task to kill loop after first request
-        async def test_monitor_and_kill():
-            task_monitor = asyncio.create_task(self.instance.monitor())
-            task_kill = asyncio.create_task(break_loop(task_monitor))
-            await asyncio.gather(task_monitor, task_kill)
+        # Confirm instance registered with poll scheduler
+        self.assertIn(self.instance.name, app_context.poll_scheduler_instance.entries)
 
         # Set current_rule to 50, state to False
         self.instance.current_rule = 50
         self.instance.state = False
 
-        # Run loop for 1 second while mocking status response to simulate light
-        # turned on with brightness = 75
-        with patch.object(self.instance, '_check_device_status', return_value=(True, 75)):
-            asyncio.run(test_monitor_and_kill())
+        # Poll while mocking status response to simulate light turned on with
+        # brightness = 75, confirm returns True
+        with patch.object(self.instance, '_check_device_status', AsyncMock(return_value=(True, 75))), \
+             patch.object(app_context.poll_scheduler_instance, 'boost') as mock_boost:
+            self.assertTrue(asyncio.run(self.instance.poll()))
+            # Confirm poll scheduler told to poll more often (change detected)
+            mock_boost.assert_called_once_with(self.instance)
 
         # Confirm current_rule changed to 75, state changed to True
         self.assertEqual(self.instance.current_rule, 75)
         self.assertTrue(self.instance.state)
+
+        # Confirm outbox acknowledged value updated (skips sending same state)
+        self.assertEqual(self.instance.outbox.acked, (True, 75))
+
+        # Simulate failed request, confirm returns False and state did not change
+        with patch.object(self.instance, '_check_device_status', AsyncMock(side_effect=RuntimeError)):
+            self.assertFalse(asyncio.run(self.instance.poll()))
+        self.assertEqual(self.instance.current_rule, 75)
+        self.assertTrue(self.instance.state)
+
+    def test_11_encrypt_decrypt(self):
+        # Confirm encrypted payload has length header + XOR autokey cipher
+        self.assertEqual(self.instance.encrypt('{}'), b'\x00\x00\x00\x02\xd0\xad')
+        # Confirm decrypt reverses encrypt
+        payload = '{"system":{"get_sysinfo":{}}}'
+        self.assertEqual(self.instance.decrypt(self.instance.encrypt(payload)[4:]), payload)
+
+    @cpython_only
+    def test_12_send_merges_queued_values(self):
+        from unittest.mock import patch, AsyncMock
+
+        self.instance._type = 'dimmer'
+        self.instance.outbox.set_acked(None)
+        # Clear failed request from previous test (send would return False)
+        self.instance.outbox.failed = False
+        merged = self.instance.outbox.merged
+
+        # Simulate fade, call send with several brightness values without
+        # yielding, confirm send returns immediately
+        with patch.object(self.instance, '_request', AsyncMock(return_value=[
+            '{"system":{"set_relay_state":{"err_code":0}}}',
+            '{"smartlife.iot.dimmer":{"set_brightness":{"err_code":0}}}'
+        ])) as mock_request:
+            for rule in range(20, 30):
+                self.instance.current_rule = rule
+                self.assertTrue(self.instance.send(1))
+            asyncio.run(asyncio.sleep(0.3))
+
+            # Confirm only the last value was sent, others merged
+            self.assertEqual(mock_request.call_count, 1)
+            self.assertIn('"brightness":29', mock_request.call_args[0][1])
+            self.assertEqual(self.instance.outbox.merged, merged + 9)
+            self.assertEqual(self.instance.outbox.acked, (True, 29))
+            self.assertIsNone(self.instance.outbox.task)
+
+    def test_13_max_send_rate(self):
+        # Confirm max_send_rate argument sets outbox min_interval
+        test = Tplink("device1", "device1", "dimmer", 42, {}, 1, 100, "0.0.0.", 10)
+        self.assertEqual(test.outbox.min_interval, 100)
+        app_context.poll_scheduler_instance.unregister(test)
+        app_context.poll_scheduler_instance.register(self.instance, self.instance.poll)
@@ -1,4 +1,6 @@
 import json
+import time
+import asyncio
 import unittest
 from Wled import Wled
 
@@ -32,10 +34,103 @@ class TestWled(unittest.TestCase):
         self.instance.enable()
 
     def test_05_network_errors(self):
-        # Instantiate with invalid IP, confirm send method returns False
+        # Instantiate with invalid IP, confirm send_async returns False
         test = Wled("device1", "device1", "wled", 50, {}, 1, 255, "0.0.0.")
-        self.assertFalse(test.send())
+        test.state = True
+        self.assertFalse(asyncio.run(test.send_async(1)))
 
-        # Set invalid rule to trigger 400 status code, confirm send returns False
+        # Confirm state set to None (unknown) after failed request
+        self.assertIsNone(test.state)
+
+        # Confirm send returns False immediately (previous request failed)
+        self.assertTrue(test.outbox.failed)
+        self.assertFalse(test.send(0))
+        asyncio.run(asyncio.sleep(0.3))
+        self.assertEqual(test.outbox.sent, 2)
+        self.assertIsNone(test.outbox.task)
+
+        # Change to valid IP, confirm send returns True after request succeeds
+        test.ip = mock_address
+        self.assertTrue(asyncio.run(test.send_async(0)))
+        self.assertFalse(test.outbox.failed)
+        self.assertTrue(test.send(0))
+
+    def test_06_send_async(self):
+        # Confirm awaitable send turns on/off
+        self.instance.current_rule = 50
+        self.assertTrue(asyncio.run(self.instance.send_async(1)))
+        self.assertTrue(asyncio.run(self.instance.send_async(0)))
+
+        # Confirm returns False and state set to None (unknown) if status
+        # code is not 200
+        self.instance.state = True
         self.instance.current_rule = 9999
-        self.assertFalse(self.instance.send())
+        self.assertFalse(asyncio.run(self.instance.send_async(1)))
+        self.assertIsNone(self.instance.state)
+        self.instance.current_rule = 50
+
+    def test_07_skip_acknowledged(self):
+        # Send state, confirm acknowledged value stored
+        self.instance.current_rule = 60
+        self.assertTrue(asyncio.run(self.instance.send_async(1)))
+        self.assertEqual(self.instance.outbox.acked, (True, 60))
+        sent = self.instance.outbox.sent
+        skipped = self.instance.outbox.skipped
+
+        # Send same state again, confirm no request sent
+        self.assertTrue(asyncio.run(self.instance.send_async(1)))
+        self.assertTrue(self.instance.send(1))
+        self.assertIsNone(self.instance.outbox.task)
+        self.assertEqual(self.instance.outbox.sent, sent)
+        self.assertEqual(self.instance.outbox.skipped, skipped + 2)
+
+        # Expire acknowledgement, confirm same state is sent again
+        self.instance.outbox.acked_time -= 60000
+        self.assertTrue(asyncio.run(self.instance.send_async(1)))
+        self.assertEqual(self.instance.outbox.sent, sent + 1)
+
+        # Confirm same state is sent again if force arg is True
+        self.assertTrue(asyncio.run(self.instance.send_async(1, force=True)))
+        self.assertEqual(self.instance.outbox.sent, sent + 2)
+
+    def test_08_merge_queued_values(self):
+        outbox = self.instance.outbox
+        sent = outbox.sent
+        merged = outbox.merged
+
+        # Simulate fade, send several brightness values without yielding
+        for rule in range(70, 80):
+            self.instance.current_rule = rule
+            self.assertTrue(self.instance.send(1))
+        asyncio.run(asyncio.sleep(0.5))
+
+        # Confirm first and last values sent, intermediate values merged
+        self.assertEqual(outbox.sent, sent + 1)
+        self.assertEqual(outbox.merged, merged + 9)
+        self.assertEqual(outbox.acked, (True, 79))
+        self.assertEqual(
+            outbox.get_stats(),
+            {'sent': outbox.sent, 'skipped': outbox.skipped, 'merged': outbox.merged}
+        )
+
+    def test_09_rate_limit(self):
+        # Instantiate with max 4 requests per second
+        test = Wled("device1", "device1", "wled", 50, {}, 1, 255, mock_address, 4)
+        self.assertEqual(test.outbox.min_interval, 250)
+
+        # Send 2 different values, confirm second waited for min_interval
+        async def send_twice():
+            start = time.time_ns()
+            test.current_rule = 50
+            await test.send_async(1)
+            test.current_rule = 51
+            await test.send_async(1)
+            return (time.time_ns() - start) / 1000000000
+        self.assertGreaterEqual(asyncio.run(send_twice()), 0.24)
+        self.assertEqual(test.outbox.acked, (True, 51))
+
+    def test_10_get_attributes(self):
+        # Confirm outbox replaced with counters (serializable)
+        attributes = self.instance.get_attributes()
+        self.assertEqual(attributes['outbox'], self.instance.outbox.get_stats())
+        json.dumps(attributes)
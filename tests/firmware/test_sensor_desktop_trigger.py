@@ -2,6 +2,7 @@ import json
 import asyncio
 import requests
 import unittest
+import app_context
 from Group import Group
 from MotionSensor import MotionSensor
 from DesktopTarget import DesktopTarget
@@ -18,6 +19,8 @@ port = config["mock_receiver"]["port"]
 
 # Expected return value of get_attributes method just after instantiation
 expected_attributes = {
+    'debounce_ms': 0,
+    'coalesced_refreshes': 0,
     'uri': f'{ip}:{port}',
     'nickname': 'sensor1',
     'current': None,
@@ -33,7 +36,10 @@ expected_attributes = {
     'scheduled_rule': None,
     'schedule': {},
     'targets': ['device1'],
-    'monitor_task': True
+    'sampling': True,
+    'sample_interval': 1000,
+    'max_age': 10000,
+    'reading_time': None
 }
 
 
@@ -80,9 +86,13 @@ class TestDesktopTrigger(unittest.TestCase):
         self.group.refresh_called = False
         self.group.reset_state_called = False
 
+    def tearDown(self):
+        # Let async sends started by group refresh finish before next test
+        asyncio.run(asyncio.sleep(0.1))
+
     @classmethod
     def tearDownClass(cls):
-        # Kill monitor task next time loop yields, avoid accumulating tasks
+        # Stop sampling, allow async sends started by refresh to finish
         cls.instance.disable()
         asyncio.run(asyncio.sleep(1))
 
@@ -164,31 +174,24 @@ class TestDesktopTrigger(unittest.TestCase):
         self.assertFalse(self.instance.get_monitor_state())
         self.assertFalse(self.instance.get_idle_time())
 
-    def test_07_enable_starts_loop(self):
-        # Cancel existing loop and replace with None
-        self.instance.monitor_task.cancel()
-        self.instance.monitor_task = None
+    def test_07_enable_starts_sampling(self):
+        # Stop sampling
+        self.instance.stop_sampling()
+        self.assertNotIn(self.instance.name, app_context.sensor_sampler_instance.entries)
 
-        # Enable, confirm loop task created
+        # Enable, confirm registered with sampler
         self.instance.enable()
-        self.assertIsInstance(self.instance.monitor_task, asyncio.Task)
-
-    def test_08_disable_stops_loop(self):
-        # Confirm loop task exists
-        self.assertIsInstance(self.instance.monitor_task, asyncio.Task)
-
-        # Ensure cancel and yield are in same event loop (cpython test
-        # environment, not required for pure micropython)
-        async def test():
-            # Disable, should call monitor_task.cancel()
-            self.instance.disable()
+        self.assertTrue(self.instance.sampling)
+        self.assertIn(self.instance.name, app_context.sensor_sampler_instance.entries)
 
-            # Yield to loop to allow monitor_task to exit
-            await asyncio.sleep(0.1)
+    def test_08_disable_stops_sampling(self):
+        # Confirm registered with sampler
+        self.assertTrue(self.instance.sampling)
 
-        # Disable and yield to loop, confirm task replaced with None
-        asyncio.run(test())
-        self.assertEqual(self.instance.monitor_task, None)
+        # Disable, confirm unregistered
+        self.instance.disable()
+        self.assertFalse(self.instance.sampling)
+        self.assertNotIn(self.instance.name, app_context.sensor_sampler_instance.entries)
 
     def test_09_condition_met_screen_mode(self):
         # Should return True when self.current is On
@@ -303,7 +306,7 @@ class TestDesktopTrigger(unittest.TestCase):
         with self.assertRaises(ValueError):
             DesktopTrigger("sensor1", "sensor1", "desktop", "enabled", {}, [], "invalid", ip, port)
 
-    def test_16_monitor_screen(self):
+    def test_16_sample_screen(self):
         # Configure mock receiver to return On for first reading
         requests.post(f'http://{ip}:{port}/set_screen_state', json={'state': 'On'})
 
@@ -311,19 +314,8 @@ class TestDesktopTrigger(unittest.TestCase):
         self.instance.mode = "screen"
         self.instance.current = "Off"
 
-        # Task breaks monitor loop after first reading
-        async def break_loop(task):
-            await asyncio.sleep(1.1)
-            task.cancel()
-
-        # Runs instance.monitor + task to kill loop after first request
-        async def test_monitor_and_kill():
-            task_monitor = asyncio.create_task(self.instance.monitor())
-            task_kill = asyncio.create_task(break_loop(task_monitor))
-            await asyncio.gather(task_monitor, task_kill)
-
-        # Run loop for 1 second
-        asyncio.run(test_monitor_and_kill())
+        # Simulate SensorSampler reading sensor
+        self.instance.sample()
 
         # Confirm instance + target attributes match last reading (On)
         self.assertEqual(self.instance.current, 'On')
@@ -335,8 +327,8 @@ class TestDesktopTrigger(unittest.TestCase):
         requests.post(f'http://{ip}:{port}/set_screen_state', json={'state': 'Off'})
         self.group.refresh_called = False
 
-        # Run loop for 1 second
-        asyncio.run(test_monitor_and_kill())
+        # Simulate SensorSampler reading sensor
+        self.instance.sample()
 
         # Confirm instance + target attributes match last reading (On)
         self.assertEqual(self.instance.current, 'Off')
@@ -344,26 +336,15 @@ class TestDesktopTrigger(unittest.TestCase):
         # Confirm refresh called
         self.assertTrue(self.group.refresh_called)
 
-    def test_17_monitor_activity(self):
+    def test_17_sample_activity(self):
         # Configure mock receiver to return 42ms for first reading
         requests.post(f'http://{ip}:{port}/set_idle_time', json={'idle_time': 42})
 
         # Set sensor mode to activity
         self.instance.mode = "activity"
 
-        # Task breaks monitor loop after first reading
-        async def break_loop(task):
-            await asyncio.sleep(1.1)
-            task.cancel()
-
-        # Runs instance.monitor + task to kill loop after first request
-        async def test_monitor_and_kill():
-            task_monitor = asyncio.create_task(self.instance.monitor())
-            task_kill = asyncio.create_task(break_loop(task_monitor))
-            await asyncio.gather(task_monitor, task_kill)
-
-        # Run loop for 1 second
-        asyncio.run(test_monitor_and_kill())
+        # Simulate SensorSampler reading sensor
+        self.instance.sample()
 
         # Confirm current is 42, condition met, group refreshed
         self.assertEqual(self.instance.current, 42)
@@ -374,15 +355,15 @@ class TestDesktopTrigger(unittest.TestCase):
         self.group.refresh_called = False
         self.group.state = True
 
-        # Run again, confirm group NOT refreshed (condition matches state)
-        asyncio.run(test_monitor_and_kill())
+        # Read again, confirm group NOT refreshed (condition matches state)
+        self.instance.sample()
         self.assertFalse(self.group.refresh_called)
 
         # Set reading >60,000 (user not active)
         requests.post(f'http://{ip}:{port}/set_idle_time', json={'idle_time': 999999})
 
-        # Run loop for 1 second
-        asyncio.run(test_monitor_and_kill())
+        # Simulate SensorSampler reading sensor
+        self.instance.sample()
 
         # Confirm current is 999999, condition NOT met, group refreshed
         self.assertEqual(self.instance.current, 999999)
@@ -407,6 +388,8 @@ class TestDesktopTrigger(unittest.TestCase):
         self.assertTrue(self.instance.trigger())
         self.assertTrue(self.instance.condition_met())
         self.assertTrue(self.group.refresh_called)
+        # Wait for async send to finish
+        asyncio.run(asyncio.sleep(0.1))
         self.assertTrue(self.group.state)
         self.assertTrue(self.target.state)
 
@@ -422,14 +405,23 @@ class TestDesktopTrigger(unittest.TestCase):
     # enable to create a new loop), so if it was not reached monitor_task would
     # still contain the canceled Task, preventing the loop from being started.
     # This is now handled in the disable method to ensure monitor_task is None.
+    # Monitor loops were later replaced by SensorSampler, confirm disabling at
+    # boot unregisters the sensor and enable registers it again.
     @cpython_only
     def test_19_regression_disabled_at_boot_breaks_monitor_loop(self):
         # Simulate instantiating with current_rule = disabled
         instance = DesktopTrigger("sensor1", "sensor1", "desktop", "disabled", {}, [], "screen", ip, port)
         instance.set_rule("disabled")
 
-        # Confirm monitor_task is None
-        self.assertIsNone(instance.monitor_task)
+        # Confirm not sampling
+        self.assertFalse(instance.sampling)
+        self.assertNotIn("sensor1", app_context.sensor_sampler_instance.entries)
+
+        # Confirm enable starts sampling
+        instance.enable()
+        self.assertTrue(instance.sampling)
+        self.assertIs(app_context.sensor_sampler_instance.entries["sensor1"]['instance'], instance)
+        instance.disable()
 
     # Original bug: When the sensor was disabled self.current was not modified.
     # If the desktop was in sleep mode when sensor re-enabled it would continue
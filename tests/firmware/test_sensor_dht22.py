@@ -4,6 +4,7 @@ from Dht22 import Dht22
 
 # Expected return value of get_attributes method just after instantiation
 expected_attributes = {
+    "debounce_ms": 0,
     "current": None,
     "tolerance": 1.0,
     "current_rule": 74.0,
@@ -20,9 +21,12 @@ expected_attributes = {
     "off_threshold": 73.0,
     "rule_queue": [],
     "mode": "cool",
-    "monitor_task": True,
+    "sampling": True,
+    "sample_interval": 5000,
     "_type": "dht22",
-    "default_rule": 74
+    "default_rule": 74,
+    "max_age": 10000,
+    "reading_time": None
 }
 
 
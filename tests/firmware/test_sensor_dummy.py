@@ -4,6 +4,8 @@ from Dummy import Dummy
 
 # Expected return value of get_attributes method just after instantiation
 expected_attributes = {
+    'debounce_ms': 0,
+    'coalesced_refreshes': 0,
     'rule_queue': [],
     'enabled': True,
     'group': 'group1',
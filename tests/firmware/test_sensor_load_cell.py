@@ -1,10 +1,12 @@
-import asyncio
 import unittest
+import app_context
 from Group import Group
 from LoadCell import LoadCell
 
 # Expected return value of get_attributes method just after instantiation
 expected_attributes = {
+    'debounce_ms': 0,
+    'coalesced_refreshes': 0,
     'rule_queue': [],
     'enabled': True,
     'group': 'group1',
@@ -16,8 +18,11 @@ expected_attributes = {
     'current_rule': None,
     'scheduled_rule': None,
     'schedule': {},
-    "monitor_task": True,
-    'targets': []
+    "sampling": True,
+    "sample_interval": 1000,
+    'targets': [],
+    'max_age': 10000,
+    'reading_time': None
 }
 
 
@@ -65,32 +70,24 @@ class TestLoadCellSensor(unittest.TestCase):
         self.assertFalse(self.instance.rule_validator({"rule": "100000"}))
         self.assertFalse(self.instance.rule_validator(float('NaN')))
 
-    def test_05_disable_stops_loop(self):
-        # Confirm loop task exists
-        self.assertIsInstance(self.instance.monitor_task, asyncio.Task)
-
-        # Ensure cancel and yield are in same event loop (cpython test
-        # environment, not required for pure micropython)
-        async def test():
-            # Disable, should call monitor_task.cancel()
-            self.instance.disable()
-
-            # Yield to loop to allow monitor_task to exit
-            await asyncio.sleep(0.1)
-
-        # Disable and yield to loop, confirm task replaced with None
-        asyncio.run(test())
-        self.assertEqual(self.instance.monitor_task, None)
-
-    def test_06_enable_starts_loop(self):
-        # Cancel existing loop and replace with None
-        if self.instance.monitor_task:
-            self.instance.monitor_task.cancel()
-            self.instance.monitor_task = None
-
-        # Enable, confirm loop task created
+    def test_05_disable_stops_sampling(self):
+        # Confirm registered with sampler
+        self.assertTrue(self.instance.sampling)
+        self.assertIs(
+            app_context.sensor_sampler_instance.entries[self.instance.name]['instance'],
+            self.instance
+        )
+
+        # Disable, confirm unregistered
+        self.instance.disable()
+        self.assertFalse(self.instance.sampling)
+        self.assertNotIn(self.instance.name, app_context.sensor_sampler_instance.entries)
+
+    def test_06_enable_starts_sampling(self):
+        # Enable, confirm registered with sampler
         self.instance.enable()
-        self.assertIsInstance(self.instance.monitor_task, asyncio.Task)
+        self.assertTrue(self.instance.sampling)
+        self.assertIn(self.instance.name, app_context.sensor_sampler_instance.entries)
 
     def test_07_condition_met(self):
         # Get raw reading
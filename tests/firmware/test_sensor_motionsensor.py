@@ -8,6 +8,8 @@ from cpython_only import cpython_only
 
 # Expected return value of get_attributes method just after instantiation
 expected_attributes = {
+    'debounce_ms': 0,
+    'coalesced_refreshes': 0,
     'targets': [],
     'nickname': 'sensor1',
     'motion': False,
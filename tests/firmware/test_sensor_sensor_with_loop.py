@@ -1,13 +1,9 @@
-import asyncio
 import unittest
+import app_context
 from Group import Group
 from SensorWithLoop import SensorWithLoop
 
 
-async def mock_monitor():
-    await asyncio.sleep(0)
-
-
 # Subclass Group to detect when refresh method called
 class MockGroup(Group):
     def __init__(self, name, sensors):
@@ -43,48 +39,78 @@ class TestSensorWithLoop(unittest.TestCase):
         self.assertEqual(self.instance.scheduled_rule, "enabled")
         self.assertEqual(self.instance.default_rule, "enabled")
         self.assertEqual(self.instance.targets, [])
-        self.assertEqual(self.instance.monitor_task, None)
-
-    def test_02_disable_stops_loop(self):
-        # Confirm loop task exists
-        self.instance.monitor_task = asyncio.create_task(mock_monitor())
-        self.assertIsInstance(self.instance.monitor_task, asyncio.Task)
-
-        # Ensure cancel and yield are in same event loop (cpython test
-        # environment, not required for pure micropython)
-        async def test():
-            # Disable, should call monitor_task.cancel()
-            self.instance.disable()
-
-            # Yield to loop to allow monitor_task to exit
-            await asyncio.sleep(0.1)
-
-        # Disable and yield to loop, confirm task replaced with None
-        asyncio.run(test())
-        self.assertEqual(self.instance.monitor_task, None)
-
-    def test_03_enable_starts_loop(self):
-        # Cancel existing loop and replace with None
-        if self.instance.monitor_task:
-            self.instance.monitor_task.cancel()
-            self.instance.monitor_task = None
-
-        # Enable, confirm loop task created
+        self.assertFalse(self.instance.sampling)
+        self.assertEqual(self.instance.sample_interval, 1000)
+
+    def test_02_disable_stops_sampling(self):
+        # Register with sampler, confirm registered
+        self.instance.start_sampling()
+        self.assertTrue(self.instance.sampling)
+        self.assertIn("sensor1", app_context.sensor_sampler_instance.entries)
+
+        # Confirm calling again does not replace existing entry
+        entry = app_context.sensor_sampler_instance.entries["sensor1"]
+        self.instance.start_sampling()
+        self.assertIs(app_context.sensor_sampler_instance.entries["sensor1"], entry)
+
+        # Disable, confirm unregistered
+        self.instance.disable()
+        self.assertFalse(self.instance.sampling)
+        self.assertNotIn("sensor1", app_context.sensor_sampler_instance.entries)
+
+    def test_03_enable_starts_sampling(self):
+        # Enable, confirm registered with sampler
         self.instance.enable()
-        self.assertIsInstance(self.instance.monitor_task, asyncio.Task)
+        self.assertTrue(self.instance.sampling)
+        self.assertIn("sensor1", app_context.sensor_sampler_instance.entries)
 
-    def test_04_get_attributes(self):
-        # monitor_task key should contain "True" when loop is running
-        self.instance.monitor_task = asyncio.create_task(mock_monitor())
-        attributes = self.instance.get_attributes()
-        self.assertEqual(attributes['monitor_task'], True)
+        # Confirm sampler gets interval from get_sample_interval method
+        entry = app_context.sensor_sampler_instance.entries["sensor1"]
+        self.instance.sample_interval = 2500
+        self.assertEqual(entry['get_interval'](), 2500)
+        self.instance.sample_interval = 1000
+        self.instance.stop_sampling()
 
-        # monitor_task key should contain "False" when loop not running
-        self.instance.monitor_task = None
+    def test_04_get_attributes(self):
+        # Confirm sampling bool and interval included, cached reading removed
         attributes = self.instance.get_attributes()
-        self.assertEqual(attributes['monitor_task'], False)
+        self.assertEqual(attributes['sampling'], False)
+        self.assertEqual(attributes['sample_interval'], 1000)
+        self.assertNotIn('reading', attributes)
 
-    def test_05_placeholder_monitor(self):
+    def test_05_placeholder_sample(self):
         # Placeholder method should raise NotImplementedError
         with self.assertRaises(NotImplementedError):
-            asyncio.run(self.instance.monitor())
+            self.instance.sample()
+
+    def test_06_cached_reading(self):
+        # Placeholder read_sensor method should raise NotImplementedError
+        with self.assertRaises(NotImplementedError):
+            self.instance.get_reading()
+
+        # Mock read_sensor to return number of times called
+        calls = []
+
+        def mock_read_sensor():
+            calls.append(1)
+            return len(calls)
+        self.instance.read_sensor = mock_read_sensor
+
+        # Confirm first call reads sensor, second returns cached reading
+        self.assertEqual(self.instance.get_reading(), 1)
+        self.assertEqual(self.instance.get_reading(), 1)
+        self.assertEqual(len(calls), 1)
+        self.assertIsInstance(self.instance.reading_time, int)
+
+        # Confirm update_reading always reads sensor and updates cache
+        self.assertEqual(self.instance.update_reading(), 2)
+        self.assertEqual(self.instance.get_reading(), 2)
+
+        # Simulate outdated cache, confirm get_reading reads sensor
+        self.instance.reading_time -= self.instance.max_age + 1
+        self.assertEqual(self.instance.get_reading(), 3)
+        self.assertEqual(len(calls), 3)
+
+        # Confirm reading removed from attributes
+        self.assertNotIn('reading', self.instance.get_attributes())
+        del self.instance.read_sensor
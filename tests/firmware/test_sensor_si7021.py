@@ -5,6 +5,7 @@ from Si7021 import Si7021
 
 # Expected return value of get_attributes method just after instantiation
 expected_attributes = {
+    "debounce_ms": 0,
     "current": None,
     "tolerance": 1.0,
     "current_rule": 74.0,
@@ -21,9 +22,12 @@ expected_attributes = {
     "off_threshold": 73.0,
     "rule_queue": [],
     "mode": "cool",
-    "monitor_task": True,
+    "sampling": True,
+    "sample_interval": 5000,
     "_type": "si7021",
-    "default_rule": 74
+    "default_rule": 74,
+    "max_age": 10000,
+    "reading_time": None
 }
 
 
@@ -6,6 +6,8 @@ from cpython_only import cpython_only
 
 # Expected return value of get_attributes method just after instantiation
 expected_attributes = {
+    'debounce_ms': 0,
+    'coalesced_refreshes': 0,
     'rule_queue': [],
     'enabled': True,
     'group': 'group1',
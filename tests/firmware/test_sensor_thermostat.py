@@ -9,6 +9,8 @@ from Thermostat import Thermostat
 
 # Expected return value of get_attributes method just after instantiation
 expected_attributes = {
+    'debounce_ms': 0,
+    'coalesced_refreshes': 0,
     'tolerance': 1.0,
     'units': 'fahrenheit',
     'nickname': 'sensor1',
@@ -21,13 +23,16 @@ expected_attributes = {
     'enabled': True,
     'group': 'group1',
     'mode': 'cool',
-    "monitor_task": True,
+    "sampling": True,
+    "sample_interval": 5000,
     'targets': ['device1'],
     'rule_queue': [],
     'name': 'sensor1',
     'on_threshold': 75.0,
     'off_threshold': 73.0,
-    'recent_temps': []
+    'recent_temps': [],
+    'max_age': 10000,
+    'reading_time': None
 }
 
 
@@ -433,32 +438,24 @@ class TestThermostat(unittest.TestCase):
         self.assertEqual(self.target.state, None)
         self.assertFalse(self.group.refresh_called)
 
-    def test_13_disable_stops_loop(self):
-        # Confirm loop task exists
-        self.assertIsInstance(self.instance.monitor_task, asyncio.Task)
-
-        # Ensure cancel and yield are in same event loop (cpython test
-        # environment, not required for pure micropython)
-        async def test():
-            # Disable, should call monitor_task.cancel()
-            self.instance.disable()
-
-            # Yield to loop to allow monitor_task to exit
-            await asyncio.sleep(0.1)
-
-        # Disable and yield to loop, confirm task replaced with None
-        asyncio.run(test())
-        self.assertEqual(self.instance.monitor_task, None)
+    def test_13_disable_stops_sampling(self):
+        # Confirm registered with sampler
+        self.assertTrue(self.instance.sampling)
+        self.assertIs(
+            app_context.sensor_sampler_instance.entries[self.instance.name]['instance'],
+            self.instance
+        )
 
-    def test_14_enable_starts_loop(self):
-        # Cancel existing loop and replace with None
-        if self.instance.monitor_task:
-            self.instance.monitor_task.cancel()
-            self.instance.monitor_task = None
+        # Disable, confirm unregistered
+        self.instance.disable()
+        self.assertFalse(self.instance.sampling)
+        self.assertNotIn(self.instance.name, app_context.sensor_sampler_instance.entries)
 
-        # Enable, confirm loop task created
+    def test_14_enable_starts_sampling(self):
+        # Enable, confirm registered with sampler
         self.instance.enable()
-        self.assertIsInstance(self.instance.monitor_task, asyncio.Task)
+        self.assertTrue(self.instance.sampling)
+        self.assertIn(self.instance.name, app_context.sensor_sampler_instance.entries)
 
     def test_15_add_routines(self):
         # Confirm no routines in group, instance.recent_temps not empty
@@ -618,3 +615,111 @@ class TestThermostat(unittest.TestCase):
 
         # Call set_threshold method, should not crash
         self.instance.set_threshold()
+
+    def test_25_status_uses_cached_reading(self):
+        # Instantiate test instance, mock sensor methods to count reads
+        test = Thermostat("sensor1", "sensor1", "Thermostat", 74, {}, "cool", 1, "celsius", [])
+        reads = []
+
+        def mock_get_raw_temperature(arg=None):
+            reads.append('temp')
+            return 20.0
+        test.get_raw_temperature = mock_get_raw_temperature
+
+        # Simulate SensorSampler reading sensor
+        self.assertEqual(test.update_reading(), (20.0, "Sensor does not support humidity"))
+        self.assertEqual(len(reads), 1)
+
+        # Confirm condition_met and get_status do not read sensor again
+        test.set_rule(18)
+        self.assertTrue(test.condition_met())
+        status = test.get_status()
+        self.assertEqual(status['temp'], 20.0)
+        self.assertEqual(status['humid'], "Sensor does not support humidity")
+        self.assertEqual(len(reads), 1)
+
+        # Confirm reads sensor if cached reading older than max_age
+        test.reading_time -= test.max_age + 1
+        self.assertTrue(test.condition_met())
+        self.assertEqual(len(reads), 2)
+        test.disable()
+
+    def test_26_sample(self):
+        # Instantiate test instance with mock group, mock sensor reading
+        test = Thermostat("sensor1", "sensor1", "Thermostat", 20, {}, "cool", 1, "celsius", [])
+        test.set_rule(20)
+        test.group = MockGroup('group1', [test])
+        temp = {'value': 25.0}
+        test.get_raw_temperature = lambda: temp['value']
+
+        # Confirm sample reads sensor, refreshes group when condition changes
+        test.sample()
+        self.assertEqual(test.reading[0], 25.0)
+        self.assertTrue(test.current)
+        self.assertTrue(test.group.refresh_called)
+
+        # Confirm group not refreshed if condition did not change
+        test.group.refresh_called = False
+        temp['value'] = 24.0
+        test.sample()
+        self.assertEqual(test.reading[0], 24.0)
+        self.assertFalse(test.group.refresh_called)
+
+        # Confirm group refreshed when temperature drops below off_threshold
+        temp['value'] = 18.0
+        test.sample()
+        self.assertFalse(test.current)
+        self.assertTrue(test.group.refresh_called)
+
+        # Confirm status version only changes if reading changed
+        version = test.changed_version
+        test.sample()
+        self.assertEqual(test.changed_version, version)
+        temp['value'] = 18.5
+        test.sample()
+        self.assertGreater(test.changed_version, version)
+        test.disable()
+
+    def test_27_adaptive_sample_interval(self):
+        # Instantiate test instance (on_threshold=21, off_threshold=19)
+        test = Thermostat("sensor1", "sensor1", "Thermostat", 20, {}, "cool", 1, "celsius", [])
+        test.set_rule(20)
+
+        # Confirm default interval when there is no reading yet
+        self.assertEqual(test.get_sample_interval(), 5000)
+
+        # Confirm default interval when temperature far from thresholds
+        test.reading = (25.0, 50.0)
+        self.assertEqual(test.get_sample_interval(), 5000)
+        test.reading = (15.0, 50.0)
+        self.assertEqual(test.get_sample_interval(), 5000)
+
+        # Condition not met: confirm fast interval only near on_threshold
+        test.current = False
+        test.reading = (21.5, 50.0)
+        self.assertEqual(test.get_sample_interval(), 1000)
+        test.reading = (20.5, 50.0)
+        self.assertEqual(test.get_sample_interval(), 1000)
+        test.reading = (20.0, 50.0)
+        self.assertEqual(test.get_sample_interval(), 5000)
+        test.reading = (19.0, 50.0)
+        self.assertEqual(test.get_sample_interval(), 5000)
+
+        # Condition met: confirm fast interval only near off_threshold
+        test.current = True
+        test.reading = (19.0, 50.0)
+        self.assertEqual(test.get_sample_interval(), 1000)
+        test.reading = (20.0, 50.0)
+        self.assertEqual(test.get_sample_interval(), 5000)
+        test.reading = (21.0, 50.0)
+        self.assertEqual(test.get_sample_interval(), 5000)
+
+        # Confirm configured interval used if faster than fast interval
+        test.sample_interval = 500
+        self.assertEqual(test.get_sample_interval(), 500)
+
+        # Confirm default interval if reading is not a number
+        test.sample_interval = 5000
+        test.reading = ("Sensor error", 50.0)
+        self.assertEqual(test.get_sample_interval(), 5000)
+        test.disable()
@@ -191,6 +191,14 @@ def start():
     app_context.timer_instance = SoftwareTimer()
     asyncio.create_task(app_context.timer_instance.loop())
 
+    # Import + initialize PollScheduler, add to shared context
+    from PollScheduler import PollScheduler
+    app_context.poll_scheduler_instance = PollScheduler()
+
+    # Import + initialize SensorSampler, add to shared context
+    from SensorSampler import SensorSampler
+    app_context.sensor_sampler_instance = SensorSampler()
+
     # Import + initialize API, add to shared context, add to async loop
     from Api import Api
     app_context.api_instance = Api()
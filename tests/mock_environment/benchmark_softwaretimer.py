@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+
+'''Microbenchmark for SoftwareTimer create, cancel, and expire operations.
+
+Schedules 1,000 timers (half with unique names, half with the "scheduler" name
+used for schedule rules), cancels every other uniquely-named timer, then moves
+the remaining timers into the past and runs the loop until all have expired.
+Prints total and per-timer time for each phase.
+
+Run from the project root directory:
+    python3 tests/mock_environment/benchmark_softwaretimer.py
+'''
+
+import os
+import sys
+import time
+import asyncio
+
+# Get absolute paths to mock_dir, repo root dir
+mock_dir = os.path.dirname(os.path.realpath(__file__))
+repo_dir = os.path.dirname(os.path.dirname(mock_dir))
+
+# Add core to python path, add mock modules (must be first for priority)
+sys.path.insert(0, os.path.join(repo_dir, 'core'))
+sys.path.insert(0, os.path.join(mock_dir, 'mocks'))
+
+# Patch asyncio to add missing micropython methods
+import mock_asyncio
+asyncio.sleep_ms = mock_asyncio.sleep_ms
+asyncio.ThreadSafeFlag = mock_asyncio.ThreadSafeFlag
+
+from SoftwareTimer import SoftwareTimer
+
+
+# Number of timers to schedule
+TIMERS = 1000
+
+
+def report(phase, elapsed):
+    '''Print total and per-timer time for a benchmark phase.'''
+    print(f"{phase:<8} {elapsed * 1000:8.2f} ms total {elapsed * 1000000 / TIMERS:8.2f} us/timer")
+
+
+async def benchmark():
+    timer = SoftwareTimer()
+    expired = []
+
+    # Schedule timers 1-2 seconds in the future (prevents expiring mid-create)
+    start = time.perf_counter()
+    for i in range(TIMERS):
+        name = "scheduler" if i % 2 else f"timer{i}"
+        await timer._create(1000 + i, lambda: expired.append(1), name)
+    report("create", time.perf_counter() - start)
+
+    # Cancel every other uniquely-named timer (a quarter of all timers)
+    start = time.perf_counter()
+    for i in range(0, TIMERS, 4):
+        await timer._cancel(f"timer{i}")
+    report("cancel", time.perf_counter() - start)
+
+    remaining = len(timer.schedule)
+    heap_size = len(timer.queue)
+
+    # Move all remaining timers into the past so they are all due immediately
+    offset = TIMERS * 3
+    timer.schedule = {exp - offset: rule for exp, rule in timer.schedule.items()}
+    timer.names = {name: {exp - offset for exp in exps} for name, exps in timer.names.items()}
+    timer.queue = [exp - offset for exp in timer.queue]
+
+    # Run loop until all remaining timers expire
+    task = asyncio.create_task(timer.loop())
+    start = time.perf_counter()
+    while len(expired) < remaining:
+        await asyncio.sleep(0)
+    report("expire", time.perf_counter() - start)
+    task.cancel()
+
+    print(f"{remaining} of {TIMERS} timers expired ({heap_size} in heap before expire)")
+
+
+if __name__ == '__main__':
+    asyncio.run(benchmark())
@@ -266,6 +266,16 @@ class MockApi:
         self.server = await asyncio.start_server(self.run_client, host=self.host, port=self.port, backlog=5)
         print('API: Awaiting client connection.\n')
 
+    def get_reply(self, path, args):
+        print(f"MockApi: Received request, endpoint={path}, args={args}")
+
+        # Send arbitrary success message if endpoint is valid, ignore arg
+        if path in self.valid_endpoints:
+            return {path: "Success"}
+
+        # Otherwise send error
+        return {"ERROR": "Invalid command"}
+
     async def run_client(self, sreader, swriter):
         try:
             # Read client request (1 second timeout)
@@ -277,9 +287,27 @@ class MockApi:
 
             # Parse endpoint and args
             data = json.loads(req)
+
+            # Keep-alive request: reply with request id, wait for next request
+            while isinstance(data, dict):
+                path = data['cmd'][0]
+
+                # Arbitrary keyword used to trigger OSError in ApiTarget.request
+                if path == "raise_exception":
+                    print("Simulating connection failure")
+                    raise OSError
+
+                reply = self.get_reply(path, data['cmd'][1:])
+                swriter.write(json.dumps({"id": data['id'], "reply": reply}).encode() + b'\n')
+                await swriter.drain()
+
+                req = await asyncio.wait_for(sreader.readline(), 60)
+                if not req:
+                    raise OSError
+                data = json.loads(req)
+
             path = data[0]
             args = data[1:]
-            print(f"MockApi: Received request, endpoint={path}, args={args}")
 
             # Arbitrary keyword used to trigger OSError in ApiTarget.request
             if path == "raise_exception":
@@ -288,13 +316,7 @@ class MockApi:
                 await swriter.wait_closed()
                 return
 
-            # Send arbitrary success message if endpoint is valid, ignore arg
-            elif path in self.valid_endpoints:
-                swriter.write(json.dumps({path: "Success"}).encode())
-
-            # Otherwise send error
-            else:
-                swriter.write(json.dumps({"ERROR": "Invalid command"}).encode())
+            swriter.write(json.dumps(self.get_reply(path, args)).encode())
             await swriter.drain()
 
         except (OSError, asyncio.TimeoutError):
@@ -1,4 +1,4 @@
-from asyncio import sleep
+from asyncio import sleep, Event, get_running_loop
 
 
 async def sleep_us(us):
@@ -9,3 +9,34 @@ async def sleep_us(us):
 async def sleep_ms(ms):
     # Convert milliseconds to seconds
     await sleep(ms / 1000.0)
+
+
+class ThreadSafeFlag:
+    '''Mocks micropython asyncio.ThreadSafeFlag with an asyncio.Event. The set
+    method may be called from another thread (eg mock Timer callback).
+    '''
+
+    def __init__(self):
+        self._event = Event()
+        self._loop = None
+
+    def set(self):
+        # Set event directly if called from event loop thread, otherwise
+        # schedule in event loop thread (asyncio.Event is not thread safe)
+        try:
+            loop = get_running_loop()
+        except RuntimeError:
+            loop = None
+        if self._loop is None or loop is self._loop:
+            self._event.set()
+        else:
+            self._loop.call_soon_threadsafe(self._event.set)
+
+    def clear(self):
+        self._event.clear()
+
+    async def wait(self):
+        # Remember event loop so set can be called from other threads
+        self._loop = get_running_loop()
+        await self._event.wait()
+        self._event.clear()
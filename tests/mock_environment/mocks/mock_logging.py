@@ -25,6 +25,17 @@ class Handler:
     def close(self):
         pass
 
+    def flush(self):
+        pass
+
+    def start_rate_limit(self):
+        pass
+
+    def clear(self):
+        # Matches RingBufferHandler.clear (raises OSError if log missing)
+        os.remove('app.log')
+        open('app.log', 'w').close()
+
     def setFormatter(*args):
         pass
 
@@ -65,6 +76,10 @@ def basicConfig(*args, **kwargs):
     pass
 
 
+def shutdown():
+    pass
+
+
 def getLogger(name=None):
     return Logger()
 
@@ -75,4 +90,12 @@ def FileHandler(filename, mode=None, encoding=None, delay=False):
     return Handler()
 
 
+def RingBufferHandler(filename, *args, **kwargs):
+    return FileHandler(filename)
+
+
+def BinaryRingBufferHandler(filename, *args, **kwargs):
+    return FileHandler(filename)
+
+
 mock_root = Logger()
@@ -31,7 +31,7 @@ def set_mocks():
     # Must be last to give mock libraries priority over ../lib
     sys.path.insert(0, os.path.join(mock_dir, 'mocks'))
 
-    # Ensure timezone is PST (Config._convert_rules uses time.mktime, this will
+    # Ensure timezone is PST (Config uses time.localtime for schedule rules, will
     # return different values if timezone differs and cause test to fail)
     os.environ['TZ'] = 'America/Los_Angeles'
     time.tzset()
@@ -44,9 +44,31 @@ def set_mocks():
         # Convert milliseconds to seconds
         time.sleep(ms / 1000.0)
 
+    def ticks_us():
+        # Microseconds from arbitrary reference point (wraps in micropython)
+        return time.perf_counter_ns() // 1000
+
+    def ticks_ms():
+        # Milliseconds from arbitrary reference point (wraps in micropython)
+        return time.perf_counter_ns() // 1000000
+
+    def ticks_add(ticks, delta):
+        return ticks + delta
+
+    def ticks_diff(ticks1, ticks2):
+        return ticks1 - ticks2
+
     # Add missing methods to time module
     time.sleep_us = sleep_us
     time.sleep_ms = sleep_ms
+    time.ticks_us = ticks_us
+    time.ticks_ms = ticks_ms
+    time.ticks_add = ticks_add
+    time.ticks_diff = ticks_diff
+
+    # Add missing method to gc module (returns free heap from mock mem_info)
+    import gc
+    gc.mem_free = lambda: 72240
 
     # Allow calling asyncio.run when an event loop is already running
     # More closely approximates micropython uasyncio behavior
@@ -57,8 +79,11 @@ def set_mocks():
     logging.Handler = mock_logging.Handler
     logging.Logger = mock_logging.Logger
     logging.basicConfig = mock_logging.basicConfig
+    logging.shutdown = mock_logging.shutdown
     logging.getLogger = mock_logging.getLogger
     logging.FileHandler = mock_logging.FileHandler
+    logging.RingBufferHandler = mock_logging.RingBufferHandler
+    logging.BinaryRingBufferHandler = mock_logging.BinaryRingBufferHandler
     logging.root = mock_logging.Logger()
     logging.root.handlers = [mock_logging.Handler()]
 
@@ -76,6 +101,7 @@ def set_mocks():
     import mock_asyncio
     asyncio.sleep_ms = mock_asyncio.sleep_ms
     asyncio.sleep_us = mock_asyncio.sleep_us
+    asyncio.ThreadSafeFlag = mock_asyncio.ThreadSafeFlag
 
     # Patch time.time to return int epoch time (no subseconds)
     import mock_time
@@ -118,6 +144,14 @@ async def run_tests():
     app_context.timer_instance = SoftwareTimer()
     asyncio.create_task(app_context.timer_instance.loop())
 
+    # Instantiate PollScheduler, add to shared context module
+    from PollScheduler import PollScheduler
+    app_context.poll_scheduler_instance = PollScheduler()
+
+    # Instantiate SensorSampler, add to shared context module
+    from SensorSampler import SensorSampler
+    app_context.sensor_sampler_instance = SensorSampler()
+
     # Instantiate API backend, add to shared context module
     from Api import Api
     app_context.api_instance = Api()
@@ -143,6 +177,7 @@ async def run_tests():
     for i in [
         'config.json',
         'ir_macros.json',
+        'astronomy.json',
         'wifi_credentials.json',
         'app.log',
         'webrepl_cfg.py'
@@ -302,6 +302,23 @@ class Webrepl():
 
         return output.getvalue()
 
+    def get_log_mem(self, log_file='app.log', segments=5):
+        '''Downloads all log segments written by RingBufferHandler (rotated
+        segments app.log.1, app.log.2, etc plus active segment app.log) from
+        ESP32 filesystem, returns as single string ordered oldest to newest.
+        '''
+
+        output = b''
+        # Rotated segments: highest number is oldest, skip if not written yet
+        for i in range(segments - 1, 0, -1):
+            try:
+                output += self.get_file_mem(f'{log_file}.{i}')
+            except AssertionError:
+                continue
+
+        # Active segment (newest lines)
+        return output + self.get_file_mem(log_file)
+
     def put_file(self, local_file, remote_file):
         '''Uploads file from local filesystem to ESP32 filesystem.
         Takes local filepath, ESP32 filesystem destination path.
@@ -15,9 +15,13 @@ importing each function individually.
 '''
 
 import json
+import time
+import socket
 import asyncio
+import threading
 from math import isnan
 from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
 from validation_constants import ir_blaster_options
 from helper_functions import (
     valid_timestamp,
@@ -30,6 +34,16 @@ from helper_functions import (
 # Populated with endpoint:handler pairs by decorators below
 endpoint_map = {}
 
+# Open PersistentConnection instances, node IPs as keys
+persistent_connections = {}
+
+# StatusSubscription instances, node IPs as keys
+status_subscriptions = {}
+
+# Max serialized size of commands in a single batch request (node rejects
+# requests larger than 4096 bytes, leaves room for batch overhead)
+MAX_BATCH_SIZE = 3500
+
 
 def add_endpoint(url):
     '''Decorator used to populate endpoint_map'''
@@ -100,8 +114,15 @@ def requires_sensor(error_message):
 async def request(ip, msg):
     '''Takes node IP and list with API endpoint followed by arguments (if any).
     Sends request to node using asyncio streams.
+
+    If a CommandBatch is passed instead of IP the message is added to the
+    batch instead of sent (see run_commands).
     '''
 
+    # Called by endpoint function in run_commands, add to batch and return
+    if isinstance(ip, CommandBatch):
+        return ip.add(msg)
+
     # Open connection (5 second timeout)
     try:
         reader, writer = await asyncio.wait_for(
@@ -135,6 +156,321 @@ async def request(ip, msg):
     return response
 
 
+class CommandBatch:
+    '''Passed to endpoint functions in place of node IP by run_commands.
+    Endpoint functions validate their arguments as usual, but the request
+    function adds the message to this batch instead of sending it. All
+    messages are then sent to the node in a single batch request by send.
+    '''
+
+    def __init__(self, ip):
+        self.ip = ip
+        self.messages = []
+
+    def add(self, msg):
+        '''Takes message list, adds to batch, returns index of message.'''
+        self.messages.append(msg)
+        return len(self.messages) - 1
+
+    def _chunks(self):
+        '''Yields lists of messages with serialized size under MAX_BATCH_SIZE.'''
+        chunk = []
+        size = 0
+        for msg in self.messages:
+            msg_size = len(json.dumps(msg)) + 2
+            if chunk and size + msg_size > MAX_BATCH_SIZE:
+                yield chunk
+                chunk = []
+                size = 0
+            chunk.append(msg)
+            size += msg_size
+        if chunk:
+            yield chunk
+
+    def send(self):
+        '''Sends all messages to node in batch requests (one request unless
+        combined size exceeds MAX_BATCH_SIZE). Returns list of responses in
+        same order as messages. Sends messages individually if node does not
+        support the batch endpoint (older firmware).
+        '''
+        responses = []
+        for chunk in self._chunks():
+            response = asyncio.run(request(self.ip, ['batch', *chunk]))
+            if isinstance(response, list) and len(response) == len(chunk):
+                responses.extend(response)
+            elif isinstance(response, dict):
+                # Invalid command error, send each message separately
+                responses.extend(asyncio.run(request(self.ip, msg)) for msg in chunk)
+            else:
+                # Request failed, return same error for each message
+                responses.extend(response for _ in chunk)
+        return responses
+
+
+def _run_command_group(ip, commands):
+    '''Takes node IP and list of (index, args) tuples, returns list of
+    (index, response) tuples. Called by run_commands for each node.
+    '''
+    batch = CommandBatch(ip)
+    results = []
+    for index, args in commands:
+        try:
+            # Returns batch index if valid, error if arguments are invalid
+            response = endpoint_map[args[0]](batch, args[1:])
+            results.append((index, response, isinstance(response, int)))
+        except IndexError:
+            results.append((index, "Error: No command received", False))
+        except SyntaxError:
+            results.append((index, "Error: Missing required parameters", False))
+        except KeyError:
+            results.append((index, "Error: Command not found", False))
+
+    replies = batch.send() if batch.messages else []
+    return [
+        (index, replies[response] if batched else response)
+        for index, response, batched in results
+    ]
+
+
+def run_commands(actions):
+    '''Takes list of (ip, args) tuples (args list starts with endpoint name).
+    Groups commands by node IP and sends each group in a single batch request
+    (all nodes in parallel), commands for each node run in order. Returns list
+    of responses in same order as actions.
+    '''
+    groups = {}
+    for index, (ip, args) in enumerate(actions):
+        groups.setdefault(ip, []).append((index, args))
+
+    responses = [None] * len(actions)
+    with ThreadPoolExecutor(max_workers=20) as executor:
+        for results in executor.map(_run_command_group, groups, groups.values()):
+            for index, response in results:
+                responses[index] = response
+    return responses
+
+
+class PersistentConnection:
+    '''Keeps a socket open to a single node and sends requests using the
+    keep-alive protocol (newline-delimited JSON dicts with request id). Avoids
+    connection setup and teardown on each request to nodes that are polled
+    frequently (eg status requests from the django frontend).
+
+    Thread safe, requests from multiple threads are sent one at a time.
+    '''
+
+    def __init__(self, ip, port=8123, timeout=5):
+        self.ip = ip
+        self.port = port
+        self.timeout = timeout
+        self._sock = None
+        self._file = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        '''Opens socket to node, raises OSError if connection fails.'''
+        self._sock = socket.create_connection((self.ip, self.port), self.timeout)
+        self._file = self._sock.makefile('rb')
+
+    def close(self):
+        '''Closes socket (next request will reconnect).'''
+        if self._sock is not None:
+            self._file.close()
+            self._sock.close()
+        self._sock = None
+        self._file = None
+
+    def _send(self, msg):
+        '''Takes list with endpoint followed by args, sends keep-alive request
+        and returns reply. Raises OSError if connection was closed by node.
+        '''
+        self._next_id += 1
+        payload = {'id': self._next_id, 'cmd': msg}
+        self._sock.sendall(f'{json.dumps(payload)}\n'.encode())
+        res = self._file.readline()
+        # Node closed connection (idle timeout, reboot, etc)
+        if not res:
+            raise OSError('Connection closed by node')
+        res = json.loads(res)
+        if res.get('id') != self._next_id:
+            raise OSError('Received reply to wrong request')
+        return res['reply']
+
+    def request(self, msg):
+        '''Takes list with API endpoint followed by arguments (if any). Sends
+        request on open connection (connects first if needed), returns reply.
+        Reconnects once if the existing connection was closed by the node.
+        Returns same error strings as request function if request fails.
+        '''
+        with self._lock:
+            # Retry once with new connection if existing connection is stale
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._send(msg)
+                except socket.timeout:
+                    self.close()
+                    return "Error: Timed out waiting for response"
+                except ValueError:
+                    self.close()
+                    return "Error: Unable to decode response"
+                except OSError:
+                    self.close()
+                    if attempt:
+                        return "Error: Failed to connect"
+        return "Error: Failed to connect"  # pragma: no cover
+
+
+def persistent_request(ip, msg):
+    '''Takes node IP and list with API endpoint followed by arguments (if any).
+    Sends request on a persistent keep-alive connection to the node (opened on
+    first call, reused by subsequent calls to the same IP). Synchronous.
+    '''
+    connection = persistent_connections.get(ip)
+    if connection is None:
+        connection = persistent_connections.setdefault(ip, PersistentConnection(ip))
+    return connection.request(msg)
+
+
+class StatusSubscription:
+    '''Holds a subscribe connection open to a single node in a background
+    thread and merges status changes pushed by the node into a cached status
+    object. Any number of clients (eg django views serving multiple browsers)
+    can wait for changes with wait_for_change without sending requests to the
+    node.
+
+    The thread reconnects after errors and exits if wait_for_change is not
+    called for idle_timeout seconds (restarted by next wait_for_change call).
+    '''
+
+    # Seconds to wait for first status after starting thread
+    connect_timeout = 2
+
+    # Seconds to wait before reconnecting after connection error
+    retry_delay = 5
+
+    def __init__(self, ip, port=8123, timeout=45, idle_timeout=300):
+        self.ip = ip
+        self.port = port
+        # Node sends event at least every 30 seconds, reconnect if exceeded
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        # Merged status object, None if not connected
+        self.status = None
+        # Error string if last connection attempt failed
+        self.error = None
+        self._last_used = time.monotonic()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def _start(self):
+        '''Starts background thread if not already running.'''
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        '''Background thread, keeps subscribe connection open until idle.'''
+        while time.monotonic() - self._last_used < self.idle_timeout:
+            try:
+                self._listen()
+            except (OSError, ValueError) as error:
+                with self._condition:
+                    self.status = None
+                    self.error = str(error) or "Error: Failed to connect"
+                    self._condition.notify_all()
+            time.sleep(self.retry_delay)
+
+        # Clear cached status, may be stale when thread is restarted
+        with self._condition:
+            self.status = None
+            self.error = None
+
+    def _listen(self):
+        '''Opens subscribe connection, merges each event into cached status.
+        Returns when idle, raises OSError or ValueError if connection fails.
+        '''
+        with socket.create_connection((self.ip, self.port), self.timeout) as sock:
+            sock.sendall(b'["subscribe"]\n')
+            with sock.makefile('rb') as file:
+                full_status = True
+                while time.monotonic() - self._last_used < self.idle_timeout:
+                    res = file.readline()
+                    # Node closed connection (reboot, too many subscribers)
+                    if not res:
+                        raise OSError('Connection closed by node')
+                    event = json.loads(res)
+                    if 'status' not in event:
+                        raise OSError(event.get('ERROR', 'Invalid event'))
+                    self._apply_event(event['status'], full_status)
+                    full_status = False
+
+    def _apply_event(self, update, full_status):
+        '''Takes status from subscribe event and bool (True if first event on
+        connection, contains full status). Merges into cached status.
+        '''
+        with self._condition:
+            if full_status:
+                self.status = update
+                self.error = None
+            elif not update.get('unchanged'):
+                # Replace instead of modifying (status returned by
+                # wait_for_change may be serialized in another thread)
+                self.status = {
+                    **self.status,
+                    **update,
+                    'devices': {**self.status['devices'], **update['devices']},
+                    'sensors': {**self.status['sensors'], **update['sensors']}
+                }
+            self._condition.notify_all()
+
+    def wait_for_change(self, version, timeout):
+        '''Takes status_version from previous status and max seconds to wait.
+        Returns cached status as soon as its version differs from version, or
+        {"unchanged": True} dict with current version if timeout expires.
+
+        Returns None if unable to connect to node or subscribe (caller should
+        fall back to requesting status).
+        '''
+        self._last_used = time.monotonic()
+        with self._condition:
+            self._start()
+            if self.status is None and self.error is None:
+                self._condition.wait_for(
+                    lambda: self.status is not None or self.error is not None,
+                    self.connect_timeout
+                )
+            if self.status is None:
+                return None
+
+            self._condition.wait_for(
+                lambda: self.status is None or self.status['status_version'] != version,
+                timeout
+            )
+            if self.status is None:
+                return None
+            if self.status['status_version'] == version:
+                unchanged = {'unchanged': True, 'status_version': version}
+                # Client compares boot_id to detect reboot (same version
+                # after reboot does not mean unchanged)
+                if 'boot_id' in self.status:
+                    unchanged['boot_id'] = self.status['boot_id']
+                return unchanged
+            return self.status
+
+
+def get_subscription(ip):
+    '''Takes node IP, returns StatusSubscription instance for node (creates
+    if it does not exist, one subscription shared by all callers).
+    '''
+    subscription = status_subscriptions.get(ip)
+    if subscription is None:
+        subscription = status_subscriptions.setdefault(ip, StatusSubscription(ip))
+    return subscription
+
+
 @add_endpoint("status")
 def status(ip, _):
     '''Makes /status API call to requested IP, returns response.'''
@@ -458,6 +794,15 @@ def set_log_level(ip, params):
     return asyncio.run(request(ip, ['set_log_level', params[0]]))
 
 
+@add_endpoint("set_log_format")
+@requires_params
+def set_log_format(ip, params):
+    '''Makes /set_log_format API call to requested IP, returns response.
+    Requires 'text' or 'binary' as argument.
+    '''
+    return asyncio.run(request(ip, ['set_log_format', params[0]]))
+
+
 @add_endpoint("condition_met")
 @requires_params
 @requires_sensor("Must specify sensor")
@@ -535,3 +880,27 @@ def load_cell_get_raw_reading(ip, target, _):
 def get_mem_info(ip, _):
     '''Makes /mem_info API call to requested IP, returns response.'''
     return asyncio.run(request(ip, ['mem_info']))
+
+
+@add_endpoint("poll_stats")
+def poll_stats(ip, _):
+    '''Makes /poll_stats API call to requested IP, returns response.'''
+    return asyncio.run(request(ip, ['poll_stats']))
+
+
+@add_endpoint("sample_stats")
+def sample_stats(ip, _):
+    '''Makes /sample_stats API call to requested IP, returns response.'''
+    return asyncio.run(request(ip, ['sample_stats']))
+
+
+@add_endpoint("time_sync")
+def time_sync(ip, _):
+    '''Makes /time_sync API call to requested IP, returns response.'''
+    return asyncio.run(request(ip, ['time_sync']))
+
+
+@add_endpoint("startup_profile")
+def startup_profile(ip, _):
+    '''Makes /startup_profile API call to requested IP, returns response.'''
+    return asyncio.run(request(ip, ['startup_profile']))
@@ -0,0 +1,147 @@
+'''Decodes log files written by BinaryRingBufferHandler (lib/logging.py) back
+into the text format written by RingBufferHandler. Used by the django get_log
+endpoint and CLI tools.
+
+Accepts one or more segments concatenated oldest to newest (see
+Webrepl.get_log_mem). Segments written in text format (log format changed
+while older segments were still on disk) are returned unchanged.
+'''
+
+import struct
+from datetime import datetime, timedelta
+
+# Constants below must match lib/logging.py
+
+# First bytes of each binary segment
+MAGIC = b'BLG1'
+
+# Arg type bytes (LONG and FLOAT are stored as decimal strings)
+ARG_NONE = 0
+ARG_TRUE = 1
+ARG_FALSE = 2
+ARG_INT = 3
+ARG_LONG = 4
+ARG_FLOAT = 5
+ARG_STR = 6
+
+LEVEL_NAMES = {
+    50: 'CRITICAL',
+    40: 'ERROR',
+    30: 'WARNING',
+    20: 'INFO',
+    10: 'DEBUG'
+}
+
+# Binary timestamps are seconds since 2000-01-01 (local time, same as RTC)
+EPOCH = datetime(2000, 1, 1)
+
+# Definition: 0, id, length (followed by string)
+DEFINITION = struct.Struct('<BHH')
+
+# Record: level, timestamp, logger name id, format string id, number of args
+RECORD = struct.Struct('<BIHHB')
+
+
+def format_line(timestamp, level, name, msg, args):
+    '''Takes decoded record (timestamp in seconds since 2000-01-01, level
+    number, logger name, format string, args tuple), returns log line in the
+    same format as text log (see core/boot.py).
+    '''
+    asctime = (EPOCH + timedelta(seconds=timestamp)).strftime('%Y-%m-%d %H:%M:%S')
+    levelname = LEVEL_NAMES.get(level, f'LVL{level}')
+    try:
+        message = msg % args
+    except (TypeError, ValueError):
+        # Args do not match format string (would raise on node in text mode)
+        message = f'{msg} {args}'
+    return f'{asctime} - {levelname} - {name} - {message}\n'
+
+
+def _unpack_arg(data, pos):
+    '''Takes binary log and position of arg type byte, returns 2-tuple with
+    decoded arg and position of next byte.
+    '''
+    kind = data[pos]
+    pos += 1
+    if kind == ARG_NONE:
+        return None, pos
+    if kind == ARG_TRUE:
+        return True, pos
+    if kind == ARG_FALSE:
+        return False, pos
+    if kind == ARG_INT:
+        return struct.unpack_from('<i', data, pos)[0], pos + 4
+    if kind in (ARG_LONG, ARG_FLOAT, ARG_STR):
+        (length,) = struct.unpack_from('<H', data, pos)
+        pos += 2
+        if pos + length > len(data):
+            raise ValueError('Truncated arg')
+        value = data[pos:pos + length].decode('utf-8', errors='replace')
+        if kind == ARG_LONG:
+            value = int(value)
+        elif kind == ARG_FLOAT:
+            value = float(value)
+        return value, pos + length
+    raise ValueError(f'Unknown arg type {kind}')
+
+
+def _decode_segment(data, pos, output):
+    '''Takes binary log, position of first byte after MAGIC, and list of
+    lines. Decodes records until next MAGIC or invalid data (text segment or
+    partially written record), appends lines to list, returns position where
+    decoding stopped.
+    '''
+    strings = {}
+    while pos < len(data) and not data.startswith(MAGIC, pos):
+        try:
+            if data[pos] == 0:
+                _, string_id, length = DEFINITION.unpack_from(data, pos)
+                start = pos + DEFINITION.size
+                if start + length > len(data):
+                    break
+                strings[string_id] = data[start:start + length].decode('utf-8', errors='replace')
+                pos = start + length
+                continue
+
+            level, timestamp, name_id, msg_id, count = RECORD.unpack_from(data, pos)
+            # Every id is defined in segment before first use, undefined id
+            # means data is not a binary record
+            if name_id not in strings or msg_id not in strings:
+                break
+            end = pos + RECORD.size
+            args = []
+            for _ in range(count):
+                arg, end = _unpack_arg(data, end)
+                args.append(arg)
+        except (struct.error, IndexError, ValueError):
+            break
+
+        output.append(format_line(timestamp, level, strings[name_id], strings[msg_id], tuple(args)))
+        pos = end
+    return pos
+
+
+def decode_log(data):
+    '''Takes log file contents (bytes, one or more text or binary segments),
+    returns decoded log as string in text format.
+    '''
+    output = []
+    pos = 0
+    while pos < len(data):
+        if data.startswith(MAGIC, pos):
+            pos = _decode_segment(data, pos + len(MAGIC), output)
+            continue
+
+        # Copy text until end of line or start of next binary segment
+        end = data.find(b'\n', pos)
+        end = len(data) if end == -1 else end + 1
+        magic = data.find(MAGIC, pos + 1, end)
+        if magic == -1:
+            output.append(data[pos:end].decode('utf-8', errors='replace'))
+        else:
+            # Invalid data (eg partially written record) before next segment,
+            # end line so first record of segment starts on new line
+            output.append(data[pos:magic].decode('utf-8', errors='replace') + '\n')
+            end = magic
+        pos = end
+    return ''.join(output)
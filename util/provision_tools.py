@@ -41,9 +41,12 @@ core_modules = [
     "core/Config.py",
     "core/Group.py",
     "core/SoftwareTimer.py",
+    "core/PollScheduler.py",
+    "core/SensorSampler.py",
     "core/Api.py",
     "core/util.py",
     "core/app_context.py",
+    "core/json_stream.py",
     "core/main.py"
 ]
 
@@ -135,6 +135,12 @@ def validate_full_config(config):
     if valid is not True:
         return valid
 
+    # Confirm optional NTP server is a non-empty string
+    if 'ntp_server' in config['metadata']:
+        server = config['metadata']['ntp_server']
+        if not isinstance(server, str) or not server.strip():
+            return f'Invalid ntp_server {server} (must be IP or hostname)'
+
     # Get list of all nicknames, check for duplicates
     nicknames = get_config_param_list(config, 'nickname')
     if len(nicknames) != len(set(nicknames)):
@@ -167,6 +173,27 @@ def validate_full_config(config):
         if not valid_uri(uri):
             return f'Invalid URI {uri}'
 
+    # Check if all optional sensor debounce windows are valid
+    for key, value in config.items():
+        if is_sensor(key) and 'debounce_ms' in value:
+            debounce = value['debounce_ms']
+            if isinstance(debounce, bool) or not isinstance(debounce, int) or debounce < 0:
+                return f'Invalid debounce_ms {debounce} (must be non-negative integer)'
+
+    # Check if all optional sensor sample intervals are valid
+    for key, value in config.items():
+        if is_sensor(key) and 'sample_interval' in value:
+            interval = value['sample_interval']
+            if isinstance(interval, bool) or not isinstance(interval, int) or interval < 100:
+                return f'Invalid sample_interval {interval} (must be integer >= 100)'
+
+    # Check if all optional sensor max reading ages are valid
+    for key, value in config.items():
+        if is_sensor(key) and 'max_age' in value:
+            max_age = value['max_age']
+            if isinstance(max_age, bool) or not isinstance(max_age, int) or max_age < 100:
+                return f'Invalid max_age {max_age} (must be integer >= 100)'
+
     # Validate rules for all devices and sensors
     for instance in [key for key in config.keys() if is_device_or_sensor(key)]:
         valid = validate_rules(config[instance])